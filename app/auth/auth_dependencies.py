@@ -3,23 +3,23 @@ from uuid import UUID
 
 from fastapi import Depends, HTTPException
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.auth.jwt import decode_access_token
+from app.database.dependencies import get_user_read_repository
 from app.database.models.user import User
-from app.database.session import get_db
-from app.repositories.user import UserRepository
+from app.repositories.protocols import UserRepositoryProtocol
 
 
 security = HTTPBearer()
 
 
 async def get_current_user(
-    db: Annotated[AsyncSession, Depends(get_db)],
+    user_repository: Annotated[UserRepositoryProtocol, Depends(get_user_read_repository)],
     credentials: Annotated[HTTPAuthorizationCredentials, Depends(security)]
 ) -> User:
     """
     Получить текущего пользователя из JWT токена.
+    Пользователь читается через читающую сессию (реплика, если настроена).
     Если токен недействителен или пользователь не найден, выбрасывает HTTPException.
     """
     token = credentials.credentials
@@ -27,7 +27,6 @@ async def get_current_user(
     if not payload or "sub" not in payload:
         raise HTTPException(status_code=401, detail="Недействительный токен")
     user_id = UUID(payload["sub"])
-    user_repository = UserRepository(db)
     user = await user_repository.get_user_by_id(user_id)
     if not user:
         raise HTTPException(status_code=404, detail="Пользователь не найден")
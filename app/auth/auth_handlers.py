@@ -6,21 +6,19 @@ from datetime import datetime, timezone
 from typing import Annotated
 from uuid import UUID
 
-import redis.asyncio as redis_async
 from fastapi import APIRouter, Depends, HTTPException, Query
 from fastapi.responses import RedirectResponse
 from fastapi.security import OAuth2PasswordRequestForm
+from redis.asyncio import Redis
 
 from app.auth.auth_service import AuthService
 from app.database.dependencies import get_auth_service, get_user_service
+from app.database.redis import get_redis
 from app.schema.user import UserRead
 from app.service.user import UserService
 from app.settings import settings
 
 
-# Инициализация клиента Redis
-redis = redis_async.from_url(settings.REDIS_URL)
-
 router = APIRouter(
     prefix='/auth',
     tags=['auth'],
@@ -65,7 +63,8 @@ async def login(
 )
 async def confirm_email(
         token: Annotated[str, Query(description="Токен подтверждения email")],
-        user_service: Annotated[UserService, Depends(get_user_service)]
+        user_service: Annotated[UserService, Depends(get_user_service)],
+        redis: Annotated[Redis, Depends(get_redis)]
 ):
     """
     Эндпоинт для подтверждения email пользователя.
@@ -85,6 +84,7 @@ async def confirm_email(
     description="Эндпоинт для перенаправления пользователя на страницу авторизации Google."
 )
 async def login_google(
+    redis: Annotated[Redis, Depends(get_redis)]
 ):
     """
     Эндпоинт для перенаправления пользователя на страницу авторизации Google.
@@ -128,6 +128,7 @@ async def google_callback(
     code: Annotated[str, Query(description="Код авторизации, полученный от Google")],
     state: Annotated[str, Query(description="Состояние для защиты от CSRF")],
     auth_service: Annotated[AuthService, Depends(get_auth_service)],
+    redis: Annotated[Redis, Depends(get_redis)]
 ):
     """
     Эндпоинт для обработки колбэка после авторизации через Google.
@@ -163,6 +164,7 @@ async def google_callback(
     description="Эндпоинт для перенаправления пользователя на страницу авторизации Yandex."
 )
 async def login_yandex(
+    redis: Annotated[Redis, Depends(get_redis)]
 ):
     """
     Эндпоинт для перенаправления пользователя на страницу авторизации Yandex.
@@ -205,6 +207,7 @@ async def yandex_callback(
     code: Annotated[str, Query(description="Код авторизации, полученный от Yandex")],
     state: Annotated[str, Query(description="Состояние для защиты от CSRF")],
     auth_service: Annotated[AuthService, Depends(get_auth_service)],
+    redis: Annotated[Redis, Depends(get_redis)]
 ):
     """
     Эндпоинт для обработки колбэка после авторизации через Yandex.
@@ -246,7 +249,7 @@ def generate_code_challenge(verifier):
 # https://2abedfb331a1.ngrok-free.app/api/v1/docs#/
 
 @router.get("/login/vk")
-async def login_vk():
+async def login_vk(redis: Annotated[Redis, Depends(get_redis)]):
     state = hashlib.sha256(os.urandom(64)).hexdigest()
     code_verifier = generate_code_verifier()
     code_challenge = generate_code_challenge(code_verifier)
@@ -257,7 +260,7 @@ async def login_vk():
     })
     await redis.set(f"oauth_state:{state}", state_data, ex=300)
     vk_auth_url = (
-        f"https://id.vk.com/authorize"
+        f"{settings.VK_AUTH_URL}"
         f"?response_type=code"
         f"&client_id={settings.VK_CLIENT_ID}"
         f"&redirect_uri={settings.VK_REDIRECT_URI}"
@@ -275,6 +278,7 @@ async def vk_callback(
     code: Annotated[str, Query(description="Код авторизации VK")],
     state: Annotated[str, Query(description="Состояние для защиты от CSRF")],
     auth_service: Annotated[AuthService, Depends(get_auth_service)],
+    redis: Annotated[Redis, Depends(get_redis)]
 ):
     raw_data = await redis.get(f"oauth_state:{state}")
     if not raw_data:
@@ -1,25 +1,52 @@
 from dataclasses import dataclass
 from datetime import timedelta
-
-from passlib.context import CryptContext
+from functools import cache
+from typing import TYPE_CHECKING
 
 from app.auth.client.google import GoogleAuthClient
 from app.auth.client.vk import VKAuthClient
 from app.auth.client.yandex import YandexAuthClient
 from app.auth.jwt import create_access_token, decode_access_token
 from app.database.models.user import User
-from app.repositories.user import UserRepository
+from app.database.routing import PrimaryPin
+from app.repositories.protocols import UserRepositoryProtocol
+from app.tracing import traced
+
+
+if TYPE_CHECKING:
+    from passlib.context import CryptContext
 
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+@cache
+def get_password_context() -> "CryptContext":
+    """
+    Контекст хеширования паролей bcrypt. passlib загружается при первом обращении:
+    пароли проверяются только при входе и регистрации, а не на каждом запросе.
+    """
+    from passlib.context import CryptContext
 
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+
+@traced
 @dataclass
 class AuthService:
-    user_repository: UserRepository
+    user_repository: UserRepositoryProtocol
     google_client: GoogleAuthClient
     yandex_client: YandexAuthClient
     vk_client: VKAuthClient
+    # Закрепляет пользователя за основной БД после записи: get_current_user читает пользователей с реплики
+    primary_pin: PrimaryPin | None = None
+
+    async def create_user(self, user_data: dict) -> User:
+        """
+        Создать пользователя и закрепить его за основной БД на окно read-your-writes,
+        чтобы первый запрос с новым токеном не прочитал реплику, ещё не получившую запись.
+        """
+        user = await self.user_repository.create_user(user_data)
+        if self.primary_pin is not None:
+            await self.primary_pin.pin(user.id)
+        return user
 
     async def authenticate_user(self, username: str, password: str):
         """
@@ -38,14 +65,14 @@ class AuthService:
         Хеширует пароль с использованием bcrypt.
         Возвращает хешированный пароль.
         """
-        return pwd_context.hash(password)
+        return get_password_context().hash(password)
 
     async def verify_password(self, plain_password: str, hashed_password: str) -> bool:
         """
         Проверяет, соответствует ли введенный пароль хешированному паролю.
         Возвращает True, если пароли совпадают, иначе False.
         """
-        return pwd_context.verify(plain_password, hashed_password)
+        return get_password_context().verify(plain_password, hashed_password)
 
     async def create_jwt_for_user(self, user: User, expires_delta: int = 15):
         """
@@ -83,7 +110,7 @@ class AuthService:
                 "is_active": True,
                 "is_admin": False,
             }
-            user = await self.user_repository.create_user(user_data)
+            user = await self.create_user(user_data)
         return user
 
     async def authenticate_yandex_user(self, code: str) -> User:
@@ -106,7 +133,7 @@ class AuthService:
                 "is_active": True,
                 "is_admin": False,
             }
-            user = await self.user_repository.create_user(user_data)
+            user = await self.create_user(user_data)
         return user
 
     async def create_email_confirmation_token(self):
@@ -125,7 +152,7 @@ class AuthService:
         user_info = await self.vk_client.get_user_info(access_token, user_id)
         username = user_info.get("first_name", "") + " " + user_info.get("last_name", "")
         email = token_data.get("email", f"{user_id}@vk.com")
-        user = await self.user_repository.get_user_by_email(email)
+        user = await self.user_repository.get_by_email(email)
         if not user:
             user_data = {
                 "username": username,
@@ -134,5 +161,5 @@ class AuthService:
                 "is_active": True,
                 "is_admin": False,
             }
-            user = await self.user_repository.create_user(user_data)
+            user = await self.create_user(user_data)
         return user
@@ -3,6 +3,7 @@ from dataclasses import dataclass
 from fastapi import HTTPException
 from httpx import AsyncClient, HTTPStatusError, RequestError
 
+from app.instrumentation import InstrumentedTransport
 from app.settings import Settings
 
 
@@ -18,7 +19,7 @@ class GoogleAuthClient:
         try:
             access_token = await self.get_user_access_token(code)
             headers = {'Authorization': f'Bearer {access_token}'}
-            async with AsyncClient() as client:
+            async with AsyncClient(transport=InstrumentedTransport("google")) as client:
                 response = await client.get(self.settings.GOOGLE_USER_INFO_URL, headers=headers)
                 response.raise_for_status()
                 user_info = response.json()
@@ -45,7 +46,7 @@ class GoogleAuthClient:
                 'redirect_uri': self.settings.GOOGLE_REDIRECT_URI,
                 'grant_type': 'authorization_code'
             }
-            async with AsyncClient() as client:
+            async with AsyncClient(transport=InstrumentedTransport("google")) as client:
                 response = await client.post(self.settings.GOOGLE_TOKEN_URL, data=data)
                 response.raise_for_status()
                 token_data = response.json()
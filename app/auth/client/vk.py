@@ -3,6 +3,7 @@ from dataclasses import dataclass
 from fastapi import HTTPException
 from httpx import AsyncClient, HTTPStatusError, RequestError
 
+from app.instrumentation import InstrumentedTransport
 from app.settings import Settings
 
 
@@ -18,9 +19,9 @@ class VKAuthClient:
             "client_id": self.settings.VK_CLIENT_ID,
             "code_verifier": code_verifier,
         }
-        async with AsyncClient() as client:
+        async with AsyncClient(transport=InstrumentedTransport("vk")) as client:
             try:
-                response = await client.post("https://id.vk.com/oauth2/token", data=data)
+                response = await client.post(self.settings.VK_TOKEN_URL, data=data)
                 response.raise_for_status()
                 token_data = response.json()
                 if "error" in token_data:
@@ -36,9 +37,9 @@ class VKAuthClient:
             "access_token": access_token,
             "v": self.settings.VK_API_VERSION,
         }
-        async with AsyncClient() as client:
+        async with AsyncClient(transport=InstrumentedTransport("vk")) as client:
             try:
-                response = await client.get("https://api.vk.com/method/users.get", params=params)
+                response = await client.get(self.settings.VK_USER_INFO_URL, params=params)
                 response.raise_for_status()
                 data = response.json()
                 if "error" in data:
@@ -3,6 +3,7 @@ from dataclasses import dataclass
 from fastapi import HTTPException
 from httpx import AsyncClient, HTTPStatusError, RequestError
 
+from app.instrumentation import InstrumentedTransport
 from app.settings import Settings
 
 
@@ -18,7 +19,7 @@ class YandexAuthClient:
         try:
             access_token = await self.get_user_access_token(code)
             headers = {'Authorization': f'OAuth {access_token}'}
-            async with AsyncClient() as client:
+            async with AsyncClient(transport=InstrumentedTransport("yandex")) as client:
                 response = await client.get(self.settings.YANDEX_USER_INFO_URL, headers=headers)
                 response.raise_for_status()
                 user_info = response.json()
@@ -46,7 +47,7 @@ class YandexAuthClient:
                 'redirect_uri': self.settings.YANDEX_REDIRECT_URI,
                 'grant_type': 'authorization_code'
             }
-            async with AsyncClient() as client:
+            async with AsyncClient(transport=InstrumentedTransport("yandex")) as client:
                 response = await client.post(
                     self.settings.YANDEX_TOKEN_URL,
                       data=data,
@@ -33,3 +33,19 @@ def decode_access_token(token: str):
 
     except JWTError:
         return None
+
+
+def bearer_subject(authorization: bytes | str | None) -> str | None:
+    '''
+    Возвращает sub из заголовка Authorization: Bearer <token> без обращения к базе данных.
+    Если заголовка нет или токен недействителен, возвращает None.
+    '''
+    if authorization is None:
+        return None
+    if isinstance(authorization, bytes):
+        authorization = authorization.decode("latin-1")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    payload = decode_access_token(token.strip())
+    return payload.get("sub") if payload else None
@@ -1,11 +1,114 @@
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+import itertools
+from dataclasses import dataclass, field
+from typing import Iterator
+
+from prometheus_client import REGISTRY
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase
 
-from app.settings import settings
+from app.instrumentation import InstrumentedAsyncPool, PoolCollector, count_queries
+from app.settings import Settings
+from app.tracing import trace_queries
+
+
+# Состояние пулов всех открытых Databases процесса для /metrics
+pool_collector = PoolCollector([])
+REGISTRY.register(pool_collector)
+
+
+@dataclass
+class Databases:
+    """
+    Пулы соединений с PostgreSQL приложения или воркера: основная БД, реплики только для чтения
+    (при их отсутствии чтения идут в основную БД) и отдельный пул административных выборок.
+    Соединения открываются при первом использовании и закрываются dispose.
+    """
+    engine: AsyncEngine
+    session_maker: async_sessionmaker[AsyncSession]
+    replica_engines: list[AsyncEngine]
+    replica_session_makers: list[async_sessionmaker[AsyncSession]]
+    admin_engine: AsyncEngine
+    admin_session_maker: async_sessionmaker[AsyncSession]
+    _replica_cycle: Iterator[async_sessionmaker[AsyncSession]] | None = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self._replica_cycle = itertools.cycle(self.replica_session_makers) if self.replica_session_makers else None
+
+    @property
+    def engines(self) -> list[AsyncEngine]:
+        return [self.engine, *self.replica_engines, self.admin_engine]
+
+    @property
+    def has_replicas(self) -> bool:
+        return self._replica_cycle is not None
+
+    def next_replica(self) -> async_sessionmaker[AsyncSession]:
+        """
+        Фабрика сессий следующей реплики по кругу.
+        """
+        return next(self._replica_cycle)
+
+    async def dispose(self) -> None:
+        """
+        Закрыть соединения всех пулов: основного, реплик и административного.
+        """
+        for engine in self.engines:
+            if engine in pool_collector.engines:
+                pool_collector.engines.remove(engine)
+            await engine.dispose()
+
+    async def __aenter__(self) -> "Databases":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.dispose()
 
 
-engine = create_async_engine(settings.DATABASE_URL, echo=True)
-async_session_maker = async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
+def create_databases(settings: Settings) -> Databases:
+    """
+    Создать пулы соединений по настройкам settings, подключив к ним метрики и трассировку.
+    """
+    engine = create_async_engine(
+        settings.DATABASE_URL,
+        echo=True,
+        poolclass=InstrumentedAsyncPool,
+        pool_logging_name="primary"
+    )
+    replica_engines = [
+        create_async_engine(url, poolclass=InstrumentedAsyncPool, pool_logging_name=f"replica{number}")
+        for number, url in enumerate(settings.DATABASE_REPLICA_URLS)
+    ]
+    # Отдельный небольшой пул для тяжёлых админских выборок: они не занимают соединения
+    # основного пула и ограничены собственным statement_timeout. При наличии реплик
+    # админские выборки уходят на последнюю из них
+    admin_engine = create_async_engine(
+        settings.DATABASE_REPLICA_URLS[-1] if settings.DATABASE_REPLICA_URLS else settings.DATABASE_URL,
+        poolclass=InstrumentedAsyncPool,
+        pool_logging_name="admin",
+        pool_size=settings.ADMIN_DB_POOL_SIZE,
+        max_overflow=0,
+        connect_args={"server_settings": {
+            "statement_timeout": str(settings.ADMIN_STATEMENT_TIMEOUT_MS),
+            "application_name": "taskpilot-admin",
+        }}
+    )
+    databases = Databases(
+        engine=engine,
+        session_maker=async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession),
+        replica_engines=replica_engines,
+        replica_session_makers=[
+            async_sessionmaker(replica_engine, expire_on_commit=False, class_=AsyncSession)
+            for replica_engine in replica_engines
+        ],
+        admin_engine=admin_engine,
+        admin_session_maker=async_sessionmaker(admin_engine, expire_on_commit=False, class_=AsyncSession)
+    )
+    # Метрики пулов и SQL-запросов по методам репозиториев, спаны SQL-запросов в трассах
+    for instrumented_engine in databases.engines:
+        count_queries(instrumented_engine)
+        trace_queries(instrumented_engine)
+    pool_collector.engines.extend(databases.engines)
+    return databases
 
 
 class Base(DeclarativeBase):
@@ -1,55 +1,204 @@
 from typing import Annotated
 
-from fastapi import Depends
+from fastapi import Depends, Request
+from redis.asyncio import Redis
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.auth.auth_service import AuthService
 from app.auth.client.google import GoogleAuthClient
 from app.auth.client.vk import VKAuthClient
 from app.auth.client.yandex import YandexAuthClient
-from app.database.session import get_db
+from app.database.redis import get_redis
+from app.database.routing import PrimaryPin
+from app.database.session import get_admin_db, get_app_settings, get_db, get_primary_pin, get_read_db
+from app.profiling import ProfileStore
+from app.repositories.admin_todo_item import AdminTodoItemRepository
+from app.repositories.memory import InMemoryTodoItemRepository, InMemoryUserRepository, MemoryStore
+from app.repositories.protocols import TodoItemRepositoryProtocol, UserRepositoryProtocol
 from app.repositories.todo_item import TodoItemRepository
+from app.repositories.todo_recurrence import TodoRecurrenceRepository
 from app.repositories.user import UserRepository
+from app.service.admin_todo_item import AdminTodoItemService
+from app.service.cache import TodoListCache
+from app.service.events import TodoEventHub, TodoEventPublisher
 from app.service.todo_item import TodoItemService
+from app.service.todo_recurrence import TodoRecurrenceService
 from app.service.user import UserService
 from app.settings import Settings
 
 
+# Зависимости запроса берут настройки и ресурсы приложения, обрабатывающего запрос, из app.state (см. create_app)
+
+
+def get_memory_store(request: Request) -> MemoryStore:
+    """Получить пользователей и задачи приложения при REPOSITORY_BACKEND=memory."""
+    return request.app.state.memory_store
+
+
+def create_user_repository(db: AsyncSession, backend: str, memory_store: MemoryStore) -> UserRepositoryProtocol:
+    """
+    Репозиторий пользователей по настройке REPOSITORY_BACKEND: sqlalchemy или memory.
+    """
+    if backend == "sqlalchemy":
+        return UserRepository(db)
+    if backend == "memory":
+        return InMemoryUserRepository(memory_store)
+    raise ValueError(f"Неизвестное хранилище репозиториев: {backend}")
+
+
+def create_todo_item_repository(
+        db: AsyncSession,
+        backend: str,
+        memory_store: MemoryStore
+) -> TodoItemRepositoryProtocol:
+    """
+    Репозиторий задач по настройке REPOSITORY_BACKEND: sqlalchemy или memory.
+    """
+    if backend == "sqlalchemy":
+        return TodoItemRepository(db)
+    if backend == "memory":
+        return InMemoryTodoItemRepository(memory_store)
+    raise ValueError(f"Неизвестное хранилище репозиториев: {backend}")
+
+
 async def get_user_repository(
-        db: Annotated[AsyncSession, Depends(get_db)]
-) -> UserRepository:
+        db: Annotated[AsyncSession, Depends(get_db)],
+        memory_store: Annotated[MemoryStore, Depends(get_memory_store)],
+        app_settings: Annotated[Settings, Depends(get_app_settings)]
+) -> UserRepositoryProtocol:
     """Получить репозиторий для работы с пользователями."""
-    return UserRepository(db)
+    return create_user_repository(db, app_settings.REPOSITORY_BACKEND, memory_store)
+
+
+async def get_user_read_repository(
+        db: Annotated[AsyncSession, Depends(get_read_db)],
+        memory_store: Annotated[MemoryStore, Depends(get_memory_store)],
+        app_settings: Annotated[Settings, Depends(get_app_settings)]
+) -> UserRepositoryProtocol:
+    """Получить репозиторий пользователей для проверки токена (реплика, если настроена)."""
+    return create_user_repository(db, app_settings.REPOSITORY_BACKEND, memory_store)
 
 
 async def get_todo_db(
-        db: Annotated[AsyncSession, Depends(get_db)]
-) -> TodoItemRepository:
+        db: Annotated[AsyncSession, Depends(get_db)],
+        memory_store: Annotated[MemoryStore, Depends(get_memory_store)],
+        app_settings: Annotated[Settings, Depends(get_app_settings)]
+) -> TodoItemRepositoryProtocol:
     """Получить репозиторий для работы с элементами списка дел."""
-    return TodoItemRepository(db)
+    return create_todo_item_repository(db, app_settings.REPOSITORY_BACKEND, memory_store)
+
+
+async def get_todo_read_db(
+        db: Annotated[AsyncSession, Depends(get_read_db)],
+        memory_store: Annotated[MemoryStore, Depends(get_memory_store)],
+        app_settings: Annotated[Settings, Depends(get_app_settings)]
+) -> TodoItemRepositoryProtocol:
+    """Получить репозиторий элементов списка дел для читающих запросов (реплика, если настроена)."""
+    return create_todo_item_repository(db, app_settings.REPOSITORY_BACKEND, memory_store)
 
 
 async def get_auth_service(
-    db: Annotated[AsyncSession, Depends(get_db)]
+    user_repository: Annotated[UserRepositoryProtocol, Depends(get_user_repository)],
+    primary_pin: Annotated[PrimaryPin | None, Depends(get_primary_pin)],
+    app_settings: Annotated[Settings, Depends(get_app_settings)]
 ) -> AuthService:
     """Получить сервис для работы с аутентификацией."""
     return AuthService(
-        user_repository=UserRepository(db),
-        google_client=GoogleAuthClient(settings=Settings()),
-        yandex_client=YandexAuthClient(settings=Settings()),
-        vk_client =VKAuthClient(settings=Settings())
+        user_repository=user_repository,
+        google_client=GoogleAuthClient(settings=app_settings),
+        yandex_client=YandexAuthClient(settings=app_settings),
+        vk_client=VKAuthClient(settings=app_settings),
+        primary_pin=primary_pin
+    )
+
+
+async def get_todo_list_cache(
+        redis: Annotated[Redis, Depends(get_redis)],
+        app_settings: Annotated[Settings, Depends(get_app_settings)]
+) -> TodoListCache:
+    """Получить кеш списков задач."""
+    return TodoListCache(
+        redis=redis,
+        ttl=app_settings.TODO_CACHE_TTL,
+        lock_ttl=app_settings.TODO_CACHE_LOCK_TTL,
+        compress_min_size=app_settings.TODO_CACHE_COMPRESS_MIN_SIZE,
+        enabled=app_settings.TODO_CACHE_ENABLED
+    )
+
+
+async def get_todo_list_read_cache(
+        redis: Annotated[Redis, Depends(get_redis)],
+        db: Annotated[AsyncSession, Depends(get_read_db)],
+        app_settings: Annotated[Settings, Depends(get_app_settings)]
+) -> TodoListCache:
+    """
+    Получить кеш списков задач для читающих эндпоинтов. Списки, прочитанные с реплики,
+    хранятся отдельно от списков основной БД и живут не дольше окна read-your-writes:
+    пользователь после записи читает основную БД и не получает список с отстающей реплики.
+    """
+    if not db.info.get("replica"):
+        return await get_todo_list_cache(redis, app_settings)
+    return TodoListCache(
+        redis=redis,
+        ttl=app_settings.TODO_CACHE_TTL,
+        lock_ttl=app_settings.TODO_CACHE_LOCK_TTL,
+        compress_min_size=app_settings.TODO_CACHE_COMPRESS_MIN_SIZE,
+        enabled=app_settings.TODO_CACHE_ENABLED,
+        namespace="replica",
+        max_ttl=app_settings.READ_YOUR_WRITES_WINDOW
+    )
+
+
+async def get_todo_event_hub(request: Request) -> TodoEventHub:
+    """Получить общую для SSE-соединений приложения подписку на события задач."""
+    return request.app.state.todo_event_hub
+
+
+async def get_todo_event_publisher(
+        redis: Annotated[Redis, Depends(get_redis)],
+        app_settings: Annotated[Settings, Depends(get_app_settings)]
+) -> TodoEventPublisher:
+    """Получить публикатор событий изменения задач."""
+    return TodoEventPublisher(
+        redis=redis,
+        maxlen=app_settings.TODO_EVENTS_STREAM_MAXLEN,
+        ttl=app_settings.TODO_EVENTS_STREAM_TTL,
+        enabled=app_settings.TODO_EVENTS_ENABLED
     )
 
 
 async def get_todo_item_service(
-        repository: Annotated[TodoItemRepository, Depends(get_todo_db)]
+        repository: Annotated[TodoItemRepositoryProtocol, Depends(get_todo_db)],
+        cache: Annotated[TodoListCache, Depends(get_todo_list_cache)],
+        primary_pin: Annotated[PrimaryPin | None, Depends(get_primary_pin)],
+        events: Annotated[TodoEventPublisher, Depends(get_todo_event_publisher)]
 ) -> TodoItemService:
     """Получить сервис для работы с элементами списка дел."""
-    return TodoItemService(repository=repository)
+    return TodoItemService(repository=repository, cache=cache, primary_pin=primary_pin, events=events)
+
+
+async def get_todo_item_read_service(
+        repository: Annotated[TodoItemRepositoryProtocol, Depends(get_todo_read_db)],
+        cache: Annotated[TodoListCache, Depends(get_todo_list_read_cache)]
+) -> TodoItemService:
+    """Получить сервис элементов списка дел для читающих эндпоинтов."""
+    return TodoItemService(repository=repository, cache=cache)
+
+
+async def get_todo_recurrence_service(
+        db: Annotated[AsyncSession, Depends(get_db)],
+        cache: Annotated[TodoListCache, Depends(get_todo_list_cache)],
+        primary_pin: Annotated[PrimaryPin | None, Depends(get_primary_pin)],
+        events: Annotated[TodoEventPublisher, Depends(get_todo_event_publisher)]
+) -> TodoRecurrenceService:
+    """Получить сервис правил повторения задач."""
+    return TodoRecurrenceService(
+        repository=TodoRecurrenceRepository(db), cache=cache, primary_pin=primary_pin, events=events
+    )
 
 
 async def get_user_service(
-        user_repository: Annotated[UserRepository, Depends(get_user_repository)],
+        user_repository: Annotated[UserRepositoryProtocol, Depends(get_user_repository)],
         auth_service: Annotated[AuthService, Depends(get_auth_service)]
 ) -> UserService:
     """Получить сервис для работы с пользователями."""
@@ -59,4 +208,13 @@ async def get_user_service(
     )
 
 
+async def get_admin_todo_item_service(
+        db: Annotated[AsyncSession, Depends(get_admin_db)]
+) -> AdminTodoItemService:
+    """Получить сервис административных выборок по задачам всех пользователей."""
+    return AdminTodoItemService(repository=AdminTodoItemRepository(db))
+
 
+async def get_profile_store(request: Request) -> ProfileStore:
+    """Получить хранилище профилей запросов: пишет ProfilingMiddleware, читают админские эндпоинты."""
+    return request.app.state.profile_store
@@ -1,12 +1,23 @@
-from .enums import CategoryName
+from .enums import CategoryName, RecurrenceFrequency
 from .todo_category import TodoCategory
 from .todo_item import TodoItem
+from .todo_item_archive import TodoItemArchive
+from .todo_recurrence import TodoRecurrence
+from .todo_stats import TodoCategoryStats, TodoDueStats
+from .todo_sync import TodoItemTombstone, TodoSyncState
 from .user import User
 
 
 __all__ = [
     "User",
     "TodoItem",
+    "TodoItemArchive",
+    "TodoRecurrence",
     "TodoCategory",
-    "CategoryName"
+    "TodoCategoryStats",
+    "TodoDueStats",
+    "TodoSyncState",
+    "TodoItemTombstone",
+    "CategoryName",
+    "RecurrenceFrequency"
 ]
\ No newline at end of file
@@ -7,3 +7,9 @@ class CategoryName(str, Enum):
     study = "study"
     sport = "sport"
     other = "other"
+
+
+class RecurrenceFrequency(str, Enum):
+    daily = "daily"
+    weekly = "weekly"
+    monthly = "monthly"
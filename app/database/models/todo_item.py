@@ -2,11 +2,14 @@ from datetime import date, datetime
 from typing import TYPE_CHECKING
 from uuid import UUID, uuid4
 
-from sqlalchemy import Boolean, Date, DateTime, ForeignKey, String
+from sqlalchemy import (DDL, BigInteger, Boolean, Computed, Date, DateTime, ForeignKey, Index, Integer, String, event,
+                        text)
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.dialects.postgresql import UUID as PGUUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database.database import Base
+from app.settings import settings
 
 
 if TYPE_CHECKING:
@@ -14,8 +17,99 @@ if TYPE_CHECKING:
     from app.database.models.user import User
 
 
+# Полнотекстовый вектор по названию (вес A) и описанию (вес B) для русского и английского текста
+SEARCH_VECTOR_EXPRESSION = (
+    "setweight(to_tsvector('russian', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('russian', coalesce(description, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'B')"
+)
+
+
+def partition_ddl(table_name: str, partitions: int) -> list[str]:
+    """
+    DDL hash-секций таблицы: {table_name}_p0 ... {table_name}_p{partitions - 1}.
+    """
+    return [
+        f"CREATE TABLE {table_name}_p{remainder} PARTITION OF {table_name} "
+        f"FOR VALUES WITH (MODULUS {partitions}, REMAINDER {remainder})"
+        for remainder in range(partitions)
+    ]
+
+
 class TodoItem(Base):
+    """
+    Задача пользователя.
+
+    Таблица секционирована hash по user_id: все запросы к задачам ограничены
+    одним пользователем и затрагивают только одну секцию.
+
+    Изменения через ORM проверяют и увеличивают version в том же UPDATE
+    (оптимистическая блокировка): если задачу успели изменить, строка не обновляется
+    и SQLAlchemy выбрасывает StaleDataError.
+    """
     __tablename__ = "todo_items"
+    # Все индексы горячих запросов частичные: задачи в корзине (deleted_at IS NOT NULL) в них не попадают
+    __table_args__ = (
+        # btree_gin позволяет держать user_id и вектор в одном GIN-индексе
+        Index(
+            "ix_todo_items_user_id_search_vector",
+            "user_id",
+            "search_vector",
+            postgresql_using="gin",
+            postgresql_where=text("deleted_at IS NULL")
+        ),
+        # Индексы списка задач: фильтры и сортировки из TodoItemFilter / TodoItemSort
+        Index("ix_todo_items_user_id_created_at", "user_id", "created_at",
+              postgresql_where=text("deleted_at IS NULL")),
+        Index("ix_todo_items_user_id_completed_created_at", "user_id", "completed", "created_at",
+              postgresql_where=text("deleted_at IS NULL")),
+        Index("ix_todo_items_user_id_category_id_created_at", "user_id", "category_id", "created_at",
+              postgresql_where=text("deleted_at IS NULL")),
+        Index("ix_todo_items_user_id_date_of_execution", "user_id", "date_of_execution",
+              postgresql_where=text("deleted_at IS NULL")),
+        Index("ix_todo_items_user_id_title", "user_id", "title",
+              postgresql_where=text("deleted_at IS NULL")),
+        # Keyset-пагинация административной выборки по всем пользователям
+        Index("ix_todo_items_created_at_id", "created_at", "id",
+              postgresql_where=text("deleted_at IS NULL")),
+        # Невыполненные задачи по сроку: фильтры pending и overdue
+        Index(
+            "ix_todo_items_pending_user_id_date_of_execution",
+            "user_id",
+            "date_of_execution",
+            postgresql_where=text("NOT completed AND deleted_at IS NULL")
+        ),
+        # Триграммы названия для автодополнения по префиксу и с опечатками
+        Index(
+            "ix_todo_items_user_id_title_trgm",
+            "user_id",
+            "title",
+            postgresql_using="gin",
+            postgresql_ops={"title": "gin_trgm_ops"},
+            postgresql_where=text("deleted_at IS NULL")
+        ),
+        # Очередь архиватора: выполненные задачи по времени выполнения
+        Index("ix_todo_items_completed_at", "completed_at",
+              postgresql_where=text("completed AND deleted_at IS NULL")),
+        # Очередь напоминаний: невыполненные задачи без отправленного напоминания по дате выполнения
+        Index("ix_todo_items_reminder_date_of_execution", "date_of_execution",
+              postgresql_where=text("NOT completed AND deleted_at IS NULL AND reminded_at IS NULL")),
+        # Одна задача на дату для каждого правила повторения: повторный запуск генератора не создаёт дублей
+        Index("ix_todo_items_recurrence_occurrence", "user_id", "recurrence_id", "date_of_execution",
+              unique=True, postgresql_where=text("recurrence_id IS NOT NULL")),
+        # Внешний ключ на правило повторения: ON DELETE SET NULL при удалении правила ищет задачи по нему
+        Index("ix_todo_items_recurrence_id", "recurrence_id",
+              postgresql_where=text("recurrence_id IS NOT NULL")),
+        # Дельта-синхронизация: изменения пользователя по номеру, включая задачи в корзине (tombstone)
+        Index("ix_todo_items_user_id_change_seq", "user_id", "change_seq", "id"),
+        # Корзина пользователя и очередь очистки корзины
+        Index("ix_todo_items_trash_user_id_deleted_at", "user_id", "deleted_at",
+              postgresql_where=text("deleted_at IS NOT NULL")),
+        Index("ix_todo_items_trash_deleted_at", "deleted_at",
+              postgresql_where=text("deleted_at IS NOT NULL")),
+        {"postgresql_partition_by": "HASH (user_id)"},
+    )
 
     id: Mapped[UUID] = mapped_column(
         primary_key=True,
@@ -27,7 +121,19 @@ class TodoItem(Base):
     completed: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now)
     updated_at: Mapped[datetime] = mapped_column(DateTime, onupdate=datetime.now, nullable=True)
+    completed_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
+    deleted_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
+    reminded_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
     date_of_execution: Mapped[date] = mapped_column(Date, nullable=True)
+    # Номер последнего изменения задачи в последовательности пользователя (TodoSyncState)
+    change_seq: Mapped[int] = mapped_column(BigInteger, default=0, server_default="0", nullable=False)
+    # Версия задачи для If-Match / ETag
+    version: Mapped[int] = mapped_column(Integer, server_default="1", nullable=False)
+    search_vector: Mapped[str] = mapped_column(
+        TSVECTOR,
+        Computed(SEARCH_VECTOR_EXPRESSION, persisted=True),
+        deferred=True
+    )
 
     category_id: Mapped[UUID] = mapped_column(
         ForeignKey("todo_categories.id",
@@ -37,14 +143,35 @@ class TodoItem(Base):
     )
     category: Mapped["TodoCategory"] = relationship("TodoCategory", back_populates="items")
 
+    # Ключ секционирования входит в первичный ключ: этого требует PostgreSQL
     user_id: Mapped[UUID] = mapped_column(
         ForeignKey("users.id",
                    ondelete="CASCADE",
                    onupdate="CASCADE"),
-        nullable=False
+        primary_key=True,
+        type_=PGUUID(as_uuid=True)
     )
     user: Mapped["User"] = relationship("User", back_populates="todo_items")
 
+    # Правило повторения, по которому создана задача
+    recurrence_id: Mapped[UUID] = mapped_column(
+        ForeignKey("todo_recurrences.id",
+                   ondelete="SET NULL",
+                   onupdate="CASCADE"),
+        nullable=True,
+        type_=PGUUID(as_uuid=True)
+    )
+
+    __mapper_args__ = {"version_id_col": version}
+
     def __repr__(self):
         category_name = self.category.name if self.category else None
         return f"TodoItem(id={self.id}, title={self.title}, category_name={category_name})"
+
+
+# Расширения нужны индексам нескольких таблиц (todo_items, todo_items_archive), поэтому создаются
+# до всех таблиц, а не перед todo_items: порядок таблиц в metadata определяют внешние ключи
+event.listen(Base.metadata, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS btree_gin"))
+event.listen(Base.metadata, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+for statement in partition_ddl(TodoItem.__tablename__, settings.TODO_ITEMS_PARTITIONS):
+    event.listen(TodoItem.__table__, "after_create", DDL(statement))
@@ -0,0 +1,58 @@
+from datetime import date, datetime
+from uuid import UUID
+
+from sqlalchemy import Boolean, Computed, Date, DateTime, ForeignKey, Index, Integer, String
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.dialects.postgresql import UUID as PGUUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database.database import Base
+from app.database.models.todo_item import SEARCH_VECTOR_EXPRESSION
+
+
+class TodoItemArchive(Base):
+    """
+    Архив выполненных задач.
+
+    Задачи, выполненные давно, переносятся сюда архиватором
+    (app.workers.todo_archiver), чтобы не раздувать горячие индексы todo_items.
+    Столбцы повторяют todo_items; архивные задачи доступны только для чтения.
+    """
+    __tablename__ = "todo_items_archive"
+    __table_args__ = (
+        Index("ix_todo_items_archive_user_id_created_at", "user_id", "created_at"),
+        Index("ix_todo_items_archive_user_id_search_vector", "user_id", "search_vector", postgresql_using="gin"),
+    )
+
+    id: Mapped[UUID] = mapped_column(primary_key=True, type_=PGUUID(as_uuid=True))
+    title: Mapped[str] = mapped_column(String, nullable=False)
+    description: Mapped[str] = mapped_column(String, nullable=True)
+    completed: Mapped[bool] = mapped_column(Boolean, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
+    completed_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
+    date_of_execution: Mapped[date] = mapped_column(Date, nullable=True)
+    version: Mapped[int] = mapped_column(Integer, server_default="1", nullable=False)
+    search_vector: Mapped[str] = mapped_column(
+        TSVECTOR,
+        Computed(SEARCH_VECTOR_EXPRESSION, persisted=True),
+        deferred=True
+    )
+    archived_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now, nullable=False)
+
+    category_id: Mapped[UUID] = mapped_column(
+        ForeignKey("todo_categories.id",
+                   ondelete="CASCADE",
+                   onupdate="CASCADE"),
+        nullable=False
+    )
+    user_id: Mapped[UUID] = mapped_column(
+        ForeignKey("users.id",
+                   ondelete="CASCADE",
+                   onupdate="CASCADE"),
+        nullable=False,
+        type_=PGUUID(as_uuid=True)
+    )
+
+    def __repr__(self):
+        return f"TodoItemArchive(id={self.id}, title={self.title})"
@@ -0,0 +1,62 @@
+from datetime import date, datetime
+from uuid import UUID, uuid4
+
+from sqlalchemy import Date, DateTime, ForeignKey, Index, Integer, SmallInteger, String, text
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.dialects.postgresql import ENUM as SAEnum
+from sqlalchemy.dialects.postgresql import UUID as PGUUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database.database import Base
+from app.database.models.enums import RecurrenceFrequency
+
+
+class TodoRecurrence(Base):
+    """
+    Правило повторения задачи пользователя.
+
+    Генератор создаёт по правилу задачи на горизонт TODO_RECURRENCE_HORIZON_DAYS дней вперёд;
+    next_occurrence — первое ещё не созданное повторение (NULL, если повторения закончились).
+    """
+    __tablename__ = "todo_recurrences"
+    __table_args__ = (
+        # Очередь генератора: правила, у которых следующее повторение попадает в горизонт
+        Index("ix_todo_recurrences_next_occurrence", "next_occurrence",
+              postgresql_where=text("next_occurrence IS NOT NULL")),
+        Index("ix_todo_recurrences_user_id_created_at", "user_id", "created_at"),
+    )
+
+    id: Mapped[UUID] = mapped_column(
+        primary_key=True,
+        default=uuid4,
+        type_=PGUUID(as_uuid=True)
+    )
+    title: Mapped[str] = mapped_column(String, nullable=False)
+    description: Mapped[str] = mapped_column(String, nullable=True)
+    frequency: Mapped[RecurrenceFrequency] = mapped_column(SAEnum(RecurrenceFrequency), nullable=False)
+    # INTERVAL — ключевое слово SQL, имя столбца всегда в кавычках
+    interval: Mapped[int] = mapped_column("interval", Integer, default=1, nullable=False, quote=True)
+    # Дни недели еженедельного повторения, 0 — понедельник
+    weekdays: Mapped[list[int]] = mapped_column(ARRAY(SmallInteger), nullable=True)
+    month_day: Mapped[int] = mapped_column(SmallInteger, nullable=True)
+    starts_on: Mapped[date] = mapped_column(Date, nullable=False)
+    until: Mapped[date] = mapped_column(Date, nullable=True)
+    next_occurrence: Mapped[date] = mapped_column(Date, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now)
+
+    category_id: Mapped[UUID] = mapped_column(
+        ForeignKey("todo_categories.id",
+                   ondelete="CASCADE",
+                   onupdate="CASCADE"),
+        nullable=False
+    )
+    user_id: Mapped[UUID] = mapped_column(
+        ForeignKey("users.id",
+                   ondelete="CASCADE",
+                   onupdate="CASCADE"),
+        nullable=False,
+        type_=PGUUID(as_uuid=True)
+    )
+
+    def __repr__(self):
+        return f"TodoRecurrence(id={self.id}, title={self.title}, frequency={self.frequency})"
@@ -0,0 +1,52 @@
+from datetime import date
+from uuid import UUID
+
+from sqlalchemy import Date, ForeignKey, Integer
+from sqlalchemy.dialects.postgresql import UUID as PGUUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database.database import Base
+
+
+class TodoCategoryStats(Base):
+    """
+    Счётчики задач пользователя по категориям.
+    Обновляются дельтами в той же транзакции, что и сами задачи.
+    """
+    __tablename__ = "todo_category_stats"
+
+    user_id: Mapped[UUID] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE", onupdate="CASCADE"),
+        primary_key=True,
+        type_=PGUUID(as_uuid=True)
+    )
+    category_id: Mapped[UUID] = mapped_column(
+        ForeignKey("todo_categories.id", ondelete="CASCADE", onupdate="CASCADE"),
+        primary_key=True,
+        type_=PGUUID(as_uuid=True)
+    )
+    total: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    completed: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+
+    def __repr__(self):
+        return f"TodoCategoryStats(user_id={self.user_id}, category_id={self.category_id}, total={self.total})"
+
+
+class TodoDueStats(Base):
+    """
+    Количество невыполненных задач пользователя на каждую дату выполнения.
+    Позволяет считать просроченные задачи без обхода todo_items.
+    Строки с pending = 0 удаляются, поэтому таблица хранит только даты с невыполненными задачами.
+    """
+    __tablename__ = "todo_due_stats"
+
+    user_id: Mapped[UUID] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE", onupdate="CASCADE"),
+        primary_key=True,
+        type_=PGUUID(as_uuid=True)
+    )
+    date_of_execution: Mapped[date] = mapped_column(Date, primary_key=True)
+    pending: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+
+    def __repr__(self):
+        return f"TodoDueStats(user_id={self.user_id}, date_of_execution={self.date_of_execution}, pending={self.pending})"
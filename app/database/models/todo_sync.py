@@ -0,0 +1,56 @@
+from datetime import datetime
+from uuid import UUID
+
+from sqlalchemy import BigInteger, DateTime, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import UUID as PGUUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database.database import Base
+
+
+class TodoSyncState(Base):
+    """
+    Счётчик изменений задач пользователя для дельта-синхронизации.
+
+    Каждое изменение задачи получает следующий номер last_seq в той же транзакции;
+    блокировка строки счётчика упорядочивает фиксацию изменений одного пользователя по номерам.
+    Изменения с номером не больше pruned_seq могли быть удалены (старые tombstone),
+    клиенту с таким токеном нужна полная синхронизация.
+    """
+    __tablename__ = "todo_sync_state"
+
+    user_id: Mapped[UUID] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE", onupdate="CASCADE"),
+        primary_key=True,
+        type_=PGUUID(as_uuid=True)
+    )
+    last_seq: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False)
+    pruned_seq: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False)
+
+    def __repr__(self):
+        return f"TodoSyncState(user_id={self.user_id}, last_seq={self.last_seq})"
+
+
+class TodoItemTombstone(Base):
+    """
+    Отметка об удалении задачи из todo_items (очистка корзины или перенос в архив)
+    для клиентов дельта-синхронизации. Задачи в корзине отдаются как удалённые прямо из todo_items.
+    """
+    __tablename__ = "todo_item_tombstones"
+    __table_args__ = (
+        Index("ix_todo_item_tombstones_user_id_change_seq", "user_id", "change_seq", "id"),
+        # Очередь очистки старых отметок
+        Index("ix_todo_item_tombstones_removed_at", "removed_at"),
+    )
+
+    id: Mapped[UUID] = mapped_column(primary_key=True, type_=PGUUID(as_uuid=True))
+    user_id: Mapped[UUID] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE", onupdate="CASCADE"),
+        primary_key=True,
+        type_=PGUUID(as_uuid=True)
+    )
+    change_seq: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    removed_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now, nullable=False)
+
+    def __repr__(self):
+        return f"TodoItemTombstone(id={self.id}, change_seq={self.change_seq})"
@@ -0,0 +1,20 @@
+from fastapi import Request
+from redis.asyncio import Redis
+
+from app.instrumentation import InstrumentedRedis
+from app.settings import Settings
+
+
+def create_redis(settings: Settings) -> InstrumentedRedis:
+    """
+    Создать клиент Redis по REDIS_URL; длительность команд попадает в метрики.
+    Соединения открываются при первой команде и закрываются aclose.
+    """
+    return InstrumentedRedis.from_url(settings.REDIS_URL)
+
+
+async def get_redis(request: Request) -> Redis:
+    """
+    Получить клиент Redis приложения, обрабатывающего запрос (create_app).
+    """
+    return request.app.state.redis
@@ -0,0 +1,89 @@
+import asyncio
+from dataclasses import dataclass
+from uuid import UUID
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from app.database.database import Databases
+from app.metrics import DB_READ_ROUTING, DB_REPLICA_LAG
+
+
+# Отставание реплики: 0, если всё полученное WAL уже применено
+REPLICA_LAG_QUERY = text("""
+    SELECT CASE
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+
+@dataclass
+class PrimaryPin:
+    """
+    Метка в Redis, закрепляющая чтения пользователя за основной БД
+    на короткое окно после его записи (read-your-writes).
+    """
+    redis: Redis
+    window: int
+
+    @staticmethod
+    def _key(user_id: UUID | str) -> str:
+        return f"db_primary_pin:{user_id}"
+
+    async def pin(self, user_id: UUID) -> None:
+        """
+        Закрепить чтения пользователя за основной БД на окно window секунд.
+        """
+        try:
+            await self.redis.set(self._key(user_id), b"1", ex=self.window)
+        except RedisError:
+            pass
+
+    async def is_pinned(self, user_id: UUID | str) -> bool:
+        """
+        Проверить, должен ли пользователь сейчас читать из основной БД.
+        При недоступности Redis безопасно считает, что должен.
+        """
+        try:
+            return bool(await self.redis.exists(self._key(user_id)))
+        except RedisError:
+            return True
+
+
+async def choose_read_session_maker(
+        databases: Databases,
+        pin: PrimaryPin,
+        user_id: str | None
+) -> async_sessionmaker[AsyncSession]:
+    """
+    Выбрать фабрику сессий для читающего запроса.
+
+    - Без реплик всегда возвращает основную БД.
+    - Пользователь, недавно выполнявший запись, читает из основной БД.
+    - Остальные чтения распределяются по репликам по кругу.
+    """
+    if not databases.has_replicas or (user_id is not None and await pin.is_pinned(user_id)):
+        DB_READ_ROUTING.labels("primary").inc()
+        return databases.session_maker
+    DB_READ_ROUTING.labels("replica").inc()
+    return databases.next_replica()
+
+
+async def monitor_replica_lag(replica_engines: list[AsyncEngine], interval: float) -> None:
+    """
+    Периодически измерять отставание каждой реплики и публиковать его в метрике.
+    """
+    while True:
+        for replica_engine in replica_engines:
+            label = f"{replica_engine.url.host}:{replica_engine.url.port or 5432}"
+            try:
+                async with replica_engine.connect() as connection:
+                    lag = await connection.scalar(REPLICA_LAG_QUERY)
+                DB_REPLICA_LAG.labels(label).set(float(lag or 0))
+            except SQLAlchemyError:
+                DB_REPLICA_LAG.labels(label).set(float("nan"))
+        await asyncio.sleep(interval)
@@ -1,13 +1,79 @@
-from typing import AsyncGenerator
+from typing import Annotated, AsyncGenerator
 
+from fastapi import Depends, Request
+from redis.asyncio import Redis
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database.database import async_session_maker
+from app.auth.jwt import bearer_subject
+from app.database.database import Databases
+from app.database.redis import get_redis
+from app.database.routing import PrimaryPin, choose_read_session_maker
+from app.settings import Settings
 
 
-async def get_db() -> AsyncGenerator[AsyncSession, None]:
+def get_app_settings(request: Request) -> Settings:
+    """
+    Получить настройки приложения, обрабатывающего запрос (create_app).
+    """
+    return request.app.state.settings
+
+
+def get_databases(request: Request) -> Databases:
+    """
+    Получить пулы соединений приложения, обрабатывающего запрос (create_app).
+    """
+    return request.app.state.databases
+
+
+async def get_db(
+        databases: Annotated[Databases, Depends(get_databases)]
+) -> AsyncGenerator[AsyncSession, None]:
     """
     Получить асинхронную сессию базы данных.
     """
-    async with async_session_maker() as session:
+    async with databases.session_maker() as session:
+        yield session
+
+
+async def get_primary_pin(
+        redis: Annotated[Redis, Depends(get_redis)],
+        databases: Annotated[Databases, Depends(get_databases)],
+        app_settings: Annotated[Settings, Depends(get_app_settings)]
+) -> PrimaryPin | None:
+    """
+    Получить метку read-your-writes. Без реплик не нужна и возвращает None.
+    """
+    if not databases.has_replicas:
+        return None
+    return PrimaryPin(redis=redis, window=app_settings.READ_YOUR_WRITES_WINDOW)
+
+
+async def get_read_db(
+        request: Request,
+        databases: Annotated[Databases, Depends(get_databases)],
+        pin: Annotated[PrimaryPin | None, Depends(get_primary_pin)]
+) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Получить сессию для читающего запроса: реплика или основная БД
+    (если реплик нет или пользователь недавно выполнял запись).
+    Сессия реплики помечена в session.info["replica"].
+    """
+    if pin is None:
+        session_maker = databases.session_maker
+    else:
+        session_maker = await choose_read_session_maker(
+            databases, pin, bearer_subject(request.headers.get("Authorization"))
+        )
+    async with session_maker() as session:
+        session.info["replica"] = session_maker is not databases.session_maker
+        yield session
+
+
+async def get_admin_db(
+        databases: Annotated[Databases, Depends(get_databases)]
+) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Получить сессию отдельного пула для административных выборок.
+    """
+    async with databases.admin_session_maker() as session:
         yield session
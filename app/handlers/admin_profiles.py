@@ -0,0 +1,82 @@
+from datetime import timedelta
+from typing import Annotated, List
+
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Response
+
+from app.auth.auth_dependencies import get_admin_user
+from app.auth.jwt import create_access_token
+from app.database.dependencies import get_profile_store
+from app.database.models.user import User
+from app.database.session import get_app_settings
+from app.middleware.profiling import PROFILE_TOKEN_SCOPE
+from app.profiling import ProfileInfo, ProfileStore
+from app.schema.profile import ProfileToken
+from app.settings import Settings
+
+
+router = APIRouter(
+    tags=["admin"],
+    prefix="/admin/profiles",
+)
+
+
+@router.post(
+    "/token",
+    response_model=ProfileToken,
+    status_code=201
+)
+async def create_profile_token(
+    admin_user: Annotated[User, Depends(get_admin_user)],
+    app_settings: Annotated[Settings, Depends(get_app_settings)]
+) -> ProfileToken:
+    """
+    Выдать токен профилирования. Запрос с заголовком X-Profile-Token выполняется под профилировщиком,
+    а его ответ содержит X-Profile-Id профиля. Токен не является токеном доступа: запрос по-прежнему
+    авторизуется своим заголовком Authorization.
+    """
+    if not app_settings.PROFILING_ENABLED:
+        raise HTTPException(status_code=404, detail="Профилирование выключено")
+    token = create_access_token(
+        {"scope": PROFILE_TOKEN_SCOPE, "admin": str(admin_user.id)},
+        expires_delta=timedelta(seconds=app_settings.PROFILING_TOKEN_TTL)
+    )
+    return ProfileToken(token=token, expires_in=app_settings.PROFILING_TOKEN_TTL)
+
+
+@router.get(
+    "",
+    response_model=List[ProfileInfo],
+    status_code=200
+)
+async def get_profiles(
+    admin_user: Annotated[User, Depends(get_admin_user)],
+    store: Annotated[ProfileStore, Depends(get_profile_store)],
+    limit: Annotated[int, Query(description="Сколько последних профилей вернуть", ge=1, le=1000)] = 50
+) -> List[ProfileInfo]:
+    """
+    Получить описания последних сохранённых профилей, от новых к старым.
+    """
+    return await store.list(limit)
+
+
+@router.get(
+    "/{profile_id}",
+    status_code=200,
+    responses={200: {"description": "Профиль в формате speedscope", "content": {"application/json": {}}}}
+)
+async def get_profile(
+    admin_user: Annotated[User, Depends(get_admin_user)],
+    store: Annotated[ProfileStore, Depends(get_profile_store)],
+    profile_id: Annotated[str, Path(description="ID профиля из X-Profile-Id", pattern="^[0-9a-f]{32}$")]
+) -> Response:
+    """
+    Получить профиль в формате speedscope: файл открывается на https://www.speedscope.app.
+    """
+    profile = await store.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Профиль не найден")
+    return Response(
+        content=profile,
+        media_type="application/json",
+        headers={"Content-Disposition": f'attachment; filename="{profile_id}.speedscope.json"'}
+    )
@@ -1,13 +1,16 @@
+from datetime import datetime
 from typing import Annotated, List
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Response
 
 from app.auth.auth_dependencies import get_admin_user
-from app.database.dependencies import get_todo_item_service
+from app.database.dependencies import get_admin_todo_item_service, get_todo_item_read_service
+from app.database.models.enums import CategoryName
 from app.database.models.todo_item import TodoItem
 from app.database.models.user import User
-from app.schema.todo_item import TodoItemRead
+from app.schema.todo_item import AdminTodoGroupBy, AdminTodoItemFilter, TodoItemAnalyticsRow, TodoItemRead
+from app.service.admin_todo_item import AdminTodoItemService
 from app.service.todo_item import TodoItemService
 
 
@@ -24,7 +27,7 @@ router = APIRouter(
 )
 async def get_todo_items(
     admin_user: Annotated[User, Depends(get_admin_user)],
-    service_todo_item: Annotated[TodoItemService, Depends(get_todo_item_service)],
+    service_todo_item: Annotated[TodoItemService, Depends(get_todo_item_read_service)],
     user_id: Annotated[UUID, Query(description="ID пользователя")],
 ) -> List[TodoItem]:
     """
@@ -33,3 +36,73 @@ async def get_todo_items(
     return await service_todo_item.get_todo_items(
         user_id=user_id
     )
+
+
+@router.get(
+    "/todo_items/all",
+    response_model=List[TodoItemRead],
+    status_code=200
+)
+async def get_all_todo_items(
+    admin_user: Annotated[User, Depends(get_admin_user)],
+    service: Annotated[AdminTodoItemService, Depends(get_admin_todo_item_service)],
+    response: Response,
+    user_id: Annotated[UUID | None, Query(description="ID пользователя")] = None,
+    category_name: Annotated[CategoryName | None, Query(description="Категория задачи")] = None,
+    completed: Annotated[bool | None, Query(description="Только выполненные или невыполненные")] = None,
+    created_from: Annotated[datetime | None, Query(description="Создана не раньше")] = None,
+    created_to: Annotated[datetime | None, Query(description="Создана раньше")] = None,
+    cursor: Annotated[str | None, Query(description="Курсор из заголовка X-Next-Cursor")] = None,
+    limit: Annotated[int, Query(description="Размер страницы", ge=1, le=1000)] = 100
+) -> List[TodoItem]:
+    """
+    Получить задачи всех пользователей для администратора.
+    Страницы упорядочены от новых задач к старым; курсор следующей страницы
+    возвращается в заголовке X-Next-Cursor.
+    """
+    filters = AdminTodoItemFilter(
+        user_id=user_id,
+        category_name=category_name,
+        completed=completed,
+        created_from=created_from,
+        created_to=created_to
+    )
+    todo_items, next_cursor = await service.list_todo_items(
+        filters=filters,
+        cursor=cursor,
+        limit=limit
+    )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return todo_items
+
+
+@router.get(
+    "/todo_items/analytics",
+    response_model=List[TodoItemAnalyticsRow],
+    status_code=200
+)
+async def get_todo_items_analytics(
+    admin_user: Annotated[User, Depends(get_admin_user)],
+    service: Annotated[AdminTodoItemService, Depends(get_admin_todo_item_service)],
+    group_by: Annotated[AdminTodoGroupBy, Query(description="Поле группировки")],
+    user_id: Annotated[UUID | None, Query(description="ID пользователя")] = None,
+    category_name: Annotated[CategoryName | None, Query(description="Категория задачи")] = None,
+    completed: Annotated[bool | None, Query(description="Только выполненные или невыполненные")] = None,
+    created_from: Annotated[datetime | None, Query(description="Создана не раньше")] = None,
+    created_to: Annotated[datetime | None, Query(description="Создана раньше")] = None
+) -> List[TodoItemAnalyticsRow]:
+    """
+    Получить количество задач и выполненных задач по группам для администратора.
+    """
+    filters = AdminTodoItemFilter(
+        user_id=user_id,
+        category_name=category_name,
+        completed=completed,
+        created_from=created_from,
+        created_to=created_to
+    )
+    return await service.aggregate_todo_items(
+        group_by=group_by,
+        filters=filters
+    )
@@ -1,14 +1,21 @@
+from datetime import date
 from typing import Annotated, List
 from uuid import UUID
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Header, Query, Response
+from fastapi.responses import StreamingResponse
 
 from app.auth.auth_dependencies import get_current_user
-from app.database.dependencies import get_todo_item_service
+from app.database.dependencies import get_todo_event_hub, get_todo_item_read_service, get_todo_item_service
+from app.database.models.enums import CategoryName
 from app.database.models.todo_item import TodoItem
 from app.database.models.user import User
-from app.schema.todo_item import TodoItemCreate, TodoItemRead, TodoItemUpdate
-from app.service.todo_item import TodoItemService
+from app.database.session import get_app_settings
+from app.schema.todo_item import (TodoItemChanges, TodoItemCreate, TodoItemFilter, TodoItemRead, TodoItemSort,
+                                  TodoItemStats, TodoItemSuggestion, TodoItemTrashRead, TodoItemUpdate)
+from app.service.events import TodoEventHub
+from app.service.todo_item import TodoItemService, parse_if_match, todo_item_etag
+from app.settings import Settings, settings
 
 
 router = APIRouter(
@@ -24,17 +31,181 @@ router = APIRouter(
 )
 async def get_todo_items(
     auth_user: Annotated[User, Depends(get_current_user)],
-    service: Annotated[TodoItemService, Depends(get_todo_item_service)]
+    service: Annotated[TodoItemService, Depends(get_todo_item_read_service)],
+    completed: Annotated[bool | None, Query(description="Только выполненные или невыполненные")] = None,
+    category_name: Annotated[CategoryName | None, Query(description="Категория задачи")] = None,
+    due_from: Annotated[date | None, Query(description="Дата выполнения не раньше")] = None,
+    due_to: Annotated[date | None, Query(description="Дата выполнения не позже")] = None,
+    overdue: Annotated[bool | None, Query(description="Только просроченные или только непросроченные")] = None,
+    sort: Annotated[TodoItemSort, Query(description="Поле сортировки, '-' — по убыванию")] = TodoItemSort.created_at_desc,
+    offset: Annotated[int, Query(description="Сколько задач пропустить", ge=0)] = 0,
+    limit: Annotated[int | None, Query(description="Размер страницы", ge=1, le=1000)] = None,
+    include_archived: Annotated[bool, Query(description="Включить архивные задачи")] = False
+) -> Response:
+    """
+    Эндпоинт для получения элементов списка дел пользователя с фильтрами и сортировкой.
+    Доступно только для аутентифицированных пользователей.
+    Готовый JSON отдаётся из кеша без повторной сериализации.
+    """
+    filters = TodoItemFilter(
+        completed=completed,
+        category_name=category_name,
+        due_from=due_from,
+        due_to=due_to,
+        overdue=overdue
+    )
+    payload = await service.get_todo_items_json(
+        user_id=auth_user.id,
+        filters=filters,
+        sort=sort,
+        offset=offset,
+        limit=limit,
+        include_archived=include_archived
+    )
+    return Response(content=payload, media_type="application/json")
+
+
+@router.get(
+    "/search",
+    response_model=List[TodoItemRead],
+    status_code=200
+)
+async def search_todo_items(
+    auth_user: Annotated[User, Depends(get_current_user)],
+    service: Annotated[TodoItemService, Depends(get_todo_item_read_service)],
+    q: Annotated[str, Query(description="Поисковый запрос", min_length=1, max_length=200)],
+    offset: Annotated[int, Query(description="Сколько результатов пропустить", ge=0)] = 0,
+    limit: Annotated[int, Query(description="Размер страницы", ge=1, le=100)] = 20,
+    include_archived: Annotated[bool, Query(description="Искать также в архивных задачах")] = False
 ) -> List[TodoItem]:
     """
-    Эндпоинт для получения всех элементов списка дел пользователя.
+    Эндпоинт для полнотекстового поиска по задачам пользователя.
+    Доступно только для аутентифицированных пользователей.
+    """
+    return await service.search_todo_items(
+        user_id=auth_user.id,
+        query=q,
+        offset=offset,
+        limit=limit,
+        include_archived=include_archived
+    )
+
+
+@router.get(
+    "/autocomplete",
+    response_model=List[TodoItemSuggestion],
+    status_code=200
+)
+async def autocomplete_todo_titles(
+    auth_user: Annotated[User, Depends(get_current_user)],
+    service: Annotated[TodoItemService, Depends(get_todo_item_read_service)],
+    q: Annotated[str, Query(description="Начало названия задачи", min_length=1, max_length=100)],
+    limit: Annotated[int, Query(description="Количество подсказок", ge=1, le=20)] = 10
+) -> Response:
+    """
+    Эндпоинт для подсказок по названиям задач при вводе.
+    Допускает опечатки. Доступно только для аутентифицированных пользователей.
+    """
+    payload = await service.suggest_todo_titles_json(
+        user_id=auth_user.id,
+        prefix=q,
+        limit=limit
+    )
+    return Response(content=payload, media_type="application/json")
+
+
+@router.get(
+    "/stats",
+    response_model=TodoItemStats,
+    status_code=200
+)
+async def get_todo_stats(
+    auth_user: Annotated[User, Depends(get_current_user)],
+    service: Annotated[TodoItemService, Depends(get_todo_item_read_service)]
+) -> TodoItemStats:
+    """
+    Эндпоинт для получения статистики задач пользователя:
+    количество по категориям, выполненные, невыполненные и просроченные.
     Доступно только для аутентифицированных пользователей.
     """
-    return await service.get_todo_items(
+    return await service.get_todo_stats(
         user_id=auth_user.id
     )
 
 
+@router.get(
+    "/trash",
+    response_model=List[TodoItemTrashRead],
+    status_code=200
+)
+async def get_trashed_todo_items(
+    auth_user: Annotated[User, Depends(get_current_user)],
+    service: Annotated[TodoItemService, Depends(get_todo_item_read_service)],
+    offset: Annotated[int, Query(description="Сколько задач пропустить", ge=0)] = 0,
+    limit: Annotated[int, Query(description="Размер страницы", ge=1, le=100)] = 50
+) -> List[TodoItem]:
+    """
+    Эндпоинт для получения задач пользователя в корзине.
+    Доступно только для аутентифицированных пользователей.
+    """
+    return await service.get_trashed_todo_items(
+        user_id=auth_user.id,
+        offset=offset,
+        limit=limit
+    )
+
+
+@router.get(
+    "/changes",
+    response_model=TodoItemChanges,
+    status_code=200
+)
+async def get_todo_item_changes(
+    auth_user: Annotated[User, Depends(get_current_user)],
+    service: Annotated[TodoItemService, Depends(get_todo_item_read_service)],
+    since: Annotated[str | None, Query(description="Токен из next_token предыдущего ответа", max_length=200)] = None,
+    limit: Annotated[int, Query(description="Максимум изменений в ответе", ge=1, le=1000)] = settings.TODO_SYNC_PAGE_SIZE
+) -> TodoItemChanges:
+    """
+    Эндпоинт дельта-синхронизации: задачи, созданные или изменённые после токена, и id удалённых задач.
+    Без токена возвращает все текущие задачи. Ответ 410 означает, что нужна полная синхронизация.
+    Доступно только для аутентифицированных пользователей.
+    """
+    return await service.get_changes(
+        user_id=auth_user.id,
+        since=since,
+        limit=limit
+    )
+
+
+@router.get(
+    "/events",
+    response_class=StreamingResponse,
+    status_code=200
+)
+async def todo_item_events(
+    auth_user: Annotated[User, Depends(get_current_user)],
+    hub: Annotated[TodoEventHub, Depends(get_todo_event_hub)],
+    app_settings: Annotated[Settings, Depends(get_app_settings)],
+    last_event_id: Annotated[str | None, Header(
+        alias="Last-Event-ID",
+        pattern=r"^\d+-\d+$",
+        description="Id последнего полученного события для возобновления потока"
+    )] = None
+) -> StreamingResponse:
+    """
+    Эндпоинт потока событий изменения задач пользователя (Server-Sent Events).
+    Каждое событие — {"type": "created|updated|deleted|restored|refresh", "id": "<id задачи>"};
+    событие reset означает, что список нужно загрузить заново.
+    Доступно только для аутентифицированных пользователей.
+    """
+    return StreamingResponse(
+        hub.stream(auth_user.id, last_event_id, app_settings.TODO_EVENTS_HEARTBEAT),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.post(
     "/",
     response_model=TodoItemRead,
@@ -43,16 +214,19 @@ async def get_todo_items(
 async def create_todo_item(
     auth_user: Annotated[User, Depends(get_current_user)],
     todo_item_schema: TodoItemCreate,
-    service: Annotated[TodoItemService, Depends(get_todo_item_service)]
+    service: Annotated[TodoItemService, Depends(get_todo_item_service)],
+    response: Response
 ) -> TodoItem:
     """
     Эндпоинт для создания элемента списка дел.
     Доступно только для аутентифицированных пользователей.
     """
-    return await service.create_todo_item(
+    todo_item = await service.create_todo_item(
         schema=todo_item_schema,
         user_id=auth_user.id
     )
+    response.headers["ETag"] = todo_item_etag(todo_item)
+    return todo_item
 
 
 @router.get(
@@ -63,16 +237,20 @@ async def create_todo_item(
 async def get_todo_item(
     auth_user: Annotated[User, Depends(get_current_user)],
     todo_item_id: UUID,
-    service: Annotated[TodoItemService, Depends(get_todo_item_service)]
+    service: Annotated[TodoItemService, Depends(get_todo_item_read_service)],
+    response: Response
 ) -> TodoItem:
     """
     Эндпоинт для получения элемента списка дел по идентификатору.
+    Версия задачи отдаётся в заголовке ETag.
     Доступно только для аутентифицированных пользователей.
     """
-    return await service.get_todo_item(
+    todo_item = await service.get_todo_item(
         todo_item_id=todo_item_id,
         user_id=auth_user.id
     )
+    response.headers["ETag"] = todo_item_etag(todo_item)
+    return todo_item
 
 
 @router.patch(
@@ -84,17 +262,27 @@ async def update_todo_item(
     auth_user: Annotated[User, Depends(get_current_user)],
     todo_item_id: UUID,
     todo_item_schema: TodoItemUpdate,
-    service: Annotated[TodoItemService, Depends(get_todo_item_service)]
+    service: Annotated[TodoItemService, Depends(get_todo_item_service)],
+    response: Response,
+    if_match: Annotated[str | None, Header(
+        alias="If-Match",
+        description="ETag задачи: запись выполнится, только если задачу не изменили"
+    )] = None
 ) -> TodoItem:
     """
     Эндпоинт для обновления элемента списка дел.
+    С If-Match обновляет задачу, только если её версия совпадает, иначе отвечает 412
+    с текущей задачей в detail.todo_item.
     Доступно только для аутентифицированных пользователей.
     """
-    return await service.update_todo_item(
+    todo_item = await service.update_todo_item(
         todo_item_id=todo_item_id,
         schema=todo_item_schema,
-        user_id=auth_user.id
+        user_id=auth_user.id,
+        if_match=parse_if_match(if_match)
     )
+    response.headers["ETag"] = todo_item_etag(todo_item)
+    return todo_item
 
 
 @router.delete(
@@ -104,14 +292,44 @@ async def update_todo_item(
 async def delete_todo_item(
     auth_user: Annotated[User, Depends(get_current_user)],
     todo_item_id: UUID,
-    service: Annotated[TodoItemService, Depends(get_todo_item_service)]
+    service: Annotated[TodoItemService, Depends(get_todo_item_service)],
+    if_match: Annotated[str | None, Header(
+        alias="If-Match",
+        description="ETag задачи: запись выполнится, только если задачу не изменили"
+    )] = None
 ) -> dict[str, str]:
     """
-    Эндпоинт для удаления элемента списка дел.
+    Эндпоинт для удаления элемента списка дел в корзину.
+    Задачу можно восстановить, пока она не удалена очисткой корзины.
+    С If-Match удаляет задачу, только если её версия совпадает, иначе отвечает 412.
     Доступно только для аутентифицированных пользователей.
     """
     await service.delete_todo_item(
         todo_item_id=todo_item_id,
-        user_id=auth_user.id
+        user_id=auth_user.id,
+        if_match=parse_if_match(if_match)
     )
     return {"detail": "Элемент списка дел успешно удален"}
+
+
+@router.post(
+    "/{todo_item_id}/restore",
+    response_model=TodoItemRead,
+    status_code=200
+)
+async def restore_todo_item(
+    auth_user: Annotated[User, Depends(get_current_user)],
+    todo_item_id: UUID,
+    service: Annotated[TodoItemService, Depends(get_todo_item_service)],
+    response: Response
+) -> TodoItem:
+    """
+    Эндпоинт для восстановления задачи из корзины.
+    Доступно только для аутентифицированных пользователей.
+    """
+    todo_item = await service.restore_todo_item(
+        todo_item_id=todo_item_id,
+        user_id=auth_user.id
+    )
+    response.headers["ETag"] = todo_item_etag(todo_item)
+    return todo_item
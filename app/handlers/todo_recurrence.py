@@ -0,0 +1,75 @@
+from typing import Annotated, List
+from uuid import UUID
+
+from fastapi import APIRouter, Depends
+
+from app.auth.auth_dependencies import get_current_user
+from app.database.dependencies import get_todo_recurrence_service
+from app.database.models.todo_recurrence import TodoRecurrence
+from app.database.models.user import User
+from app.schema.todo_recurrence import TodoRecurrenceCreate, TodoRecurrenceRead
+from app.service.todo_recurrence import TodoRecurrenceService
+
+
+router = APIRouter(
+    tags=["todo_recurrences"],
+    prefix="/todo_recurrences",
+)
+
+
+@router.get(
+    "/",
+    response_model=List[TodoRecurrenceRead],
+    status_code=200
+)
+async def get_recurrences(
+    auth_user: Annotated[User, Depends(get_current_user)],
+    service: Annotated[TodoRecurrenceService, Depends(get_todo_recurrence_service)]
+) -> List[TodoRecurrence]:
+    """
+    Эндпоинт для получения правил повторения задач пользователя.
+    Доступно только для аутентифицированных пользователей.
+    """
+    return await service.get_recurrences(user_id=auth_user.id)
+
+
+@router.post(
+    "/",
+    response_model=TodoRecurrenceRead,
+    status_code=201
+)
+async def create_recurrence(
+    auth_user: Annotated[User, Depends(get_current_user)],
+    recurrence_schema: TodoRecurrenceCreate,
+    service: Annotated[TodoRecurrenceService, Depends(get_todo_recurrence_service)]
+) -> TodoRecurrence:
+    """
+    Эндпоинт для создания правила повторения задачи.
+    Задачи на ближайшие TODO_RECURRENCE_HORIZON_DAYS дней создаются сразу,
+    следующие досоздаёт генератор повторений.
+    Доступно только для аутентифицированных пользователей.
+    """
+    return await service.create_recurrence(
+        schema=recurrence_schema,
+        user_id=auth_user.id
+    )
+
+
+@router.delete(
+    "/{recurrence_id}",
+    status_code=200
+)
+async def delete_recurrence(
+    auth_user: Annotated[User, Depends(get_current_user)],
+    recurrence_id: UUID,
+    service: Annotated[TodoRecurrenceService, Depends(get_todo_recurrence_service)]
+) -> dict[str, str]:
+    """
+    Эндпоинт для удаления правила повторения. Уже созданные задачи остаются.
+    Доступно только для аутентифицированных пользователей.
+    """
+    await service.delete_recurrence(
+        recurrence_id=recurrence_id,
+        user_id=auth_user.id
+    )
+    return {"detail": "Правило повторения удалено"}
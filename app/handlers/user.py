@@ -1,9 +1,10 @@
 from typing import Annotated
 
-import redis.asyncio as redis_async
 from fastapi import APIRouter, Depends
+from redis.asyncio import Redis
 
 from app.database.dependencies import get_user_service
+from app.database.redis import get_redis
 from app.schema.user import UserCreate
 from app.service.user import UserService
 
@@ -13,8 +14,6 @@ router = APIRouter(
     tags=['user'],
 )
 
-redis = redis_async.from_url("redis://localhost:6379")
-
 
 @router.post(
     "/register",
@@ -22,7 +21,8 @@ redis = redis_async.from_url("redis://localhost:6379")
 )
 async def register(
     user_schema: UserCreate,
-    user_service: Annotated[UserService, Depends(get_user_service)]
+    user_service: Annotated[UserService, Depends(get_user_service)],
+    redis: Annotated[Redis, Depends(get_redis)]
 ):
     """
     Эндпоинт для регистрации нового пользователя.
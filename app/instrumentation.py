@@ -0,0 +1,183 @@
+import contextlib
+import functools
+import inspect
+import time
+from contextvars import ContextVar
+from typing import AsyncIterator, Iterable
+
+import httpx
+from prometheus_client.core import GaugeMetricFamily
+from prometheus_client.registry import Collector
+from redis.asyncio import Redis
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.metrics import (DB_POOL_CHECKOUT_SECONDS, DB_POOL_TIMEOUTS, DB_QUERIES, OUTBOUND_REQUEST_DURATION,
+                         REDIS_COMMAND_DURATION, REPOSITORY_METHOD_DURATION)
+from app.tracing import start_child, start_span, traced_method, traceparent_header
+
+
+# Метод репозитория, в котором сейчас выполняется код задачи asyncio
+_repository_method: ContextVar[str] = ContextVar("repository_method", default="other")
+
+
+def instrumented(cls: type) -> type:
+    """
+    Декоратор класса репозитория: публичные async-методы считают длительность вызова,
+    а SQL-запросы внутри них учитываются с именем метода ("Класс.метод").
+    Метки ограничены набором методов в коде. В отобранной трассе метод выполняется в своём спане.
+    """
+    for name, method in list(vars(cls).items()):
+        if name.startswith("_") or not inspect.iscoroutinefunction(method):
+            continue
+        label = f"{cls.__name__}.{name}"
+        setattr(cls, name, _timed_method(label, traced_method(label, method)))
+    return cls
+
+
+def _timed_method(label: str, method):
+    histogram = REPOSITORY_METHOD_DURATION.labels(label)
+
+    @functools.wraps(method)
+    async def wrapper(*args, **kwargs):
+        token = _repository_method.set(label)
+        start = time.perf_counter()
+        try:
+            return await method(*args, **kwargs)
+        finally:
+            histogram.observe(time.perf_counter() - start)
+            _repository_method.reset(token)
+    return wrapper
+
+
+def count_queries(engine: AsyncEngine) -> None:
+    """
+    Считать SQL-запросы движка по методу репозитория, в котором они выполнены.
+    """
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        DB_QUERIES.labels(_repository_method.get()).inc()
+
+    event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+
+
+class InstrumentedAsyncPool(AsyncAdaptedQueuePool):
+    """
+    Пул соединений asyncio, измеряющий ожидание соединения.
+    Имя пула в метриках — pool_logging_name движка.
+    """
+
+    def _do_get(self):
+        start = time.perf_counter()
+        name = self._orig_logging_name or "default"
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            DB_POOL_TIMEOUTS.labels(name).inc()
+            raise
+        finally:
+            DB_POOL_CHECKOUT_SECONDS.labels(name).observe(time.perf_counter() - start)
+
+
+class PoolCollector(Collector):
+    """
+    Состояние пулов соединений на момент сбора метрик: размер, выданные соединения и переполнение.
+    Значения читаются только при запросе /metrics и не добавляют работы запросам.
+    """
+
+    def __init__(self, engines: Iterable[AsyncEngine]):
+        self.engines = list(engines)
+
+    def collect(self):
+        size = GaugeMetricFamily("taskpilot_db_pool_size", "Постоянный размер пула соединений", labels=["pool"])
+        checked_out = GaugeMetricFamily(
+            "taskpilot_db_pool_checked_out", "Соединения, выданные из пула", labels=["pool"]
+        )
+        overflow = GaugeMetricFamily(
+            "taskpilot_db_pool_overflow", "Соединения сверх постоянного размера пула", labels=["pool"]
+        )
+        for engine in self.engines:
+            pool = engine.pool
+            if not isinstance(pool, AsyncAdaptedQueuePool):
+                continue
+            name = pool._orig_logging_name or "default"
+            size.add_metric([name], pool.size())
+            checked_out.add_metric([name], pool.checkedout())
+            overflow.add_metric([name], max(pool.overflow(), 0))
+        yield from (size, checked_out, overflow)
+
+
+class InstrumentedRedis(Redis):
+    """
+    Клиент Redis, измеряющий длительность команд; в отобранной трассе команда — отдельный спан.
+    Команды конвейеров и pub/sub выполняются отдельно и не учитываются.
+    """
+
+    async def execute_command(self, *args, **options):
+        command = (args[0] if isinstance(args[0], str) else args[0].decode()).upper()
+        span = start_child(f"redis {command}", "client", {"db.system": "redis"})
+        start = time.perf_counter()
+        try:
+            return await super().execute_command(*args, **options)
+        except Exception as exc:
+            if span is not None:
+                span.record_error(exc)
+            raise
+        finally:
+            REDIS_COMMAND_DURATION.labels(command).observe(time.perf_counter() - start)
+            if span is not None:
+                span.end()
+
+
+class InstrumentedTransport(httpx.AsyncHTTPTransport):
+    """
+    Транспорт httpx, измеряющий длительность запросов к внешнему сервису.
+    В трассе запрос — спан, а его контекст передаётся сервису в заголовке traceparent.
+    """
+
+    def __init__(self, service: str, **kwargs):
+        super().__init__(**kwargs)
+        self.service = service
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        # URL без строки запроса: в ней передаются коды авторизации и токены
+        span = start_child(f"HTTP {request.method}", "client", {
+            "peer.service": self.service,
+            "http.method": request.method,
+            "http.url": str(request.url.copy_with(query=None)),
+        })
+        traceparent = span.traceparent if span is not None else traceparent_header()
+        if traceparent is not None:
+            request.headers["traceparent"] = traceparent
+        start = time.perf_counter()
+        result = "error"
+        try:
+            response = await super().handle_async_request(request)
+            result = f"{response.status_code // 100}xx"
+            if span is not None:
+                span.attributes["http.status_code"] = response.status_code
+            return response
+        except Exception as exc:
+            if span is not None:
+                span.record_error(exc)
+            raise
+        finally:
+            OUTBOUND_REQUEST_DURATION.labels(self.service, result).observe(time.perf_counter() - start)
+            if span is not None:
+                span.end()
+
+
+@contextlib.asynccontextmanager
+async def observe_outbound(service: str) -> AsyncIterator[None]:
+    """
+    Измерить длительность обращения к внешнему сервису, не использующему httpx (SMTP).
+    """
+    start = time.perf_counter()
+    result = "error"
+    try:
+        with start_span(service, "client", {"peer.service": service}):
+            yield
+        result = "ok"
+    finally:
+        OUTBOUND_REQUEST_DURATION.labels(service, result).observe(time.perf_counter() - start)
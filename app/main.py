@@ -1,31 +1,212 @@
+import asyncio
+import contextlib
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from prometheus_client import make_asgi_app
 
 from app.auth.auth_handlers import router as auth_router
+from app.database.database import create_databases
+from app.database.redis import create_redis
+from app.database.routing import monitor_replica_lag
+from app.handlers.admin_profiles import router as admin_profile_router
 from app.handlers.admin_todo_items import router as admin_todo_item_router
 from app.handlers.todo_item import router as todo_item_router
+from app.handlers.todo_recurrence import router as todo_recurrence_router
 from app.handlers.user import router as user_router
-from app.settings import settings
-
-
-app = FastAPI(
-    title=settings.APP_NAME,
-    version=settings.APP_VERSION,
-    openapi_url=f"{settings.API_VERSION_PREFIX}/openapi.json",
-    docs_url=f"{settings.API_VERSION_PREFIX}/docs",
-    redoc_url=f"{settings.API_VERSION_PREFIX}/redoc",
-)
-
-
-@app.get("/")
-async def root():
-    """Информация о приложении."""
-    return {
-        "message": "Добро пожаловать в приложение",
-        "app_name": settings.APP_NAME,
-        "version": settings.APP_VERSION,
-    }
-
-app.include_router(user_router, prefix=settings.API_VERSION_PREFIX)
-app.include_router(admin_todo_item_router, prefix=settings.API_VERSION_PREFIX)
-app.include_router(auth_router, prefix=settings.API_VERSION_PREFIX)
-app.include_router(todo_item_router, prefix=settings.API_VERSION_PREFIX)
+from app.middleware.idempotency import IdempotencyMiddleware
+from app.middleware.metrics import MetricsMiddleware
+from app.middleware.profiling import ProfilingMiddleware
+from app.middleware.rate_limit import RateLimitMiddleware
+from app.middleware.tracing import TracingMiddleware
+from app.openapi import load_openapi_schema
+from app.profiling import SamplingProfiler, create_profile_store
+from app.repositories.memory import MemoryStore
+from app.service.events import TodoEventHub
+from app.service.idempotency import IdempotencyStore
+from app.service.rate_limit import RateLimiter
+from app.settings import Settings
+from app.settings import settings as default_settings
+from app.tracing import Tracer, create_span_exporter
+from app.warmup import WarmupState, warm_up
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Ресурсы и фоновые задачи приложения: прогрев процесса (см. app.warmup), отправка спанов
+    трассировки по времени, измерение отставания реплик, если они настроены, и подписка
+    на события задач (запускается при первом SSE-соединении). При остановке отправляются накопленные
+    спаны трассировки, останавливается подписка на события и закрываются соединения приложения
+    с PostgreSQL и Redis.
+    """
+    settings: Settings = app.state.settings
+    databases = app.state.databases
+    background = []
+    if settings.WARMUP_ENABLED:
+        background.append(asyncio.create_task(warm_up(app.state.warmup, settings, databases, app.state.redis)))
+    if app.state.tracer.enabled:
+        background.append(asyncio.create_task(app.state.tracer.run_flush_loop()))
+    if databases.has_replicas:
+        background.append(asyncio.create_task(
+            monitor_replica_lag(databases.replica_engines, settings.REPLICA_LAG_CHECK_INTERVAL)
+        ))
+    try:
+        yield
+    finally:
+        for task in background:
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+        await app.state.tracer.shutdown()
+        await app.state.todo_event_hub.stop()
+        await databases.dispose()
+        await app.state.redis.aclose()
+
+
+def create_app(settings: Settings = default_settings) -> FastAPI:
+    """
+    Собрать приложение: маршруты, middleware, трассировщик и ресурсы по настройкам settings.
+
+    Пулы соединений с PostgreSQL, клиент Redis, подписка на события задач, хранилище профилей
+    и хранилище в памяти (REPOSITORY_BACKEND=memory) принадлежат приложению: они лежат в app.state,
+    зависимости запросов берут их оттуда. Соединения открываются при первом использовании
+    и закрываются при остановке приложения (lifespan). Ключ JWT и SMTP берутся из app.settings.
+    """
+    tracer = Tracer(
+        exporter=create_span_exporter(
+            settings.TRACING_EXPORTER,
+            file_path=settings.TRACING_FILE_PATH,
+            otlp_endpoint=settings.TRACING_OTLP_ENDPOINT
+        ),
+        sample_ratio=settings.TRACING_SAMPLE_RATIO,
+        service_name=settings.TRACING_SERVICE_NAME,
+        batch_size=settings.TRACING_BATCH_SIZE,
+        max_queue_size=settings.TRACING_MAX_QUEUE_SIZE,
+        flush_interval=settings.TRACING_FLUSH_INTERVAL
+    )
+
+    app = FastAPI(
+        lifespan=lifespan,
+        title=settings.APP_NAME,
+        version=settings.APP_VERSION,
+        openapi_url=f"{settings.API_VERSION_PREFIX}/openapi.json",
+        docs_url=f"{settings.API_VERSION_PREFIX}/docs",
+        redoc_url=f"{settings.API_VERSION_PREFIX}/redoc",
+    )
+    redis = create_redis(settings)
+    app.state.settings = settings
+    app.state.tracer = tracer
+    app.state.databases = create_databases(settings)
+    app.state.redis = redis
+    app.state.memory_store = MemoryStore()
+    # Общая для SSE-соединений приложения подписка на события задач
+    app.state.todo_event_hub = TodoEventHub(
+        redis=redis,
+        queue_size=settings.TODO_EVENTS_QUEUE_SIZE,
+        ttl=settings.TODO_EVENTS_STREAM_TTL
+    )
+    # Хранилище профилей запросов: пишет ProfilingMiddleware, читают админские эндпоинты
+    app.state.profile_store = create_profile_store(
+        settings.PROFILING_STORAGE,
+        redis=redis,
+        directory=settings.PROFILING_DIR,
+        ttl=settings.PROFILING_TTL,
+        max_profiles=settings.PROFILING_MAX_PROFILES
+    )
+    # Без прогрева процесс готов сразу; с ним — когда прогрев, запущенный в lifespan, закончится
+    app.state.warmup = WarmupState(ready=not settings.WARMUP_ENABLED)
+    # Готовая схема избавляет первый запрос к документации от её построения
+    if settings.OPENAPI_SCHEMA_PATH:
+        app.openapi_schema = load_openapi_schema(settings.OPENAPI_SCHEMA_PATH)
+
+    @app.get("/")
+    async def root():
+        """Информация о приложении."""
+        return {
+            "message": "Добро пожаловать в приложение",
+            "app_name": settings.APP_NAME,
+            "version": settings.APP_VERSION,
+        }
+
+    @app.get("/ready")
+    async def ready():
+        """Готовность процесса принимать запросы: 503, пока идёт прогрев."""
+        warmup: WarmupState = app.state.warmup
+        return JSONResponse(
+            status_code=200 if warmup.ready else 503,
+            content={
+                "status": "ready" if warmup.ready else "warming_up",
+                "warmup": {"durations_ms": warmup.durations_ms, "errors": warmup.errors},
+            }
+        )
+
+    # Профилирование выбранных запросов — внутренний слой; выключенное не подключается совсем
+    if settings.PROFILING_ENABLED:
+        app.add_middleware(
+            ProfilingMiddleware,
+            profiler=SamplingProfiler(
+                interval=settings.PROFILING_INTERVAL_MS / 1000,
+                max_duration=settings.PROFILING_MAX_DURATION
+            ),
+            store=app.state.profile_store,
+            path_prefix=settings.API_VERSION_PREFIX,
+            route_sample_rates=settings.PROFILING_ROUTE_SAMPLE_RATES,
+            min_duration=settings.PROFILING_MIN_DURATION,
+            routes=app.routes
+        )
+    # Повторы записывающих запросов задач с Idempotency-Key отдаются из Redis
+    app.add_middleware(
+        IdempotencyMiddleware,
+        store=IdempotencyStore(
+            redis=redis,
+            ttl=settings.IDEMPOTENCY_TTL,
+            lock_ttl=settings.IDEMPOTENCY_LOCK_TTL,
+            wait_timeout=settings.IDEMPOTENCY_WAIT_TIMEOUT
+        ),
+        path_prefixes=(
+            f"{settings.API_VERSION_PREFIX}/todo_items",
+            f"{settings.API_VERSION_PREFIX}/todo_recurrences",
+        ),
+        enabled=settings.IDEMPOTENCY_ENABLED
+    )
+    # Ограничение частоты запросов — внешний слой: отклонённые запросы не доходят до Redis-снимков и БД
+    app.add_middleware(
+        RateLimitMiddleware,
+        user_limiter=RateLimiter(
+            redis=redis,
+            capacity=settings.RATE_LIMIT_CAPACITY,
+            refill_rate=settings.RATE_LIMIT_REFILL_RATE,
+            lease_size=settings.RATE_LIMIT_LOCAL_LEASE,
+            lease_ttl=settings.RATE_LIMIT_LOCAL_LEASE_TTL
+        ),
+        anonymous_limiter=RateLimiter(
+            redis=redis,
+            capacity=settings.RATE_LIMIT_ANONYMOUS_CAPACITY,
+            refill_rate=settings.RATE_LIMIT_ANONYMOUS_REFILL_RATE
+        ),
+        path_prefix=settings.API_VERSION_PREFIX,
+        route_costs=settings.RATE_LIMIT_ROUTE_COSTS,
+        trusted_proxies=settings.RATE_LIMIT_TRUSTED_PROXIES,
+        enabled=settings.RATE_LIMIT_ENABLED
+    )
+    # Метрики HTTP — снаружи ограничения частоты: учитываются и запросы, отклонённые им
+    app.add_middleware(MetricsMiddleware, routes=app.routes, exclude_paths=("/metrics", "/ready"))
+    # Корневой спан трассы охватывает все слои, включая метрики
+    app.add_middleware(TracingMiddleware, tracer=tracer, routes=app.routes, exclude_paths=("/metrics", "/ready"))
+
+    app.include_router(user_router, prefix=settings.API_VERSION_PREFIX)
+    app.include_router(admin_todo_item_router, prefix=settings.API_VERSION_PREFIX)
+    app.include_router(admin_profile_router, prefix=settings.API_VERSION_PREFIX)
+    app.include_router(auth_router, prefix=settings.API_VERSION_PREFIX)
+    app.include_router(todo_item_router, prefix=settings.API_VERSION_PREFIX)
+    app.include_router(todo_recurrence_router, prefix=settings.API_VERSION_PREFIX)
+
+    # Метрики Prometheus
+    app.mount("/metrics", make_asgi_app())
+    return app
+
+
+# Точка входа uvicorn (app.main:app): приложение с настройками из окружения
+app = create_app()
@@ -0,0 +1,177 @@
+from prometheus_client import Counter, Gauge, Histogram
+
+
+# Обращения к кешу списков задач по результату: hit, miss, wait_hit, bypass, error.
+# Доля попаданий: hit / (hit + miss + wait_hit)
+TODO_CACHE_REQUESTS = Counter(
+    "taskpilot_todo_cache_requests_total",
+    "Обращения к кешу списков задач",
+    ["result"],
+)
+
+# Инвалидации кеша списков задач (увеличения версии пользователя)
+TODO_CACHE_INVALIDATIONS = Counter(
+    "taskpilot_todo_cache_invalidations_total",
+    "Инвалидации кеша списков задач",
+)
+
+# Маршрутизация читающих сессий: primary или replica
+DB_READ_ROUTING = Counter(
+    "taskpilot_db_read_routing_total",
+    "Выбор базы данных для читающих запросов",
+    ["target"],
+)
+
+# Отставание реплик от основной БД
+DB_REPLICA_LAG = Gauge(
+    "taskpilot_db_replica_lag_seconds",
+    "Отставание реплики от основной базы данных в секундах",
+    ["replica"],
+)
+
+# Очистка корзины: окончательно удалённые задачи (пропускная способность — rate() счётчика)
+TODO_TRASH_PURGED = Counter(
+    "taskpilot_todo_trash_purged_total",
+    "Задачи, окончательно удалённые из корзины",
+)
+
+# Задачи в корзине с истёкшим сроком хранения, ожидающие удаления
+TODO_TRASH_BACKLOG = Gauge(
+    "taskpilot_todo_trash_purge_backlog",
+    "Задачи в корзине, ожидающие окончательного удаления",
+)
+
+# Длительность одной пачки очистки корзины
+TODO_TRASH_PURGE_BATCH_SECONDS = Histogram(
+    "taskpilot_todo_trash_purge_batch_seconds",
+    "Длительность пачки очистки корзины в секундах",
+)
+
+# Напоминания о сроках задач по результату: sent или failed
+TODO_REMINDERS = Counter(
+    "taskpilot_todo_reminders_total",
+    "Напоминания о сроках задач",
+    ["result"],
+)
+
+# Задачи, созданные генератором по правилам повторения
+TODO_RECURRENCE_OCCURRENCES = Counter(
+    "taskpilot_todo_recurrence_occurrences_total",
+    "Задачи, созданные по правилам повторения",
+)
+
+# События изменения задач для SSE по результату публикации: published или error
+TODO_EVENTS_PUBLISHED = Counter(
+    "taskpilot_todo_events_published_total",
+    "Опубликованные события изменения задач",
+    ["result"],
+)
+
+# Открытые SSE-соединения потока событий задач в процессе
+TODO_EVENT_CONNECTIONS = Gauge(
+    "taskpilot_todo_event_connections",
+    "Открытые SSE-соединения событий задач",
+)
+
+# Клиенты, которым пришлось заново загрузить список: пропущенные события вытеснены из журнала
+TODO_EVENT_RESETS = Counter(
+    "taskpilot_todo_event_resets_total",
+    "Сбросы потока событий задач",
+)
+
+# Записывающие запросы с Idempotency-Key по результату: executed, replayed, in_progress, mismatch, error
+IDEMPOTENCY_REQUESTS = Counter(
+    "taskpilot_idempotency_requests_total",
+    "Запросы с ключом идемпотентности",
+    ["result"],
+)
+
+# Решения ограничителя частоты запросов: allowed, local (из локального запаса процесса), limited, error
+RATE_LIMIT_DECISIONS = Counter(
+    "taskpilot_rate_limit_decisions_total",
+    "Решения ограничителя частоты запросов",
+    ["result"],
+)
+
+# HTTP-запросы к API по шаблону пути маршрута (/api/v1/todo_items/{todo_item_id}), методу и коду ответа.
+# Запросы вне маршрутов приложения попадают в route="<unmatched>": число рядов ограничено числом маршрутов
+HTTP_REQUEST_DURATION = Histogram(
+    "taskpilot_http_request_duration_seconds",
+    "Длительность HTTP-запросов в секундах",
+    ["method", "route", "status"],
+)
+
+# Выполняющиеся HTTP-запросы по методу
+HTTP_REQUESTS_IN_PROGRESS = Gauge(
+    "taskpilot_http_requests_in_progress",
+    "Выполняющиеся HTTP-запросы",
+    ["method"],
+)
+
+# Ожидание соединения из пула SQLAlchemy (включая открытие нового соединения) по пулу: primary, replicaN, admin
+DB_POOL_CHECKOUT_SECONDS = Histogram(
+    "taskpilot_db_pool_checkout_seconds",
+    "Ожидание соединения из пула базы данных в секундах",
+    ["pool"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+
+# Ожидания соединения, завершившиеся ошибкой по таймауту пула
+DB_POOL_TIMEOUTS = Counter(
+    "taskpilot_db_pool_timeouts_total",
+    "Таймауты ожидания соединения из пула базы данных",
+    ["pool"],
+)
+
+# Вызовы методов репозиториев (TodoItemRepository.get_todo_items) и их длительность
+REPOSITORY_METHOD_DURATION = Histogram(
+    "taskpilot_repository_method_duration_seconds",
+    "Длительность методов репозиториев в секундах",
+    ["method"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+
+# SQL-запросы по методу репозитория, в котором они выполнены; вне репозиториев — method="other"
+DB_QUERIES = Counter(
+    "taskpilot_db_queries_total",
+    "SQL-запросы к базе данных",
+    ["method"],
+)
+
+# Команды Redis по имени команды (GET, SET, EVALSHA, ...) и их длительность
+REDIS_COMMAND_DURATION = Histogram(
+    "taskpilot_redis_command_duration_seconds",
+    "Длительность команд Redis в секундах",
+    ["command"],
+    buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1),
+)
+
+# Запросы к внешним сервисам: OAuth-провайдеры (google, yandex, vk), SMTP (smtp, smtp_login).
+# result — класс кода ответа (2xx, 4xx, 5xx), ok или error для SMTP и сетевых ошибок
+OUTBOUND_REQUEST_DURATION = Histogram(
+    "taskpilot_outbound_request_duration_seconds",
+    "Длительность запросов к внешним сервисам в секундах",
+    ["service", "result"],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+
+# Спаны трассировки по результату: exported, dropped (переполнена очередь), error (ошибка экспорта)
+TRACING_SPANS = Counter(
+    "taskpilot_tracing_spans_total",
+    "Завершённые спаны трассировки",
+    ["result"],
+)
+
+# Профилированные запросы по причине (token, sampling) и результату: saved, skipped (быстрее порога), error
+PROFILED_REQUESTS = Counter(
+    "taskpilot_profiled_requests_total",
+    "Запросы, выполненные под профилировщиком",
+    ["reason", "result"],
+)
+
+# Длительность шагов прогрева процесса после запуска: database, redis, serializers, bcrypt
+WARMUP_DURATION = Gauge(
+    "taskpilot_warmup_duration_seconds",
+    "Длительность шагов прогрева процесса в секундах",
+    ["step"],
+)
@@ -0,0 +1,172 @@
+import hashlib
+import re
+import secrets
+from typing import Sequence
+
+from redis.exceptions import RedisError
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.auth.jwt import bearer_subject
+from app.metrics import IDEMPOTENCY_REQUESTS
+from app.service.idempotency import IdempotencyInProgress, IdempotencyStore, StoredResponse
+
+
+UNSAFE_METHODS = frozenset({"POST", "PUT", "PATCH", "DELETE"})
+
+# Печатные ASCII-символы без пробелов, как в заголовках HTTP
+_KEY_PATTERN = re.compile(r"^[\x21-\x7e]{1,255}$")
+
+
+async def _read_body(receive: Receive) -> bytes:
+    chunks = []
+    while True:
+        message = await receive()
+        if message["type"] != "http.request":
+            break
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body", False):
+            break
+    return b"".join(chunks)
+
+
+def _replay_receive(body: bytes, receive: Receive) -> Receive:
+    """Отдать приложению уже прочитанное тело запроса, дальше — исходный канал (http.disconnect)."""
+    sent = False
+
+    async def replay() -> Message:
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        return await receive()
+    return replay
+
+
+class IdempotencyMiddleware:
+    """
+    ASGI-middleware повторов записывающих запросов с заголовком Idempotency-Key.
+
+    - Первый запрос с ключом выполняется, снимок ответа (кроме 5xx) сохраняется в Redis.
+    - Повтор с тем же ключом получает сохранённый ответ с заголовком Idempotent-Replayed,
+      не доходя до обработчика, авторизации и базы данных.
+    - Параллельный дубль ждёт ответа первого запроса; если тот не завершился за время ожидания — 409.
+    - Тот же ключ с другим методом, путём или телом запроса — 422.
+    - Запросы без ключа или без действительного токена проходят как обычно;
+      при недоступности Redis запрос выполняется без защиты от повторов.
+    """
+
+    def __init__(
+            self,
+            app: ASGIApp,
+            store: IdempotencyStore,
+            path_prefixes: Sequence[str],
+            enabled: bool = True
+    ):
+        self.app = app
+        self.store = store
+        self.path_prefixes = tuple(path_prefixes)
+        self.enabled = enabled
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            not self.enabled
+            or scope["type"] != "http"
+            or scope["method"] not in UNSAFE_METHODS
+            or not scope["path"].startswith(self.path_prefixes)
+        ):
+            await self.app(scope, receive, send)
+            return
+        headers = dict(scope["headers"])
+        raw_key = headers.get(b"idempotency-key")
+        if raw_key is None:
+            await self.app(scope, receive, send)
+            return
+        key = raw_key.decode("latin-1")
+        if not _KEY_PATTERN.match(key):
+            await JSONResponse({"detail": "Некорректный Idempotency-Key"}, status_code=400)(scope, receive, send)
+            return
+        user_id = bearer_subject(headers.get(b"authorization"))
+        if user_id is None:
+            await self.app(scope, receive, send)
+            return
+
+        body = await _read_body(receive)
+        receive = _replay_receive(body, receive)
+        fingerprint = hashlib.sha256(
+            b"\0".join([scope["method"].encode(), scope["path"].encode(), scope["query_string"], body])
+        ).hexdigest()
+        owner = secrets.token_hex(16)
+        try:
+            stored = await self.store.begin(user_id, key, owner)
+        except IdempotencyInProgress:
+            IDEMPOTENCY_REQUESTS.labels("in_progress").inc()
+            await JSONResponse(
+                {"detail": "Запрос с этим Idempotency-Key ещё выполняется"}, status_code=409
+            )(scope, receive, send)
+            return
+        except RedisError:
+            IDEMPOTENCY_REQUESTS.labels("error").inc()
+            await self.app(scope, receive, send)
+            return
+
+        if stored is not None:
+            if stored.fingerprint != fingerprint:
+                IDEMPOTENCY_REQUESTS.labels("mismatch").inc()
+                await JSONResponse(
+                    {"detail": "Idempotency-Key уже использован для другого запроса"}, status_code=422
+                )(scope, receive, send)
+                return
+            IDEMPOTENCY_REQUESTS.labels("replayed").inc()
+            await send({
+                "type": "http.response.start",
+                "status": stored.status,
+                "headers": stored.headers + [(b"idempotent-replayed", b"true")],
+            })
+            await send({"type": "http.response.body", "body": stored.body})
+            return
+
+        IDEMPOTENCY_REQUESTS.labels("executed").inc()
+        await self._execute(scope, receive, send, user_id, key, owner, StoredResponse(fingerprint=fingerprint))
+
+    async def _execute(
+            self,
+            scope: Scope,
+            receive: Receive,
+            send: Send,
+            user_id: str,
+            key: str,
+            owner: str,
+            response: StoredResponse
+    ) -> None:
+        """Выполнить запрос, запомнив ответ по мере отправки клиенту, и сохранить его для повторов."""
+        chunks = []
+
+        async def capture(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                response.status = message["status"]
+                response.headers = list(message.get("headers", []))
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, capture)
+        except BaseException:
+            await self._release(user_id, key, owner)
+            raise
+        if response.status >= 500:
+            # Ошибку сервера не запоминаем: повтор выполнит запрос заново
+            await self._release(user_id, key, owner)
+            return
+        response.body = b"".join(chunks)
+        try:
+            await self.store.save(user_id, key, owner, response)
+        except RedisError:
+            IDEMPOTENCY_REQUESTS.labels("error").inc()
+
+    async def _release(self, user_id: str, key: str, owner: str) -> None:
+        try:
+            await self.store.release(user_id, key, owner)
+        except RedisError:
+            IDEMPOTENCY_REQUESTS.labels("error").inc()
@@ -0,0 +1,68 @@
+import time
+from typing import Sequence
+
+from starlette.routing import BaseRoute, Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.metrics import HTTP_REQUEST_DURATION, HTTP_REQUESTS_IN_PROGRESS
+
+
+KNOWN_METHODS = frozenset({"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"})
+
+# Путь вне маршрутов приложения (404, сканеры): одна метка вместо произвольных путей
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+def route_path(scope: Scope, routes: Sequence[BaseRoute]) -> str:
+    """
+    Шаблон пути маршрута запроса. Если маршрутизатор не успел положить маршрут в scope
+    (ответ дал внутренний middleware), маршрут ищется сопоставлением с routes.
+    """
+    route = scope.get("route")
+    if route is None:
+        for candidate in routes:
+            match, _ = candidate.matches(scope)
+            if match == Match.FULL:
+                route = candidate
+                break
+    return getattr(route, "path_format", None) or UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """
+    ASGI-middleware метрик HTTP-запросов.
+
+    - Длительность запроса учитывается по шаблону пути маршрута (/api/v1/todo_items/{todo_item_id}),
+      который маршрутизатор FastAPI кладёт в scope; число рядов ограничено числом маршрутов.
+    - Запросы, на которые ответил внутренний middleware (429, повтор по Idempotency-Key), до маршрутизатора
+      не доходят; их маршрут определяется сопоставлением с routes уже после ответа.
+    - Длительность считается до конца отправки ответа, для SSE — до закрытия соединения.
+    - Пути из exclude_paths (сама страница /metrics) не учитываются.
+    """
+
+    def __init__(self, app: ASGIApp, routes: Sequence[BaseRoute] = (), exclude_paths: tuple[str, ...] = ()):
+        self.app = app
+        self.routes = routes
+        self.exclude_paths = exclude_paths
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"].startswith(self.exclude_paths):
+            await self.app(scope, receive, send)
+            return
+        method = scope["method"] if scope["method"] in KNOWN_METHODS else "OTHER"
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        in_progress = HTTP_REQUESTS_IN_PROGRESS.labels(method)
+        in_progress.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_REQUEST_DURATION.labels(method, route_path(scope, self.routes), str(status)).observe(time.perf_counter() - start)
+            in_progress.dec()
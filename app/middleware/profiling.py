@@ -0,0 +1,117 @@
+import asyncio
+import random
+import time
+from typing import Mapping, Sequence
+from uuid import uuid4
+
+from redis.exceptions import RedisError
+from starlette.routing import BaseRoute
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.auth.jwt import decode_access_token
+from app.metrics import PROFILED_REQUESTS
+from app.middleware.metrics import route_path
+from app.middleware.rate_limit import parse_route_costs
+from app.profiling import ProfileInfo, ProfileSession, ProfileStore, SamplingProfiler
+
+
+# Назначение токена профилирования (claim scope); без sub токен не принимается как токен доступа
+PROFILE_TOKEN_SCOPE = "profile"
+
+PROFILE_TOKEN_HEADER = b"x-profile-token"
+
+
+class ProfilingMiddleware:
+    """
+    ASGI-middleware профилирования отдельных запросов выборочным профилировщиком.
+
+    Профилируется запрос:
+    - с заголовком X-Profile-Token — подписанным токеном, выданным администратору
+      (POST /admin/profiles/token); ответ содержит X-Profile-Id сохранённого профиля;
+    - маршрута из route_sample_rates ({"GET /todo_items/all": 0.01}) с заданной вероятностью;
+      такие профили сохраняются, только если запрос длился не меньше min_duration секунд.
+
+    Профиль в формате speedscope сохраняется в хранилище после ответа. Middleware подключается
+    только при PROFILING_ENABLED: выключенное профилирование не добавляет работы запросам.
+    """
+
+    def __init__(
+            self,
+            app: ASGIApp,
+            profiler: SamplingProfiler,
+            store: ProfileStore,
+            path_prefix: str = "",
+            route_sample_rates: Mapping[str, float] | None = None,
+            min_duration: float = 0.0,
+            routes: Sequence[BaseRoute] = ()
+    ):
+        self.app = app
+        self.profiler = profiler
+        self.store = store
+        self.rules = parse_route_costs(route_sample_rates or {}, path_prefix)
+        self.min_duration = min_duration
+        self.routes = routes
+
+    def _reason(self, scope: Scope) -> str | None:
+        for name, value in scope["headers"]:
+            if name == PROFILE_TOKEN_HEADER:
+                payload = decode_access_token(value.decode("latin-1").strip())
+                if payload and payload.get("scope") == PROFILE_TOKEN_SCOPE:
+                    return "token"
+                break
+        for rule_method, rule_path, rate in self.rules:
+            if rule_method in ("*", scope["method"]) and scope["path"].startswith(rule_path):
+                return "sampling" if random.random() < rate else None
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        reason = self._reason(scope)
+        if reason is None:
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = uuid4().hex
+        status = 500
+
+        async def send_with_profile_id(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if reason == "token":
+                    headers = list(message.get("headers", []))
+                    headers.append((b"x-profile-id", profile_id.encode()))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        session = self.profiler.start(asyncio.current_task())
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            self.profiler.stop(session)
+            await self._save(scope, session, profile_id, reason, status)
+
+    async def _save(self, scope: Scope, session: ProfileSession, profile_id: str, reason: str, status: int) -> None:
+        if reason == "sampling" and session.duration < self.min_duration:
+            PROFILED_REQUESTS.labels(reason, "skipped").inc()
+            return
+        route = route_path(scope, self.routes)
+        info = ProfileInfo(
+            id=profile_id,
+            method=scope["method"],
+            path=scope["path"],
+            route=route,
+            status=status,
+            duration_ms=round(session.duration * 1000, 3),
+            samples=len(session.samples),
+            reason=reason,
+            created_at=time.time()
+        )
+        try:
+            await self.store.save(info, session.to_speedscope(f"{scope['method']} {scope['path']} ({status})"))
+        except (RedisError, OSError):
+            PROFILED_REQUESTS.labels(reason, "error").inc()
+        else:
+            PROFILED_REQUESTS.labels(reason, "saved").inc()
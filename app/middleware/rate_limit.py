@@ -0,0 +1,96 @@
+from typing import Mapping, TypeVar
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.auth.jwt import bearer_subject
+from app.service.rate_limit import RateLimiter
+
+
+T = TypeVar("T")
+
+
+def parse_route_costs(route_costs: Mapping[str, T], path_prefix: str) -> list[tuple[str, str, T]]:
+    """
+    Разобрать значения по маршрутам вида {"GET /todo_items/search": 5} (пути относительно path_prefix,
+    метод * — любой) в список правил, где более длинные префиксы проверяются первыми.
+    """
+    rules = []
+    for route, cost in route_costs.items():
+        method, _, path = route.strip().partition(" ")
+        rules.append((method.upper(), path_prefix + path.strip(), cost))
+    return sorted(rules, key=lambda rule: len(rule[1]), reverse=True)
+
+
+class RateLimitMiddleware:
+    """
+    ASGI-middleware ограничения частоты запросов к API.
+
+    - Запросы с действительным Bearer-токеном ограничиваются по пользователю (sub токена),
+      остальные — по IP-адресу клиента с отдельным, более строгим лимитом.
+    - Стоимость запроса берётся из правил по методу и префиксу пути, по умолчанию 1.
+    - Каждый ответ содержит заголовки RateLimit-Limit, RateLimit-Remaining, RateLimit-Reset
+      и RateLimit-Policy; при превышении лимита — 429 с Retry-After, запрос до обработчика не доходит.
+    """
+
+    def __init__(
+            self,
+            app: ASGIApp,
+            user_limiter: RateLimiter,
+            anonymous_limiter: RateLimiter,
+            path_prefix: str,
+            route_costs: Mapping[str, int] | None = None,
+            trusted_proxies: int = 0,
+            enabled: bool = True
+    ):
+        self.app = app
+        self.user_limiter = user_limiter
+        self.anonymous_limiter = anonymous_limiter
+        self.path_prefix = path_prefix
+        self.rules = parse_route_costs(route_costs or {}, path_prefix)
+        self.trusted_proxies = trusted_proxies
+        self.enabled = enabled
+
+    def _cost(self, method: str, path: str) -> int:
+        for rule_method, rule_path, cost in self.rules:
+            if rule_method in ("*", method) and path.startswith(rule_path):
+                return cost
+        return 1
+
+    def _client_ip(self, scope: Scope, headers: dict[bytes, bytes]) -> str:
+        """
+        IP клиента. За trusted_proxies доверенными прокси — адрес из X-Forwarded-For, добавленный
+        самым внешним из них (trusted_proxies-й справа): левые адреса клиент может подставить сам.
+        """
+        forwarded = headers.get(b"x-forwarded-for") if self.trusted_proxies else None
+        if forwarded:
+            addresses = [address.strip() for address in forwarded.decode("latin-1").split(",")]
+            return addresses[max(len(addresses) - self.trusted_proxies, 0)]
+        client = scope.get("client")
+        return client[0] if client else "unknown"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if not self.enabled or scope["type"] != "http" or not scope["path"].startswith(self.path_prefix):
+            await self.app(scope, receive, send)
+            return
+        headers = dict(scope["headers"])
+        subject = bearer_subject(headers.get(b"authorization"))
+        if subject is not None:
+            limiter, key = self.user_limiter, f"user:{subject}"
+        else:
+            limiter, key = self.anonymous_limiter, f"ip:{self._client_ip(scope, headers)}"
+
+        decision = await limiter.acquire(key, self._cost(scope["method"], scope["path"]))
+        limit_headers = decision.headers(limiter.window)
+        if not decision.allowed:
+            response = JSONResponse({"detail": "Слишком много запросов, повторите позже"}, status_code=429)
+            response.raw_headers.extend(limit_headers)
+            await response(scope, receive, send)
+            return
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", []), *limit_headers]
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
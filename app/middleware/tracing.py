@@ -0,0 +1,64 @@
+from typing import Sequence
+
+from starlette.routing import BaseRoute
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.middleware.metrics import route_path
+from app.tracing import Tracer, activate
+
+
+class TracingMiddleware:
+    """
+    ASGI-middleware трассировки: корневой серверный спан запроса.
+
+    - Продолжает трассу из заголовка traceparent (W3C Trace Context) или начинает новую;
+      отбор трассы решает Tracer.
+    - Спан называется по методу и шаблону пути маршрута ("GET /api/v1/todo_items/{todo_item_id}")
+      и охватывает внутренние middleware, зависимости и обработчик.
+    - Идентификатор трассы возвращается клиенту в заголовке traceresponse, чтобы медленный
+      запрос можно было найти в хранилище трасс.
+    - Выключенный трассировщик (нет экспортёра) и пути из exclude_paths пропускаются без обработки.
+    """
+
+    def __init__(self, app: ASGIApp, tracer: Tracer, routes: Sequence[BaseRoute] = (),
+                 exclude_paths: tuple[str, ...] = ()):
+        self.app = app
+        self.tracer = tracer
+        self.routes = routes
+        self.exclude_paths = exclude_paths
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self.tracer.enabled or scope["path"].startswith(self.exclude_paths):
+            await self.app(scope, receive, send)
+            return
+        traceparent = next((value for name, value in scope["headers"] if name == b"traceparent"), None)
+        span = self.tracer.start_trace(scope["method"], traceparent, {
+            "http.method": scope["method"],
+            "http.target": scope["path"],
+        })
+        status = 500
+
+        async def send_with_trace(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if span.sampled:
+                    headers = list(message.get("headers", []))
+                    headers.append((b"traceresponse", span.traceparent.encode()))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            with activate(span):
+                await self.app(scope, receive, send_with_trace)
+        except BaseException as exc:
+            span.record_error(exc)
+            raise
+        finally:
+            route = route_path(scope, self.routes)
+            span.name = f"{scope['method']} {route}"
+            span.attributes["http.route"] = route
+            span.attributes["http.status_code"] = status
+            if status >= 500 and span.error is None:
+                span.error = f"HTTP {status}"
+            span.end()
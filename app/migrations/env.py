@@ -7,7 +7,8 @@ from sqlalchemy.engine import Connection
 from sqlalchemy.ext.asyncio import async_engine_from_config
 
 from app.database.database import Base
-from app.database.models import CategoryName, TodoCategory, TodoItem, User
+from app.database.models import (CategoryName, TodoCategory, TodoCategoryStats, TodoDueStats, TodoItem, TodoItemArchive,
+                                 TodoItemTombstone, TodoRecurrence, TodoSyncState, User)
 
 
 # this is the Alembic Config object, which provides
@@ -0,0 +1,50 @@
+"""todo_items list filter indexes
+
+Revision ID: 2b6ed6a561f9
+Revises: 2fa1be76804c
+Create Date: 2026-10-19 13:05:47.881204
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2b6ed6a561f9'
+down_revision: Union[str, Sequence[str], None] = '2fa1be76804c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEXES = [
+    ('ix_todo_items_user_id_created_at', ['user_id', 'created_at'], None),
+    ('ix_todo_items_user_id_completed_created_at', ['user_id', 'completed', 'created_at'], None),
+    ('ix_todo_items_user_id_category_id_created_at', ['user_id', 'category_id', 'created_at'], None),
+    ('ix_todo_items_user_id_date_of_execution', ['user_id', 'date_of_execution'], None),
+    ('ix_todo_items_user_id_title', ['user_id', 'title'], None),
+    ('ix_todo_items_pending_user_id_date_of_execution', ['user_id', 'date_of_execution'], 'NOT completed'),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Индексы строятся без блокировки записи в todo_items
+    with op.get_context().autocommit_block():
+        for name, columns, where in INDEXES:
+            op.create_index(
+                name,
+                'todo_items',
+                columns,
+                unique=False,
+                postgresql_where=sa.text(where) if where else None,
+                postgresql_concurrently=True
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name='todo_items', postgresql_concurrently=True)
@@ -0,0 +1,44 @@
+"""todo_items title trigram index
+
+Revision ID: 2fa1be76804c
+Revises: 4e67b1cb21cf
+Create Date: 2026-10-19 11:40:02.518730
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2fa1be76804c'
+down_revision: Union[str, Sequence[str], None] = '4e67b1cb21cf'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # Индекс строится без блокировки записи в todo_items
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_todo_items_user_id_title_trgm',
+            'todo_items',
+            ['user_id', 'title'],
+            unique=False,
+            postgresql_using='gin',
+            postgresql_ops={'title': 'gin_trgm_ops'},
+            postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_todo_items_user_id_title_trgm',
+            table_name='todo_items',
+            postgresql_concurrently=True
+        )
@@ -0,0 +1,36 @@
+"""todo_items admin keyset index
+
+Revision ID: 40a17011947c
+Revises: 9980232c46a9
+Create Date: 2026-10-19 15:48:53.317205
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '40a17011947c'
+down_revision: Union[str, Sequence[str], None] = '9980232c46a9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_todo_items_created_at_id',
+            'todo_items',
+            ['created_at', 'id'],
+            unique=False,
+            postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_todo_items_created_at_id', table_name='todo_items', postgresql_concurrently=True)
@@ -0,0 +1,125 @@
+"""todo_items partitioned shadow
+
+Revision ID: 80b13ca53082
+Revises: 40a17011947c
+Create Date: 2026-10-19 17:05:42.118306
+
+Первый шаг онлайн-перехода на секционированную todo_items:
+- создаёт todo_items_partitioned (hash по user_id) с секциями и индексами;
+- вешает на todo_items триггер, зеркалирующий все изменения в новую таблицу.
+
+Дальше существующие строки переносятся пачками без блокировки таблицы
+(python -m app.workers.partition_backfill), после чего миграция
+a2951563573b меняет таблицы местами.
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '80b13ca53082'
+down_revision: Union[str, Sequence[str], None] = '40a17011947c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Количество секций зафиксировано в ревизии: изменение TODO_ITEMS_PARTITIONS не должно менять
+# уже применённую миграцию. Другое количество секций — только пересозданием таблицы.
+PARTITIONS = 16
+
+SEARCH_VECTOR_EXPRESSION = (
+    "setweight(to_tsvector('russian', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('russian', coalesce(description, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'B')"
+)
+
+COLUMNS = (
+    "id", "title", "description", "completed", "created_at",
+    "updated_at", "date_of_execution", "category_id", "user_id",
+)
+
+# Индексы todo_items; в новой таблице создаются с суффиксом _shadow и переименовываются при переключении
+INDEXES = {
+    "ix_todo_items_user_id_search_vector": dict(columns=["user_id", "search_vector"], postgresql_using="gin"),
+    "ix_todo_items_user_id_created_at": dict(columns=["user_id", "created_at"]),
+    "ix_todo_items_user_id_completed_created_at": dict(columns=["user_id", "completed", "created_at"]),
+    "ix_todo_items_user_id_category_id_created_at": dict(columns=["user_id", "category_id", "created_at"]),
+    "ix_todo_items_user_id_date_of_execution": dict(columns=["user_id", "date_of_execution"]),
+    "ix_todo_items_user_id_title": dict(columns=["user_id", "title"]),
+    "ix_todo_items_created_at_id": dict(columns=["created_at", "id"]),
+    "ix_todo_items_pending_user_id_date_of_execution": dict(
+        columns=["user_id", "date_of_execution"],
+        postgresql_where=sa.text("NOT completed")
+    ),
+    "ix_todo_items_user_id_title_trgm": dict(
+        columns=["user_id", "title"],
+        postgresql_using="gin",
+        postgresql_ops={"title": "gin_trgm_ops"}
+    ),
+}
+
+MIRROR_FUNCTION = f"""
+CREATE OR REPLACE FUNCTION todo_items_mirror() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        DELETE FROM todo_items_partitioned WHERE id = OLD.id AND user_id = OLD.user_id;
+    END IF;
+    IF TG_OP = 'DELETE' THEN
+        RETURN OLD;
+    END IF;
+    INSERT INTO todo_items_partitioned ({", ".join(COLUMNS)})
+    VALUES ({", ".join(f"NEW.{column}" for column in COLUMNS)});
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('todo_items_partitioned',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('title', sa.String(), nullable=False),
+    sa.Column('description', sa.String(), nullable=True),
+    sa.Column('completed', sa.Boolean(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.Column('date_of_execution', sa.Date(), nullable=True),
+    sa.Column(
+        'search_vector',
+        postgresql.TSVECTOR(),
+        sa.Computed(SEARCH_VECTOR_EXPRESSION, persisted=True),
+        nullable=False
+    ),
+    sa.Column('category_id', sa.UUID(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.ForeignKeyConstraint(['category_id'], ['todo_categories.id'], onupdate='CASCADE', ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], onupdate='CASCADE', ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id', 'user_id', name='todo_items_partitioned_pkey'),
+    postgresql_partition_by='HASH (user_id)'
+    )
+    for remainder in range(PARTITIONS):
+        op.execute(
+            f"CREATE TABLE todo_items_partitioned_p{remainder} PARTITION OF todo_items_partitioned "
+            f"FOR VALUES WITH (MODULUS {PARTITIONS}, REMAINDER {remainder})"
+        )
+    for name, index in INDEXES.items():
+        index = dict(index)
+        op.create_index(f"{name}_shadow", 'todo_items_partitioned', index.pop("columns"), unique=False, **index)
+
+    op.execute(MIRROR_FUNCTION)
+    op.execute(
+        "CREATE TRIGGER todo_items_mirror AFTER INSERT OR UPDATE OR DELETE ON todo_items "
+        "FOR EACH ROW EXECUTE FUNCTION todo_items_mirror()"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS todo_items_mirror ON todo_items")
+    op.execute("DROP FUNCTION IF EXISTS todo_items_mirror()")
+    op.drop_table('todo_items_partitioned')
@@ -0,0 +1,58 @@
+"""todo stats
+
+Revision ID: 9980232c46a9
+Revises: 2b6ed6a561f9
+Create Date: 2026-10-19 14:22:16.004391
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9980232c46a9'
+down_revision: Union[str, Sequence[str], None] = '2b6ed6a561f9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('todo_category_stats',
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('category_id', sa.UUID(), nullable=False),
+    sa.Column('total', sa.Integer(), nullable=False),
+    sa.Column('completed', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['category_id'], ['todo_categories.id'], onupdate='CASCADE', ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], onupdate='CASCADE', ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'category_id')
+    )
+    op.create_table('todo_due_stats',
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('date_of_execution', sa.Date(), nullable=False),
+    sa.Column('pending', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], onupdate='CASCADE', ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'date_of_execution')
+    )
+    # Начальное заполнение по существующим задачам
+    op.execute("""
+        INSERT INTO todo_category_stats (user_id, category_id, total, completed)
+        SELECT user_id, category_id, count(*), count(*) FILTER (WHERE completed)
+        FROM todo_items
+        GROUP BY user_id, category_id
+    """)
+    op.execute("""
+        INSERT INTO todo_due_stats (user_id, date_of_execution, pending)
+        SELECT user_id, date_of_execution, count(*)
+        FROM todo_items
+        WHERE NOT completed AND date_of_execution IS NOT NULL
+        GROUP BY user_id, date_of_execution
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('todo_due_stats')
+    op.drop_table('todo_category_stats')
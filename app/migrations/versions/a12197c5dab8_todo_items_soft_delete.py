@@ -0,0 +1,101 @@
+"""todo_items soft delete
+
+Revision ID: a12197c5dab8
+Revises: ac0a921bd292
+Create Date: 2026-10-19 19:02:17.463902
+
+Добавляет deleted_at и переводит индексы горячих запросов в частичные
+(WHERE deleted_at IS NULL). Индексы секционированной таблицы строятся без
+блокировки записи: пустой индекс на родителе (ON ONLY), CONCURRENTLY по секциям
+и ATTACH PARTITION; затем старый индекс удаляется, новый получает его имя.
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a12197c5dab8'
+down_revision: Union[str, Sequence[str], None] = 'ac0a921bd292'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+ACTIVE = "deleted_at IS NULL"
+
+# Имя индекса -> (определение, старое условие, новое условие)
+INDEXES = {
+    "ix_todo_items_user_id_search_vector": ("USING gin (user_id, search_vector)", None, ACTIVE),
+    "ix_todo_items_user_id_created_at": ("(user_id, created_at)", None, ACTIVE),
+    "ix_todo_items_user_id_completed_created_at": ("(user_id, completed, created_at)", None, ACTIVE),
+    "ix_todo_items_user_id_category_id_created_at": ("(user_id, category_id, created_at)", None, ACTIVE),
+    "ix_todo_items_user_id_date_of_execution": ("(user_id, date_of_execution)", None, ACTIVE),
+    "ix_todo_items_user_id_title": ("(user_id, title)", None, ACTIVE),
+    "ix_todo_items_created_at_id": ("(created_at, id)", None, ACTIVE),
+    "ix_todo_items_pending_user_id_date_of_execution": (
+        "(user_id, date_of_execution)", "NOT completed", f"NOT completed AND {ACTIVE}"
+    ),
+    "ix_todo_items_user_id_title_trgm": ("USING gin (user_id, title gin_trgm_ops)", None, ACTIVE),
+    "ix_todo_items_completed_at": ("(completed_at)", "completed", f"completed AND {ACTIVE}"),
+}
+
+TRASH_INDEXES = {
+    "ix_todo_items_trash_user_id_deleted_at": "(user_id, deleted_at)",
+    "ix_todo_items_trash_deleted_at": "(deleted_at)",
+}
+
+
+def todo_items_partitions() -> list[str]:
+    """Секции todo_items по pg_inherits: их количество задано при создании таблицы, а не настройками."""
+    return op.get_bind().exec_driver_sql(
+        "SELECT inhrelid::regclass::text FROM pg_inherits WHERE inhparent = 'todo_items'::regclass ORDER BY 1"
+    ).scalars().all()
+
+
+def create_partitioned_index(name: str, definition: str, where: str | None) -> None:
+    """Построить индекс секционированной todo_items, не блокируя запись."""
+    condition = f" WHERE {where}" if where else ""
+    op.execute(f"CREATE INDEX {name} ON ONLY todo_items {definition}{condition}")
+    partitions = todo_items_partitions()
+    with op.get_context().autocommit_block():
+        for partition in partitions:
+            partition_index = f"{name}_{partition.removeprefix('todo_items_')}"
+            op.execute(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {partition_index} "
+                f"ON {partition} {definition}{condition}"
+            )
+            op.execute(f"ALTER INDEX {name} ATTACH PARTITION {partition_index}")
+
+
+def replace_index(name: str, definition: str, where: str | None) -> None:
+    """
+    Перестроить индекс с новым условием и вернуть прежние имена ему и индексам секций:
+    иначе откат создавал бы индексы секций с уже занятыми именами.
+    """
+    create_partitioned_index(f"{name}_new", definition, where)
+    op.execute(f"DROP INDEX {name}")
+    op.execute(f"ALTER INDEX {name}_new RENAME TO {name}")
+    for partition in todo_items_partitions():
+        suffix = partition.removeprefix('todo_items_')
+        op.execute(f"ALTER INDEX {name}_new_{suffix} RENAME TO {name}_{suffix}")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('todo_items', sa.Column('deleted_at', sa.DateTime(), nullable=True))
+    for name, (definition, _, where) in INDEXES.items():
+        replace_index(name, definition, where)
+    for name, definition in TRASH_INDEXES.items():
+        create_partitioned_index(name, definition, "deleted_at IS NOT NULL")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name in TRASH_INDEXES:
+        op.execute(f"DROP INDEX {name}")
+    for name, (definition, where, _) in INDEXES.items():
+        replace_index(name, definition, where)
+    # Задачи из корзины при откате удаляются окончательно
+    op.execute("DELETE FROM todo_items WHERE deleted_at IS NOT NULL")
+    op.drop_column('todo_items', 'deleted_at')
@@ -0,0 +1,140 @@
+"""todo_items partitioned swap
+
+Revision ID: a2951563573b
+Revises: 80b13ca53082
+Create Date: 2026-10-19 17:31:09.542780
+
+Второй шаг онлайн-перехода: применяется после завершения
+python -m app.workers.partition_backfill (воркер отмечает новую таблицу
+после сверки строк). Под короткой эксклюзивной блокировкой снимает триггер
+и меняет таблицы местами переименованием; данные не копируются.
+
+Пустая или небольшая todo_items (новая база, тестовые стенды) переносится
+прямо в миграции под той же блокировкой, без запуска воркера.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a2951563573b'
+down_revision: Union[str, Sequence[str], None] = '80b13ca53082'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Количество секций, созданных ревизией 80b13ca53082
+PARTITIONS = 16
+
+# Не больше стольких строк todo_items переносится в миграции без воркера
+INLINE_BACKFILL_MAX_ROWS = 10_000
+
+# Определения индексов todo_items (для восстановления несекционированной таблицы при откате)
+INDEXES = {
+    "ix_todo_items_user_id_search_vector": "USING gin (user_id, search_vector)",
+    "ix_todo_items_user_id_created_at": "(user_id, created_at)",
+    "ix_todo_items_user_id_completed_created_at": "(user_id, completed, created_at)",
+    "ix_todo_items_user_id_category_id_created_at": "(user_id, category_id, created_at)",
+    "ix_todo_items_user_id_date_of_execution": "(user_id, date_of_execution)",
+    "ix_todo_items_user_id_title": "(user_id, title)",
+    "ix_todo_items_created_at_id": "(created_at, id)",
+    "ix_todo_items_pending_user_id_date_of_execution": "(user_id, date_of_execution) WHERE NOT completed",
+    "ix_todo_items_user_id_title_trgm": "USING gin (user_id, title gin_trgm_ops)",
+}
+
+COLUMNS = (
+    "id, title, description, completed, created_at, "
+    "updated_at, date_of_execution, category_id, user_id"
+)
+
+MIRROR_FUNCTION = f"""
+CREATE OR REPLACE FUNCTION todo_items_mirror() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        DELETE FROM todo_items_partitioned WHERE id = OLD.id AND user_id = OLD.user_id;
+    END IF;
+    IF TG_OP = 'DELETE' THEN
+        RETURN OLD;
+    END IF;
+    INSERT INTO todo_items_partitioned ({COLUMNS})
+    VALUES ({", ".join(f"NEW.{column.strip()}" for column in COLUMNS.split(","))});
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql
+"""
+
+# Отметку ставит app.workers.partition_backfill после переноса и сверки всех строк. Без отметки
+# небольшая таблица переносится здесь же: выполняется под ACCESS EXCLUSIVE, строки не меняются,
+# а уже зеркалированные триггером пропускаются
+CHECK_BACKFILL = f"""
+DO $$
+BEGIN
+    IF obj_description('todo_items_partitioned'::regclass, 'pg_class') IS NOT DISTINCT FROM 'backfilled' THEN
+        RETURN;
+    END IF;
+    IF (SELECT count(*) FROM (SELECT 1 FROM todo_items LIMIT {INLINE_BACKFILL_MAX_ROWS + 1}) AS sample)
+            > {INLINE_BACKFILL_MAX_ROWS} THEN
+        RAISE EXCEPTION 'todo_items backfill is not finished: run python -m app.workers.partition_backfill';
+    END IF;
+    INSERT INTO todo_items_partitioned ({COLUMNS})
+    SELECT {COLUMNS} FROM todo_items
+    ON CONFLICT (id, user_id) DO NOTHING;
+END
+$$
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("LOCK TABLE todo_items, todo_items_partitioned IN ACCESS EXCLUSIVE MODE")
+    op.execute(CHECK_BACKFILL)
+    op.execute("DROP TRIGGER todo_items_mirror ON todo_items")
+    op.execute("DROP FUNCTION todo_items_mirror()")
+
+    op.rename_table('todo_items', 'todo_items_legacy')
+    op.execute("ALTER INDEX todo_items_pkey RENAME TO todo_items_legacy_pkey")
+    for name in INDEXES:
+        op.execute(f"ALTER INDEX {name} RENAME TO {name}_legacy")
+
+    op.rename_table('todo_items_partitioned', 'todo_items')
+    op.execute("ALTER INDEX todo_items_partitioned_pkey RENAME TO todo_items_pkey")
+    for name in INDEXES:
+        op.execute(f"ALTER INDEX {name}_shadow RENAME TO {name}")
+    for remainder in range(PARTITIONS):
+        op.rename_table(f'todo_items_partitioned_p{remainder}', f'todo_items_p{remainder}')
+
+    op.execute("COMMENT ON TABLE todo_items IS NULL")
+    op.drop_table('todo_items_legacy')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Возвращаемся к состоянию после 80b13ca53082: секционированная таблица снова теневая,
+    # несекционированная todo_items восстанавливается копированием (блокирующая операция)
+    op.execute("LOCK TABLE todo_items IN ACCESS EXCLUSIVE MODE")
+    for remainder in range(PARTITIONS):
+        op.rename_table(f'todo_items_p{remainder}', f'todo_items_partitioned_p{remainder}')
+    for name in INDEXES:
+        op.execute(f"ALTER INDEX {name} RENAME TO {name}_shadow")
+    op.execute("ALTER INDEX todo_items_pkey RENAME TO todo_items_partitioned_pkey")
+    op.rename_table('todo_items', 'todo_items_partitioned')
+
+    op.execute(
+        "CREATE TABLE todo_items (LIKE todo_items_partitioned "
+        "INCLUDING DEFAULTS INCLUDING GENERATED INCLUDING CONSTRAINTS)"
+    )
+    op.execute(f"INSERT INTO todo_items ({COLUMNS}) SELECT {COLUMNS} FROM todo_items_partitioned")
+    op.create_primary_key('todo_items_pkey', 'todo_items', ['id'])
+    op.create_foreign_key(
+        None, 'todo_items', 'todo_categories', ['category_id'], ['id'], onupdate='CASCADE', ondelete='CASCADE'
+    )
+    op.create_foreign_key(None, 'todo_items', 'users', ['user_id'], ['id'], onupdate='CASCADE', ondelete='CASCADE')
+    for name, definition in INDEXES.items():
+        op.execute(f"CREATE INDEX {name} ON todo_items {definition}")
+
+    op.execute(MIRROR_FUNCTION)
+    op.execute(
+        "CREATE TRIGGER todo_items_mirror AFTER INSERT OR UPDATE OR DELETE ON todo_items "
+        "FOR EACH ROW EXECUTE FUNCTION todo_items_mirror()"
+    )
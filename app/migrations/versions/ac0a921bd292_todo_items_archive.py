@@ -0,0 +1,144 @@
+"""todo_items archive
+
+Revision ID: ac0a921bd292
+Revises: a2951563573b
+Create Date: 2026-10-19 18:12:40.735519
+
+completed_at уже выполненных задач заполняется пачками по id, каждая пачка —
+отдельная транзакция: одна UPDATE по всей таблице держала бы блокировки строк
+и раздувала таблицу до конца миграции. Откат так же пачками возвращает
+архивные задачи в todo_items.
+"""
+from typing import Sequence, Union
+from uuid import UUID
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'ac0a921bd292'
+down_revision: Union[str, Sequence[str], None] = 'a2951563573b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+SEARCH_VECTOR_EXPRESSION = (
+    "setweight(to_tsvector('russian', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('russian', coalesce(description, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'B')"
+)
+
+BATCH_SIZE = 5000
+
+# Для уже выполненных задач время выполнения неизвестно, берём последнее изменение
+BACKFILL_BATCH = sa.text("""
+    WITH batch AS (
+        SELECT id, user_id FROM todo_items
+        WHERE id > :last_id
+        ORDER BY id
+        LIMIT :batch_size
+    ), updated AS (
+        UPDATE todo_items AS item
+        SET completed_at = coalesce(item.updated_at, item.created_at)
+        FROM batch
+        WHERE item.id = batch.id AND item.user_id = batch.user_id
+          AND item.completed AND item.completed_at IS NULL
+    )
+    SELECT id FROM batch ORDER BY id DESC LIMIT 1
+""")
+
+ARCHIVE_COLUMNS = (
+    "id, title, description, completed, created_at, updated_at, "
+    "completed_at, date_of_execution, category_id, user_id"
+)
+
+# Перенос пачки архивных задач обратно: удаление и вставка в одной транзакции
+RESTORE_BATCH = sa.text(f"""
+    WITH moved AS (
+        DELETE FROM todo_items_archive
+        WHERE id IN (SELECT id FROM todo_items_archive ORDER BY id LIMIT :batch_size)
+        RETURNING {ARCHIVE_COLUMNS}
+    )
+    INSERT INTO todo_items ({ARCHIVE_COLUMNS})
+    SELECT {ARCHIVE_COLUMNS} FROM moved
+""")
+
+
+def backfill_completed_at() -> None:
+    """Заполнить completed_at выполненных задач пачками по id."""
+    last_id = UUID(int=0)
+    with op.get_context().autocommit_block():
+        while last_id is not None:
+            last_id = op.get_bind().execute(
+                BACKFILL_BATCH, {"last_id": last_id, "batch_size": BATCH_SIZE}
+            ).scalar()
+
+
+def restore_archive() -> None:
+    """Вернуть архивные задачи в todo_items пачками."""
+    with op.get_context().autocommit_block():
+        while op.get_bind().execute(RESTORE_BATCH, {"batch_size": BATCH_SIZE}).rowcount:
+            pass
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('todo_items', sa.Column('completed_at', sa.DateTime(), nullable=True))
+    backfill_completed_at()
+    op.create_index(
+        'ix_todo_items_completed_at',
+        'todo_items',
+        ['completed_at'],
+        unique=False,
+        postgresql_where=sa.text('completed')
+    )
+
+    op.create_table('todo_items_archive',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('title', sa.String(), nullable=False),
+    sa.Column('description', sa.String(), nullable=True),
+    sa.Column('completed', sa.Boolean(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.Column('completed_at', sa.DateTime(), nullable=True),
+    sa.Column('date_of_execution', sa.Date(), nullable=True),
+    sa.Column(
+        'search_vector',
+        postgresql.TSVECTOR(),
+        sa.Computed(SEARCH_VECTOR_EXPRESSION, persisted=True),
+        nullable=False
+    ),
+    sa.Column('archived_at', sa.DateTime(), nullable=False),
+    sa.Column('category_id', sa.UUID(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.ForeignKeyConstraint(['category_id'], ['todo_categories.id'], onupdate='CASCADE', ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], onupdate='CASCADE', ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(
+        'ix_todo_items_archive_user_id_created_at',
+        'todo_items_archive',
+        ['user_id', 'created_at'],
+        unique=False
+    )
+    op.create_index(
+        'ix_todo_items_archive_user_id_search_vector',
+        'todo_items_archive',
+        ['user_id', 'search_vector'],
+        unique=False,
+        postgresql_using='gin'
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Возвращаем архивные задачи в todo_items вместе с completed_at, чтобы откат не терял данные
+    restore_archive()
+    op.drop_index('ix_todo_items_archive_user_id_search_vector', table_name='todo_items_archive', postgresql_using='gin')
+    op.drop_index('ix_todo_items_archive_user_id_created_at', table_name='todo_items_archive')
+    op.drop_table('todo_items_archive')
+    op.drop_index('ix_todo_items_completed_at', table_name='todo_items', postgresql_where=sa.text('completed'))
+    op.drop_column('todo_items', 'completed_at')
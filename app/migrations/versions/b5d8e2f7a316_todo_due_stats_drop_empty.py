@@ -0,0 +1,30 @@
+"""todo due stats drop empty
+
+Revision ID: b5d8e2f7a316
+Revises: f3c5a7b9d124
+Create Date: 2026-10-20 15:42:08.117306
+
+Удаляет строки todo_due_stats с pending = 0, накопленные до того, как репозиторий
+статистики начал удалять их сам: подсчёт просроченных задач суммирует все строки пользователя.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5d8e2f7a316'
+down_revision: Union[str, Sequence[str], None] = 'f3c5a7b9d124'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("DELETE FROM todo_due_stats WHERE pending = 0")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Пустые строки не нужны: отсутствие строки означает pending = 0
+    pass
@@ -0,0 +1,53 @@
+"""todo_items reminders
+
+Revision ID: b7e3c1d94f20
+Revises: a12197c5dab8
+Create Date: 2026-10-19 19:41:52.108337
+
+Добавляет reminded_at и частичный индекс очереди напоминаний
+(невыполненные задачи без отправленного напоминания). Индекс строится
+без блокировки записи: ON ONLY на родителе, CONCURRENTLY по секциям и ATTACH PARTITION.
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e3c1d94f20'
+down_revision: Union[str, Sequence[str], None] = 'a12197c5dab8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEX_NAME = "ix_todo_items_reminder_date_of_execution"
+INDEX_WHERE = "NOT completed AND deleted_at IS NULL AND reminded_at IS NULL"
+
+
+def todo_items_partitions() -> list[str]:
+    """Секции todo_items по pg_inherits: их количество задано при создании таблицы, а не настройками."""
+    return op.get_bind().exec_driver_sql(
+        "SELECT inhrelid::regclass::text FROM pg_inherits WHERE inhparent = 'todo_items'::regclass ORDER BY 1"
+    ).scalars().all()
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('todo_items', sa.Column('reminded_at', sa.DateTime(), nullable=True))
+    op.execute(f"CREATE INDEX {INDEX_NAME} ON ONLY todo_items (date_of_execution) WHERE {INDEX_WHERE}")
+    partitions = todo_items_partitions()
+    with op.get_context().autocommit_block():
+        for partition in partitions:
+            partition_index = f"{INDEX_NAME}_{partition.removeprefix('todo_items_')}"
+            op.execute(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {partition_index} "
+                f"ON {partition} (date_of_execution) WHERE {INDEX_WHERE}"
+            )
+            op.execute(f"ALTER INDEX {INDEX_NAME} ATTACH PARTITION {partition_index}")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute(f"DROP INDEX {INDEX_NAME}")
+    op.drop_column('todo_items', 'reminded_at')
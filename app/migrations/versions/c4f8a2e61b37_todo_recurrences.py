@@ -0,0 +1,100 @@
+"""todo recurrences
+
+Revision ID: c4f8a2e61b37
+Revises: b7e3c1d94f20
+Create Date: 2026-10-19 20:24:06.517493
+
+Правила повторения задач и ссылка todo_items.recurrence_id. Уникальный индекс
+(user_id, recurrence_id, date_of_execution) делает генерацию идемпотентной;
+он строится без блокировки записи: ON ONLY на родителе, CONCURRENTLY по секциям
+и ATTACH PARTITION.
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4f8a2e61b37'
+down_revision: Union[str, Sequence[str], None] = 'b7e3c1d94f20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEX_NAME = "ix_todo_items_recurrence_occurrence"
+INDEX_DEFINITION = "(user_id, recurrence_id, date_of_execution) WHERE recurrence_id IS NOT NULL"
+
+
+def todo_items_partitions() -> list[str]:
+    """Секции todo_items по pg_inherits: их количество задано при создании таблицы, а не настройками."""
+    return op.get_bind().exec_driver_sql(
+        "SELECT inhrelid::regclass::text FROM pg_inherits WHERE inhparent = 'todo_items'::regclass ORDER BY 1"
+    ).scalars().all()
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('todo_recurrences',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('title', sa.String(), nullable=False),
+    sa.Column('description', sa.String(), nullable=True),
+    sa.Column('frequency', sa.Enum('daily', 'weekly', 'monthly', name='recurrencefrequency'), nullable=False),
+    sa.Column('interval', sa.Integer(), nullable=False, quote=True),
+    sa.Column('weekdays', postgresql.ARRAY(sa.SmallInteger()), nullable=True),
+    sa.Column('month_day', sa.SmallInteger(), nullable=True),
+    sa.Column('starts_on', sa.Date(), nullable=False),
+    sa.Column('until', sa.Date(), nullable=True),
+    sa.Column('next_occurrence', sa.Date(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('category_id', sa.UUID(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.ForeignKeyConstraint(['category_id'], ['todo_categories.id'], onupdate='CASCADE', ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], onupdate='CASCADE', ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(
+        'ix_todo_recurrences_next_occurrence',
+        'todo_recurrences',
+        ['next_occurrence'],
+        unique=False,
+        postgresql_where=sa.text('next_occurrence IS NOT NULL')
+    )
+    op.create_index(
+        'ix_todo_recurrences_user_id_created_at',
+        'todo_recurrences',
+        ['user_id', 'created_at'],
+        unique=False
+    )
+
+    op.add_column('todo_items', sa.Column('recurrence_id', sa.UUID(), nullable=True))
+    op.create_foreign_key(
+        'todo_items_recurrence_id_fkey', 'todo_items', 'todo_recurrences',
+        ['recurrence_id'], ['id'], onupdate='CASCADE', ondelete='SET NULL'
+    )
+    op.execute(f"CREATE UNIQUE INDEX {INDEX_NAME} ON ONLY todo_items {INDEX_DEFINITION}")
+    partitions = todo_items_partitions()
+    with op.get_context().autocommit_block():
+        for partition in partitions:
+            partition_index = f"{INDEX_NAME}_{partition.removeprefix('todo_items_')}"
+            op.execute(
+                f"CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS {partition_index} "
+                f"ON {partition} {INDEX_DEFINITION}"
+            )
+            op.execute(f"ALTER INDEX {INDEX_NAME} ATTACH PARTITION {partition_index}")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute(f"DROP INDEX {INDEX_NAME}")
+    op.drop_constraint('todo_items_recurrence_id_fkey', 'todo_items', type_='foreignkey')
+    op.drop_column('todo_items', 'recurrence_id')
+    op.drop_index('ix_todo_recurrences_user_id_created_at', table_name='todo_recurrences')
+    op.drop_index(
+        'ix_todo_recurrences_next_occurrence',
+        table_name='todo_recurrences',
+        postgresql_where=sa.text('next_occurrence IS NOT NULL')
+    )
+    op.drop_table('todo_recurrences')
+    sa.Enum(name='recurrencefrequency').drop(op.get_bind(), checkfirst=True)
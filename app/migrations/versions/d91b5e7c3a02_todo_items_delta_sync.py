@@ -0,0 +1,82 @@
+"""todo_items delta sync
+
+Revision ID: d91b5e7c3a02
+Revises: c4f8a2e61b37
+Create Date: 2026-10-19 21:08:33.742915
+
+Номер изменения задачи (change_seq) из счётчика пользователя todo_sync_state
+и отметки об удалении todo_item_tombstones для GET /todo_items/changes.
+Добавление столбца с константным значением по умолчанию не перезаписывает таблицу;
+индекс строится без блокировки записи: ON ONLY на родителе, CONCURRENTLY по секциям
+и ATTACH PARTITION. Существующие задачи получают change_seq = 0 и отдаются при полной синхронизации.
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd91b5e7c3a02'
+down_revision: Union[str, Sequence[str], None] = 'c4f8a2e61b37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEX_NAME = "ix_todo_items_user_id_change_seq"
+INDEX_DEFINITION = "(user_id, change_seq, id)"
+
+
+def todo_items_partitions() -> list[str]:
+    """Секции todo_items по pg_inherits: их количество задано при создании таблицы, а не настройками."""
+    return op.get_bind().exec_driver_sql(
+        "SELECT inhrelid::regclass::text FROM pg_inherits WHERE inhparent = 'todo_items'::regclass ORDER BY 1"
+    ).scalars().all()
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('todo_sync_state',
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('last_seq', sa.BigInteger(), nullable=False),
+    sa.Column('pruned_seq', sa.BigInteger(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], onupdate='CASCADE', ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+    op.create_table('todo_item_tombstones',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('change_seq', sa.BigInteger(), nullable=False),
+    sa.Column('removed_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], onupdate='CASCADE', ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id', 'user_id')
+    )
+    op.create_index(
+        'ix_todo_item_tombstones_user_id_change_seq',
+        'todo_item_tombstones',
+        ['user_id', 'change_seq', 'id'],
+        unique=False
+    )
+    op.create_index('ix_todo_item_tombstones_removed_at', 'todo_item_tombstones', ['removed_at'], unique=False)
+
+    op.add_column('todo_items', sa.Column('change_seq', sa.BigInteger(), server_default='0', nullable=False))
+    op.execute(f"CREATE INDEX {INDEX_NAME} ON ONLY todo_items {INDEX_DEFINITION}")
+    partitions = todo_items_partitions()
+    with op.get_context().autocommit_block():
+        for partition in partitions:
+            partition_index = f"{INDEX_NAME}_{partition.removeprefix('todo_items_')}"
+            op.execute(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {partition_index} "
+                f"ON {partition} {INDEX_DEFINITION}"
+            )
+            op.execute(f"ALTER INDEX {INDEX_NAME} ATTACH PARTITION {partition_index}")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute(f"DROP INDEX {INDEX_NAME}")
+    op.drop_column('todo_items', 'change_seq')
+    op.drop_index('ix_todo_item_tombstones_removed_at', table_name='todo_item_tombstones')
+    op.drop_index('ix_todo_item_tombstones_user_id_change_seq', table_name='todo_item_tombstones')
+    op.drop_table('todo_item_tombstones')
+    op.drop_table('todo_sync_state')
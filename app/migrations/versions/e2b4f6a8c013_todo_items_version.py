@@ -0,0 +1,33 @@
+"""todo_items version
+
+Revision ID: e2b4f6a8c013
+Revises: d91b5e7c3a02
+Create Date: 2026-10-19 22:41:05.318207
+
+Версия задачи для оптимистической блокировки (If-Match / ETag).
+Добавление столбца с константным значением по умолчанию не перезаписывает таблицы;
+существующие задачи получают версию 1. В архиве версия сохраняется при переносе.
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2b4f6a8c013'
+down_revision: Union[str, Sequence[str], None] = 'd91b5e7c3a02'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('todo_items', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+    op.add_column('todo_items_archive', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('todo_items_archive', 'version')
+    op.drop_column('todo_items', 'version')
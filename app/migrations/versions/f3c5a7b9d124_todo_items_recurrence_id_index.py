@@ -0,0 +1,47 @@
+"""todo_items recurrence_id index
+
+Revision ID: f3c5a7b9d124
+Revises: e2b4f6a8c013
+Create Date: 2026-10-20 10:14:27.502913
+
+Индекс по внешнему ключу recurrence_id. Без него удаление правила повторения
+(ON DELETE SET NULL) просматривает все секции todo_items целиком: уникальный индекс
+повторений начинается с user_id и для поиска по recurrence_id не подходит.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3c5a7b9d124'
+down_revision: Union[str, Sequence[str], None] = 'e2b4f6a8c013'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEX_NAME = "ix_todo_items_recurrence_id"
+INDEX_DEFINITION = "(recurrence_id) WHERE recurrence_id IS NOT NULL"
+
+
+def todo_items_partitions() -> list[str]:
+    """Секции todo_items по pg_inherits: их количество задано при создании таблицы, а не настройками."""
+    return op.get_bind().exec_driver_sql(
+        "SELECT inhrelid::regclass::text FROM pg_inherits WHERE inhparent = 'todo_items'::regclass ORDER BY 1"
+    ).scalars().all()
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(f"CREATE INDEX {INDEX_NAME} ON ONLY todo_items {INDEX_DEFINITION}")
+    partitions = todo_items_partitions()
+    with op.get_context().autocommit_block():
+        for partition in partitions:
+            partition_index = f"{INDEX_NAME}_{partition.removeprefix('todo_items_')}"
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {partition_index} ON {partition} {INDEX_DEFINITION}")
+            op.execute(f"ALTER INDEX {INDEX_NAME} ATTACH PARTITION {partition_index}")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute(f"DROP INDEX {INDEX_NAME}")
@@ -0,0 +1,276 @@
+import asyncio
+import json
+import sys
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from types import FrameType
+from typing import Protocol
+
+from redis.asyncio import Redis
+
+
+SPEEDSCOPE_SCHEMA = "https://www.speedscope.app/file-format-schema.json"
+
+# Синтетические листовые кадры для времени, когда задача запроса не выполнялась
+AWAIT_FRAME = ("<await>", "", 0)
+READY_FRAME = ("<ready: ждёт цикл событий>", "", 0)
+
+
+def _frame_key(frame: FrameType) -> tuple[str, str, int]:
+    code = frame.f_code
+    return code.co_qualname, code.co_filename, code.co_firstlineno
+
+
+def _await_chain(awaitable) -> tuple[list[tuple[str, str, int]], tuple[str, str, int]]:
+    """
+    Стек приостановленной корутины от внешнего кадра к внутреннему по цепочке cr_await
+    и листовой кадр: ожидание ввода-вывода или готовность к продолжению.
+    """
+    stack = []
+    while awaitable is not None:
+        if isinstance(awaitable, asyncio.Task):
+            awaitable = awaitable.get_coro()
+        frame = getattr(awaitable, "cr_frame", None) or getattr(awaitable, "gi_frame", None) \
+            or getattr(awaitable, "ag_frame", None)
+        if frame is None:
+            # Future (ответ сокета, таймер): если он уже выполнен, задача ждёт своей очереди в цикле
+            done = getattr(awaitable, "done", None)
+            return stack, READY_FRAME if done is not None and done() else AWAIT_FRAME
+        stack.append(_frame_key(frame))
+        awaitable = getattr(awaitable, "cr_await", None) or getattr(awaitable, "gi_yieldfrom", None) \
+            or getattr(awaitable, "ag_await", None)
+    return stack, READY_FRAME
+
+
+@dataclass(eq=False)
+class ProfileSession:
+    """
+    Выборки стека одной задачи asyncio (запроса).
+
+    Каждую выборку стек берётся из потока цикла событий, если задача сейчас выполняется,
+    иначе — по цепочке ожиданий её корутины: профиль показывает и время CPU, и время ожидания
+    базы данных, Redis или самого цикла событий, занятого другими запросами.
+    """
+    task: asyncio.Task
+    loop: asyncio.AbstractEventLoop
+    thread_id: int
+    started: float = field(default_factory=time.perf_counter)
+    frames: dict[tuple[str, str, int], int] = field(default_factory=dict)
+    samples: list[list[int]] = field(default_factory=list)
+    weights: list[float] = field(default_factory=list)
+    last_sample: float = 0.0
+    finished: float = 0.0
+
+    def __post_init__(self):
+        self.last_sample = self.started
+
+    def _index(self, key: tuple[str, str, int]) -> int:
+        index = self.frames.get(key)
+        if index is None:
+            index = self.frames[key] = len(self.frames)
+        return index
+
+    def sample(self, thread_frame: FrameType | None, now: float) -> None:
+        root = self.task.get_coro().cr_frame
+        if root is None:
+            return
+        if thread_frame is not None and asyncio.current_task(self.loop) is self.task:
+            stack = []
+            frame = thread_frame
+            while frame is not None:
+                stack.append(_frame_key(frame))
+                if frame is root:
+                    break
+                frame = frame.f_back
+            stack.reverse()
+        else:
+            stack, leaf = _await_chain(self.task.get_coro())
+            stack.append(leaf)
+        self.samples.append([self._index(key) for key in stack])
+        self.weights.append((now - self.last_sample) * 1000)
+        self.last_sample = now
+
+    @property
+    def duration(self) -> float:
+        return (self.finished or time.perf_counter()) - self.started
+
+    def to_speedscope(self, name: str) -> dict:
+        """
+        Профиль в формате speedscope (https://www.speedscope.app): выборочный профиль в миллисекундах.
+        """
+        return {
+            "$schema": SPEEDSCOPE_SCHEMA,
+            "name": name,
+            "exporter": "taskpilot",
+            "activeProfileIndex": 0,
+            "shared": {"frames": [
+                {"name": function, "file": file, "line": line} if file else {"name": function}
+                for function, file, line in self.frames
+            ]},
+            "profiles": [{
+                "type": "sampled",
+                "name": name,
+                "unit": "milliseconds",
+                "startValue": 0,
+                "endValue": sum(self.weights),
+                "samples": self.samples,
+                "weights": self.weights,
+            }],
+        }
+
+
+class SamplingProfiler:
+    """
+    Выборочный профилировщик запросов.
+
+    Один поток на процесс раз в interval секунд снимает стеки профилируемых задач и работает,
+    только пока есть хотя бы один профилируемый запрос; остальные запросы его не замечают.
+    Профилирование задачи прекращается через max_duration секунд (длинные SSE-соединения).
+    """
+
+    def __init__(self, interval: float = 0.005, max_duration: float = 30.0):
+        self.interval = interval
+        self.max_duration = max_duration
+        self._sessions: set[ProfileSession] = set()
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+
+    def start(self, task: asyncio.Task) -> ProfileSession:
+        """
+        Начать профилирование задачи; вызывается из потока её цикла событий.
+        """
+        session = ProfileSession(task=task, loop=asyncio.get_running_loop(), thread_id=threading.get_ident())
+        with self._lock:
+            self._sessions.add(session)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+                self._thread.start()
+        return session
+
+    def stop(self, session: ProfileSession) -> ProfileSession:
+        with self._lock:
+            self._sessions.discard(session)
+            session.finished = session.finished or time.perf_counter()
+        return session
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(self.interval)
+            # Выборка под блокировкой: stop не вернёт сессию, пока в неё дописывается выборка
+            with self._lock:
+                if not self._sessions:
+                    self._thread = None
+                    return
+                now = time.perf_counter()
+                frames = sys._current_frames()
+                for session in list(self._sessions):
+                    if now - session.started > self.max_duration:
+                        session.finished = now
+                        self._sessions.discard(session)
+                        continue
+                    session.sample(frames.get(session.thread_id), now)
+                del frames
+
+
+@dataclass
+class ProfileInfo:
+    """Описание сохранённого профиля запроса."""
+    id: str
+    method: str
+    path: str
+    route: str
+    status: int
+    duration_ms: float
+    samples: int
+    reason: str
+    created_at: float
+
+
+class ProfileStore(Protocol):
+    async def save(self, info: ProfileInfo, profile: dict) -> None: ...
+
+    async def list(self, limit: int) -> list[ProfileInfo]: ...
+
+    async def get(self, profile_id: str) -> bytes | None: ...
+
+
+@dataclass
+class RedisProfileStore:
+    """
+    Профили в Redis: доступны со всех узлов, хранятся ttl секунд, в индексе — последние max_profiles.
+    """
+    redis: Redis
+    ttl: int = 86400
+    max_profiles: int = 100
+    prefix: str = "profile"
+
+    async def save(self, info: ProfileInfo, profile: dict) -> None:
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.set(f"{self.prefix}:{info.id}", json.dumps(profile, ensure_ascii=False), ex=self.ttl)
+            pipe.set(f"{self.prefix}:{info.id}:info", json.dumps(asdict(info), ensure_ascii=False), ex=self.ttl)
+            pipe.zadd(f"{self.prefix}:index", {info.id: info.created_at})
+            pipe.zremrangebyrank(f"{self.prefix}:index", 0, -self.max_profiles - 1)
+            await pipe.execute()
+
+    async def list(self, limit: int) -> list[ProfileInfo]:
+        ids = await self.redis.zrevrange(f"{self.prefix}:index", 0, limit - 1)
+        if not ids:
+            return []
+        values = await self.redis.mget([f"{self.prefix}:{profile_id.decode()}:info" for profile_id in ids])
+        return [ProfileInfo(**json.loads(value)) for value in values if value is not None]
+
+    async def get(self, profile_id: str) -> bytes | None:
+        return await self.redis.get(f"{self.prefix}:{profile_id}")
+
+
+@dataclass
+class FileProfileStore:
+    """
+    Профили в каталоге узла: <id>.speedscope.json и описание <id>.info.json; хранятся последние max_profiles.
+    """
+    directory: str
+    max_profiles: int = 100
+
+    def _save(self, info: ProfileInfo, profile: dict) -> None:
+        directory = Path(self.directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        (directory / f"{info.id}.speedscope.json").write_text(json.dumps(profile, ensure_ascii=False), "utf-8")
+        (directory / f"{info.id}.info.json").write_text(json.dumps(asdict(info), ensure_ascii=False), "utf-8")
+        for old in self._infos()[self.max_profiles:]:
+            (directory / f"{old.id}.speedscope.json").unlink(missing_ok=True)
+            (directory / f"{old.id}.info.json").unlink(missing_ok=True)
+
+    def _infos(self) -> list[ProfileInfo]:
+        infos = []
+        for path in Path(self.directory).glob("*.info.json"):
+            try:
+                infos.append(ProfileInfo(**json.loads(path.read_text("utf-8"))))
+            except (OSError, ValueError, TypeError):
+                continue
+        return sorted(infos, key=lambda info: info.created_at, reverse=True)
+
+    def _get(self, profile_id: str) -> bytes | None:
+        path = Path(self.directory) / f"{profile_id}.speedscope.json"
+        return path.read_bytes() if path.is_file() else None
+
+    async def save(self, info: ProfileInfo, profile: dict) -> None:
+        await asyncio.to_thread(self._save, info, profile)
+
+    async def list(self, limit: int) -> list[ProfileInfo]:
+        return (await asyncio.to_thread(self._infos))[:limit]
+
+    async def get(self, profile_id: str) -> bytes | None:
+        return await asyncio.to_thread(self._get, profile_id)
+
+
+def create_profile_store(kind: str, redis: Redis, directory: str, ttl: int, max_profiles: int) -> ProfileStore:
+    """
+    Хранилище профилей по настройке PROFILING_STORAGE: redis или file.
+    """
+    if kind == "redis":
+        return RedisProfileStore(redis=redis, ttl=ttl, max_profiles=max_profiles)
+    if kind == "file":
+        return FileProfileStore(directory=directory, max_profiles=max_profiles)
+    raise ValueError(f"Неизвестное хранилище профилей: {kind}")
@@ -0,0 +1,84 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Sequence
+from uuid import UUID
+
+from sqlalchemy import Row, Select, func, literal_column, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.database.models.todo_category import TodoCategory
+from app.database.models.todo_item import TodoItem
+from app.instrumentation import instrumented
+from app.schema.todo_item import AdminTodoGroupBy, AdminTodoItemFilter
+
+
+def _apply_filters(query: Select, filters: AdminTodoItemFilter) -> Select:
+    """
+    Добавить к запросу фильтры административной выборки.
+    Задачи в корзине не показываются.
+    """
+    query = query.where(TodoItem.deleted_at.is_(None))
+    if filters.user_id is not None:
+        query = query.where(TodoItem.user_id == filters.user_id)
+    if filters.category_name is not None:
+        query = query.where(TodoItem.category_id == (
+            select(TodoCategory.id)
+            .where(TodoCategory.name == filters.category_name)
+            .scalar_subquery()
+        ))
+    if filters.completed is not None:
+        query = query.where(TodoItem.completed == filters.completed)
+    if filters.created_from is not None:
+        query = query.where(TodoItem.created_at >= filters.created_from)
+    if filters.created_to is not None:
+        query = query.where(TodoItem.created_at < filters.created_to)
+    return query
+
+
+@instrumented
+@dataclass
+class AdminTodoItemRepository:
+    db: AsyncSession
+
+    async def list_todo_items(
+            self,
+            filters: AdminTodoItemFilter,
+            after: tuple[datetime, UUID] | None = None,
+            limit: int = 100
+    ) -> Sequence[TodoItem]:
+        """
+        Получить задачи всех пользователей с keyset-пагинацией.
+        Порядок — от новых к старым; after — (created_at, id) последней задачи предыдущей страницы.
+        """
+        query = _apply_filters(select(TodoItem), filters)
+        if after is not None:
+            query = query.where(tuple_(TodoItem.created_at, TodoItem.id) < tuple_(*after))
+        todo_items = await self.db.scalars(query
+                                           .order_by(TodoItem.created_at.desc(), TodoItem.id.desc())
+                                           .limit(limit)
+                                           )
+        return todo_items.all()
+
+    async def aggregate_todo_items(self, group_by: AdminTodoGroupBy, filters: AdminTodoItemFilter) -> Sequence[Row]:
+        """
+        Посчитать количество задач и выполненных задач по группам на стороне базы данных.
+        """
+        keys = {
+            AdminTodoGroupBy.user: TodoItem.user_id,
+            AdminTodoGroupBy.category: TodoItem.category_id,
+            AdminTodoGroupBy.completed: TodoItem.completed,
+            AdminTodoGroupBy.day: func.date_trunc(literal_column("'day'"), TodoItem.created_at),
+        }
+        key = keys[group_by].label("key")
+        grouped = _apply_filters(
+            select(key, func.count().label("total"), func.count().filter(TodoItem.completed).label("completed")),
+            filters
+        ).group_by(key).subquery()
+        if group_by == AdminTodoGroupBy.category:
+            query = (select(TodoCategory.name.label("key"), grouped.c.total, grouped.c.completed)
+                     .join(TodoCategory, TodoCategory.id == grouped.c.key))
+        else:
+            query = select(grouped.c.key, grouped.c.total, grouped.c.completed)
+        rows = await self.db.execute(query.order_by("key"))
+        return rows.all()
@@ -0,0 +1,468 @@
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Iterable, Sequence
+from uuid import UUID, uuid4
+
+from sqlalchemy.exc import IntegrityError
+
+from app.database.models.enums import CategoryName
+from app.database.models.todo_category import TodoCategory
+from app.database.models.todo_item import TodoItem
+from app.database.models.todo_sync import TodoSyncState
+from app.database.models.user import User
+from app.instrumentation import instrumented
+from app.repositories.todo_item import SORT_FIELDS
+from app.repositories.todo_stats import StatsKey
+from app.schema.todo_item import TodoItemFilter, TodoItemSort
+
+
+# Поля задачи, которые копируются при чтении; search_vector считает только PostgreSQL
+TODO_ITEM_FIELDS = tuple(
+    attribute.key for attribute in TodoItem.__mapper__.column_attrs if attribute.key != "search_vector"
+)
+
+
+def copy_todo_item(todo_item: TodoItem) -> TodoItem:
+    """
+    Отдельная копия задачи: как объект, прочитанный своей сессией, она не меняет хранимую задачу.
+    """
+    return TodoItem(**{name: getattr(todo_item, name) for name in TODO_ITEM_FIELDS})
+
+
+def matches_filters(todo_item: TodoItem, filters: TodoItemFilter | None, category_id: UUID | None, today: date) -> bool:
+    """
+    Условия filter_todo_items для задачи в памяти; сравнение с пустой датой, как в SQL, ложно.
+    """
+    if filters is None:
+        return True
+    due = todo_item.date_of_execution
+    if filters.completed is not None and todo_item.completed != filters.completed:
+        return False
+    if filters.category_name is not None and todo_item.category_id != category_id:
+        return False
+    if filters.due_from is not None and (due is None or due < filters.due_from):
+        return False
+    if filters.due_to is not None and (due is None or due > filters.due_to):
+        return False
+    if filters.overdue is not None:
+        overdue = not todo_item.completed and due is not None and due < today
+        if overdue != filters.overdue:
+            return False
+    return True
+
+
+def sort_key(value):
+    """
+    Ключ сравнения значения поля сортировки: строки — без учёта регистра, затем как есть.
+    """
+    if isinstance(value, str):
+        return value.casefold(), value
+    return value
+
+
+def sort_todo_items(todo_items: Iterable[TodoItem], sort: TodoItemSort) -> list[TodoItem]:
+    """
+    Порядок sort_order: поле и id в одном направлении, пустые даты выполнения в конце.
+    Названия сравниваются без учёта регистра, а при равенстве — по кодам символов: это приближает
+    правила локали базы данных, но не повторяет их (знаки препинания, ё и т. п. могут стоять иначе).
+    """
+    field_name, descending = SORT_FIELDS[sort]
+    present, missing = [], []
+    for todo_item in todo_items:
+        (missing if getattr(todo_item, field_name) is None else present).append(todo_item)
+    present.sort(key=lambda todo_item: (sort_key(getattr(todo_item, field_name)), todo_item.id), reverse=descending)
+    missing.sort(key=lambda todo_item: todo_item.id, reverse=descending)
+    return present + missing
+
+
+@dataclass
+class MemoryStore:
+    """
+    Пользователи и задачи в памяти процесса: общие для всех репозиториев InMemory*.
+
+    Задачи хранятся словарями по пользователю; порядок словаря пользователя — порядок изменений:
+    каждое изменение получает следующий номер change_seq и переставляет задачу в конец.
+    Уникальность имени и email пользователя проверяется, как ограничениями таблицы users.
+    """
+    users: dict[UUID, User] = field(default_factory=dict)
+    usernames: dict[str, UUID] = field(default_factory=dict)
+    emails: dict[str, UUID] = field(default_factory=dict)
+    categories: dict[CategoryName, TodoCategory] = field(
+        default_factory=lambda: {name: TodoCategory(id=uuid4(), name=name) for name in CategoryName}
+    )
+    # user_id -> id задачи -> задача
+    items: dict[UUID, dict[UUID, TodoItem]] = field(default_factory=dict)
+    # user_id -> название -> id задачи вне корзины
+    titles: dict[UUID, dict[str, UUID]] = field(default_factory=dict)
+    sync_states: dict[UUID, TodoSyncState] = field(default_factory=dict)
+    # user_id -> category_id -> [всего, выполнено]
+    category_stats: dict[UUID, dict[UUID, list[int]]] = field(default_factory=dict)
+    # user_id -> дата выполнения -> невыполненных задач
+    due_stats: dict[UUID, dict[date, int]] = field(default_factory=dict)
+
+    def clear(self) -> None:
+        """Удалить всех пользователей и задачи; категории сохраняются."""
+        for name in ("users", "usernames", "emails", "items", "titles", "sync_states", "category_stats", "due_stats"):
+            getattr(self, name).clear()
+
+
+@instrumented
+@dataclass
+class InMemoryUserRepository:
+    store: MemoryStore
+
+    async def get_user_by_id(self, user_id: UUID) -> User | None:
+        """
+        Получить пользователя по его идентификатору.
+        """
+        return self.store.users.get(user_id)
+
+    async def get_by_username(self, username: str) -> User | None:
+        """
+        Получить активного пользователя по имени пользователя.
+        """
+        user = self.store.users.get(self.store.usernames.get(username))
+        return user if user is not None and user.is_active else None
+
+    async def get_by_email(self, email: str) -> User | None:
+        """
+        Получить активного пользователя по его электронному адресу.
+        """
+        user = self.store.users.get(self.store.emails.get(email))
+        return user if user is not None and user.is_active else None
+
+    def _check_unique(self, user_data: dict, user_id: UUID | None = None) -> None:
+        for index, key in ((self.store.usernames, "username"), (self.store.emails, "email")):
+            owner = index.get(user_data.get(key))
+            if owner is not None and owner != user_id:
+                raise IntegrityError(
+                    "INSERT INTO users", {key: user_data[key]},
+                    ValueError(f"duplicate key value violates unique constraint \"users_{key}_key\"")
+                )
+
+    async def create_user(self, user_data: dict) -> User:
+        """
+        Создать нового пользователя. Занятое имя или email — IntegrityError, как от PostgreSQL.
+        """
+        self._check_unique(user_data)
+        user = User(**user_data)
+        user.id = user.id or uuid4()
+        user.is_active = bool(user.is_active)
+        user.is_admin = bool(user.is_admin)
+        self.store.users[user.id] = user
+        self.store.usernames[user.username] = user.id
+        self.store.emails[user.email] = user.id
+        return user
+
+    async def update_user(self, user: User, user_data: dict) -> User:
+        """
+        Обновить данные пользователя.
+        """
+        self._check_unique(user_data, user.id)
+        old_username, old_email = user.username, user.email
+        for key, value in user_data.items():
+            setattr(user, key, value)
+        self.store.usernames.pop(old_username, None)
+        self.store.emails.pop(old_email, None)
+        self.store.usernames[user.username] = user.id
+        self.store.emails[user.email] = user.id
+        self.store.users[user.id] = user
+        return user
+
+
+@instrumented
+@dataclass
+class InMemoryTodoStatsRepository:
+    store: MemoryStore
+
+    async def apply_delta(self, user_id: UUID, key: StatsKey, sign: int) -> None:
+        """
+        Учесть добавление (sign=1) или удаление (sign=-1) задачи в счётчиках.
+        """
+        counters = self.store.category_stats.setdefault(user_id, {}).setdefault(key.category_id, [0, 0])
+        counters[0] += sign
+        counters[1] += sign if key.completed else 0
+        if key.completed or key.date_of_execution is None:
+            return
+        due = self.store.due_stats.setdefault(user_id, {})
+        pending = due.get(key.date_of_execution, 0) + sign
+        if pending:
+            due[key.date_of_execution] = pending
+        else:
+            due.pop(key.date_of_execution, None)
+
+    async def apply_change(self, user_id: UUID, old: StatsKey, new: StatsKey) -> None:
+        """
+        Учесть изменение полей задачи, если оно затрагивает счётчики.
+        """
+        if old == new:
+            return
+        await self.apply_delta(user_id, old, -1)
+        await self.apply_delta(user_id, new, 1)
+
+    async def get_category_stats(self, user_id: UUID) -> Sequence[tuple[CategoryName, int, int]]:
+        """
+        Получить счётчики пользователя по категориям вместе с названиями категорий.
+        """
+        names = {category.id: category.name for category in self.store.categories.values()}
+        return [
+            (names[category_id], total, completed)
+            for category_id, (total, completed) in self.store.category_stats.get(user_id, {}).items()
+        ]
+
+    async def get_overdue_count(self, user_id: UUID, today: date) -> int:
+        """
+        Получить количество невыполненных задач со сроком раньше today.
+        """
+        return sum(pending for day, pending in self.store.due_stats.get(user_id, {}).items() if day < today)
+
+
+@instrumented
+@dataclass
+class InMemoryTodoSyncRepository:
+    store: MemoryStore
+
+    async def allocate(self, user_id: UUID, count: int = 1) -> int:
+        """
+        Выделить count следующих номеров изменений пользователя; возвращает последний из них.
+        """
+        state = self.store.sync_states.get(user_id)
+        if state is None:
+            state = self.store.sync_states[user_id] = TodoSyncState(user_id=user_id, last_seq=0, pruned_seq=0)
+        state.last_seq += count
+        return state.last_seq
+
+    async def get_state(self, user_id: UUID) -> TodoSyncState | None:
+        return self.store.sync_states.get(user_id)
+
+    async def get_changed_items(
+            self,
+            user_id: UUID,
+            after: tuple[int, UUID],
+            limit: int,
+            include_deleted: bool = True
+    ) -> Sequence[TodoItem]:
+        """
+        Задачи пользователя, изменённые после позиции after = (change_seq, id), по порядку изменений.
+        Словарь задач упорядочен по изменениям: обход с конца останавливается на позиции after.
+        """
+        changed = []
+        for todo_item in reversed(self.store.items.get(user_id, {}).values()):
+            if (todo_item.change_seq, todo_item.id) <= after:
+                break
+            if include_deleted or todo_item.deleted_at is None:
+                changed.append(todo_item)
+        changed.reverse()
+        return changed[:limit]
+
+    async def get_tombstones(self, user_id: UUID, after: tuple[int, UUID], limit: int) -> Sequence:
+        """
+        Отметки об удалении: задачи из памяти удаляются только в корзину, поэтому отметок нет.
+        """
+        return []
+
+
+@instrumented
+@dataclass
+class InMemoryTodoItemRepository:
+    """
+    Задачи в памяти процесса с поведением TodoItemRepository: те же фильтры, порядок сортировки,
+    версии и номера изменений, счётчики статистики и проверка версии при записи.
+
+    Отличия: архива нет (include_archived ничего не добавляет), поиск — вхождение всех слов запроса
+    в название или описание без ранжирования, подсказки — префикс, затем вхождение вместо триграмм.
+    Чтение одной задачи возвращает копию; списки — хранимые задачи, их нельзя изменять.
+    """
+    store: MemoryStore
+
+    @property
+    def stats(self) -> InMemoryTodoStatsRepository:
+        return InMemoryTodoStatsRepository(self.store)
+
+    @property
+    def sync(self) -> InMemoryTodoSyncRepository:
+        return InMemoryTodoSyncRepository(self.store)
+
+    def _user_items(self, user_id: UUID) -> dict[UUID, TodoItem]:
+        return self.store.items.get(user_id, {})
+
+    def _active_items(self, user_id: UUID) -> list[TodoItem]:
+        return [todo_item for todo_item in self._user_items(user_id).values() if todo_item.deleted_at is None]
+
+    def _current(self, todo_item: TodoItem) -> TodoItem | None:
+        """
+        Хранимая задача той же версии, что и прочитанная; None — задачу успели изменить.
+        """
+        stored = self._user_items(todo_item.user_id).get(todo_item.id)
+        return stored if stored is not None and stored.version == todo_item.version else None
+
+    async def _save(self, todo_item: TodoItem, previous: TodoItem | None) -> TodoItem:
+        """
+        Записать изменённую задачу: новый номер изменения, следующая версия, перенос в конец порядка изменений.
+        """
+        user_id = todo_item.user_id
+        todo_item.change_seq = await self.sync.allocate(user_id)
+        if previous is not None:
+            todo_item.version = previous.version + 1
+            todo_item.updated_at = datetime.now()
+        items = self.store.items.setdefault(user_id, {})
+        titles = self.store.titles.setdefault(user_id, {})
+        items.pop(todo_item.id, None)
+        items[todo_item.id] = copy_todo_item(todo_item)
+        if previous is not None and titles.get(previous.title) == todo_item.id:
+            del titles[previous.title]
+        if todo_item.deleted_at is None:
+            titles[todo_item.title] = todo_item.id
+        return todo_item
+
+    async def check_category_exists(self, category_name: CategoryName) -> TodoCategory | None:
+        """
+        Проверить, существует ли категория с данным названием. В памяти есть все категории CategoryName.
+        """
+        return self.store.categories.get(category_name)
+
+    async def get_todo_items(
+            self,
+            user_id: UUID,
+            filters: TodoItemFilter | None = None,
+            sort: TodoItemSort = TodoItemSort.created_at_desc,
+            offset: int = 0,
+            limit: int | None = None,
+            include_archived: bool = False
+    ) -> Sequence[TodoItem]:
+        """
+        Получить элементы списка дел пользователя с фильтрами и сортировкой.
+        Без limit возвращает все элементы, начиная с offset.
+        """
+        category = self.store.categories.get(filters.category_name) if filters and filters.category_name else None
+        category_id = category.id if category is not None else None
+        today = date.today()
+        todo_items = sort_todo_items(
+            (todo_item for todo_item in self._active_items(user_id)
+             if matches_filters(todo_item, filters, category_id, today)),
+            sort
+        )
+        return todo_items[offset:None if limit is None else offset + limit]
+
+    async def search_todo_items(
+            self,
+            user_id: UUID,
+            query: str,
+            offset: int = 0,
+            limit: int = 20,
+            include_archived: bool = False
+    ) -> Sequence[TodoItem]:
+        """
+        Найти задачи, в названии или описании которых есть все слова запроса; новые первыми.
+        """
+        words = query.lower().split()
+        found = [
+            todo_item for todo_item in self._active_items(user_id)
+            if words and all(word in f"{todo_item.title} {todo_item.description or ''}".lower() for word in words)
+        ]
+        found.sort(key=lambda todo_item: todo_item.created_at, reverse=True)
+        return found[offset:offset + limit]
+
+    async def suggest_todo_titles(self, user_id: UUID, prefix: str, limit: int = 10) -> Sequence[TodoItem]:
+        """
+        Подобрать названия задач: сначала начинающиеся с prefix, затем содержащие его.
+        """
+        prefix = prefix.lower()
+        found = []
+        for todo_item in self._active_items(user_id):
+            title = todo_item.title.lower()
+            if prefix in title:
+                found.append((not title.startswith(prefix), todo_item.title, todo_item))
+        found.sort(key=lambda row: row[:2])
+        return [todo_item for _, _, todo_item in found[:limit]]
+
+    async def create_todo_item(self, data: dict) -> TodoItem:
+        """
+        Создать новый элемент списка дел.
+        """
+        todo_item = TodoItem(**data)
+        todo_item.id = todo_item.id or uuid4()
+        todo_item.completed = bool(todo_item.completed)
+        todo_item.created_at = todo_item.created_at or datetime.now()
+        todo_item.version = 1
+        await self._save(todo_item, previous=None)
+        await self.stats.apply_delta(todo_item.user_id, StatsKey.of(todo_item), 1)
+        return todo_item
+
+    async def get_todo_item(self, todo_item_id: UUID, user_id: UUID) -> TodoItem | None:
+        """
+        Получить элемент списка дел по идентификатору.
+        """
+        todo_item = self._user_items(user_id).get(todo_item_id)
+        if todo_item is None or todo_item.deleted_at is not None:
+            return None
+        return copy_todo_item(todo_item)
+
+    async def get_todo_item_by_title(self, title: str, user_id: UUID) -> TodoItem | None:
+        """
+        Получить элемент списка дел по названию.
+        """
+        todo_item_id = self.store.titles.get(user_id, {}).get(title)
+        return await self.get_todo_item(todo_item_id, user_id) if todo_item_id is not None else None
+
+    async def update_todo_item(self, todo_item: TodoItem, data: dict) -> TodoItem | None:
+        """
+        Обновить элемент списка дел.
+        Возвращает None, если задачу успели изменить после чтения (версия не совпала).
+        """
+        previous = self._current(todo_item)
+        if previous is None:
+            return None
+        old_stats_key = StatsKey.of(previous)
+        for key, value in data.items():
+            setattr(todo_item, key, value)
+        if todo_item.completed != old_stats_key.completed:
+            todo_item.completed_at = datetime.now() if todo_item.completed else None
+        if todo_item.date_of_execution != old_stats_key.date_of_execution:
+            todo_item.reminded_at = None
+        await self._save(todo_item, previous)
+        await self.stats.apply_change(todo_item.user_id, old_stats_key, StatsKey.of(todo_item))
+        return todo_item
+
+    async def trash_todo_item(self, todo_item: TodoItem) -> TodoItem | None:
+        """
+        Переместить элемент списка дел в корзину.
+        Возвращает None, если задачу успели изменить после чтения (версия не совпала).
+        """
+        previous = self._current(todo_item)
+        if previous is None:
+            return None
+        todo_item.deleted_at = datetime.now()
+        await self._save(todo_item, previous)
+        await self.stats.apply_delta(todo_item.user_id, StatsKey.of(previous), -1)
+        return todo_item
+
+    async def get_trashed_todo_items(self, user_id: UUID, offset: int = 0, limit: int = 50) -> Sequence[TodoItem]:
+        """
+        Получить задачи пользователя в корзине, недавно удалённые первыми.
+        """
+        trashed = [todo_item for todo_item in self._user_items(user_id).values() if todo_item.deleted_at is not None]
+        trashed.sort(key=lambda todo_item: (todo_item.deleted_at, todo_item.id), reverse=True)
+        return trashed[offset:offset + limit]
+
+    async def get_trashed_todo_item(self, todo_item_id: UUID, user_id: UUID) -> TodoItem | None:
+        """
+        Получить задачу из корзины по идентификатору.
+        """
+        todo_item = self._user_items(user_id).get(todo_item_id)
+        if todo_item is None or todo_item.deleted_at is None:
+            return None
+        return copy_todo_item(todo_item)
+
+    async def restore_todo_item(self, todo_item: TodoItem) -> TodoItem | None:
+        """
+        Вернуть задачу из корзины.
+        Возвращает None, если задачу успели изменить после чтения (версия не совпала).
+        """
+        previous = self._current(todo_item)
+        if previous is None:
+            return None
+        todo_item.deleted_at = None
+        await self._save(todo_item, previous)
+        await self.stats.apply_delta(todo_item.user_id, StatsKey.of(todo_item), 1)
+        return todo_item
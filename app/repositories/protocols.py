@@ -0,0 +1,102 @@
+from datetime import date
+from typing import Protocol, Sequence
+from uuid import UUID
+
+from app.database.models.enums import CategoryName
+from app.database.models.todo_category import TodoCategory
+from app.database.models.todo_item import TodoItem
+from app.database.models.todo_sync import TodoSyncState
+from app.database.models.user import User
+from app.schema.todo_item import TodoItemFilter, TodoItemSort
+
+
+class UserRepositoryProtocol(Protocol):
+    """Репозиторий пользователей, которым пользуются сервисы и зависимости авторизации."""
+
+    async def get_user_by_id(self, user_id: UUID) -> User | None: ...
+
+    async def get_by_username(self, username: str) -> User | None: ...
+
+    async def get_by_email(self, email: str) -> User | None: ...
+
+    async def create_user(self, user_data: dict) -> User: ...
+
+    async def update_user(self, user: User, user_data: dict) -> User: ...
+
+
+class TodoStatsRepositoryProtocol(Protocol):
+    """Чтение счётчиков статистики задач пользователя."""
+
+    async def get_category_stats(self, user_id: UUID) -> Sequence: ...
+
+    async def get_overdue_count(self, user_id: UUID, today: date) -> int: ...
+
+
+class TodoSyncRepositoryProtocol(Protocol):
+    """Чтение последовательности изменений задач пользователя для дельта-синхронизации."""
+
+    async def get_state(self, user_id: UUID) -> TodoSyncState | None: ...
+
+    async def get_changed_items(
+            self,
+            user_id: UUID,
+            after: tuple[int, UUID],
+            limit: int,
+            include_deleted: bool = True
+    ) -> Sequence[TodoItem]: ...
+
+    async def get_tombstones(self, user_id: UUID, after: tuple[int, UUID], limit: int) -> Sequence: ...
+
+
+class TodoItemRepositoryProtocol(Protocol):
+    """
+    Репозиторий задач, которым пользуется TodoItemService.
+
+    Реализации: TodoItemRepository (PostgreSQL) и InMemoryTodoItemRepository (память процесса).
+    Изменяющие методы возвращают None, если задачу успели изменить после чтения.
+    """
+
+    @property
+    def stats(self) -> TodoStatsRepositoryProtocol: ...
+
+    @property
+    def sync(self) -> TodoSyncRepositoryProtocol: ...
+
+    async def check_category_exists(self, category_name: CategoryName) -> TodoCategory | None: ...
+
+    async def get_todo_items(
+            self,
+            user_id: UUID,
+            filters: TodoItemFilter | None = None,
+            sort: TodoItemSort = TodoItemSort.created_at_desc,
+            offset: int = 0,
+            limit: int | None = None,
+            include_archived: bool = False
+    ) -> Sequence[TodoItem]: ...
+
+    async def search_todo_items(
+            self,
+            user_id: UUID,
+            query: str,
+            offset: int = 0,
+            limit: int = 20,
+            include_archived: bool = False
+    ) -> Sequence[TodoItem]: ...
+
+    async def suggest_todo_titles(self, user_id: UUID, prefix: str, limit: int = 10) -> Sequence: ...
+
+    async def create_todo_item(self, data: dict) -> TodoItem: ...
+
+    async def get_todo_item(self, todo_item_id: UUID, user_id: UUID) -> TodoItem | None: ...
+
+    async def get_todo_item_by_title(self, title: str, user_id: UUID) -> TodoItem | None: ...
+
+    async def update_todo_item(self, todo_item: TodoItem, data: dict) -> TodoItem | None: ...
+
+    async def trash_todo_item(self, todo_item: TodoItem) -> TodoItem | None: ...
+
+    async def get_trashed_todo_items(self, user_id: UUID, offset: int = 0, limit: int = 50) -> Sequence[TodoItem]: ...
+
+    async def get_trashed_todo_item(self, todo_item_id: UUID, user_id: UUID) -> TodoItem | None: ...
+
+    async def restore_todo_item(self, todo_item: TodoItem) -> TodoItem | None: ...
@@ -0,0 +1,69 @@
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Sequence
+from uuid import UUID
+
+from sqlalchemy import delete, func, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.database.models.todo_item import TodoItem
+from app.database.models.todo_item_archive import TodoItemArchive
+from app.instrumentation import instrumented
+from app.repositories.todo_item import ITEM_COLUMNS, item_columns
+from app.repositories.todo_sync import TodoSyncRepository
+
+
+@instrumented
+@dataclass
+class TodoArchiveRepository:
+    db: AsyncSession
+
+    async def archive_completed(self, completed_before: datetime, batch_size: int) -> Sequence[UUID]:
+        """
+        Перенести в архив пачку задач, выполненных раньше completed_before, и зафиксировать транзакцию.
+
+        Перенос выполняется одним запросом: DELETE ... RETURNING из todo_items
+        передаёт строки в INSERT в todo_items_archive. Строки, заблокированные
+        пользовательскими запросами, пропускаются (SKIP LOCKED) и попадут в следующую пачку.
+        Статистика не меняется: архивные задачи по-прежнему учитываются в счётчиках.
+        Для дельта-синхронизации перенесённые задачи получают отметки об удалении с новыми номерами изменений.
+        Возвращает user_id перенесённых задач (по одному на задачу).
+        """
+        batch = (
+            select(TodoItem.id, TodoItem.user_id)
+            .where(TodoItem.completed)
+            .where(TodoItem.deleted_at.is_(None))
+            .where(TodoItem.completed_at < completed_before)
+            .order_by(TodoItem.completed_at)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+            .cte("batch")
+        )
+        moved = (
+            delete(TodoItem.__table__)
+            .where(TodoItem.id == batch.c.id)
+            .where(TodoItem.user_id == batch.c.user_id)
+            .returning(*item_columns(TodoItem))
+            .cte("moved")
+        )
+        archived = (
+            insert(TodoItemArchive.__table__)
+            .from_select(
+                [*ITEM_COLUMNS, "archived_at"],
+                select(*(moved.c[name] for name in ITEM_COLUMNS), func.now())
+            )
+            .returning(TodoItemArchive.id, TodoItemArchive.user_id)
+            .add_cte(batch, moved, nest_here=True)
+        )
+        rows = (await self.db.execute(archived)).all()
+        sync = TodoSyncRepository(self.db)
+        last_seqs = await sync.allocate_many(Counter(row.user_id for row in rows))
+        tombstones = []
+        for row in rows:
+            tombstones.append({"id": row.id, "user_id": row.user_id, "change_seq": last_seqs[row.user_id]})
+            last_seqs[row.user_id] -= 1
+        await sync.add_tombstones(tombstones)
+        await self.db.commit()
+        return [row.user_id for row in rows]
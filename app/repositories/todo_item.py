@@ -1,44 +1,270 @@
 from dataclasses import dataclass
+from datetime import date, datetime
 from typing import Sequence
 from uuid import UUID
 
+from sqlalchemy import Row, Select, false, func, literal, literal_column, null, or_, union_all
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy.orm import aliased
+from sqlalchemy.orm.exc import StaleDataError
 
 from app.database.models.enums import CategoryName
 from app.database.models.todo_category import TodoCategory
 from app.database.models.todo_item import TodoItem
+from app.database.models.todo_item_archive import TodoItemArchive
+from app.instrumentation import instrumented
+from app.repositories.todo_stats import StatsKey, TodoStatsRepository
+from app.repositories.todo_sync import TodoSyncRepository
+from app.schema.todo_item import TodoItemFilter, TodoItemSort
 
 
+# Белый список сортировок: поле и направление
+SORT_FIELDS = {
+    TodoItemSort.created_at_desc: ("created_at", True),
+    TodoItemSort.created_at: ("created_at", False),
+    TodoItemSort.date_of_execution: ("date_of_execution", False),
+    TodoItemSort.date_of_execution_desc: ("date_of_execution", True),
+    TodoItemSort.title: ("title", False),
+    TodoItemSort.title_desc: ("title", True),
+}
+
+# Столбцы, общие для todo_items и todo_items_archive
+ITEM_COLUMNS = tuple(
+    column.name for column in TodoItem.__table__.columns
+    if column.name not in ("search_vector", "deleted_at", "reminded_at", "recurrence_id", "change_seq")
+)
+
+TodoItemModel = type[TodoItem] | type[TodoItemArchive]
+
+# Категории — справочник из миграций, который приложение не меняет. Прогрев процесса
+# заполняет карту, и запись задачи не читает категорию из базы; пока карта пуста
+# (прогрев выключен или ещё идёт), категория читается запросом
+category_map: dict[CategoryName, TodoCategory] = {}
+
+
+def sort_order(columns, sort: TodoItemSort) -> tuple:
+    """
+    Выражения ORDER BY для сортировки по столбцам модели или подзапроса;
+    id добавлен для стабильного порядка при равных значениях.
+    """
+    field, descending = SORT_FIELDS[sort]
+    column, tiebreaker = getattr(columns, field), columns.id
+    if descending:
+        column, tiebreaker = column.desc(), tiebreaker.desc()
+    else:
+        column, tiebreaker = column.asc(), tiebreaker.asc()
+    if field == "date_of_execution":
+        column = column.nulls_last()
+    return column, tiebreaker
+
+
+def item_columns(model: TodoItemModel) -> list:
+    return [getattr(model, name) for name in ITEM_COLUMNS]
+
+
+def union_columns(model: TodoItemModel) -> list:
+    """
+    Столбцы задачи для UNION ALL с архивом; у архивных задач deleted_at всегда пустой.
+    """
+    deleted_at = TodoItem.deleted_at if model is TodoItem else null().label("deleted_at")
+    return [*item_columns(model), deleted_at]
+
+
+def not_trashed(model: TodoItemModel) -> list:
+    """
+    Условие «задача не в корзине»; совпадает с предикатом частичных индексов todo_items.
+    В архив попадают только задачи вне корзины.
+    """
+    return [TodoItem.deleted_at.is_(None)] if model is TodoItem else []
+
+
+def filter_todo_items(query: Select, model: TodoItemModel, user_id: UUID, filters: TodoItemFilter | None) -> Select:
+    """
+    Добавить к запросу условия пользователя и фильтров списка задач.
+    Каждое условие опирается на индексы, начинающиеся с user_id.
+    """
+    query = query.where(model.user_id == user_id).where(*not_trashed(model))
+    if filters is None:
+        return query
+    if filters.completed is not None:
+        query = query.where(model.completed == filters.completed)
+    if filters.category_name is not None:
+        query = query.where(model.category_id == (
+            select(TodoCategory.id)
+            .where(TodoCategory.name == filters.category_name)
+            .scalar_subquery()
+        ))
+    if filters.due_from is not None:
+        query = query.where(model.date_of_execution >= filters.due_from)
+    if filters.due_to is not None:
+        query = query.where(model.date_of_execution <= filters.due_to)
+    if filters.overdue is True:
+        query = (query
+                 .where(model.completed == false())
+                 .where(model.date_of_execution < date.today()))
+    elif filters.overdue is False:
+        query = query.where(or_(model.completed,
+                                model.date_of_execution.is_(None),
+                                model.date_of_execution >= date.today()))
+    return query
+
+
+def todo_items_query(
+        user_id: UUID,
+        filters: TodoItemFilter | None = None,
+        sort: TodoItemSort = TodoItemSort.created_at_desc,
+        include_archived: bool = False
+) -> Select:
+    """
+    Построить запрос списка задач пользователя с фильтрами и сортировкой.
+    С include_archived к todo_items добавляется архив через UNION ALL.
+    """
+    if not include_archived:
+        return filter_todo_items(select(TodoItem), TodoItem, user_id, filters).order_by(*sort_order(TodoItem, sort))
+    items = union_all(
+        filter_todo_items(select(*union_columns(TodoItem)), TodoItem, user_id, filters),
+        filter_todo_items(select(*union_columns(TodoItemArchive)), TodoItemArchive, user_id, filters),
+    ).subquery("todo_items_all")
+    return select(aliased(TodoItem, items, adapt_on_names=True)).order_by(*sort_order(items.c, sort))
+
+
+def search_todo_items_query(user_id: UUID, query: str, include_archived: bool = False) -> Select:
+    """
+    Построить запрос полнотекстового поиска по задачам пользователя.
+    Запрос разбирается для русского и английского языков, результаты
+    упорядочены по релевантности. С include_archived ищет и в архиве.
+    """
+    ts_query = (
+        func.websearch_to_tsquery(literal_column("'russian'::regconfig"), query)
+        .op("||")(func.websearch_to_tsquery(literal_column("'english'::regconfig"), query))
+    )
+    if not include_archived:
+        rank = func.ts_rank_cd(TodoItem.search_vector, ts_query)
+        return (select(TodoItem)
+                .where(TodoItem.user_id == user_id)
+                .where(TodoItem.deleted_at.is_(None))
+                .where(TodoItem.search_vector.op("@@")(ts_query))
+                .order_by(rank.desc(), TodoItem.created_at.desc()))
+
+    def matching(model: TodoItemModel) -> Select:
+        return (select(*union_columns(model), func.ts_rank_cd(model.search_vector, ts_query).label("rank"))
+                .where(model.user_id == user_id)
+                .where(*not_trashed(model))
+                .where(model.search_vector.op("@@")(ts_query)))
+
+    items = union_all(matching(TodoItem), matching(TodoItemArchive)).subquery("todo_items_all")
+    return (select(aliased(TodoItem, items, adapt_on_names=True))
+            .order_by(items.c.rank.desc(), items.c.created_at.desc()))
+
+
+def suggest_todo_titles_query(user_id: UUID, prefix: str) -> Select:
+    """
+    Построить запрос подсказок названий: сначала совпадения по префиксу,
+    затем похожие названия с опечатками; оба условия обслуживаются триграммным GIN-индексом.
+    """
+    escaped = prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    starts_with = TodoItem.title.ilike(f"{escaped}%")
+    return (select(TodoItem.id, TodoItem.title)
+            .where(TodoItem.user_id == user_id)
+            .where(TodoItem.deleted_at.is_(None))
+            .where(or_(starts_with, literal(prefix).op("<%")(TodoItem.title)))
+            .order_by(starts_with.desc(),
+                      func.word_similarity(prefix, TodoItem.title).desc(),
+                      TodoItem.title))
+
+
+@instrumented
 @dataclass
 class TodoItemRepository:
     db: AsyncSession
 
+    @property
+    def stats(self) -> TodoStatsRepository:
+        """
+        Счётчики статистики, обновляемые в той же сессии и транзакции.
+        """
+        return TodoStatsRepository(self.db)
+
+    @property
+    def sync(self) -> TodoSyncRepository:
+        """
+        Номера изменений для дельта-синхронизации, выделяемые в той же транзакции.
+        """
+        return TodoSyncRepository(self.db)
+
     async def check_category_exists(self, category_name: CategoryName) -> TodoCategory | None:
         """
         Проверить, существует ли категория с данным названием.
         """
+        category = category_map.get(category_name)
+        if category is not None:
+            return category
         return await self.db.scalar(
             select(TodoCategory)
             .where(TodoCategory.name == category_name)
         )
 
-    async def get_todo_items(self, user_id: UUID) -> Sequence[TodoItem]:
+    async def load_category_map(self) -> None:
         """
-        Получить все элементы списка дел.
+        Заполнить category_map всеми категориями. В карте хранятся копии вне сессии:
+        откат или закрытие сессии не делает их недоступными.
         """
-        todo_items = await self.db.scalars(select(TodoItem)
-                                           .where(TodoItem.user_id == user_id)
-                                           .order_by(TodoItem.created_at.desc())
+        for category in await self.db.scalars(select(TodoCategory)):
+            category_map[category.name] = TodoCategory(id=category.id, name=category.name)
+
+    async def get_todo_items(
+            self,
+            user_id: UUID,
+            filters: TodoItemFilter | None = None,
+            sort: TodoItemSort = TodoItemSort.created_at_desc,
+            offset: int = 0,
+            limit: int | None = None,
+            include_archived: bool = False
+    ) -> Sequence[TodoItem]:
+        """
+        Получить элементы списка дел пользователя с фильтрами и сортировкой.
+        Без limit возвращает все элементы, начиная с offset.
+        """
+        todo_items = await self.db.scalars(todo_items_query(user_id, filters, sort, include_archived)
+                                           .offset(offset)
+                                           .limit(limit)
                                            )
         return todo_items.all()
 
+    async def search_todo_items(
+            self,
+            user_id: UUID,
+            query: str,
+            offset: int = 0,
+            limit: int = 20,
+            include_archived: bool = False
+    ) -> Sequence[TodoItem]:
+        """
+        Найти элементы списка дел пользователя по тексту названия и описания.
+        """
+        todo_items = await self.db.scalars(search_todo_items_query(user_id, query, include_archived)
+                                           .offset(offset)
+                                           .limit(limit)
+                                           )
+        return todo_items.all()
+
+    async def suggest_todo_titles(self, user_id: UUID, prefix: str, limit: int = 10) -> Sequence[Row]:
+        """
+        Подобрать названия задач пользователя для автодополнения.
+        """
+        rows = await self.db.execute(suggest_todo_titles_query(user_id, prefix).limit(limit))
+        return rows.all()
+
     async def create_todo_item(self, data: dict) -> TodoItem:
         """
         Создать новый элемент списка дел.
         """
         item = TodoItem(**data)
+        item.change_seq = await self.sync.allocate(item.user_id)
         self.db.add(item)
+        await self.db.flush()
+        await self.stats.apply_delta(item.user_id, StatsKey.of(item), 1)
         await self.db.commit()
         await self.db.refresh(item)
         return item
@@ -51,6 +277,7 @@ class TodoItemRepository:
             select(TodoItem)
             .where(TodoItem.id == todo_item_id)
             .where(TodoItem.user_id == user_id)
+            .where(TodoItem.deleted_at.is_(None))
         )
         return todo_item
     
@@ -62,22 +289,86 @@ class TodoItemRepository:
             select(TodoItem)
             .where(TodoItem.title == title)
             .where(TodoItem.user_id == user_id)
+            .where(TodoItem.deleted_at.is_(None))
         )
 
-    async def update_todo_item(self, todo_item: TodoItem, data: dict) -> TodoItem:
+    async def update_todo_item(self, todo_item: TodoItem, data: dict) -> TodoItem | None:
         """
         Обновить элемент списка дел.
+        Возвращает None, если задачу успели изменить после чтения (версия не совпала).
         """
+        old_stats_key = StatsKey.of(todo_item)
+        # Номер изменения выделяется до изменения полей: автофлеш запроса счётчика
+        # иначе отправил бы UPDATE задачи раньше и увеличил бы версию дважды
+        change_seq = await self.sync.allocate(todo_item.user_id)
         for key, value in data.items():
             setattr(todo_item, key, value)
-        await self.db.commit()
+        if todo_item.completed != old_stats_key.completed:
+            todo_item.completed_at = datetime.now() if todo_item.completed else None
+        if todo_item.date_of_execution != old_stats_key.date_of_execution:
+            todo_item.reminded_at = None
+        todo_item.change_seq = change_seq
+        try:
+            await self.stats.apply_change(todo_item.user_id, old_stats_key, StatsKey.of(todo_item))
+            await self.db.commit()
+        except StaleDataError:
+            await self.db.rollback()
+            return None
         await self.db.refresh(todo_item)
         return todo_item
 
-    async def delete_todo_item(self, todo_item: TodoItem) -> dict[str, str]:
+    async def trash_todo_item(self, todo_item: TodoItem) -> TodoItem | None:
         """
-        Удалить элемент списка дел.
+        Переместить элемент списка дел в корзину.
+        Задача перестаёт учитываться в статистике; окончательно её удаляет очистка корзины.
+        Возвращает None, если задачу успели изменить после чтения (версия не совпала).
         """
-        await self.db.delete(todo_item)
-        await self.db.commit()
-        return {"detail": "Элемент списка дел успешно удален"}
+        await self.stats.apply_delta(todo_item.user_id, StatsKey.of(todo_item), -1)
+        todo_item.change_seq = await self.sync.allocate(todo_item.user_id)
+        todo_item.deleted_at = datetime.now()
+        try:
+            await self.db.commit()
+        except StaleDataError:
+            await self.db.rollback()
+            return None
+        return todo_item
+
+    async def get_trashed_todo_items(self, user_id: UUID, offset: int = 0, limit: int = 50) -> Sequence[TodoItem]:
+        """
+        Получить задачи пользователя в корзине, недавно удалённые первыми.
+        """
+        todo_items = await self.db.scalars(select(TodoItem)
+                                           .where(TodoItem.user_id == user_id)
+                                           .where(TodoItem.deleted_at.is_not(None))
+                                           .order_by(TodoItem.deleted_at.desc(), TodoItem.id.desc())
+                                           .offset(offset)
+                                           .limit(limit)
+                                           )
+        return todo_items.all()
+
+    async def get_trashed_todo_item(self, todo_item_id: UUID, user_id: UUID) -> TodoItem | None:
+        """
+        Получить задачу из корзины по идентификатору.
+        """
+        return await self.db.scalar(
+            select(TodoItem)
+            .where(TodoItem.id == todo_item_id)
+            .where(TodoItem.user_id == user_id)
+            .where(TodoItem.deleted_at.is_not(None))
+        )
+
+    async def restore_todo_item(self, todo_item: TodoItem) -> TodoItem | None:
+        """
+        Вернуть задачу из корзины.
+        Возвращает None, если задачу успели изменить после чтения (версия не совпала).
+        """
+        todo_item.change_seq = await self.sync.allocate(todo_item.user_id)
+        todo_item.deleted_at = None
+        try:
+            await self.stats.apply_delta(todo_item.user_id, StatsKey.of(todo_item), 1)
+            await self.db.commit()
+        except StaleDataError:
+            await self.db.rollback()
+            return None
+        await self.db.refresh(todo_item)
+        return todo_item
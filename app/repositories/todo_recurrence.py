@@ -0,0 +1,131 @@
+from collections import Counter
+from dataclasses import dataclass
+from datetime import date
+from typing import Sequence
+from uuid import UUID
+
+from sqlalchemy import Row
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.database.models.enums import CategoryName
+from app.database.models.todo_category import TodoCategory
+from app.database.models.todo_item import TodoItem
+from app.database.models.todo_recurrence import TodoRecurrence
+from app.instrumentation import instrumented
+from app.repositories.todo_stats import StatsKey, TodoStatsRepository
+from app.repositories.todo_sync import TodoSyncRepository
+
+
+# Строк задач в одном многострочном INSERT: asyncpg ограничивает запрос 32767 параметрами
+INSERT_CHUNK_SIZE = 2000
+
+
+@instrumented
+@dataclass
+class TodoRecurrenceRepository:
+    db: AsyncSession
+
+    @property
+    def stats(self) -> TodoStatsRepository:
+        """
+        Счётчики статистики, обновляемые в той же сессии и транзакции.
+        """
+        return TodoStatsRepository(self.db)
+
+    async def check_category_exists(self, category_name: CategoryName) -> TodoCategory | None:
+        """
+        Проверить, существует ли категория с данным названием.
+        """
+        return await self.db.scalar(
+            select(TodoCategory)
+            .where(TodoCategory.name == category_name)
+        )
+
+    async def create_recurrence(self, data: dict) -> TodoRecurrence:
+        """
+        Создать правило повторения.
+        """
+        recurrence = TodoRecurrence(**data)
+        self.db.add(recurrence)
+        await self.db.commit()
+        await self.db.refresh(recurrence)
+        return recurrence
+
+    async def get_recurrences(self, user_id: UUID) -> Sequence[TodoRecurrence]:
+        """
+        Получить правила повторения пользователя, новые первыми.
+        """
+        recurrences = await self.db.scalars(select(TodoRecurrence)
+                                            .where(TodoRecurrence.user_id == user_id)
+                                            .order_by(TodoRecurrence.created_at.desc())
+                                            )
+        return recurrences.all()
+
+    async def get_recurrence(self, recurrence_id: UUID, user_id: UUID) -> TodoRecurrence | None:
+        """
+        Получить правило повторения по идентификатору.
+        """
+        return await self.db.scalar(
+            select(TodoRecurrence)
+            .where(TodoRecurrence.id == recurrence_id)
+            .where(TodoRecurrence.user_id == user_id)
+        )
+
+    async def delete_recurrence(self, recurrence: TodoRecurrence) -> None:
+        """
+        Удалить правило повторения. Уже созданные задачи остаются, их recurrence_id обнуляется.
+        """
+        await self.db.delete(recurrence)
+        await self.db.commit()
+
+    async def claim_due(self, horizon: date, batch_size: int) -> Sequence[TodoRecurrence]:
+        """
+        Заблокировать пачку правил, у которых следующее повторение не позже horizon.
+
+        Правила выбираются по частичному индексу next_occurrence, поэтому стоимость
+        зависит только от числа правил с новыми повторениями, а не от общего числа правил.
+        FOR UPDATE SKIP LOCKED позволяет запускать несколько генераторов.
+        Блокировка держится до save_occurrences.
+        """
+        recurrences = await self.db.scalars(select(TodoRecurrence)
+                                            .where(TodoRecurrence.next_occurrence <= horizon)
+                                            .order_by(TodoRecurrence.next_occurrence)
+                                            .limit(batch_size)
+                                            .with_for_update(skip_locked=True)
+                                            )
+        return recurrences.all()
+
+    async def save_occurrences(self, rows: list[dict]) -> Sequence[Row]:
+        """
+        Вставить задачи-повторения многострочными INSERT и зафиксировать транзакцию
+        вместе с изменёнными в сессии правилами.
+
+        Уже существующие повторения (то же правило и дата) пропускаются ON CONFLICT DO NOTHING,
+        поэтому повторный запуск генератора не создаёт дублей. Статистика учитывает только
+        действительно вставленные задачи. Каждая строка получает номер изменения пользователя
+        (номера пропущенных строк остаются неиспользованными). Возвращает строки
+        (user_id, category_id, date_of_execution).
+        """
+        last_seqs = await TodoSyncRepository(self.db).allocate_many(Counter(row["user_id"] for row in rows))
+        for row in reversed(rows):
+            row["change_seq"] = last_seqs[row["user_id"]]
+            last_seqs[row["user_id"]] -= 1
+        inserted = []
+        for start in range(0, len(rows), INSERT_CHUNK_SIZE):
+            result = await self.db.execute(
+                insert(TodoItem)
+                .values(rows[start:start + INSERT_CHUNK_SIZE])
+                .on_conflict_do_nothing(
+                    index_elements=[TodoItem.user_id, TodoItem.recurrence_id, TodoItem.date_of_execution],
+                    index_where=TodoItem.recurrence_id.is_not(None)
+                )
+                .returning(TodoItem.user_id, TodoItem.category_id, TodoItem.date_of_execution)
+            )
+            inserted.extend(result.all())
+        await self.stats.apply_deltas([
+            (row.user_id, StatsKey(row.category_id, False, row.date_of_execution)) for row in inserted
+        ])
+        await self.db.commit()
+        return inserted
@@ -0,0 +1,65 @@
+from dataclasses import dataclass
+from datetime import date
+from typing import Sequence
+
+from sqlalchemy import Row, false, func, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.database.models.todo_item import TodoItem
+from app.database.models.user import User
+from app.instrumentation import instrumented
+
+
+@instrumented
+@dataclass
+class TodoReminderRepository:
+    db: AsyncSession
+
+    async def claim_due(self, day: date, batch_size: int) -> Sequence[Row]:
+        """
+        Забрать пачку задач со сроком day, по которым ещё не отправлено напоминание,
+        и зафиксировать транзакцию.
+
+        Задачи выбираются по частичному индексу очереди напоминаний и блокируются
+        FOR UPDATE SKIP LOCKED, поэтому несколько воркеров разбирают очередь параллельно,
+        не получая одни и те же задачи. Отметка reminded_at ставится до отправки,
+        неотправленные напоминания возвращаются в очередь через release.
+        Возвращает строки (id, user_id, title, date_of_execution, email).
+        """
+        batch = (
+            select(TodoItem.id, TodoItem.user_id)
+            .where(TodoItem.date_of_execution == day)
+            .where(TodoItem.completed == false())
+            .where(TodoItem.deleted_at.is_(None))
+            .where(TodoItem.reminded_at.is_(None))
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+            .cte("batch")
+        )
+        rows = await self.db.execute(
+            update(TodoItem.__table__)
+            .where(TodoItem.id == batch.c.id)
+            .where(TodoItem.user_id == batch.c.user_id)
+            .where(User.id == TodoItem.user_id)
+            # updated_at присваивается сам себе, чтобы отметка напоминания не считалась изменением задачи
+            .values(reminded_at=func.now(), updated_at=TodoItem.updated_at)
+            .returning(TodoItem.id, TodoItem.user_id, TodoItem.title, TodoItem.date_of_execution, User.email)
+        )
+        claimed = rows.all()
+        await self.db.commit()
+        return claimed
+
+    async def release(self, keys: Sequence[tuple]) -> None:
+        """
+        Вернуть задачи в очередь напоминаний (например, после ошибки отправки).
+        keys — пары (id, user_id).
+        """
+        if not keys:
+            return
+        await self.db.execute(
+            update(TodoItem.__table__)
+            .where(tuple_(TodoItem.id, TodoItem.user_id).in_(keys))
+            .values(reminded_at=None, updated_at=TodoItem.updated_at)
+        )
+        await self.db.commit()
@@ -0,0 +1,181 @@
+from collections import Counter
+from dataclasses import dataclass
+from datetime import date
+from typing import NamedTuple, Sequence
+from uuid import UUID
+
+from sqlalchemy import delete, false, func, tuple_, union_all
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.database.models.todo_category import TodoCategory
+from app.database.models.todo_item import TodoItem
+from app.database.models.todo_item_archive import TodoItemArchive
+from app.database.models.todo_stats import TodoCategoryStats, TodoDueStats
+from app.instrumentation import instrumented
+
+
+class StatsKey(NamedTuple):
+    """
+    Поля задачи, от которых зависят счётчики статистики.
+    """
+    category_id: UUID
+    completed: bool
+    date_of_execution: date | None
+
+    @classmethod
+    def of(cls, todo_item: TodoItem) -> "StatsKey":
+        return cls(todo_item.category_id, bool(todo_item.completed), todo_item.date_of_execution)
+
+
+@instrumented
+@dataclass
+class TodoStatsRepository:
+    db: AsyncSession
+
+    async def apply_delta(self, user_id: UUID, key: StatsKey, sign: int) -> None:
+        """
+        Учесть добавление (sign=1) или удаление (sign=-1) задачи в счётчиках.
+        Не фиксирует транзакцию: вызывается внутри транзакции изменения задачи.
+        """
+        category_stmt = insert(TodoCategoryStats).values(
+            user_id=user_id,
+            category_id=key.category_id,
+            total=sign,
+            completed=sign if key.completed else 0
+        )
+        await self.db.execute(category_stmt.on_conflict_do_update(
+            index_elements=[TodoCategoryStats.user_id, TodoCategoryStats.category_id],
+            set_={
+                "total": TodoCategoryStats.total + category_stmt.excluded.total,
+                "completed": TodoCategoryStats.completed + category_stmt.excluded.completed,
+            }
+        ))
+        if key.completed or key.date_of_execution is None:
+            return
+        await self._apply_due({(user_id, key.date_of_execution): sign})
+
+    async def _apply_due(self, due: dict[tuple[UUID, date], int]) -> None:
+        """
+        Прибавить дельты к счётчикам невыполненных задач по датам (user_id, дата) -> дельта
+        и удалить строки, в которых не осталось задач: иначе подсчёт просроченных
+        обходил бы все даты, когда-либо использованные пользователем.
+        """
+        due_stmt = insert(TodoDueStats).values([
+            {"user_id": user_id, "date_of_execution": day, "pending": pending}
+            for (user_id, day), pending in due.items()
+        ])
+        rows = await self.db.execute(
+            due_stmt.on_conflict_do_update(
+                index_elements=[TodoDueStats.user_id, TodoDueStats.date_of_execution],
+                set_={"pending": TodoDueStats.pending + due_stmt.excluded.pending}
+            )
+            .returning(TodoDueStats.user_id, TodoDueStats.date_of_execution, TodoDueStats.pending)
+        )
+        # Строки уже заблокированы upsert до конца транзакции, поэтому pending = 0 не изменится
+        empty = [(row.user_id, row.date_of_execution) for row in rows if row.pending == 0]
+        if empty:
+            await self.db.execute(
+                delete(TodoDueStats)
+                .where(tuple_(TodoDueStats.user_id, TodoDueStats.date_of_execution).in_(empty))
+                .where(TodoDueStats.pending == 0)
+            )
+
+    async def apply_deltas(self, items: Sequence[tuple[UUID, StatsKey]], sign: int = 1) -> None:
+        """
+        Учесть добавление (sign=1) или удаление (sign=-1) многих задач пар (user_id, ключ).
+        Дельты суммируются по строкам счётчиков, каждая таблица обновляется одним INSERT.
+        Не фиксирует транзакцию.
+        """
+        categories, completed, due = Counter(), Counter(), Counter()
+        for user_id, key in items:
+            categories[user_id, key.category_id] += sign
+            completed[user_id, key.category_id] += sign if key.completed else 0
+            if not key.completed and key.date_of_execution is not None:
+                due[user_id, key.date_of_execution] += sign
+        if categories:
+            category_stmt = insert(TodoCategoryStats).values([
+                {"user_id": user_id, "category_id": category_id, "total": total,
+                 "completed": completed[user_id, category_id]}
+                for (user_id, category_id), total in categories.items()
+            ])
+            await self.db.execute(category_stmt.on_conflict_do_update(
+                index_elements=[TodoCategoryStats.user_id, TodoCategoryStats.category_id],
+                set_={
+                    "total": TodoCategoryStats.total + category_stmt.excluded.total,
+                    "completed": TodoCategoryStats.completed + category_stmt.excluded.completed,
+                }
+            ))
+        if due:
+            await self._apply_due(due)
+
+    async def apply_change(self, user_id: UUID, old: StatsKey, new: StatsKey) -> None:
+        """
+        Учесть изменение полей задачи, если оно затрагивает счётчики.
+        """
+        if old == new:
+            return
+        await self.apply_delta(user_id, old, -1)
+        await self.apply_delta(user_id, new, 1)
+
+    async def get_category_stats(self, user_id: UUID) -> Sequence:
+        """
+        Получить счётчики пользователя по категориям вместе с названиями категорий.
+        """
+        rows = await self.db.execute(
+            select(TodoCategory.name, TodoCategoryStats.total, TodoCategoryStats.completed)
+            .join(TodoCategory, TodoCategory.id == TodoCategoryStats.category_id)
+            .where(TodoCategoryStats.user_id == user_id)
+        )
+        return rows.all()
+
+    async def get_overdue_count(self, user_id: UUID, today: date) -> int:
+        """
+        Получить количество невыполненных задач со сроком раньше today.
+        """
+        overdue = await self.db.scalar(
+            select(func.coalesce(func.sum(TodoDueStats.pending), 0))
+            .where(TodoDueStats.user_id == user_id)
+            .where(TodoDueStats.date_of_execution < today)
+        )
+        return int(overdue)
+
+    async def recompute(self, user_ids: Sequence[UUID]) -> None:
+        """
+        Пересчитать счётчики пользователей по todo_items и архиву и зафиксировать транзакцию.
+        """
+        await self.db.execute(delete(TodoCategoryStats).where(TodoCategoryStats.user_id.in_(user_ids)))
+        await self.db.execute(delete(TodoDueStats).where(TodoDueStats.user_id.in_(user_ids)))
+        # Архивные задачи остаются в счётчиках категорий, задачи в корзине — нет
+        items = union_all(
+            select(TodoItem.user_id, TodoItem.category_id, TodoItem.completed)
+            .where(TodoItem.user_id.in_(user_ids))
+            .where(TodoItem.deleted_at.is_(None)),
+            select(TodoItemArchive.user_id, TodoItemArchive.category_id, TodoItemArchive.completed)
+            .where(TodoItemArchive.user_id.in_(user_ids)),
+        ).subquery("items")
+        await self.db.execute(
+            insert(TodoCategoryStats).from_select(
+                ["user_id", "category_id", "total", "completed"],
+                select(
+                    items.c.user_id,
+                    items.c.category_id,
+                    func.count(),
+                    func.count().filter(items.c.completed)
+                )
+                .group_by(items.c.user_id, items.c.category_id)
+            )
+        )
+        await self.db.execute(
+            insert(TodoDueStats).from_select(
+                ["user_id", "date_of_execution", "pending"],
+                select(TodoItem.user_id, TodoItem.date_of_execution, func.count())
+                .where(TodoItem.user_id.in_(user_ids))
+                .where(TodoItem.deleted_at.is_(None))
+                .where(TodoItem.completed == false())
+                .where(TodoItem.date_of_execution.is_not(None))
+                .group_by(TodoItem.user_id, TodoItem.date_of_execution)
+            )
+        )
+        await self.db.commit()
@@ -0,0 +1,123 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Mapping, Sequence
+from uuid import UUID
+
+from sqlalchemy import Row, delete, func, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.database.models.todo_item import TodoItem
+from app.database.models.todo_sync import TodoItemTombstone, TodoSyncState
+from app.instrumentation import instrumented
+
+
+@instrumented
+@dataclass
+class TodoSyncRepository:
+    db: AsyncSession
+
+    async def allocate(self, user_id: UUID, count: int = 1) -> int:
+        """
+        Выделить count следующих номеров изменений пользователя; возвращает последний из них.
+        Строка счётчика остаётся заблокированной до конца транзакции.
+        Не фиксирует транзакцию: вызывается внутри транзакции изменения задач.
+        """
+        return (await self.allocate_many({user_id: count}))[user_id]
+
+    async def allocate_many(self, counts: Mapping[UUID, int]) -> dict[UUID, int]:
+        """
+        Выделить номера изменений нескольким пользователям одним запросом.
+        Возвращает последний выделенный номер каждого пользователя: его номера — (last - count, last].
+        Счётчики блокируются в порядке user_id, чтобы параллельные пачки не взаимоблокировались.
+        """
+        if not counts:
+            return {}
+        stmt = insert(TodoSyncState).values([
+            {"user_id": user_id, "last_seq": counts[user_id], "pruned_seq": 0} for user_id in sorted(counts)
+        ])
+        rows = await self.db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[TodoSyncState.user_id],
+                set_={"last_seq": TodoSyncState.last_seq + stmt.excluded.last_seq}
+            )
+            .returning(TodoSyncState.user_id, TodoSyncState.last_seq)
+        )
+        return {user_id: last_seq for user_id, last_seq in rows.all()}
+
+    async def add_tombstones(self, rows: Sequence[dict]) -> None:
+        """
+        Записать отметки об удалении задач (id, user_id, change_seq). Не фиксирует транзакцию.
+        """
+        if rows:
+            await self.db.execute(insert(TodoItemTombstone).values(list(rows)).on_conflict_do_nothing())
+
+    async def get_state(self, user_id: UUID) -> TodoSyncState | None:
+        return await self.db.scalar(select(TodoSyncState).where(TodoSyncState.user_id == user_id))
+
+    async def get_changed_items(
+            self,
+            user_id: UUID,
+            after: tuple[int, UUID],
+            limit: int,
+            include_deleted: bool = True
+    ) -> Sequence[TodoItem]:
+        """
+        Задачи пользователя, изменённые после позиции after = (change_seq, id), по порядку изменений.
+        Задачи в корзине входят в выборку (как удалённые), если include_deleted.
+        """
+        query = (select(TodoItem)
+                 .where(TodoItem.user_id == user_id)
+                 .where(tuple_(TodoItem.change_seq, TodoItem.id) > after)
+                 .order_by(TodoItem.change_seq, TodoItem.id)
+                 .limit(limit))
+        if not include_deleted:
+            query = query.where(TodoItem.deleted_at.is_(None))
+        return (await self.db.scalars(query)).all()
+
+    async def get_tombstones(self, user_id: UUID, after: tuple[int, UUID], limit: int) -> Sequence[Row]:
+        """
+        Отметки об удалении задач пользователя после позиции after по порядку изменений.
+        """
+        rows = await self.db.execute(
+            select(TodoItemTombstone.id, TodoItemTombstone.change_seq)
+            .where(TodoItemTombstone.user_id == user_id)
+            .where(tuple_(TodoItemTombstone.change_seq, TodoItemTombstone.id) > after)
+            .order_by(TodoItemTombstone.change_seq, TodoItemTombstone.id)
+            .limit(limit)
+        )
+        return rows.all()
+
+    async def prune_tombstones(self, removed_before: datetime, batch_size: int) -> int:
+        """
+        Удалить пачку отметок старше removed_before и зафиксировать транзакцию.
+        pruned_seq пользователей поднимается до номеров удалённых отметок: клиенты
+        с более старыми токенами получат требование полной синхронизации.
+        Возвращает количество удалённых отметок.
+        """
+        batch = (
+            select(TodoItemTombstone.id, TodoItemTombstone.user_id)
+            .where(TodoItemTombstone.removed_at < removed_before)
+            .order_by(TodoItemTombstone.removed_at)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        rows = (await self.db.execute(
+            delete(TodoItemTombstone)
+            .where(tuple_(TodoItemTombstone.id, TodoItemTombstone.user_id).in_(batch))
+            .returning(TodoItemTombstone.user_id, TodoItemTombstone.change_seq)
+        )).all()
+        pruned: dict[UUID, int] = {}
+        for user_id, change_seq in rows:
+            pruned[user_id] = max(pruned.get(user_id, 0), change_seq)
+        if pruned:
+            stmt = insert(TodoSyncState).values([
+                {"user_id": user_id, "last_seq": seq, "pruned_seq": seq} for user_id, seq in sorted(pruned.items())
+            ])
+            await self.db.execute(stmt.on_conflict_do_update(
+                index_elements=[TodoSyncState.user_id],
+                set_={"pruned_seq": func.greatest(TodoSyncState.pruned_seq, stmt.excluded.pruned_seq)}
+            ))
+        await self.db.commit()
+        return len(rows)
@@ -0,0 +1,51 @@
+from dataclasses import dataclass
+from datetime import datetime
+
+from sqlalchemy import delete, func, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.database.models.todo_item import TodoItem
+from app.instrumentation import instrumented
+from app.repositories.todo_sync import TodoSyncRepository
+
+
+@instrumented
+@dataclass
+class TodoTrashRepository:
+    db: AsyncSession
+
+    async def purge_expired(self, deleted_before: datetime, batch_size: int) -> int:
+        """
+        Окончательно удалить пачку задач, попавших в корзину раньше deleted_before,
+        и зафиксировать транзакцию. Строки, заблокированные другими запросами, пропускаются.
+        Статистика не меняется: задачи в корзине в ней уже не учитываются.
+        Для дельта-синхронизации остаётся отметка об удалении с тем же номером изменения,
+        под которым задача попала в корзину.
+        Возвращает количество удалённых задач.
+        """
+        batch = (
+            select(TodoItem.id, TodoItem.user_id)
+            .where(TodoItem.deleted_at < deleted_before)
+            .order_by(TodoItem.deleted_at)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        rows = (await self.db.execute(
+            delete(TodoItem.__table__)
+            .where(tuple_(TodoItem.id, TodoItem.user_id).in_(batch))
+            .returning(TodoItem.id, TodoItem.user_id, TodoItem.change_seq)
+        )).all()
+        await TodoSyncRepository(self.db).add_tombstones([row._asdict() for row in rows])
+        await self.db.commit()
+        return len(rows)
+
+    async def count_expired(self, deleted_before: datetime) -> int:
+        """
+        Количество задач в корзине, ожидающих окончательного удаления.
+        """
+        return await self.db.scalar(
+            select(func.count())
+            .select_from(TodoItem)
+            .where(TodoItem.deleted_at < deleted_before)
+        )
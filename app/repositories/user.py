@@ -5,8 +5,10 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
 from app.database.models.user import User
+from app.instrumentation import instrumented
 
 
+@instrumented
 @dataclass
 class UserRepository:
     db: AsyncSession
@@ -0,0 +1,9 @@
+from typing import Annotated
+
+from pydantic import BaseModel, Field
+
+
+class ProfileToken(BaseModel):
+    token: Annotated[str, Field(description="Токен для заголовка X-Profile-Token профилируемых запросов")]
+    header: Annotated[str, Field(default="X-Profile-Token", description="Заголовок запроса с токеном")]
+    expires_in: Annotated[int, Field(description="Время жизни токена в секундах")]
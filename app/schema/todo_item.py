@@ -1,4 +1,5 @@
 from datetime import date, datetime
+from enum import Enum
 from typing import Annotated
 from uuid import UUID, uuid4
 
@@ -35,3 +36,76 @@ class TodoItemRead(TodoItemBase):
     completed: Annotated[bool, Field(default=False)]
     id: Annotated[UUID, Field]
     user_id: Annotated[UUID, Field]
+    version: Annotated[int, Field(default=1, description="Версия задачи, совпадает с ETag")]
+
+
+class TodoItemTrashRead(TodoItemRead):
+    deleted_at: Annotated[datetime, Field]
+
+
+class TodoItemChanges(BaseModel):
+    items: Annotated[list[TodoItemRead], Field(description="Созданные и изменённые задачи")]
+    deleted: Annotated[list[UUID], Field(description="Id удалённых задач")]
+    next_token: Annotated[str, Field(description="Токен для следующего запроса изменений")]
+    has_more: Annotated[bool, Field(description="Есть ещё изменения: запросите их сразу с next_token")]
+
+
+class TodoItemSuggestion(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: Annotated[UUID, Field]
+    title: Annotated[str, Field]
+
+
+class TodoItemSort(str, Enum):
+    created_at_desc = "-created_at"
+    created_at = "created_at"
+    date_of_execution = "date_of_execution"
+    date_of_execution_desc = "-date_of_execution"
+    title = "title"
+    title_desc = "-title"
+
+
+class TodoItemFilter(BaseModel):
+    completed: Annotated[bool | None, Field(default=None, description="Только выполненные или невыполненные")]
+    category_name: Annotated[CategoryName | None, Field(default=None, description="Категория задачи")]
+    due_from: Annotated[date | None, Field(default=None, description="Дата выполнения не раньше")]
+    due_to: Annotated[date | None, Field(default=None, description="Дата выполнения не позже")]
+    overdue: Annotated[bool | None, Field(
+        default=None,
+        description="Только просроченные (невыполненные с датой в прошлом) или только непросроченные")
+    ]
+
+
+class CategoryStats(BaseModel):
+    total: Annotated[int, Field(default=0)]
+    completed: Annotated[int, Field(default=0)]
+
+
+class TodoItemStats(BaseModel):
+    total: Annotated[int, Field(default=0)]
+    completed: Annotated[int, Field(default=0)]
+    pending: Annotated[int, Field(default=0)]
+    overdue: Annotated[int, Field(default=0)]
+    by_category: Annotated[dict[CategoryName, CategoryStats], Field(default_factory=dict)]
+
+
+class AdminTodoItemFilter(BaseModel):
+    user_id: Annotated[UUID | None, Field(default=None, description="ID пользователя")]
+    category_name: Annotated[CategoryName | None, Field(default=None, description="Категория задачи")]
+    completed: Annotated[bool | None, Field(default=None, description="Только выполненные или невыполненные")]
+    created_from: Annotated[datetime | None, Field(default=None, description="Создана не раньше")]
+    created_to: Annotated[datetime | None, Field(default=None, description="Создана раньше")]
+
+
+class AdminTodoGroupBy(str, Enum):
+    user = "user"
+    category = "category"
+    completed = "completed"
+    day = "day"
+
+
+class TodoItemAnalyticsRow(BaseModel):
+    key: Annotated[str | None, Field(description="Значение группировки")]
+    total: Annotated[int, Field(default=0)]
+    completed: Annotated[int, Field(default=0)]
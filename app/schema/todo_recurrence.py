@@ -0,0 +1,41 @@
+from datetime import date, datetime
+from typing import Annotated
+from uuid import UUID
+
+from pydantic import BaseModel, ConfigDict, Field
+
+from app.database.models.enums import CategoryName, RecurrenceFrequency
+
+
+class TodoRecurrenceCreate(BaseModel):
+    # К названию задачи-повторения добавляется дата " (дд.мм.гггг)", итог не длиннее 100 символов
+    title: Annotated[str, Field(max_length=87)]
+    description: Annotated[str | None, Field(max_length=500)] = None
+    category_name: Annotated[CategoryName, Field(default=CategoryName.personal)]
+    frequency: Annotated[RecurrenceFrequency | None, Field(default=None)]
+    interval: Annotated[int, Field(default=1, ge=1, le=365)]
+    weekdays: Annotated[list[int] | None, Field(default=None, description="Дни недели, 0 — понедельник")]
+    month_day: Annotated[int | None, Field(default=None, ge=1, le=31)]
+    starts_on: Annotated[date, Field(default_factory=date.today)]
+    until: Annotated[date | None, Field(default=None)]
+    rrule: Annotated[str | None, Field(
+        default=None,
+        max_length=200,
+        description="Правило RRULE (FREQ, INTERVAL, BYDAY, BYMONTHDAY, UNTIL) вместо отдельных полей"
+    )]
+
+
+class TodoRecurrenceRead(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: Annotated[UUID, Field]
+    title: Annotated[str, Field]
+    description: Annotated[str | None, Field(default=None)]
+    frequency: Annotated[RecurrenceFrequency, Field]
+    interval: Annotated[int, Field]
+    weekdays: Annotated[list[int] | None, Field(default=None)]
+    month_day: Annotated[int | None, Field(default=None)]
+    starts_on: Annotated[date, Field]
+    until: Annotated[date | None, Field(default=None)]
+    next_occurrence: Annotated[date | None, Field(default=None)]
+    created_at: Annotated[datetime, Field]
@@ -0,0 +1,102 @@
+import base64
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from uuid import UUID
+
+from fastapi import HTTPException
+from sqlalchemy.exc import DBAPIError, SQLAlchemyError
+
+from app.repositories.admin_todo_item import AdminTodoItemRepository
+from app.schema.todo_item import AdminTodoGroupBy, AdminTodoItemFilter, TodoItemAnalyticsRow
+
+
+def encode_cursor(created_at: datetime, todo_item_id: UUID) -> str:
+    """
+    Упаковать позицию keyset-пагинации в непрозрачную строку.
+    """
+    raw = json.dumps([created_at.isoformat(), str(todo_item_id)]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    """
+    Распаковать позицию keyset-пагинации. При некорректной строке выбрасывает ошибку 400.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, todo_item_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), UUID(todo_item_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Некорректный курсор")
+
+
+@dataclass
+class AdminTodoItemService:
+    repository: AdminTodoItemRepository
+
+    async def list_todo_items(self, filters: AdminTodoItemFilter, cursor: str | None, limit: int):
+        """
+        Получить страницу задач всех пользователей.
+
+        - Возвращает задачи и курсор следующей страницы (None, если страница последняя).
+        - Если запрос превысил statement_timeout, выбрасывает ошибку 503.
+        - В случае других ошибок базы данных выбрасывает ошибку 500.
+        """
+        after = decode_cursor(cursor) if cursor else None
+        try:
+            todo_items = await self.repository.list_todo_items(
+                filters=filters,
+                after=after,
+                limit=limit + 1
+            )
+        except DBAPIError as e:
+            raise self._database_error(e)
+        except SQLAlchemyError as e:
+            raise HTTPException(status_code=500, detail=f"Ошибка базы данных: {e}")
+        if len(todo_items) <= limit:
+            return todo_items, None
+        last = todo_items[limit - 1]
+        return todo_items[:limit], encode_cursor(last.created_at, last.id)
+
+    async def aggregate_todo_items(self, group_by: AdminTodoGroupBy, filters: AdminTodoItemFilter):
+        """
+        Посчитать агрегаты по задачам всех пользователей.
+
+        - Группирует по пользователю, категории, статусу выполнения или дню создания.
+        - Если запрос превысил statement_timeout, выбрасывает ошибку 503.
+        - В случае других ошибок базы данных выбрасывает ошибку 500.
+        """
+        try:
+            rows = await self.repository.aggregate_todo_items(group_by=group_by, filters=filters)
+        except DBAPIError as e:
+            raise self._database_error(e)
+        except SQLAlchemyError as e:
+            raise HTTPException(status_code=500, detail=f"Ошибка базы данных: {e}")
+        return [
+            TodoItemAnalyticsRow(
+                key=self._format_key(key),
+                total=total,
+                completed=completed
+            )
+            for key, total, completed in rows
+        ]
+
+    @staticmethod
+    def _format_key(key) -> str | None:
+        if key is None:
+            return None
+        if isinstance(key, bool):
+            return str(key).lower()
+        if isinstance(key, datetime):
+            return key.date().isoformat()
+        if hasattr(key, "value"):
+            return key.value
+        return str(key)
+
+    @staticmethod
+    def _database_error(error: DBAPIError) -> HTTPException:
+        # SQLSTATE 57014 — query_canceled, в том числе по statement_timeout
+        if getattr(error.orig, "sqlstate", None) == "57014":
+            return HTTPException(status_code=503, detail="Запрос превысил допустимое время выполнения")
+        return HTTPException(status_code=500, detail=f"Ошибка базы данных: {error}")
@@ -0,0 +1,155 @@
+import asyncio
+import contextlib
+import secrets
+import zlib
+from dataclasses import dataclass
+from typing import Awaitable, Callable
+from uuid import UUID
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from app.metrics import TODO_CACHE_INVALIDATIONS, TODO_CACHE_REQUESTS
+from app.service.idempotency import RELEASE_SCRIPT
+
+
+# Маркеры формата значения в Redis: сжатое zlib или как есть
+_COMPRESSED = b"z"
+_RAW = b"r"
+
+
+@dataclass
+class TodoListCache:
+    """
+    Кеш сериализованных списков задач пользователя в Redis.
+
+    Ключи содержат версию пользователя: любая запись увеличивает версию,
+    после чего старые значения становятся недостижимыми и истекают по TTL.
+
+    Значения, построенные по основной БД и по репликам, хранятся в разных пространствах
+    (namespace): отстающая реплика не может подложить устаревший список запросу, который
+    читает основную БД. Для значений с реплик max_ttl ограничивает время жизни.
+    """
+    redis: Redis
+    ttl: int = 300
+    lock_ttl: float = 5.0
+    compress_min_size: int = 1024
+    enabled: bool = True
+    namespace: str = "primary"
+    max_ttl: int | None = None
+
+    def __post_init__(self):
+        self._release_script = self.redis.register_script(RELEASE_SCRIPT)
+
+    @staticmethod
+    def _version_key(user_id: UUID) -> str:
+        return f"todo_cache:{user_id}:version"
+
+    def _encode(self, payload: bytes) -> bytes:
+        if len(payload) >= self.compress_min_size:
+            return _COMPRESSED + zlib.compress(payload)
+        return _RAW + payload
+
+    @staticmethod
+    def _decode(value: bytes) -> bytes:
+        if value[:1] == _COMPRESSED:
+            return zlib.decompress(value[1:])
+        return value[1:]
+
+    async def get_or_load(
+            self,
+            user_id: UUID,
+            name: str,
+            loader: Callable[[], Awaitable[bytes]],
+            ttl: int | None = None
+    ) -> bytes:
+        """
+        Получить значение из кеша или построить его через loader.
+
+        - Если кеш выключен, сразу вызывает loader.
+        - При промахе перестраивает значение только один запрос (блокировка SET NX),
+          остальные ждут появления значения, а не идут в базу данных.
+        - При недоступности Redis работает напрямую через loader.
+        """
+        if not self.enabled:
+            TODO_CACHE_REQUESTS.labels("bypass").inc()
+            return await loader()
+        try:
+            version = await self.redis.get(self._version_key(user_id))
+            key = f"todo_cache:{user_id}:v{int(version or 0)}:{self.namespace}:{name}"
+            cached = await self.redis.get(key)
+        except RedisError:
+            TODO_CACHE_REQUESTS.labels("error").inc()
+            return await loader()
+
+        if cached is not None:
+            TODO_CACHE_REQUESTS.labels("hit").inc()
+            return self._decode(cached)
+        TODO_CACHE_REQUESTS.labels("miss").inc()
+        ttl = ttl or self.ttl
+        if self.max_ttl is not None:
+            ttl = min(ttl, self.max_ttl)
+        return await self._fill(key, loader, ttl)
+
+    async def _fill(self, key: str, loader: Callable[[], Awaitable[bytes]], ttl: int) -> bytes:
+        """
+        Перестроить значение под блокировкой, защищая базу данных от лавины промахов.
+        Блокировка хранит случайный токен запроса: если загрузка длилась дольше lock_ttl
+        и блокировку уже взял другой запрос, она не снимается.
+        """
+        lock_key = f"{key}:lock"
+        owner = secrets.token_hex(16)
+        try:
+            acquired = await self.redis.set(lock_key, owner, nx=True, px=int(self.lock_ttl * 1000))
+            if not acquired:
+                cached = await self._wait_for(key)
+                if cached is not None:
+                    TODO_CACHE_REQUESTS.labels("wait_hit").inc()
+                    return cached
+        except RedisError:
+            TODO_CACHE_REQUESTS.labels("error").inc()
+            return await loader()
+
+        try:
+            payload = await loader()
+        except BaseException:
+            # Без снятия блокировки остальные запросы ждали бы её истечения
+            if acquired:
+                with contextlib.suppress(RedisError):
+                    await self._release_script(keys=[lock_key], args=[owner])
+            raise
+        try:
+            await self.redis.set(key, self._encode(payload), ex=ttl)
+            if acquired:
+                await self._release_script(keys=[lock_key], args=[owner])
+        except RedisError:
+            TODO_CACHE_REQUESTS.labels("error").inc()
+        return payload
+
+    async def _wait_for(self, key: str) -> bytes | None:
+        """
+        Подождать, пока значение построит владелец блокировки.
+        Возвращает None, если значение не появилось за время жизни блокировки.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.lock_ttl
+        delay = 0.01
+        while loop.time() < deadline:
+            await asyncio.sleep(delay)
+            cached = await self.redis.get(key)
+            if cached is not None:
+                return self._decode(cached)
+            delay = min(delay * 2, 0.2)
+        return None
+
+    async def invalidate(self, user_id: UUID) -> None:
+        """
+        Инвалидировать все закешированные списки пользователя увеличением версии.
+        """
+        if not self.enabled:
+            return
+        try:
+            await self.redis.incr(self._version_key(user_id))
+            TODO_CACHE_INVALIDATIONS.inc()
+        except RedisError:
+            TODO_CACHE_REQUESTS.labels("error").inc()
@@ -1,11 +1,18 @@
+from collections import defaultdict
+from dataclasses import dataclass, field
 from email.message import EmailMessage
+from typing import Sequence
 
-import aiosmtplib
+from sqlalchemy import Row
 
+from app.instrumentation import observe_outbound
 from app.settings import settings
 
 
 async def send_confirmation_email(to_email: str, token: str):
+    # aiosmtplib нужен только при отправке письма и не загружается при старте приложения
+    import aiosmtplib
+
     msg = EmailMessage()
     msg["From"] = "noreply@localhost"
     msg["To"] = to_email
@@ -17,11 +24,70 @@ async def send_confirmation_email(to_email: str, token: str):
         f"\nЕсли вы не регистрировались, просто проигнорируйте это письмо."
     )
 
-    await aiosmtplib.send(
-        msg,
-        hostname=settings.GMAIL_SMTP_HOST,     # SMTP-сервер Gmail
-        port=settings.GMAIL_SMTP_PORT,         # порт для TLS
-        username=settings.GMAIL_ADDRESS,       # твой Gmail адрес
-        password=settings.GMAIL_APP_PASSWORD,  # пароль приложения Gmail
-        start_tls=True                         # использовать TLS
+    async with observe_outbound("smtp"):
+        await aiosmtplib.send(
+            msg,
+            hostname=settings.GMAIL_SMTP_HOST,     # SMTP-сервер Gmail
+            port=settings.GMAIL_SMTP_PORT,         # порт для TLS
+            username=settings.GMAIL_ADDRESS,       # твой Gmail адрес
+            password=settings.GMAIL_APP_PASSWORD,  # пароль приложения Gmail
+            start_tls=settings.GMAIL_SMTP_START_TLS  # использовать TLS
+        )
+
+
+def build_reminder_message(to_email: str, reminders: Sequence[Row]) -> EmailMessage:
+    msg = EmailMessage()
+    msg["From"] = "noreply@localhost"
+    msg["To"] = to_email
+    msg["Subject"] = "Напоминание о задачах"
+    lines = [f"- {reminder.title} (срок: {reminder.date_of_execution:%d.%m.%Y})" for reminder in reminders]
+    msg.set_content("Приближается срок выполнения задач:\n" + "\n".join(lines))
+    return msg
+
+
+@dataclass
+class ReminderDelivery:
+    """
+    Неотправленные напоминания пачки: retry — из-за ошибки соединения или входа, их стоит повторить;
+    refused — адрес отклонён сервером, повтор не поможет.
+    """
+    retry: list[Row] = field(default_factory=list)
+    refused: list[Row] = field(default_factory=list)
+
+
+async def send_reminder_emails(reminders: Sequence[Row]) -> ReminderDelivery:
+    """
+    Отправить напоминания пачкой через одно SMTP-соединение: одно письмо на пользователя.
+    Возвращает напоминания, которые отправить не удалось.
+    """
+    import aiosmtplib
+
+    by_email: dict[str, list[Row]] = defaultdict(list)
+    for reminder in reminders:
+        by_email[reminder.email].append(reminder)
+
+    delivery = ReminderDelivery()
+    smtp = aiosmtplib.SMTP(
+        hostname=settings.GMAIL_SMTP_HOST,
+        port=settings.GMAIL_SMTP_PORT,
+        start_tls=settings.GMAIL_SMTP_START_TLS
     )
+    try:
+        async with smtp:
+            async with observe_outbound("smtp_login"):
+                await smtp.login(settings.GMAIL_ADDRESS, settings.GMAIL_APP_PASSWORD)
+            while by_email:
+                to_email, items = by_email.popitem()
+                try:
+                    async with observe_outbound("smtp"):
+                        await smtp.send_message(build_reminder_message(to_email, items))
+                except aiosmtplib.SMTPRecipientsRefused:
+                    delivery.refused.extend(items)
+                except (aiosmtplib.SMTPException, OSError):
+                    delivery.retry.extend(items)
+                    raise
+    except (aiosmtplib.SMTPException, OSError):
+        # Соединение потеряно: всё, что не успели отправить, возвращается в очередь
+        for items in by_email.values():
+            delivery.retry.extend(items)
+    return delivery
@@ -0,0 +1,229 @@
+import asyncio
+import contextlib
+import json
+import time
+from dataclasses import dataclass, field
+from typing import AsyncIterator
+from uuid import UUID
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError, ResponseError
+
+from app.metrics import TODO_EVENT_CONNECTIONS, TODO_EVENT_RESETS, TODO_EVENTS_PUBLISHED
+
+
+# Журнал событий пользователя (Redis Stream) и канал pub/sub называются одинаково
+EVENTS_PREFIX = "todo_events:"
+
+# Запись в журнал и публикация одной операцией: id события в сообщении совпадает с id в журнале
+PUBLISH_SCRIPT = """
+local id = redis.call('XADD', KEYS[1], 'MAXLEN', '~', ARGV[1], '*', 'data', ARGV[2])
+redis.call('EXPIRE', KEYS[1], ARGV[3])
+redis.call('PUBLISH', KEYS[1], id .. ' ' .. ARGV[2])
+return id
+"""
+
+
+def events_key(user_id: UUID | str) -> str:
+    return f"{EVENTS_PREFIX}{user_id}"
+
+
+def stream_id(value: str) -> tuple[int, int]:
+    """
+    Id записи Redis Stream "миллисекунды-номер" в виде, пригодном для сравнения.
+    """
+    ms, _, seq = value.partition("-")
+    return int(ms), int(seq or 0)
+
+
+def sse_frame(data: str | None = None, event_id: str | None = None, event: str | None = None) -> str:
+    lines = []
+    if event is not None:
+        lines.append(f"event: {event}")
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    if data is not None:
+        lines.append(f"data: {data}")
+    return "\n".join(lines) + "\n\n"
+
+
+@dataclass
+class TodoEventPublisher:
+    """
+    Публикация компактных событий об изменении задач пользователя.
+
+    Событие пишется в ограниченный журнал пользователя (для возобновления по Last-Event-ID)
+    и публикуется в канал пользователя для подключённых клиентов.
+    """
+    redis: Redis
+    maxlen: int = 1000
+    ttl: int = 86400
+    enabled: bool = True
+
+    def __post_init__(self):
+        self._script = self.redis.register_script(PUBLISH_SCRIPT)
+
+    async def publish(self, user_id: UUID, event_type: str, todo_item_id: UUID | None = None) -> str | None:
+        """
+        Опубликовать событие и вернуть его id.
+        Ошибки Redis не прерывают запрос: изменение уже зафиксировано, клиенты догонят при переподключении.
+        """
+        if not self.enabled:
+            return None
+        data = json.dumps(
+            {"type": event_type, "id": str(todo_item_id) if todo_item_id else None},
+            separators=(",", ":")
+        )
+        try:
+            event_id = await self._script(keys=[events_key(user_id)], args=[self.maxlen, data, self.ttl])
+        except RedisError:
+            TODO_EVENTS_PUBLISHED.labels("error").inc()
+            return None
+        TODO_EVENTS_PUBLISHED.labels("published").inc()
+        return event_id.decode()
+
+
+@dataclass(eq=False)
+class TodoEventSubscription:
+    """
+    Локальный подписчик на события пользователя (одно SSE-соединение).
+    lagging — подписчик мог пропустить события и должен догнать их по журналу.
+    """
+    user_id: str
+    queue: asyncio.Queue
+    lagging: bool = False
+
+
+@dataclass
+class TodoEventHub:
+    """
+    Раздача событий задач SSE-клиентам процесса.
+
+    На процесс открыто одно соединение PSUBSCRIBE todo_events:*, события раздаются
+    локальным подписчикам через ограниченные очереди. Если очередь переполнена или
+    подписка переподключалась, подписчик догоняет пропущенное по журналу пользователя.
+    """
+    redis: Redis
+    queue_size: int = 100
+    ttl: int = 86400
+    _subscribers: dict[str, set[TodoEventSubscription]] = field(default_factory=dict, init=False)
+    _task: asyncio.Task | None = field(default=None, init=False)
+
+    def subscribe(self, user_id: UUID) -> TodoEventSubscription:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._listen())
+        subscription = TodoEventSubscription(str(user_id), asyncio.Queue(self.queue_size))
+        self._subscribers.setdefault(subscription.user_id, set()).add(subscription)
+        TODO_EVENT_CONNECTIONS.inc()
+        return subscription
+
+    def unsubscribe(self, subscription: TodoEventSubscription) -> None:
+        subscribers = self._subscribers.get(subscription.user_id)
+        if subscribers is not None:
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[subscription.user_id]
+        TODO_EVENT_CONNECTIONS.dec()
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    async def _listen(self) -> None:
+        """
+        Общая подписка процесса; при обрыве соединения переподключается.
+        """
+        while True:
+            try:
+                async with self.redis.pubsub() as pubsub:
+                    await pubsub.psubscribe(f"{EVENTS_PREFIX}*")
+                    # События, опубликованные до (пере)подключения, подписчики берут из журнала
+                    for subscribers in self._subscribers.values():
+                        for subscription in subscribers:
+                            subscription.lagging = True
+                    async for message in pubsub.listen():
+                        if message["type"] == "pmessage":
+                            self._dispatch(message["channel"], message["data"])
+            except RedisError:
+                await asyncio.sleep(1.0)
+
+    def _dispatch(self, channel: bytes, data: bytes) -> None:
+        subscribers = self._subscribers.get(channel.decode()[len(EVENTS_PREFIX):])
+        if not subscribers:
+            return
+        event_id, _, payload = data.decode().partition(" ")
+        for subscription in subscribers:
+            if subscription.lagging:
+                continue
+            try:
+                subscription.queue.put_nowait((event_id, payload))
+            except asyncio.QueueFull:
+                subscription.lagging = True
+
+    async def _latest_id(self, user_id: str) -> str:
+        entries = await self.redis.xrevrange(events_key(user_id), count=1)
+        return entries[0][0].decode() if entries else "0-0"
+
+    async def _read_since(self, user_id: str, last_id: str) -> list[tuple[str, str]] | None:
+        """
+        События журнала после last_id. None, если часть из них уже вытеснена из журнала
+        и клиенту нужно заново загрузить список.
+        """
+        key = events_key(user_id)
+        try:
+            info = await self.redis.xinfo_stream(key)
+        except ResponseError:
+            # Журнала нет: событий не было дольше ttl; если last_id старше, часть событий могла истечь
+            expired = stream_id(last_id)[0] < (time.time() - self.ttl) * 1000
+            return None if last_id != "0-0" and expired else []
+        max_deleted = info.get("max-deleted-entry-id")
+        if max_deleted is not None and stream_id(max_deleted.decode()) > stream_id(last_id):
+            return None
+        entries = await self.redis.xrange(key, min=f"({last_id}", max="+")
+        return [(entry_id.decode(), fields[b"data"].decode()) for entry_id, fields in entries]
+
+    async def stream(self, user_id: UUID, last_event_id: str | None, heartbeat: float) -> AsyncIterator[str]:
+        """
+        Поток SSE событий пользователя.
+
+        - Без Last-Event-ID начинает с текущего конца журнала, с ним — досылает пропущенное.
+        - Если пропущенное уже вытеснено из журнала, шлёт событие reset: клиент загружает список заново.
+        - Раз в heartbeat секунд без событий шлёт комментарий, чтобы прокси не закрывали соединение.
+        """
+        subscription = self.subscribe(user_id)
+        try:
+            if last_event_id is None:
+                last_id = await self._latest_id(subscription.user_id)
+                # Кадр без данных задаёт клиенту Last-Event-ID для переподключения
+                yield "retry: 3000\n" + sse_frame(event_id=last_id)
+            else:
+                last_id = last_event_id
+                subscription.lagging = True
+            while True:
+                if subscription.lagging:
+                    subscription.lagging = False
+                    missed = await self._read_since(subscription.user_id, last_id)
+                    if missed is None:
+                        TODO_EVENT_RESETS.inc()
+                        last_id = await self._latest_id(subscription.user_id)
+                        yield sse_frame("{}", last_id, event="reset")
+                        continue
+                    for event_id, payload in missed:
+                        yield sse_frame(payload, event_id)
+                        last_id = event_id
+                    continue
+                try:
+                    event_id, payload = await asyncio.wait_for(subscription.queue.get(), heartbeat)
+                except asyncio.TimeoutError:
+                    yield ": ping\n\n"
+                    continue
+                # Событие уже отправлено при догоне по журналу
+                if stream_id(event_id) <= stream_id(last_id):
+                    continue
+                yield sse_frame(payload, event_id)
+                last_id = event_id
+        finally:
+            self.unsubscribe(subscription)
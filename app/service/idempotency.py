@@ -0,0 +1,116 @@
+import asyncio
+import json
+from dataclasses import dataclass, field
+
+from redis.asyncio import Redis
+
+
+# Снять блокировку, только если её держит этот запрос: блокировка могла истечь и перейти к дублю
+RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class IdempotencyInProgress(Exception):
+    """Запрос с тем же ключом идемпотентности ещё выполняется."""
+
+
+@dataclass
+class StoredResponse:
+    """Снимок ответа на запрос с ключом идемпотентности."""
+    fingerprint: str
+    status: int = 500
+    headers: list[tuple[bytes, bytes]] = field(default_factory=list)
+    body: bytes = b""
+
+    def encode(self) -> bytes:
+        meta = {
+            "fingerprint": self.fingerprint,
+            "status": self.status,
+            "headers": [[name.decode("latin-1"), value.decode("latin-1")] for name, value in self.headers],
+        }
+        return json.dumps(meta).encode() + b"\n" + self.body
+
+    @classmethod
+    def decode(cls, value: bytes) -> "StoredResponse":
+        meta, body = value.split(b"\n", 1)
+        data = json.loads(meta)
+        return cls(
+            fingerprint=data["fingerprint"],
+            status=data["status"],
+            headers=[(name.encode("latin-1"), value.encode("latin-1")) for name, value in data["headers"]],
+            body=body
+        )
+
+
+@dataclass
+class IdempotencyStore:
+    """
+    Ответы на записывающие запросы с заголовком Idempotency-Key в Redis.
+
+    Ключи ограничены пользователем: одинаковые ключи разных пользователей не пересекаются.
+    Пока запрос выполняется, ключ занят блокировкой; дубли ждут сохранённого ответа,
+    а не выполняют запрос повторно.
+
+    В блокировке хранится случайный owner запроса, и снимает её только он. lock_ttl должен
+    быть больше наибольшей длительности запроса: если запрос выполняется дольше, блокировка
+    истекает и дубль выполнит запрос параллельно с ним.
+    """
+    redis: Redis
+    ttl: int = 86400
+    lock_ttl: float = 30.0
+    wait_timeout: float = 10.0
+
+    def __post_init__(self):
+        self._release_script = self.redis.register_script(RELEASE_SCRIPT)
+
+    @staticmethod
+    def _key(scope: str, key: str) -> str:
+        return f"idempotency:{scope}:{key}"
+
+    async def begin(self, scope: str, key: str, owner: str) -> StoredResponse | None:
+        """
+        Получить сохранённый ответ или право выполнить запрос.
+
+        - Если ответ уже сохранён, возвращает его.
+        - Если запрос с тем же ключом выполняется, ждёт его ответа до wait_timeout.
+          Если первый запрос завершился без сохранения ответа, право выполнения переходит к дублю.
+        - Возвращает None, если запрос должен выполнить вызывающий; после выполнения
+          нужно вызвать save или release с тем же owner (случайная строка этого запроса).
+        - Если ответ не появился за wait_timeout, выбрасывает IdempotencyInProgress.
+        """
+        record_key = self._key(scope, key)
+        lock_key = f"{record_key}:lock"
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.wait_timeout
+        delay = 0.01
+        while True:
+            stored = await self.redis.get(record_key)
+            if stored is not None:
+                return StoredResponse.decode(stored)
+            if await self.redis.set(lock_key, owner, nx=True, px=int(self.lock_ttl * 1000)):
+                # Ответ мог быть сохранён между чтением и захватом блокировки
+                stored = await self.redis.get(record_key)
+                if stored is None:
+                    return None
+                await self.release(scope, key, owner)
+                return StoredResponse.decode(stored)
+            if loop.time() >= deadline:
+                raise IdempotencyInProgress()
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 0.2)
+
+    async def save(self, scope: str, key: str, owner: str, response: StoredResponse) -> None:
+        """Сохранить ответ на ttl и освободить блокировку, если её держит owner."""
+        await self.redis.set(self._key(scope, key), response.encode(), ex=self.ttl)
+        await self.release(scope, key, owner)
+
+    async def release(self, scope: str, key: str, owner: str) -> None:
+        """
+        Освободить блокировку без сохранения ответа: следующий повтор выполнит запрос заново.
+        Блокировку, истёкшую и захваченную другим запросом, не трогает.
+        """
+        await self._release_script(keys=[f"{self._key(scope, key)}:lock"], args=[owner])
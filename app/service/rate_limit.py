@@ -0,0 +1,145 @@
+import math
+import time
+from dataclasses import dataclass, field
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from app.metrics import RATE_LIMIT_DECISIONS
+
+
+# Token bucket: пополнение по времени Redis, списание и выдача локального запаса одной операцией.
+# Запас (lease) выдаётся, только если после него в корзине остаётся не меньше ARGV[5] токенов
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local lease = tonumber(ARGV[4])
+local lease_floor = tonumber(ARGV[5])
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+local leased = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+    if lease > 0 and tokens - lease >= lease_floor then
+        tokens = tokens - lease
+        leased = lease
+    end
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000) + 1000)
+return {allowed, tostring(tokens), leased}
+"""
+
+# Сколько ключей с локальным запасом держать до очистки истёкших
+_MAX_LEASES = 10000
+
+
+@dataclass
+class RateLimitDecision:
+    """Результат проверки лимита и значения для заголовков RateLimit-*."""
+    allowed: bool
+    limit: int
+    remaining: float
+    reset: float
+    retry_after: float = 0.0
+
+    def headers(self, window: float) -> list[tuple[bytes, bytes]]:
+        headers = [
+            (b"ratelimit-limit", str(self.limit).encode()),
+            (b"ratelimit-remaining", str(max(0, math.floor(self.remaining))).encode()),
+            (b"ratelimit-reset", str(math.ceil(self.reset)).encode()),
+            (b"ratelimit-policy", f"{self.limit};w={math.ceil(window)}".encode()),
+        ]
+        if not self.allowed:
+            headers.append((b"retry-after", str(max(1, math.ceil(self.retry_after))).encode()))
+        return headers
+
+
+@dataclass
+class _Lease:
+    tokens: float
+    remaining: float
+    expires: float
+
+
+@dataclass
+class RateLimiter:
+    """
+    Ограничение частоты запросов token bucket в Redis, общее для всех процессов и узлов.
+
+    Корзина ключа вмещает capacity токенов и пополняется на refill_rate токенов в секунду;
+    запрос списывает свою стоимость. Проверка и списание выполняются атомарно Lua-скриптом
+    по часам Redis, поэтому расхождение часов узлов не влияет на лимит.
+
+    Локальный быстрый путь: пока в корзине больше половины токенов, скрипт вместе со списанием
+    выдаёт процессу запас из lease_size токенов на lease_ttl секунд, и следующие запросы ключа
+    списываются из него без обращения к Redis. Неизрасходованный запас пропадает; клиентов
+    у лимита это не касается — для них запас не выдаётся и каждый запрос проверяется в Redis.
+    """
+    redis: Redis
+    capacity: int
+    refill_rate: float
+    lease_size: int = 0
+    lease_ttl: float = 1.0
+    prefix: str = "rate_limit"
+    _leases: dict[str, _Lease] = field(default_factory=dict, init=False, repr=False)
+
+    def __post_init__(self):
+        self._script = self.redis.register_script(TOKEN_BUCKET_SCRIPT)
+
+    @property
+    def window(self) -> float:
+        """За сколько секунд пустая корзина наполняется полностью."""
+        return self.capacity / self.refill_rate
+
+    def _decision(self, allowed: bool, remaining: float, cost: int) -> RateLimitDecision:
+        return RateLimitDecision(
+            allowed=allowed,
+            limit=self.capacity,
+            remaining=remaining,
+            reset=(self.capacity - remaining) / self.refill_rate,
+            retry_after=0.0 if allowed else (cost - remaining) / self.refill_rate
+        )
+
+    async def acquire(self, key: str, cost: int = 1) -> RateLimitDecision:
+        """
+        Списать cost токенов с корзины ключа.
+
+        - Сначала пробует локальный запас процесса, затем скрипт в Redis.
+        - Стоимость больше ёмкости корзины ограничивается ёмкостью.
+        - При недоступности Redis пропускает запрос: лимит защищает базу данных,
+          но не должен сам становиться причиной отказов.
+        """
+        cost = min(cost, self.capacity)
+        now = time.monotonic()
+        lease = self._leases.get(key)
+        if lease is not None:
+            if lease.expires > now and lease.tokens >= cost:
+                lease.tokens -= cost
+                RATE_LIMIT_DECISIONS.labels("local").inc()
+                return self._decision(True, lease.remaining + lease.tokens, cost)
+            del self._leases[key]
+
+        try:
+            allowed, remaining, leased = await self._script(
+                keys=[f"{self.prefix}:{key}"],
+                args=[self.capacity, self.refill_rate, cost, self.lease_size, self.capacity / 2]
+            )
+        except RedisError:
+            RATE_LIMIT_DECISIONS.labels("error").inc()
+            return self._decision(True, self.capacity, cost)
+        remaining = float(remaining)
+        if leased:
+            if len(self._leases) >= _MAX_LEASES:
+                self._leases = {k: v for k, v in self._leases.items() if v.expires > now}
+            self._leases[key] = _Lease(tokens=float(leased), remaining=remaining, expires=now + self.lease_ttl)
+            remaining += leased
+        RATE_LIMIT_DECISIONS.labels("allowed" if allowed else "limited").inc()
+        return self._decision(bool(allowed), remaining, cost)
@@ -0,0 +1,160 @@
+import calendar
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Iterator
+
+from app.database.models.enums import RecurrenceFrequency
+
+
+# Дни недели RRULE (BYDAY) в нумерации date.weekday()
+RRULE_WEEKDAYS = {"MO": 0, "TU": 1, "WE": 2, "TH": 3, "FR": 4, "SA": 5, "SU": 6}
+
+
+@dataclass(frozen=True)
+class RecurrenceRule:
+    """
+    Правило повторения задачи: подмножество RRULE (FREQ, INTERVAL, BYDAY, BYMONTHDAY, UNTIL).
+
+    Повторения отсчитываются от starts_on: ежедневные — каждые interval дней,
+    еженедельные — в дни weekdays каждой interval-й недели, ежемесячные — в день
+    month_day каждого interval-го месяца (в коротких месяцах — в последний день).
+    """
+    frequency: RecurrenceFrequency
+    starts_on: date
+    interval: int = 1
+    weekdays: tuple[int, ...] | None = None
+    month_day: int | None = None
+    until: date | None = None
+
+    @classmethod
+    def of(cls, recurrence) -> "RecurrenceRule":
+        """
+        Правило из модели или схемы с теми же полями.
+        """
+        return cls(
+            frequency=recurrence.frequency,
+            starts_on=recurrence.starts_on,
+            interval=recurrence.interval,
+            weekdays=tuple(recurrence.weekdays) if recurrence.weekdays else None,
+            month_day=recurrence.month_day,
+            until=recurrence.until,
+        )
+
+    @classmethod
+    def parse_rrule(cls, rrule: str, starts_on: date) -> "RecurrenceRule":
+        """
+        Разобрать строку RRULE, например "FREQ=WEEKLY;INTERVAL=2;BYDAY=MO,WE".
+        Неподдерживаемые или некорректные части вызывают ValueError.
+        """
+        parts = {}
+        for part in rrule.removeprefix("RRULE:").strip().split(";"):
+            name, separator, value = part.partition("=")
+            if not separator or not value:
+                raise ValueError(f"Некорректная часть RRULE: {part!r}")
+            parts[name.strip().upper()] = value.strip().upper()
+
+        unsupported = parts.keys() - {"FREQ", "INTERVAL", "BYDAY", "BYMONTHDAY", "UNTIL"}
+        if unsupported:
+            raise ValueError(f"Неподдерживаемые части RRULE: {', '.join(sorted(unsupported))}")
+        try:
+            frequency = RecurrenceFrequency(parts["FREQ"].lower())
+        except (KeyError, ValueError):
+            raise ValueError("FREQ должен быть DAILY, WEEKLY или MONTHLY")
+
+        weekdays = None
+        if "BYDAY" in parts:
+            try:
+                weekdays = tuple(sorted({RRULE_WEEKDAYS[day] for day in parts["BYDAY"].split(",")}))
+            except KeyError:
+                raise ValueError("BYDAY поддерживает только дни недели MO..SU")
+        until = None
+        if "UNTIL" in parts:
+            until = date(int(parts["UNTIL"][:4]), int(parts["UNTIL"][4:6]), int(parts["UNTIL"][6:8]))
+        return cls(
+            frequency=frequency,
+            starts_on=starts_on,
+            interval=int(parts.get("INTERVAL", 1)),
+            weekdays=weekdays,
+            month_day=int(parts["BYMONTHDAY"]) if "BYMONTHDAY" in parts else None,
+            until=until,
+        ).validated()
+
+    def validated(self) -> "RecurrenceRule":
+        """
+        Проверить согласованность полей правила; возвращает само правило.
+        """
+        if self.interval < 1:
+            raise ValueError("INTERVAL должен быть положительным")
+        if self.weekdays is not None and (
+                self.frequency != RecurrenceFrequency.weekly or not all(0 <= day <= 6 for day in self.weekdays)):
+            raise ValueError("Дни недели задаются только для еженедельного повторения")
+        if self.month_day is not None and (
+                self.frequency != RecurrenceFrequency.monthly or not 1 <= self.month_day <= 31):
+            raise ValueError("День месяца (1..31) задаётся только для ежемесячного повторения")
+        if self.until is not None and self.until < self.starts_on:
+            raise ValueError("UNTIL раньше даты начала")
+        return self
+
+    def occurrences(self, start: date) -> Iterator[date]:
+        """
+        Даты повторений не раньше start по возрастанию (бесконечно, если не задан until).
+        Первое повторение находится арифметикой, без перебора периодов до start.
+        """
+        start = max(start, self.starts_on)
+        if self.frequency == RecurrenceFrequency.daily:
+            dates = self._daily(start)
+        elif self.frequency == RecurrenceFrequency.weekly:
+            dates = self._weekly(start)
+        else:
+            dates = self._monthly(start)
+        for day in dates:
+            if self.until is not None and day > self.until:
+                return
+            yield day
+
+    def next_occurrence(self, after: date) -> date | None:
+        """
+        Первое повторение строго после after или None, если повторения закончились.
+        """
+        return next(self.occurrences(after + timedelta(days=1)), None)
+
+    def between(self, start: date, end: date) -> list[date]:
+        """
+        Повторения в интервале [start, end].
+        """
+        dates = []
+        for day in self.occurrences(start):
+            if day > end:
+                break
+            dates.append(day)
+        return dates
+
+    def _daily(self, start: date) -> Iterator[date]:
+        skipped = -(-(start - self.starts_on).days // self.interval)
+        day = self.starts_on + timedelta(days=skipped * self.interval)
+        while True:
+            yield day
+            day += timedelta(days=self.interval)
+
+    def _weekly(self, start: date) -> Iterator[date]:
+        weekdays = self.weekdays or (self.starts_on.weekday(),)
+        first_week = self.starts_on - timedelta(days=self.starts_on.weekday())
+        weeks = (start - first_week).days // 7
+        week = first_week + timedelta(weeks=weeks - weeks % self.interval)
+        while True:
+            for weekday in weekdays:
+                day = week + timedelta(days=weekday)
+                if day >= start:
+                    yield day
+            week += timedelta(weeks=self.interval)
+
+    def _monthly(self, start: date) -> Iterator[date]:
+        month_day = self.month_day or self.starts_on.day
+        months = (start.year - self.starts_on.year) * 12 + start.month - self.starts_on.month
+        index = self.starts_on.year * 12 + self.starts_on.month - 1 + months - months % self.interval
+        while True:
+            year, month = divmod(index, 12)
+            day = date(year, month + 1, min(month_day, calendar.monthrange(year, month + 1)[1]))
+            if day >= start:
+                yield day
+            index += self.interval
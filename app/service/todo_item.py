@@ -1,31 +1,309 @@
+import base64
+import json
 from dataclasses import dataclass
+from datetime import date
 from uuid import UUID
 
 from fastapi import HTTPException
+from pydantic import TypeAdapter
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 
 from app.database.models.todo_category import TodoCategory
-from app.repositories.todo_item import TodoItemRepository
-from app.schema.todo_item import TodoItemCreate, TodoItemUpdate
+from app.database.routing import PrimaryPin
+from app.repositories.protocols import TodoItemRepositoryProtocol
+from app.schema.todo_item import (CategoryStats, TodoItemChanges, TodoItemCreate, TodoItemFilter, TodoItemRead,
+                                  TodoItemSort, TodoItemStats, TodoItemSuggestion, TodoItemUpdate)
+from app.service.cache import TodoListCache
+from app.service.events import TodoEventPublisher
+from app.settings import settings
+from app.tracing import traced
 
 
+todo_items_adapter = TypeAdapter(list[TodoItemRead])
+suggestions_adapter = TypeAdapter(list[TodoItemSuggestion])
+
+# Позиция до первого изменения: запрос без токена начинает полную синхронизацию
+SYNC_START = (-1, UUID(int=0))
+
+
+def encode_sync_token(change_seq: int, todo_item_id: UUID) -> str:
+    """
+    Упаковать позицию в последовательности изменений пользователя в непрозрачный токен.
+    """
+    raw = json.dumps([change_seq, str(todo_item_id)]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_sync_token(token: str) -> tuple[int, UUID]:
+    """
+    Распаковать токен синхронизации. При некорректной строке выбрасывает ошибку 400.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        change_seq, todo_item_id = json.loads(raw)
+        return int(change_seq), UUID(todo_item_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Некорректный токен синхронизации")
+
+
+def list_cache_name(
+        filters: TodoItemFilter | None,
+        sort: TodoItemSort,
+        offset: int,
+        limit: int | None,
+        include_archived: bool
+) -> str:
+    """
+    Имя страницы списка задач в кеше. Фильтр overdue сравнивает срок с текущей датой,
+    поэтому для него в имя входит дата: после полуночи страница строится заново.
+    """
+    filters_key = filters.model_dump_json(exclude_none=True) if filters else "{}"
+    if filters is not None and filters.overdue is not None:
+        filters_key += f":{date.today().isoformat()}"
+    return f"list:{sort.value}:{filters_key}:{offset}:{limit}:{int(include_archived)}"
+
+
+def todo_item_etag(todo_item) -> str:
+    """
+    ETag задачи: её версия.
+    """
+    return f'"{todo_item.version}"'
+
+
+def parse_if_match(value: str | None) -> set[int] | None:
+    """
+    Разобрать заголовок If-Match в множество версий задачи.
+    None — условия нет: заголовок не передан или равен "*" (подходит любая существующая задача).
+    Нераспознанные метки не совпадают ни с одной версией.
+    """
+    if value is None or value.strip() == "*":
+        return None
+    versions = set()
+    for tag in value.split(","):
+        tag = tag.strip().removeprefix("W/").strip('"')
+        if tag.isdigit():
+            versions.add(int(tag))
+    return versions
+
+
+def precondition_failed(todo_item) -> HTTPException:
+    """
+    Ошибка 412 с текущим состоянием задачи: клиент может показать конфликт без повторного чтения.
+    """
+    return HTTPException(
+        status_code=412,
+        detail={
+            "message": "Задача изменена: версия не совпадает с If-Match",
+            "todo_item": TodoItemRead.model_validate(todo_item).model_dump(mode="json"),
+        },
+        headers={"ETag": todo_item_etag(todo_item)}
+    )
+
+
+@traced
 @dataclass
 class TodoItemService:
-    repository: TodoItemRepository
+    repository: TodoItemRepositoryProtocol
+    cache: TodoListCache | None = None
+    primary_pin: PrimaryPin | None = None
+    events: TodoEventPublisher | None = None
 
-    async def get_todo_items(self, user_id: UUID):
+    async def get_todo_items(
+            self,
+            user_id: UUID,
+            filters: TodoItemFilter | None = None,
+            sort: TodoItemSort = TodoItemSort.created_at_desc,
+            offset: int = 0,
+            limit: int | None = None,
+            include_archived: bool = False
+    ):
         """
-        Получить все элементы списка дел.
+        Получить элементы списка дел.
 
-        - Возвращает список всех задач из базы данных.
+        - Возвращает список задач пользователя из базы данных с учётом фильтров и сортировки.
+        - С include_archived добавляет архивные задачи.
         - В случае ошибки базы данных выбрасывает HTTPException с кодом 500.
         """
         try:
             return await self.repository.get_todo_items(
-                user_id=user_id
+                user_id=user_id,
+                filters=filters,
+                sort=sort,
+                offset=offset,
+                limit=limit,
+                include_archived=include_archived
+            )
+        except SQLAlchemyError as e:
+            raise HTTPException(status_code=500, detail=f"Ошибка базы данных: {e}")
+
+    async def get_todo_items_json(
+            self,
+            user_id: UUID,
+            filters: TodoItemFilter | None = None,
+            sort: TodoItemSort = TodoItemSort.created_at_desc,
+            offset: int = 0,
+            limit: int | None = None,
+            include_archived: bool = False
+    ) -> bytes:
+        """
+        Получить сериализованный в JSON список задач пользователя.
+
+        - Если подключён кеш, отдаёт готовый payload из Redis.
+        - При промахе читает задачи из базы данных и сохраняет результат в кеш.
+        """
+        async def load() -> bytes:
+            items = await self.get_todo_items(
+                user_id=user_id,
+                filters=filters,
+                sort=sort,
+                offset=offset,
+                limit=limit,
+                include_archived=include_archived
+            )
+            return todo_items_adapter.dump_json(
+                todo_items_adapter.validate_python(items, from_attributes=True)
+            )
+
+        if self.cache is None:
+            return await load()
+        return await self.cache.get_or_load(
+            user_id=user_id,
+            name=list_cache_name(filters, sort, offset, limit, include_archived),
+            loader=load
+        )
+
+    async def search_todo_items(
+            self,
+            user_id: UUID,
+            query: str,
+            offset: int = 0,
+            limit: int = 20,
+            include_archived: bool = False
+    ):
+        """
+        Полнотекстовый поиск по задачам пользователя.
+
+        - Ищет по названию и описанию задачи, результаты отсортированы по релевантности.
+        - С include_archived ищет также среди архивных задач.
+        - В случае ошибки базы данных выбрасывает HTTPException с кодом 500.
+        """
+        try:
+            return await self.repository.search_todo_items(
+                user_id=user_id,
+                query=query,
+                offset=offset,
+                limit=limit,
+                include_archived=include_archived
+            )
+        except SQLAlchemyError as e:
+            raise HTTPException(status_code=500, detail=f"Ошибка базы данных: {e}")
+
+    async def suggest_todo_titles_json(self, user_id: UUID, prefix: str, limit: int = 10) -> bytes:
+        """
+        Получить сериализованные подсказки автодополнения по названиям задач.
+
+        - Результаты кешируются на короткое время для пары (пользователь, префикс)
+          и сбрасываются при любом изменении задач пользователя.
+        - В случае ошибки базы данных выбрасывает HTTPException с кодом 500.
+        """
+        prefix = prefix.strip().lower()
+
+        async def load() -> bytes:
+            try:
+                rows = await self.repository.suggest_todo_titles(
+                    user_id=user_id,
+                    prefix=prefix,
+                    limit=limit
+                )
+            except SQLAlchemyError as e:
+                raise HTTPException(status_code=500, detail=f"Ошибка базы данных: {e}")
+            return suggestions_adapter.dump_json(
+                suggestions_adapter.validate_python(rows, from_attributes=True)
             )
+
+        if self.cache is None:
+            return await load()
+        return await self.cache.get_or_load(
+            user_id=user_id,
+            name=f"suggest:{limit}:{prefix}",
+            loader=load,
+            ttl=settings.TODO_AUTOCOMPLETE_CACHE_TTL
+        )
+
+    async def get_changes(self, user_id: UUID, since: str | None, limit: int) -> TodoItemChanges:
+        """
+        Получить изменения задач пользователя после токена since.
+
+        - Без токена отдаёт текущие задачи (полная синхронизация), дальше — только изменения.
+        - Изменения упорядочены по номеру изменения пользователя, а не по времени,
+          поэтому расхождение часов серверов не приводит к пропускам.
+        - Удалённые задачи (корзина, очистка корзины, архив) приходят в списке deleted.
+        - Если часть изменений после токена уже не хранится, выбрасывает ошибку 410:
+          клиенту нужна полная синхронизация.
+        - В случае ошибки базы данных выбрасывает HTTPException с кодом 500.
+        """
+        after = decode_sync_token(since) if since else SYNC_START
+        try:
+            sync = self.repository.sync
+            if since:
+                state = await sync.get_state(user_id)
+                if state is not None and after[0] < state.pruned_seq:
+                    raise HTTPException(status_code=410, detail="Токен устарел, нужна полная синхронизация")
+            # По limit + 1 из каждого источника: после слияния видно, есть ли следующая страница
+            items = await sync.get_changed_items(user_id, after, limit + 1, include_deleted=bool(since))
+            tombstones = await sync.get_tombstones(user_id, after, limit + 1) if since else []
+        except SQLAlchemyError as e:
+            raise HTTPException(status_code=500, detail=f"Ошибка базы данных: {e}")
+
+        changes = sorted(
+            [(item.change_seq, item.id, item) for item in items]
+            + [(tombstone.change_seq, tombstone.id, None) for tombstone in tombstones],
+            key=lambda change: change[:2]
+        )
+        page = changes[:limit]
+        next_token = encode_sync_token(*page[-1][:2]) if page else (since or encode_sync_token(*SYNC_START))
+        return TodoItemChanges(
+            items=[item for _, _, item in page if item is not None and item.deleted_at is None],
+            deleted=[todo_item_id for _, todo_item_id, item in page if item is None or item.deleted_at is not None],
+            next_token=next_token,
+            has_more=len(changes) > limit
+        )
+
+    async def get_todo_stats(self, user_id: UUID) -> TodoItemStats:
+        """
+        Получить статистику задач пользователя.
+
+        - Читает заранее посчитанные счётчики, не обходя таблицу задач.
+        - В случае ошибки базы данных выбрасывает HTTPException с кодом 500.
+        """
+        try:
+            category_rows = await self.repository.stats.get_category_stats(user_id)
+            overdue = await self.repository.stats.get_overdue_count(user_id, date.today())
         except SQLAlchemyError as e:
             raise HTTPException(status_code=500, detail=f"Ошибка базы данных: {e}")
+        stats = TodoItemStats(overdue=overdue)
+        for name, total, completed in category_rows:
+            stats.by_category[name] = CategoryStats(total=total, completed=completed)
+            stats.total += total
+            stats.completed += completed
+        stats.pending = stats.total - stats.completed
+        return stats
+
+    async def _after_write(self, user_id: UUID, event_type: str, todo_item_id: UUID):
+        """
+        Действия после зафиксированного изменения задач пользователя.
+
+        - Закрепляет чтения пользователя за основной БД, чтобы он сразу видел своё изменение.
+        - Сбрасывает закешированные списки задач пользователя. Закрепление идёт первым:
+          запрос, увидевший новую версию кеша, уже читает основную БД.
+        - Публикует событие изменения для подключённых клиентов пользователя.
+        """
+        if self.primary_pin is not None:
+            await self.primary_pin.pin(user_id)
+        if self.cache is not None:
+            await self.cache.invalidate(user_id)
+        if self.events is not None:
+            await self.events.publish(user_id, event_type, todo_item_id)
 
     async def create_todo_item(self, schema: TodoItemCreate, user_id: UUID):
         """
@@ -61,9 +339,11 @@ class TodoItemService:
 
             if old_item_title:
                 raise HTTPException(status_code=400, detail="Задача с таким названием уже существует")
-            return await self.repository.create_todo_item(
+            todo_item = await self.repository.create_todo_item(
                 data=data
             )
+            await self._after_write(user_id, "created", todo_item.id)
+            return todo_item
         except SQLAlchemyError as e:
             raise HTTPException(status_code=500, detail=f"Ошибка базы данных: {e}")
 
@@ -86,14 +366,31 @@ class TodoItemService:
         except SQLAlchemyError as e:
             raise HTTPException(status_code=500, detail=f"Ошибка базы данных: {e}")
 
-    async def update_todo_item(self, todo_item_id: UUID, schema: TodoItemUpdate, user_id: UUID):
+    async def _concurrent_change(self, todo_item_id: UUID, user_id: UUID, if_match: set[int] | None):
+        """
+        Ошибка для записи, проигравшей параллельному изменению той же задачи.
+        С If-Match — 412 с текущим состоянием задачи, без него — 409.
+        """
+        if if_match is None:
+            return HTTPException(status_code=409, detail="Задача одновременно изменена другим запросом, повторите запрос")
+        return precondition_failed(await self.get_todo_item(todo_item_id=todo_item_id, user_id=user_id))
+
+    async def update_todo_item(
+            self,
+            todo_item_id: UUID,
+            schema: TodoItemUpdate,
+            user_id: UUID,
+            if_match: set[int] | None = None
+    ):
         """
         Обновить элемент списка дел.
 
         - Получает данные для обновления из схемы.
         - Находит задачу по уникальному идентификатору.
+        - Если версия задачи не входит в if_match, выбрасывает ошибку 412 с текущей задачей.
         - Если передано новое имя категории, ищет категорию по имени и обновляет category_id.
-        - Обновляет указанные поля задачи.
+        - Обновляет указанные поля задачи; UPDATE проверяет и увеличивает версию, поэтому
+          параллельное изменение той же задачи приводит к ошибке 412 (с if_match) или 409.
         - Возвращает обновлённую задачу.
         - В случае ошибки базы данных выбрасывает HTTPException с кодом 500.
         """
@@ -103,6 +400,8 @@ class TodoItemService:
                 todo_item_id=todo_item_id,
                 user_id=user_id
             )
+            if if_match is not None and todo_item.version not in if_match:
+                raise precondition_failed(todo_item)
             category_name = data.pop('category_name', None)
             if not category_name:
                 raise HTTPException(status_code=400, detail="Не указано имя категории")
@@ -115,17 +414,22 @@ class TodoItemService:
                 todo_item=todo_item,
                 data=data
             )
+            if todo_item is None:
+                raise await self._concurrent_change(todo_item_id, user_id, if_match)
+            await self._after_write(user_id, "updated", todo_item.id)
             return todo_item
         except SQLAlchemyError as e:
             raise HTTPException(status_code=500, detail=f"Ошибка базы данных: {e}")
 
-    async def delete_todo_item(self, todo_item_id: UUID, user_id: UUID):
+    async def delete_todo_item(self, todo_item_id: UUID, user_id: UUID, if_match: set[int] | None = None):
         """
-        Удалить элемент списка дел.
+        Удалить элемент списка дел в корзину.
 
         - Находит задачу по уникальному идентификатору.
         - Если задача не найдена, выбрасывает ошибку 404.
-        - Удаляет найденную задачу из базы данных.
+        - Если версия задачи не входит в if_match или задачу изменили параллельно,
+          выбрасывает ошибку 412 с текущей задачей (без if_match — 409).
+        - Помечает задачу удалённой; окончательно её удаляет очистка корзины.
         - Возвращает сообщение об успешном удалении.
         - В случае ошибки базы данных выбрасывает HTTPException с кодом 500.
         """
@@ -134,7 +438,52 @@ class TodoItemService:
                 todo_item_id=todo_item_id,
                 user_id=user_id
             )
-            await self.repository.delete_todo_item(todo_item)
+            if if_match is not None and todo_item.version not in if_match:
+                raise precondition_failed(todo_item)
+            if await self.repository.trash_todo_item(todo_item) is None:
+                raise await self._concurrent_change(todo_item_id, user_id, if_match)
+            await self._after_write(user_id, "deleted", todo_item_id)
             return {"message": "Элемент списка дел успешно удален"}
         except SQLAlchemyError as e:
             raise HTTPException(status_code=500, detail=f"Ошибка базы данных: {e}")
+
+    async def get_trashed_todo_items(self, user_id: UUID, offset: int = 0, limit: int = 50):
+        """
+        Получить задачи пользователя в корзине.
+
+        - В случае ошибки базы данных выбрасывает HTTPException с кодом 500.
+        """
+        try:
+            return await self.repository.get_trashed_todo_items(
+                user_id=user_id,
+                offset=offset,
+                limit=limit
+            )
+        except SQLAlchemyError as e:
+            raise HTTPException(status_code=500, detail=f"Ошибка базы данных: {e}")
+
+    async def restore_todo_item(self, todo_item_id: UUID, user_id: UUID):
+        """
+        Вернуть задачу из корзины.
+
+        - Если задачи нет в корзине, выбрасывает ошибку 404.
+        - Если уже есть задача с таким названием, выбрасывает ошибку 400.
+        - Если задачу изменили параллельно, выбрасывает ошибку 409.
+        - В случае ошибки базы данных выбрасывает HTTPException с кодом 500.
+        """
+        try:
+            todo_item = await self.repository.get_trashed_todo_item(
+                todo_item_id=todo_item_id,
+                user_id=user_id
+            )
+            if not todo_item:
+                raise HTTPException(status_code=404, detail="Элемент списка дел не найден в корзине")
+            if await self.repository.get_todo_item_by_title(title=todo_item.title, user_id=user_id):
+                raise HTTPException(status_code=400, detail="Задача с таким названием уже существует")
+            todo_item = await self.repository.restore_todo_item(todo_item)
+            if todo_item is None:
+                raise HTTPException(status_code=409, detail="Задача одновременно изменена другим запросом, повторите запрос")
+            await self._after_write(user_id, "restored", todo_item.id)
+            return todo_item
+        except SQLAlchemyError as e:
+            raise HTTPException(status_code=500, detail=f"Ошибка базы данных: {e}")
@@ -0,0 +1,153 @@
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Sequence
+from uuid import UUID, uuid4
+
+from fastapi import HTTPException
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.database.models.todo_recurrence import TodoRecurrence
+from app.database.routing import PrimaryPin
+from app.repositories.todo_recurrence import TodoRecurrenceRepository
+from app.schema.todo_recurrence import TodoRecurrenceCreate
+from app.service.cache import TodoListCache
+from app.service.events import TodoEventPublisher
+from app.service.recurrence import RecurrenceRule
+from app.settings import settings
+
+
+def occurrence_title(title: str, day: date) -> str:
+    """
+    Название задачи-повторения: дата в названии сохраняет уникальность названий задач пользователя.
+    """
+    return f"{title} ({day:%d.%m.%Y})"
+
+
+@dataclass
+class TodoRecurrenceService:
+    repository: TodoRecurrenceRepository
+    cache: TodoListCache | None = None
+    primary_pin: PrimaryPin | None = None
+    events: TodoEventPublisher | None = None
+
+    async def materialize(self, recurrences: Sequence[TodoRecurrence], today: date | None = None) -> list[UUID]:
+        """
+        Создать задачи по правилам на горизонт TODO_RECURRENCE_HORIZON_DAYS дней
+        и сдвинуть next_occurrence правил за горизонт.
+
+        - Прошедшие повторения (генератор не работал) пропускаются.
+        - Все задачи пачки вставляются многострочными INSERT в одной транзакции.
+        - Возвращает user_id созданных задач (по одному на задачу).
+        """
+        today = today or date.today()
+        horizon = today + timedelta(days=settings.TODO_RECURRENCE_HORIZON_DAYS)
+        now = datetime.now()
+        rows = []
+        for recurrence in recurrences:
+            rule = RecurrenceRule.of(recurrence)
+            for day in rule.between(max(recurrence.next_occurrence, today), horizon):
+                rows.append({
+                    "id": uuid4(),
+                    "title": occurrence_title(recurrence.title, day),
+                    "description": recurrence.description,
+                    "completed": False,
+                    "created_at": now,
+                    "date_of_execution": day,
+                    "category_id": recurrence.category_id,
+                    "user_id": recurrence.user_id,
+                    "recurrence_id": recurrence.id,
+                })
+            recurrence.next_occurrence = rule.next_occurrence(horizon)
+        inserted = await self.repository.save_occurrences(rows)
+        return [row.user_id for row in inserted]
+
+    async def _after_write(self, user_id: UUID):
+        """
+        Закрепить чтения пользователя за основной БД, затем сбросить кеш его списков задач
+        и сообщить клиентам, что список нужно перезагрузить (создано сразу несколько задач).
+        """
+        if self.primary_pin is not None:
+            await self.primary_pin.pin(user_id)
+        if self.cache is not None:
+            await self.cache.invalidate(user_id)
+        if self.events is not None:
+            await self.events.publish(user_id, "refresh")
+
+    async def create_recurrence(self, schema: TodoRecurrenceCreate, user_id: UUID) -> TodoRecurrence:
+        """
+        Создать правило повторения задачи.
+
+        - Правило задаётся полями frequency/interval/weekdays/month_day или строкой rrule;
+          некорректное правило — ошибка 400.
+        - Находит категорию по имени, если не найдена — выбрасывает ошибку 400.
+        - Сразу создаёт задачи на горизонт генерации, дальше их досоздаёт воркер.
+        - В случае ошибки базы данных выбрасывает HTTPException с кодом 500.
+        """
+        try:
+            if schema.rrule is not None:
+                rule = RecurrenceRule.parse_rrule(schema.rrule, schema.starts_on)
+            elif schema.frequency is not None:
+                rule = RecurrenceRule(
+                    frequency=schema.frequency,
+                    starts_on=schema.starts_on,
+                    interval=schema.interval,
+                    weekdays=tuple(sorted(set(schema.weekdays))) if schema.weekdays else None,
+                    month_day=schema.month_day,
+                    until=schema.until,
+                ).validated()
+            else:
+                raise ValueError("Укажите frequency или rrule")
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Некорректное правило повторения: {e}")
+
+        try:
+            category = await self.repository.check_category_exists(schema.category_name)
+            if not category:
+                raise HTTPException(status_code=400, detail="Нет ID категории")
+            recurrence = await self.repository.create_recurrence({
+                "title": schema.title,
+                "description": schema.description,
+                "frequency": rule.frequency,
+                "interval": rule.interval,
+                "weekdays": list(rule.weekdays) if rule.weekdays else None,
+                "month_day": rule.month_day,
+                "starts_on": rule.starts_on,
+                "until": rule.until,
+                "next_occurrence": next(rule.occurrences(rule.starts_on), None),
+                "category_id": category.id,
+                "user_id": user_id,
+            })
+            if recurrence.next_occurrence is not None:
+                await self.materialize([recurrence])
+                await self.repository.db.refresh(recurrence)
+            await self._after_write(user_id)
+            return recurrence
+        except SQLAlchemyError as e:
+            raise HTTPException(status_code=500, detail=f"Ошибка базы данных: {e}")
+
+    async def get_recurrences(self, user_id: UUID) -> Sequence[TodoRecurrence]:
+        """
+        Получить правила повторения пользователя.
+
+        - В случае ошибки базы данных выбрасывает HTTPException с кодом 500.
+        """
+        try:
+            return await self.repository.get_recurrences(user_id)
+        except SQLAlchemyError as e:
+            raise HTTPException(status_code=500, detail=f"Ошибка базы данных: {e}")
+
+    async def delete_recurrence(self, recurrence_id: UUID, user_id: UUID) -> None:
+        """
+        Удалить правило повторения.
+
+        - Если правило не найдено, выбрасывает ошибку 404.
+        - Уже созданные задачи остаются в списке пользователя.
+        - В случае ошибки базы данных выбрасывает HTTPException с кодом 500.
+        """
+        try:
+            recurrence = await self.repository.get_recurrence(recurrence_id, user_id)
+            if not recurrence:
+                raise HTTPException(status_code=404, detail="Правило повторения не найдено")
+            await self.repository.delete_recurrence(recurrence)
+        except SQLAlchemyError as e:
+            raise HTTPException(status_code=500, detail=f"Ошибка базы данных: {e}")
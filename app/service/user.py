@@ -2,14 +2,16 @@ from dataclasses import dataclass
 from uuid import UUID
 
 from app.auth.auth_service import AuthService
-from app.repositories.user import UserRepository
+from app.repositories.protocols import UserRepositoryProtocol
 from app.schema.user import UserCreate
 from app.service.email import send_confirmation_email
+from app.tracing import traced
 
 
+@traced
 @dataclass
 class UserService:
-    user_repository: UserRepository
+    user_repository: UserRepositoryProtocol
     auth_service: AuthService
 
     async def register_user(self, user_schema: UserCreate):
@@ -23,9 +25,7 @@ class UserService:
             password=password
         )
         user_data['hashed_password'] = hash_password
-        user = await self.user_repository.create_user(
-            user_data=user_data
-        )
+        user = await self.auth_service.create_user(user_data)
         # Генерация токена подтверждения email
         token = await self.auth_service.create_email_confirmation_token()
 
@@ -35,12 +35,16 @@ class UserService:
     async def activate_user(self, user_id: UUID):
         """
         Активация пользователя по его идентификатору.
+        Пользователь закрепляется за основной БД: иначе проверка токена могла бы прочитать
+        с реплики ещё неактивного пользователя.
         """
         user = await self.get_user_by_id(user_id)
         await self.user_repository.update_user(
             user=user,
             user_data={"is_active": True}
         )
+        if self.auth_service.primary_pin is not None:
+            await self.auth_service.primary_pin.pin(user.id)
         return user
 
     async def get_user_by_id(self, user_id: UUID):
@@ -0,0 +1,422 @@
+import asyncio
+import contextlib
+import functools
+import inspect
+import json
+import random
+import re
+import time
+from contextvars import Context, ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Iterator, Protocol
+
+import httpx
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.metrics import TRACING_SPANS
+
+
+# W3C traceparent версии 00: 00-<trace-id 32 hex>-<parent-id 16 hex>-<флаги 2 hex>
+_TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+_INVALID_TRACE_ID = "0" * 32
+_INVALID_SPAN_ID = "0" * 16
+
+# Виды спанов в OTLP
+SPAN_KINDS = {"internal": 1, "server": 2, "client": 3}
+
+# Длина SQL-запроса в атрибуте спана
+MAX_STATEMENT_LENGTH = 1000
+
+
+def parse_traceparent(value: str | bytes | None) -> tuple[str, str, bool] | None:
+    """
+    Разобрать заголовок traceparent: (trace_id, span_id родителя, sampled).
+    Некорректный заголовок игнорируется — запрос начинает новую трассу.
+    """
+    if not value:
+        return None
+    if isinstance(value, bytes):
+        value = value.decode("latin-1")
+    match = _TRACEPARENT.match(value.strip().lower())
+    if match is None:
+        return None
+    trace_id, span_id, flags = match.groups()
+    if trace_id == _INVALID_TRACE_ID or span_id == _INVALID_SPAN_ID:
+        return None
+    return trace_id, span_id, bool(int(flags, 16) & 1)
+
+
+def _new_span_id() -> str:
+    return f"{random.getrandbits(64) or 1:016x}"
+
+
+def _otlp_value(value: Any) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+@dataclass(eq=False)
+class Span:
+    """
+    Спан трассы. Неотбираемые спаны (sampled=False) только передают контекст дальше:
+    дочерние спаны для них не создаются и никуда не отправляются.
+    """
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: str | None = None
+    kind: str = "internal"
+    sampled: bool = True
+    tracer: "Tracer | None" = field(default=None, repr=False)
+    attributes: dict[str, Any] = field(default_factory=dict)
+    start_ns: int = field(default_factory=time.time_ns)
+    end_ns: int = 0
+    error: str | None = None
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+    def child(self, name: str, kind: str = "internal", attributes: dict[str, Any] | None = None) -> "Span":
+        return Span(
+            name=name,
+            trace_id=self.trace_id,
+            span_id=_new_span_id(),
+            parent_id=self.span_id,
+            kind=kind,
+            sampled=self.sampled,
+            tracer=self.tracer,
+            attributes=attributes or {}
+        )
+
+    def record_error(self, exc: BaseException) -> None:
+        self.attributes["exception.type"] = type(exc).__name__
+        self.error = str(exc) or type(exc).__name__
+
+    def end(self) -> None:
+        self.end_ns = time.time_ns()
+        if self.sampled and self.tracer is not None:
+            self.tracer.on_end(self)
+
+    def to_otlp(self) -> dict:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": SPAN_KINDS[self.kind],
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [{"key": key, "value": _otlp_value(value)} for key, value in self.attributes.items()],
+            "status": {"code": 2, "message": self.error} if self.error is not None else {},
+        }
+        if self.parent_id is not None:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+
+# Текущий спан задачи asyncio
+_current_span: ContextVar[Span | None] = ContextVar("current_span", default=None)
+
+
+def current_span() -> Span | None:
+    return _current_span.get()
+
+
+@contextlib.contextmanager
+def activate(span: Span) -> Iterator[Span]:
+    """
+    Сделать спан текущим на время блока, не завершая его.
+    """
+    token = _current_span.set(span)
+    try:
+        yield span
+    finally:
+        _current_span.reset(token)
+
+
+def start_child(name: str, kind: str = "internal", attributes: dict[str, Any] | None = None) -> Span | None:
+    """
+    Начать дочерний спан текущего, не делая его текущим (листовые спаны: SQL, Redis, HTTP).
+    Вне отобранной трассы возвращает None — это весь расход трассировки на вызов.
+    """
+    parent = _current_span.get()
+    if parent is None or not parent.sampled:
+        return None
+    return parent.child(name, kind, attributes)
+
+
+@contextlib.contextmanager
+def start_span(name: str, kind: str = "internal", attributes: dict[str, Any] | None = None) -> Iterator[Span | None]:
+    """
+    Выполнить блок в дочернем спане текущего; вложенные спаны становятся его потомками.
+    """
+    span = start_child(name, kind, attributes)
+    if span is None:
+        yield None
+        return
+    token = _current_span.set(span)
+    try:
+        yield span
+    except BaseException as exc:
+        span.record_error(exc)
+        raise
+    finally:
+        _current_span.reset(token)
+        span.end()
+
+
+def traced_method(name: str, method):
+    """
+    Обернуть async-метод в спан с именем name.
+    """
+    @functools.wraps(method)
+    async def wrapper(*args, **kwargs):
+        span = start_child(name)
+        if span is None:
+            return await method(*args, **kwargs)
+        token = _current_span.set(span)
+        try:
+            return await method(*args, **kwargs)
+        except BaseException as exc:
+            span.record_error(exc)
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end()
+    return wrapper
+
+
+def traced(cls: type) -> type:
+    """
+    Декоратор класса сервиса: публичные async-методы выполняются в спанах "Класс.метод".
+    """
+    for name, method in list(vars(cls).items()):
+        if name.startswith("_") or not inspect.iscoroutinefunction(method):
+            continue
+        setattr(cls, name, traced_method(f"{cls.__name__}.{name}", method))
+    return cls
+
+
+def traceparent_header() -> str | None:
+    """
+    Значение traceparent для исходящего запроса из текущего спана.
+    """
+    span = _current_span.get()
+    return span.traceparent if span is not None else None
+
+
+def trace_queries(engine: AsyncEngine) -> None:
+    """
+    Спан на каждый SQL-запрос движка с текстом запроса (без значений параметров) и именем пула.
+    """
+    pool_name = getattr(engine.pool, "_orig_logging_name", None) or "default"
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        parent = _current_span.get()
+        if context is None or parent is None or not parent.sampled:
+            return
+        operation = statement.split(None, 1)[0].upper() if statement.strip() else "SQL"
+        context._tracing_span = parent.child(f"db {operation}", "client", {
+            "db.system": "postgresql",
+            "db.instance": pool_name,
+            "db.statement": statement[:MAX_STATEMENT_LENGTH],
+        })
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        span = getattr(context, "_tracing_span", None)
+        if span is not None:
+            context._tracing_span = None
+            span.end()
+
+    def handle_error(exception_context):
+        context = exception_context.execution_context
+        span = getattr(context, "_tracing_span", None)
+        if span is not None:
+            context._tracing_span = None
+            span.record_error(exception_context.original_exception)
+            span.end()
+
+    event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(engine.sync_engine, "after_cursor_execute", after_cursor_execute)
+    event.listen(engine.sync_engine, "handle_error", handle_error)
+
+
+class SpanExporter(Protocol):
+    async def export(self, payload: dict) -> None: ...
+
+    async def close(self) -> None: ...
+
+
+@dataclass
+class FileSpanExporter:
+    """
+    Запись пачек спанов в файл: строка — JSON запроса OTLP (формат otlpjson),
+    такой файл читает OpenTelemetry Collector и jq.
+    """
+    path: str
+
+    def _write(self, line: str) -> None:
+        with open(self.path, "a", encoding="utf-8") as file:
+            file.write(line)
+
+    async def export(self, payload: dict) -> None:
+        await asyncio.to_thread(self._write, json.dumps(payload, ensure_ascii=False) + "\n")
+
+    async def close(self) -> None:
+        pass
+
+
+@dataclass
+class OtlpHttpSpanExporter:
+    """
+    Отправка пачек спанов в OTLP/HTTP с JSON-кодированием (коллектор OpenTelemetry, Jaeger, Tempo).
+    """
+    endpoint: str
+    timeout: float = 5.0
+    _client: httpx.AsyncClient | None = field(default=None, init=False, repr=False)
+
+    async def export(self, payload: dict) -> None:
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=self.timeout)
+        response = await self._client.post(self.endpoint, json=payload)
+        response.raise_for_status()
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+
+
+def create_span_exporter(kind: str, file_path: str, otlp_endpoint: str) -> SpanExporter | None:
+    """
+    Экспортёр по настройке TRACING_EXPORTER: none, file или otlp.
+    """
+    if kind == "file":
+        return FileSpanExporter(path=file_path)
+    if kind == "otlp":
+        return OtlpHttpSpanExporter(endpoint=otlp_endpoint)
+    if kind == "none":
+        return None
+    raise ValueError(f"Неизвестный экспортёр трассировки: {kind}")
+
+
+class Tracer:
+    """
+    Отбор трасс и пакетная отправка завершённых спанов.
+
+    - Решение об отборе принимается один раз на трассу: по флагу входящего traceparent,
+      а без него — по trace_id с долей sample_ratio, поэтому все узлы отбирают одни и те же трассы.
+    - Завершённые спаны копятся в очереди и уходят в экспортёр пачкой из batch_size спанов
+      или раз в flush_interval секунд в отдельной задаче, не задерживая ответ. По времени
+      пачку отправляет и run_flush_loop: без него при редких запросах спаны ждали бы
+      следующего завершённого спана.
+    - При переполнении очереди (экспортёр не успевает) новые спаны отбрасываются.
+    """
+
+    def __init__(
+        self,
+        exporter: SpanExporter | None = None,
+        sample_ratio: float = 1.0,
+        service_name: str = "taskpilot",
+        batch_size: int = 512,
+        max_queue_size: int = 4096,
+        flush_interval: float = 5.0
+    ):
+        self.exporter = exporter
+        self.sample_ratio = sample_ratio
+        self.service_name = service_name
+        self.batch_size = batch_size
+        self.max_queue_size = max_queue_size
+        self.flush_interval = flush_interval
+        self._queue: list[Span] = []
+        self._last_flush = time.monotonic()
+        self._tasks: set[asyncio.Task] = set()
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    def _sampled(self, trace_id: str) -> bool:
+        # Как TraceIdRatioBased в OpenTelemetry: младшие 64 бита trace_id против доли
+        return int(trace_id[16:], 16) < self.sample_ratio * 2 ** 64
+
+    def start_trace(self, name: str, traceparent: str | bytes | None = None,
+                    attributes: dict[str, Any] | None = None) -> Span:
+        """
+        Начать серверный спан запроса, продолжая входящую трассу, если она передана.
+        """
+        parent = parse_traceparent(traceparent)
+        if parent is not None:
+            trace_id, parent_id, sampled = parent
+        else:
+            trace_id, parent_id = f"{random.getrandbits(128) or 1:032x}", None
+            sampled = self._sampled(trace_id)
+        return Span(
+            name=name,
+            trace_id=trace_id,
+            span_id=_new_span_id(),
+            parent_id=parent_id,
+            kind="server",
+            sampled=sampled and self.enabled,
+            tracer=self,
+            attributes=attributes or {}
+        )
+
+    def on_end(self, span: Span) -> None:
+        if len(self._queue) >= self.max_queue_size:
+            TRACING_SPANS.labels("dropped").inc()
+            return
+        self._queue.append(span)
+        if len(self._queue) >= self.batch_size or time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def _payload(self, spans: list[Span]) -> dict:
+        return {"resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": self.service_name}}]},
+            "scopeSpans": [{"scope": {"name": "app.tracing"}, "spans": [span.to_otlp() for span in spans]}],
+        }]}
+
+    async def _export(self, spans: list[Span]) -> None:
+        try:
+            await self.exporter.export(self._payload(spans))
+        except Exception:
+            TRACING_SPANS.labels("error").inc(len(spans))
+        else:
+            TRACING_SPANS.labels("exported").inc(len(spans))
+
+    def flush(self) -> None:
+        """
+        Отправить накопленные спаны в фоновой задаче.
+        """
+        self._last_flush = time.monotonic()
+        if not self._queue or self.exporter is None:
+            return
+        spans, self._queue = self._queue, []
+        # Пустой контекст: запросы экспортёра не должны попадать в трассу запроса, завершившего пачку
+        task = asyncio.get_running_loop().create_task(self._export(spans), context=Context())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def run_flush_loop(self) -> None:
+        """
+        Отправлять накопленные спаны не реже раза в flush_interval секунд (фоновая задача lifespan).
+        """
+        while True:
+            await asyncio.sleep(max(self.flush_interval - (time.monotonic() - self._last_flush), 0))
+            if time.monotonic() - self._last_flush >= self.flush_interval:
+                self.flush()
+
+    async def shutdown(self) -> None:
+        """
+        Отправить оставшиеся спаны и закрыть экспортёр (при остановке приложения).
+        """
+        if self.exporter is None:
+            return
+        self.flush()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        await self.exporter.close()
@@ -0,0 +1,139 @@
+"""
+Прогрев процесса после запуска.
+
+Первые запросы нового процесса платят за открытие соединений с PostgreSQL (вместе с интроспекцией
+типов asyncpg), подготовку и компиляцию SQL-запросов, загрузку bcrypt и первый проход сериализаторов.
+Прогрев выполняет это в фоне сразу после запуска; GET /ready отвечает 200 только после его окончания,
+поэтому балансировщик не направляет запросы в холодный процесс.
+
+Ошибка шага прогрева не делает процесс неготовым навсегда: она записывается в состояние, и шаг
+остаётся на первые запросы, как без прогрева.
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from uuid import UUID
+
+from redis.asyncio import Redis
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from app.auth.auth_service import get_password_context
+from app.auth.jwt import create_access_token, decode_access_token
+from app.database.database import Databases
+from app.metrics import WARMUP_DURATION
+from app.repositories.todo_item import TodoItemRepository
+from app.repositories.user import UserRepository
+from app.schema.todo_item import TodoItemRead
+from app.service.todo_item import todo_items_adapter
+from app.settings import Settings
+
+
+# Идентификатор, которого нет в базе: запросы прогрева ничего не находят, но готовятся на соединении
+WARMUP_ID = UUID(int=0)
+
+
+@dataclass
+class WarmupState:
+    """
+    Состояние прогрева процесса: готовность, длительность шагов в миллисекундах и ошибки шагов.
+    """
+    ready: bool = False
+    durations_ms: dict[str, float] = field(default_factory=dict)
+    errors: dict[str, str] = field(default_factory=dict)
+
+
+async def warm_connection(read_engine: AsyncEngine) -> None:
+    """
+    Выполнить частые запросы чтения на одном соединении: asyncpg готовит запрос отдельно
+    на каждом соединении, SQLAlchemy компилирует его один раз на движок.
+    """
+    async with read_engine.connect() as connection:
+        async with AsyncSession(bind=connection) as session:
+            users = UserRepository(session)
+            todo_items = TodoItemRepository(session)
+            await users.get_user_by_id(WARMUP_ID)
+            await users.get_by_username("")
+            await todo_items.get_todo_items(WARMUP_ID)
+            await todo_items.get_todo_item(WARMUP_ID, WARMUP_ID)
+        await connection.rollback()
+
+
+async def warm_database(databases: Databases, connections: int) -> None:
+    """
+    Заполнить карту категорий и открыть заранее до connections соединений основного пула и пула
+    каждой реплики, подготовив на них частые запросы. Соединения берутся одновременно, чтобы
+    были открыты разные; сверх размера пула они закрылись бы при возврате.
+    """
+    async with databases.engine.connect() as connection:
+        async with AsyncSession(bind=connection) as session:
+            await TodoItemRepository(session).load_category_map()
+        await connection.rollback()
+
+    await asyncio.gather(*(
+        warm_connection(read_engine)
+        for read_engine in (databases.engine, *databases.replica_engines)
+        for _ in range(min(connections, read_engine.pool.size()))
+    ))
+
+
+async def warm_redis(redis: Redis) -> None:
+    """
+    Открыть соединение клиента Redis приложения.
+    """
+    await redis.ping()
+
+
+async def warm_serializers() -> None:
+    """
+    Первый выпуск и проверка JWT и сериализация списка задач.
+    """
+    decode_access_token(create_access_token({"sub": str(WARMUP_ID)}, timedelta(minutes=1)))
+    item = TodoItemRead(
+        id=WARMUP_ID, user_id=WARMUP_ID, title="warmup", created_at=datetime.now(), updated_at=datetime.now()
+    )
+    todo_items_adapter.dump_json(todo_items_adapter.validate_python([item], from_attributes=True))
+
+
+async def warm_bcrypt() -> None:
+    """
+    Первый хеш bcrypt в отдельном потоке: загрузка passlib, выбор и самопроверка бэкенда.
+    """
+    await asyncio.to_thread(get_password_context().hash, "warmup")
+
+
+async def run_step(state: WarmupState, name: str, step) -> None:
+    """
+    Выполнить шаг и записать его длительность; шаг, прерванный по таймауту, длительности не получает.
+    """
+    start = time.perf_counter()
+    try:
+        await step
+    except Exception as exc:
+        state.errors[name] = repr(exc)
+    duration = time.perf_counter() - start
+    state.durations_ms[name] = duration * 1000
+    WARMUP_DURATION.labels(name).set(duration)
+
+
+async def warm_up(state: WarmupState, settings: Settings, databases: Databases, redis: Redis) -> None:
+    """
+    Выполнить шаги прогрева пулов и клиента Redis приложения одновременно и отметить процесс готовым.
+    Шаги, не успевшие за WARMUP_TIMEOUT, прерываются.
+    """
+    steps = {"redis": warm_redis(redis), "serializers": warm_serializers()}
+    if settings.REPOSITORY_BACKEND == "sqlalchemy" and settings.WARMUP_DB_CONNECTIONS > 0:
+        steps["database"] = warm_database(databases, settings.WARMUP_DB_CONNECTIONS)
+    if settings.WARMUP_BCRYPT:
+        steps["bcrypt"] = warm_bcrypt()
+    try:
+        await asyncio.wait_for(
+            asyncio.gather(*(run_step(state, name, step) for name, step in steps.items())),
+            timeout=settings.WARMUP_TIMEOUT
+        )
+    except TimeoutError:
+        for name in steps.keys() - state.durations_ms.keys():
+            state.errors[name] = "timeout"
+    finally:
+        state.ready = True
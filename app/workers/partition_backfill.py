@@ -0,0 +1,89 @@
+"""
+Перенос строк todo_items в секционированную todo_items_partitioned.
+
+Запускается между миграциями 80b13ca53082 (теневая таблица и триггер)
+и a2951563573b (переключение). Новые изменения уже зеркалирует триггер,
+воркер переносит существующие строки пачками по id, каждая пачка —
+отдельная короткая транзакция. Строки пачки блокируются FOR SHARE, поэтому
+параллельное удаление или изменение не оставит в новой таблице устаревшую копию.
+
+После переноса сверяет количество строк в одном снимке и отмечает
+новую таблицу комментарием 'backfilled', который проверяет миграция переключения.
+
+    python -m app.workers.partition_backfill
+    python -m app.workers.partition_backfill --batch-size 5000 --pause 0.1
+"""
+
+import argparse
+import asyncio
+from uuid import UUID
+
+from sqlalchemy import text
+
+from app.database.database import create_databases
+from app.settings import settings
+
+
+COLUMNS = (
+    "id, title, description, completed, created_at, "
+    "updated_at, date_of_execution, category_id, user_id"
+)
+
+COPY_BATCH = text(f"""
+    WITH batch AS (
+        SELECT {COLUMNS} FROM todo_items
+        WHERE id > :last_id
+        ORDER BY id
+        LIMIT :batch_size
+        FOR SHARE
+    ), copied AS (
+        INSERT INTO todo_items_partitioned ({COLUMNS})
+        SELECT {COLUMNS} FROM batch
+        ON CONFLICT (id, user_id) DO NOTHING
+    )
+    SELECT id FROM batch ORDER BY id DESC LIMIT 1
+""")
+
+COUNT_ROWS = text("""
+    SELECT (SELECT count(*) FROM todo_items), (SELECT count(*) FROM todo_items_partitioned)
+""")
+
+
+async def backfill_partitioned_todo_items(batch_size: int = 1000, pause: float = 0.0) -> int:
+    """
+    Перенести все строки todo_items в секционированную таблицу и сверить результат.
+    Возвращает количество просмотренных пачек.
+    """
+    batches = 0
+    last_id = UUID(int=0)
+    async with create_databases(settings) as databases, databases.session_maker() as session:
+        while True:
+            batch_last_id = await session.scalar(COPY_BATCH, {"last_id": last_id, "batch_size": batch_size})
+            await session.commit()
+            if batch_last_id is None:
+                break
+            batches += 1
+            last_id = batch_last_id
+            if pause:
+                await asyncio.sleep(pause)
+
+        # Триггер пишет в обе таблицы в одной транзакции, поэтому в одном снимке количества совпадают
+        await session.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+        legacy_count, partitioned_count = (await session.execute(COUNT_ROWS)).one()
+        await session.commit()
+        if legacy_count != partitioned_count:
+            raise RuntimeError(
+                f"Строки не совпадают: {legacy_count} в todo_items, {partitioned_count} в todo_items_partitioned"
+            )
+        await session.execute(text("COMMENT ON TABLE todo_items_partitioned IS 'backfilled'"))
+        await session.commit()
+    return batches
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Перенос todo_items в секционированную таблицу")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Строк в одной транзакции")
+    parser.add_argument("--pause", type=float, default=0.0, help="Пауза между пачками в секундах")
+    args = parser.parse_args()
+    count = asyncio.run(backfill_partitioned_todo_items(args.batch_size, args.pause))
+    print(f"Перенос завершён: {count} пачек")
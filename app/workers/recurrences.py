@@ -0,0 +1,77 @@
+"""
+Генератор повторяющихся задач.
+
+Создаёт задачи по правилам повторения на TODO_RECURRENCE_HORIZON_DAYS дней вперёд.
+Выбираются только правила, у которых next_occurrence попадает в горизонт, поэтому
+стоимость прохода пропорциональна числу новых задач, а не числу правил.
+Задачи пачки правил вставляются многострочными INSERT ... ON CONFLICT DO NOTHING
+в одной транзакции: повторный или параллельный запуск не создаёт дублей.
+
+    python -m app.workers.recurrences
+    python -m app.workers.recurrences --once
+"""
+
+import argparse
+import asyncio
+from datetime import date, timedelta
+
+from prometheus_client import start_http_server
+
+from app.database.database import create_databases
+from app.database.redis import create_redis
+from app.metrics import TODO_RECURRENCE_OCCURRENCES
+from app.repositories.todo_recurrence import TodoRecurrenceRepository
+from app.service.cache import TodoListCache
+from app.service.events import TodoEventPublisher
+from app.service.todo_recurrence import TodoRecurrenceService
+from app.settings import settings
+
+
+async def generate_recurring_todo_items(
+        batch_size: int = settings.TODO_RECURRENCE_BATCH_SIZE,
+        once: bool = False
+) -> int:
+    """
+    Создавать задачи по правилам повторения.
+    С once=True завершается, когда все правила обработаны, и возвращает количество созданных задач.
+    """
+    redis = create_redis(settings)
+    cache = TodoListCache(redis=redis, enabled=settings.TODO_CACHE_ENABLED)
+    events = TodoEventPublisher(
+        redis=redis,
+        maxlen=settings.TODO_EVENTS_STREAM_MAXLEN,
+        ttl=settings.TODO_EVENTS_STREAM_TTL,
+        enabled=settings.TODO_EVENTS_ENABLED
+    )
+    created = 0
+    async with redis, create_databases(settings) as databases, databases.session_maker() as session:
+        service = TodoRecurrenceService(repository=TodoRecurrenceRepository(session))
+        while True:
+            today = date.today()
+            recurrences = await service.repository.claim_due(
+                horizon=today + timedelta(days=settings.TODO_RECURRENCE_HORIZON_DAYS),
+                batch_size=batch_size
+            )
+            user_ids = await service.materialize(recurrences, today)
+            for user_id in set(user_ids):
+                await cache.invalidate(user_id)
+                await events.publish(user_id, "refresh")
+            TODO_RECURRENCE_OCCURRENCES.inc(len(user_ids))
+            created += len(user_ids)
+
+            if len(recurrences) < batch_size:
+                if once:
+                    return created
+                await asyncio.sleep(settings.TODO_RECURRENCE_INTERVAL)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Генерация повторяющихся задач")
+    parser.add_argument("--batch-size", type=int, default=settings.TODO_RECURRENCE_BATCH_SIZE,
+                        help="Правил в одной транзакции")
+    parser.add_argument("--once", action="store_true", help="Завершиться, когда все правила обработаны")
+    args = parser.parse_args()
+    if not args.once:
+        start_http_server(settings.WORKER_METRICS_PORT)
+    count = asyncio.run(generate_recurring_todo_items(args.batch_size, args.once))
+    print(f"Создано задач по правилам повторения: {count}")
@@ -0,0 +1,105 @@
+"""
+Напоминания о сроках задач.
+
+Очередь — частичный индекс ix_todo_items_reminder_date_of_execution: в нём только
+невыполненные задачи без отправленного напоминания. Воркер обходит её по дням
+(от TODO_REMINDER_LOOKBACK_DAYS назад до TODO_REMINDER_LEAD_DAYS вперёд), а не всю таблицу.
+Задачи забираются короткими транзакциями FOR UPDATE SKIP LOCKED, поэтому
+обработчики внутри воркера и несколько воркеров работают параллельно без дублей.
+Письма отправляются пачкой через одно SMTP-соединение; напоминания, не отправленные из-за ошибки
+соединения или входа, возвращаются в очередь и повторяются на следующем проходе. Напоминание на адрес,
+отклонённый сервером, не повторяется: оно остаётся отмеченным и учитывается как failed.
+
+    python -m app.workers.reminders
+    python -m app.workers.reminders --once
+"""
+
+import argparse
+import asyncio
+from datetime import date, timedelta
+from typing import Awaitable, Callable, Sequence
+
+from prometheus_client import start_http_server
+from sqlalchemy import Row
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.database.database import create_databases
+from app.metrics import TODO_REMINDERS
+from app.repositories.todo_reminder import TodoReminderRepository
+from app.service.email import ReminderDelivery, send_reminder_emails
+from app.settings import settings
+
+
+# Отправитель получает пачку напоминаний и возвращает неотправленные
+ReminderSender = Callable[[Sequence[Row]], Awaitable[ReminderDelivery]]
+
+
+def reminder_days(today: date, lead_days: int, lookback_days: int) -> list[date]:
+    """
+    Дни-корзины очереди напоминаний, начиная с самых срочных.
+    """
+    return [today + timedelta(days=offset) for offset in range(-lookback_days, lead_days + 1)]
+
+
+async def process_due_reminders(
+        session_maker: async_sessionmaker[AsyncSession],
+        send: ReminderSender = send_reminder_emails,
+        today: date | None = None,
+        batch_size: int = settings.TODO_REMINDER_BATCH_SIZE,
+        lead_days: int = settings.TODO_REMINDER_LEAD_DAYS,
+        lookback_days: int = settings.TODO_REMINDER_LOOKBACK_DAYS
+) -> int:
+    """
+    Один проход по очереди напоминаний. Возвращает количество отправленных напоминаний.
+    """
+    days = reminder_days(today or date.today(), lead_days, lookback_days)
+    sent = 0
+    async with session_maker() as session:
+        repository = TodoReminderRepository(session)
+        for day in days:
+            while True:
+                claimed = await repository.claim_due(day, batch_size)
+                if not claimed:
+                    break
+                delivery = await send(claimed)
+                await repository.release([(reminder.id, reminder.user_id) for reminder in delivery.retry])
+                delivered = len(claimed) - len(delivery.retry) - len(delivery.refused)
+                TODO_REMINDERS.labels("sent").inc(delivered)
+                TODO_REMINDERS.labels("retry").inc(len(delivery.retry))
+                TODO_REMINDERS.labels("failed").inc(len(delivery.refused))
+                sent += delivered
+                # SMTP недоступен: не крутимся на тех же задачах, повторим на следующем проходе
+                if delivery.retry or len(claimed) < batch_size:
+                    break
+    return sent
+
+
+async def run_reminders(
+        concurrency: int = settings.TODO_REMINDER_CONCURRENCY,
+        send: ReminderSender = send_reminder_emails,
+        once: bool = False
+) -> int:
+    """
+    Обрабатывать очередь напоминаний в concurrency параллельных обработчиков.
+    С once=True выполняет один проход и возвращает количество отправленных напоминаний.
+    """
+    async with create_databases(settings) as databases:
+        while True:
+            results = await asyncio.gather(*(
+                process_due_reminders(databases.session_maker, send=send) for _ in range(concurrency)
+            ))
+            if once:
+                return sum(results)
+            await asyncio.sleep(settings.TODO_REMINDER_INTERVAL)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Напоминания о сроках задач")
+    parser.add_argument("--concurrency", type=int, default=settings.TODO_REMINDER_CONCURRENCY,
+                        help="Параллельных обработчиков")
+    parser.add_argument("--once", action="store_true", help="Выполнить один проход и завершиться")
+    args = parser.parse_args()
+    if not args.once:
+        start_http_server(settings.WORKER_METRICS_PORT)
+    count = asyncio.run(run_reminders(args.concurrency, once=args.once))
+    print(f"Отправлено напоминаний: {count}")
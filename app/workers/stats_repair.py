@@ -0,0 +1,54 @@
+"""
+Пересчёт статистики задач по таблицам todo_items и todo_items_archive.
+
+Исправляет расхождения счётчиков (например, после ручных правок в базе данных).
+Пользователи обрабатываются пачками, каждая пачка — отдельная короткая транзакция.
+
+    python -m app.workers.stats_repair
+    python -m app.workers.stats_repair --user-id <UUID>
+"""
+
+import argparse
+import asyncio
+from uuid import UUID
+
+from sqlalchemy.future import select
+
+from app.database.database import create_databases
+from app.database.models.user import User
+from app.repositories.todo_stats import TodoStatsRepository
+from app.settings import settings
+
+
+async def repair_todo_stats(user_id: UUID | None = None, batch_size: int = 500) -> int:
+    """
+    Пересчитать статистику одного пользователя или всех пользователей.
+    Возвращает количество обработанных пользователей.
+    """
+    async with create_databases(settings) as databases, databases.session_maker() as session:
+        repository = TodoStatsRepository(session)
+        if user_id is not None:
+            await repository.recompute([user_id])
+            return 1
+
+        processed = 0
+        last_id: UUID | None = None
+        while True:
+            query = select(User.id).order_by(User.id).limit(batch_size)
+            if last_id is not None:
+                query = query.where(User.id > last_id)
+            user_ids = (await session.scalars(query)).all()
+            if not user_ids:
+                return processed
+            await repository.recompute(user_ids)
+            processed += len(user_ids)
+            last_id = user_ids[-1]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Пересчёт статистики задач")
+    parser.add_argument("--user-id", type=UUID, default=None, help="Пересчитать только этого пользователя")
+    parser.add_argument("--batch-size", type=int, default=500, help="Пользователей в одной транзакции")
+    args = parser.parse_args()
+    count = asyncio.run(repair_todo_stats(args.user_id, args.batch_size))
+    print(f"Статистика пересчитана для {count} пользователей")
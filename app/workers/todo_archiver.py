@@ -0,0 +1,73 @@
+"""
+Архиватор выполненных задач.
+
+Переносит задачи, выполненные больше TODO_ARCHIVE_AFTER_DAYS дней назад,
+из todo_items в todo_items_archive пачками по TODO_ARCHIVE_BATCH_SIZE.
+Скорость ограничивается TODO_ARCHIVE_MAX_ROWS_PER_SECOND: после каждой пачки
+воркер ждёт столько, чтобы средняя скорость записи не превышала заданную.
+Кеш списков задач затронутых пользователей сбрасывается после каждой пачки.
+
+    python -m app.workers.todo_archiver
+    python -m app.workers.todo_archiver --once
+"""
+
+import argparse
+import asyncio
+from datetime import datetime, timedelta
+
+from app.database.database import create_databases
+from app.database.redis import create_redis
+from app.repositories.todo_archive import TodoArchiveRepository
+from app.service.cache import TodoListCache
+from app.settings import settings
+
+
+async def archive_completed_todo_items(
+        after_days: int = settings.TODO_ARCHIVE_AFTER_DAYS,
+        batch_size: int = settings.TODO_ARCHIVE_BATCH_SIZE,
+        max_rows_per_second: int = settings.TODO_ARCHIVE_MAX_ROWS_PER_SECOND,
+        once: bool = False
+) -> int:
+    """
+    Переносить выполненные задачи в архив.
+    С once=True завершается, когда переносить больше нечего, и возвращает количество перенесённых задач.
+    """
+    redis = create_redis(settings)
+    cache = TodoListCache(redis=redis, enabled=settings.TODO_CACHE_ENABLED)
+    loop = asyncio.get_running_loop()
+    archived = 0
+    async with redis, create_databases(settings) as databases, databases.session_maker() as session:
+        repository = TodoArchiveRepository(session)
+        while True:
+            started = loop.time()
+            user_ids = await repository.archive_completed(
+                completed_before=datetime.now() - timedelta(days=after_days),
+                batch_size=batch_size
+            )
+            for user_id in set(user_ids):
+                await cache.invalidate(user_id)
+            archived += len(user_ids)
+
+            if len(user_ids) < batch_size:
+                if once:
+                    return archived
+                await asyncio.sleep(settings.TODO_ARCHIVE_IDLE_INTERVAL)
+                continue
+            # Троттлинг: пачка из N строк должна занимать не меньше N / max_rows_per_second секунд
+            await asyncio.sleep(max(0.0, len(user_ids) / max_rows_per_second - (loop.time() - started)))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Архивирование выполненных задач")
+    parser.add_argument("--after-days", type=int, default=settings.TODO_ARCHIVE_AFTER_DAYS,
+                        help="Архивировать задачи, выполненные больше N дней назад")
+    parser.add_argument("--batch-size", type=int, default=settings.TODO_ARCHIVE_BATCH_SIZE,
+                        help="Задач в одной транзакции")
+    parser.add_argument("--max-rows-per-second", type=int, default=settings.TODO_ARCHIVE_MAX_ROWS_PER_SECOND,
+                        help="Целевая скорость переноса")
+    parser.add_argument("--once", action="store_true", help="Завершиться, когда переносить больше нечего")
+    args = parser.parse_args()
+    count = asyncio.run(archive_completed_todo_items(
+        args.after_days, args.batch_size, args.max_rows_per_second, args.once
+    ))
+    print(f"Перенесено в архив: {count} задач")
@@ -0,0 +1,78 @@
+"""
+Очистка корзины задач.
+
+Окончательно удаляет задачи, пролежавшие в корзине больше TODO_TRASH_RETENTION_DAYS дней,
+небольшими пачками по TODO_TRASH_PURGE_BATCH_SIZE. Скорость ограничивается
+TODO_TRASH_PURGE_MAX_ROWS_PER_SECOND, чтобы массовые удаления не давали всплесков
+блокировок и WAL. Заодно удаляет отметки об удалении для дельта-синхронизации старше
+TODO_SYNC_TOMBSTONE_RETENTION_DAYS дней. Метрики (удалённые задачи, остаток очереди, длительность пачки)
+публикуются на порту WORKER_METRICS_PORT.
+
+    python -m app.workers.trash_purge
+    python -m app.workers.trash_purge --once
+"""
+
+import argparse
+import asyncio
+from datetime import datetime, timedelta
+
+from prometheus_client import start_http_server
+
+from app.database.database import create_databases
+from app.metrics import TODO_TRASH_BACKLOG, TODO_TRASH_PURGE_BATCH_SECONDS, TODO_TRASH_PURGED
+from app.repositories.todo_sync import TodoSyncRepository
+from app.repositories.todo_trash import TodoTrashRepository
+from app.settings import settings
+
+
+async def purge_trash(
+        retention_days: int = settings.TODO_TRASH_RETENTION_DAYS,
+        batch_size: int = settings.TODO_TRASH_PURGE_BATCH_SIZE,
+        max_rows_per_second: int = settings.TODO_TRASH_PURGE_MAX_ROWS_PER_SECOND,
+        once: bool = False
+) -> int:
+    """
+    Удалять задачи с истёкшим сроком хранения в корзине.
+    С once=True завершается, когда удалять больше нечего, и возвращает количество удалённых задач.
+    """
+    loop = asyncio.get_running_loop()
+    purged = 0
+    async with create_databases(settings) as databases, databases.session_maker() as session:
+        repository = TodoTrashRepository(session)
+        sync = TodoSyncRepository(session)
+        while True:
+            deleted_before = datetime.now() - timedelta(days=retention_days)
+            started = loop.time()
+            with TODO_TRASH_PURGE_BATCH_SECONDS.time():
+                count = await repository.purge_expired(deleted_before, batch_size)
+            TODO_TRASH_PURGED.inc(count)
+            purged += count
+
+            if count < batch_size:
+                TODO_TRASH_BACKLOG.set(await repository.count_expired(deleted_before))
+                await session.commit()
+                removed_before = datetime.now() - timedelta(days=settings.TODO_SYNC_TOMBSTONE_RETENTION_DAYS)
+                while await sync.prune_tombstones(removed_before, batch_size) == batch_size:
+                    await asyncio.sleep(batch_size / max_rows_per_second)
+                if once:
+                    return purged
+                await asyncio.sleep(settings.TODO_TRASH_PURGE_IDLE_INTERVAL)
+                continue
+            # Троттлинг: пачка из N строк должна занимать не меньше N / max_rows_per_second секунд
+            await asyncio.sleep(max(0.0, count / max_rows_per_second - (loop.time() - started)))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Очистка корзины задач")
+    parser.add_argument("--retention-days", type=int, default=settings.TODO_TRASH_RETENTION_DAYS,
+                        help="Удалять задачи, пролежавшие в корзине больше N дней")
+    parser.add_argument("--batch-size", type=int, default=settings.TODO_TRASH_PURGE_BATCH_SIZE,
+                        help="Задач в одной транзакции")
+    parser.add_argument("--max-rows-per-second", type=int, default=settings.TODO_TRASH_PURGE_MAX_ROWS_PER_SECOND,
+                        help="Целевая скорость удаления")
+    parser.add_argument("--once", action="store_true", help="Завершиться, когда удалять больше нечего")
+    args = parser.parse_args()
+    if not args.once:
+        start_http_server(settings.WORKER_METRICS_PORT)
+    count = asyncio.run(purge_trash(args.retention_days, args.batch_size, args.max_rows_per_second, args.once))
+    print(f"Удалено из корзины: {count} задач")
@@ -0,0 +1,92 @@
+"""
+Бенчмарк автодополнения названий задач.
+
+Создаёт пользователя с большим числом задач и измеряет задержку
+запроса подсказок на уровне репозитория (без HTTP и кеша).
+
+    python -m benchmarks.autocomplete --items 50000 --queries 500
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from datetime import datetime
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.repositories.todo_item import TodoItemRepository
+from app.settings import settings
+from benchmarks.common import create_bench_user, ensure_category, print_summary, seed_todo_items, summarize
+
+
+WORDS = [
+    "купить", "позвонить", "отправить", "подготовить", "проверить", "написать", "оплатить",
+    "молоко", "отчёт", "презентация", "врач", "машина", "квартира", "билеты", "подарок",
+    "buy", "call", "send", "prepare", "review", "write", "pay", "report", "meeting",
+    "invoice", "dentist", "groceries", "tickets", "birthday", "release", "backup",
+]
+
+
+def make_title(rnd: random.Random, number: int) -> str:
+    return " ".join(rnd.sample(WORDS, 3)) + f" {number}"
+
+
+def make_prefix(rnd: random.Random) -> str:
+    word = rnd.choice(WORDS)
+    prefix = word[:rnd.randint(2, len(word))]
+    if len(prefix) > 3 and rnd.random() < 0.3:
+        # Опечатка: переставляем две соседние буквы
+        i = rnd.randrange(len(prefix) - 1)
+        prefix = prefix[:i] + prefix[i + 1] + prefix[i] + prefix[i + 2:]
+    return prefix
+
+
+async def main(items: int, queries: int, limit: int, seed: int) -> None:
+    engine = create_async_engine(settings.DATABASE_URL, echo=False)
+    session_maker = async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
+    rnd = random.Random(seed)
+
+    async with session_maker() as session:
+        category_id = await ensure_category(session)
+        user_id = await create_bench_user(session, prefix="autocomplete")
+        now = datetime.now()
+        rows = [
+            {"title": make_title(rnd, i), "category_id": category_id, "completed": False, "created_at": now}
+            for i in range(items)
+        ]
+        started = time.perf_counter()
+        await seed_todo_items(session, user_id, rows)
+        await session.execute(text("ANALYZE todo_items"))
+        await session.commit()
+        print(f"Создано {items} задач за {time.perf_counter() - started:.1f}s")
+
+        repository = TodoItemRepository(session)
+        # Прогрев соединения и плана запроса
+        for _ in range(20):
+            await repository.suggest_todo_titles(user_id, make_prefix(rnd), limit)
+
+        samples = []
+        for _ in range(queries):
+            prefix = make_prefix(rnd)
+            started = time.perf_counter()
+            await repository.suggest_todo_titles(user_id, prefix, limit)
+            samples.append((time.perf_counter() - started) * 1000)
+
+        print_summary(f"suggest_todo_titles ({items} items)", summarize(samples))
+
+        await session.execute(text("DELETE FROM users WHERE id = :id"), {"id": user_id})
+        await session.commit()
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Бенчмарк автодополнения названий задач")
+    parser.add_argument("--items", type=int, default=50000, help="Количество задач у пользователя")
+    parser.add_argument("--queries", type=int, default=500, help="Количество запросов подсказок")
+    parser.add_argument("--limit", type=int, default=10, help="Количество подсказок в ответе")
+    parser.add_argument("--seed", type=int, default=42, help="Зерно генератора случайных чисел")
+    args = parser.parse_args()
+    asyncio.run(main(args.items, args.queries, args.limit, args.seed))
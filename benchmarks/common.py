@@ -0,0 +1,90 @@
+"""Общие утилиты бенчмарков TaskPilot."""
+
+import math
+import statistics
+from uuid import UUID, uuid4
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database.models import CategoryName, TodoCategory, TodoItem, User
+
+
+def percentile(samples: list[float], p: float) -> float:
+    """
+    Перцентиль выборки методом ближайшего ранга.
+    """
+    ordered = sorted(samples)
+    rank = max(math.ceil(p / 100 * len(ordered)) - 1, 0)
+    return ordered[rank]
+
+
+def summarize(samples_ms: list[float]) -> dict[str, float]:
+    """
+    Сводная статистика по задержкам в миллисекундах.
+    """
+    return {
+        "count": len(samples_ms),
+        "mean": statistics.fmean(samples_ms),
+        "stdev": statistics.stdev(samples_ms) if len(samples_ms) > 1 else 0.0,
+        "min": min(samples_ms),
+        "p50": percentile(samples_ms, 50),
+        "p95": percentile(samples_ms, 95),
+        "p99": percentile(samples_ms, 99),
+        "max": max(samples_ms),
+    }
+
+
+def print_summary(name: str, summary: dict[str, float]) -> None:
+    """
+    Вывести сводную статистику одной строкой.
+    """
+    print(
+        f"{name:<40} n={summary['count']:<6} "
+        f"mean={summary['mean']:.2f}ms p50={summary['p50']:.2f}ms "
+        f"p95={summary['p95']:.2f}ms p99={summary['p99']:.2f}ms max={summary['max']:.2f}ms"
+    )
+
+
+async def ensure_category(session: AsyncSession, name: CategoryName = CategoryName.personal) -> UUID:
+    """
+    Получить идентификатор категории, создав её при необходимости.
+    """
+    category_id = await session.scalar(select(TodoCategory.id).where(TodoCategory.name == name))
+    if category_id is None:
+        category_id = uuid4()
+        await session.execute(insert(TodoCategory).values(id=category_id, name=name))
+        await session.commit()
+    return category_id
+
+
+async def create_bench_user(session: AsyncSession, prefix: str = "bench") -> UUID:
+    """
+    Создать активного пользователя для бенчмарка.
+    """
+    user_id = uuid4()
+    await session.execute(insert(User).values(
+        id=user_id,
+        username=f"{prefix}_{user_id.hex[:12]}",
+        email=f"{prefix}_{user_id.hex[:12]}@bench.local",
+        hashed_password="",
+        is_active=True,
+        is_admin=False,
+    ))
+    await session.commit()
+    return user_id
+
+
+async def seed_todo_items(
+        session: AsyncSession,
+        user_id: UUID,
+        rows: list[dict],
+        chunk_size: int = 5000
+) -> None:
+    """
+    Вставить задачи пользователя пачками многострочных INSERT.
+    """
+    for start in range(0, len(rows), chunk_size):
+        chunk = [{"user_id": user_id, **row} for row in rows[start:start + chunk_size]]
+        await session.execute(insert(TodoItem), chunk)
+        await session.commit()
@@ -0,0 +1,358 @@
+"""
+Микробенчмарки кода, который выполняется на каждом запросе.
+
+Без базы данных и Redis, в одном процессе:
+- выпуск и проверка JWT (create_access_token, decode_access_token);
+- TodoItemRead: валидация ORM-объектов и сериализация в JSON списков из 1, 100 и 10k задач
+  (как get_todo_items_json при промахе кеша);
+- разбор тел запросов TodoItemCreate и TodoItemUpdate;
+- разрешение зависимостей FastAPI get_current_user + get_todo_item_service в запросе через ASGI
+  (сессия базы данных заменена объектом, который сразу отдаёт пользователя), в том числе
+  при подмене сессии через dependency_overrides;
+- сервис задач поверх репозитория в памяти: список в JSON без кеша и цикл создание/правка/удаление;
+- bcrypt с настроенной стоимостью: хеширование и проверка пароля.
+
+Каждый замер — --repeat серий; число вызовов в серии подбирается так, чтобы серия шла
+не меньше --min-time секунд. Выводятся среднее, стандартное отклонение, медиана, p95
+и 95% доверительный интервал среднего времени одного вызова.
+
+    python -m benchmarks.hot_paths --output hot-paths.json
+    python -m benchmarks.hot_paths --compare hot-paths.json --tolerance 0.1   # код 1 при регрессии
+    python -m benchmarks.hot_paths --filter jwt
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import math
+import platform
+import sys
+import time
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Annotated, Awaitable, Callable
+from uuid import uuid4
+
+from fastapi import Depends, FastAPI
+from fastapi.responses import Response
+
+from app.auth.auth_dependencies import get_current_user
+from app.auth.auth_service import get_password_context
+from app.auth.jwt import create_access_token, decode_access_token
+from app.database.database import create_databases
+from app.database.dependencies import get_todo_item_service
+from app.database.models import TodoItem, User
+from app.database.redis import create_redis
+from app.database.session import get_db, get_read_db
+from app.repositories.memory import InMemoryTodoItemRepository, InMemoryUserRepository, MemoryStore
+from app.schema.todo_item import TodoItemCreate, TodoItemUpdate
+from app.service.todo_item import TodoItemService, todo_items_adapter
+from app.settings import settings
+from benchmarks.common import summarize
+
+
+def measure(batch: Callable[[int], float], repeat: int, min_time: float) -> tuple[int, list[float]]:
+    """
+    Число вызовов в серии и время одного вызова в микросекундах по каждой из repeat серий.
+    batch(loops) выполняет loops вызовов и возвращает затраченное время в секундах.
+    """
+    loops = 1
+    while (elapsed := batch(loops)) < min_time and loops < 1_000_000:
+        loops = max(loops * 2, int(loops * min_time / max(elapsed, 1e-9) * 1.2))
+    return loops, [batch(loops) / loops * 1_000_000 for _ in range(repeat)]
+
+
+def sync_batch(func: Callable[[], object]) -> Callable[[int], float]:
+    def batch(loops: int) -> float:
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            started = time.perf_counter()
+            for _ in range(loops):
+                func()
+            return time.perf_counter() - started
+        finally:
+            if gc_enabled:
+                gc.enable()
+    return batch
+
+
+def async_batch(func: Callable[[], Awaitable[object]], loop: asyncio.AbstractEventLoop) -> Callable[[int], float]:
+    async def run(loops: int) -> float:
+        started = time.perf_counter()
+        for _ in range(loops):
+            await func()
+        return time.perf_counter() - started
+
+    def batch(loops: int) -> float:
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            return loop.run_until_complete(run(loops))
+        finally:
+            if gc_enabled:
+                gc.enable()
+    return batch
+
+
+def format_us(value: float) -> str:
+    if value >= 1000:
+        return f"{value / 1000:.2f}ms"
+    return f"{value:.2f}us"
+
+
+def describe(loops: int, samples_us: list[float]) -> dict:
+    """
+    Сводка по сериям: статистика summarize и полуширина 95% доверительного интервала среднего.
+    """
+    summary = summarize(samples_us)
+    summary["ci95"] = 1.96 * summary["stdev"] / math.sqrt(len(samples_us))
+    summary["loops"] = loops
+    return summary
+
+
+def print_result(name: str, result: dict) -> None:
+    print(
+        f"{name:<48} {format_us(result['mean']):>10} ± {format_us(result['ci95']):<9} "
+        f"sd={format_us(result['stdev']):<9} p50={format_us(result['p50']):<9} "
+        f"p95={format_us(result['p95']):<9} n={result['count']}x{result['loops']}"
+    )
+
+
+def make_items(count: int, user_id) -> list[TodoItem]:
+    """
+    Задачи в том виде, в котором их возвращает репозиторий.
+    """
+    now = datetime.now()
+    return [
+        TodoItem(
+            id=uuid4(),
+            user_id=user_id,
+            title=f"Задача {number}",
+            description="Описание задачи" if number % 2 else None,
+            completed=number % 3 == 0,
+            created_at=now - timedelta(minutes=number),
+            updated_at=now if number % 4 == 0 else None,
+            date_of_execution=date.today() + timedelta(days=number % 30) if number % 2 else None,
+            version=1 + number % 5,
+        )
+        for number in range(count)
+    ]
+
+
+class BenchSession:
+    """Сессия базы данных, которая отдаёт пользователя без запроса: измеряется только код приложения."""
+
+    def __init__(self, user: User):
+        self.user = user
+
+    async def scalar(self, statement):
+        return self.user
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return None
+
+
+def build_app(user: User, use_overrides: bool = False) -> FastAPI:
+    """
+    Приложение с эндпоинтом без зависимостей и эндпоинтом с get_current_user и get_todo_item_service.
+
+    Ресурсы в app.state те же, что собирает create_app (соединения не открываются). По умолчанию сессии
+    подменяются на уровне фабрики сессий, и граф зависимостей тот же, что в работе.
+    С use_overrides — через app.dependency_overrides: при непустых подменах FastAPI заново строит
+    граф зависимостей на каждом запросе, поэтому этот вариант измеряется отдельно.
+    """
+    app = FastAPI()
+    app.state.settings = settings
+    app.state.redis = create_redis(settings)
+    app.state.databases = create_databases(settings)
+    app.state.memory_store = MemoryStore()
+
+    async def get_bench_db():
+        yield BenchSession(user)
+
+    @app.get("/api/v1/todo_items/plain")
+    async def plain():
+        return Response(b"[]", media_type="application/json")
+
+    @app.get("/api/v1/todo_items/resolved")
+    async def resolved(
+            auth_user: Annotated[User, Depends(get_current_user)],
+            service: Annotated[TodoItemService, Depends(get_todo_item_service)]
+    ):
+        return Response(b"[]", media_type="application/json")
+
+    if use_overrides:
+        app.dependency_overrides[get_db] = get_bench_db
+        app.dependency_overrides[get_read_db] = get_bench_db
+    else:
+        app.state.databases.session_maker = lambda: BenchSession(user)
+    return app
+
+
+async def call(app: FastAPI, path: str, authorization: bytes) -> None:
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "root_path": "", "query_string": b"",
+        "headers": [(b"host", b"bench"), (b"authorization", authorization)],
+        "client": ("127.0.0.1", 1), "server": ("bench", 80),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    await app(scope, receive, send)
+
+
+def build_benchmarks(loop: asyncio.AbstractEventLoop) -> dict[str, Callable[[int], float]]:
+    user = User(id=uuid4(), username="bench", email="bench@bench.local", hashed_password="",
+                is_active=True, is_admin=False)
+    token = create_access_token({"sub": str(user.id)}, timedelta(minutes=15))
+    authorization = f"Bearer {token}".encode()
+    app = build_app(user)
+    overridden_app = build_app(user, use_overrides=True)
+    password = "BenchPass123!"
+    hashed_password = get_password_context().hash(password)
+    create_body = json.dumps({
+        "title": "Купить продукты", "description": "Молоко, хлеб", "date_of_execution": "2026-01-15",
+        "category_name": "personal"
+    }).encode()
+    update_body = json.dumps({"completed": True, "title": "Купить продукты и воду"}).encode()
+
+    benchmarks = {
+        "jwt.create_access_token": sync_batch(
+            lambda: create_access_token({"sub": str(user.id)}, timedelta(minutes=15))
+        ),
+        "jwt.decode_access_token": sync_batch(lambda: decode_access_token(token)),
+        "schema.TodoItemCreate.parse": sync_batch(lambda: TodoItemCreate.model_validate_json(create_body)),
+        "schema.TodoItemUpdate.parse": sync_batch(lambda: TodoItemUpdate.model_validate_json(update_body)),
+    }
+    for count in (1, 100, 10_000):
+        items = make_items(count, user.id)
+        validated = todo_items_adapter.validate_python(items, from_attributes=True)
+        benchmarks[f"schema.TodoItemRead.validate[{count}]"] = sync_batch(
+            lambda items=items: todo_items_adapter.validate_python(items, from_attributes=True)
+        )
+        benchmarks[f"schema.TodoItemRead.dump_json[{count}]"] = sync_batch(
+            lambda validated=validated: todo_items_adapter.dump_json(validated)
+        )
+    benchmarks["deps.request_without_dependencies"] = async_batch(
+        lambda: call(app, "/api/v1/todo_items/plain", authorization), loop
+    )
+    benchmarks["deps.current_user+todo_item_service"] = async_batch(
+        lambda: call(app, "/api/v1/todo_items/resolved", authorization), loop
+    )
+    benchmarks["deps.current_user+todo_item_service[overrides]"] = async_batch(
+        lambda: call(overridden_app, "/api/v1/todo_items/resolved", authorization), loop
+    )
+    store = MemoryStore()
+    memory_user = loop.run_until_complete(InMemoryUserRepository(store).create_user(
+        {"username": "bench", "email": "bench@bench.local", "hashed_password": "", "is_active": True}
+    ))
+    service = TodoItemService(repository=InMemoryTodoItemRepository(store))
+    for number in range(100):
+        loop.run_until_complete(service.create_todo_item(TodoItemCreate(title=f"Задача {number}"), memory_user.id))
+
+    async def write_cycle() -> None:
+        todo_item = await service.create_todo_item(TodoItemCreate.model_validate_json(create_body), memory_user.id)
+        await service.update_todo_item(
+            todo_item.id, TodoItemUpdate(completed=True, category_name="personal"), memory_user.id, {todo_item.version}
+        )
+        await service.delete_todo_item(todo_item.id, memory_user.id)
+
+    benchmarks["service.get_todo_items_json[100, memory]"] = async_batch(
+        lambda: service.get_todo_items_json(memory_user.id), loop
+    )
+    benchmarks["service.create+update+delete[memory]"] = async_batch(write_cycle, loop)
+    benchmarks["bcrypt.hash"] = sync_batch(lambda: get_password_context().hash(password))
+    benchmarks["bcrypt.verify"] = sync_batch(lambda: get_password_context().verify(password, hashed_password))
+    return benchmarks
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """
+    Сравнить медианы с базовым результатом; регрессия — замедление больше tolerance,
+    которое не объясняется разбросом: доверительные интервалы средних не пересекаются.
+    """
+    regressions = []
+    for name, current in results.items():
+        base = baseline.get("benchmarks", {}).get(name)
+        if base is None:
+            print(f"{name:<48} нет в базовом результате")
+            continue
+        change = current["p50"] / base["p50"] - 1
+        significant = current["mean"] - current["ci95"] > base["mean"] + base["ci95"]
+        mark = ""
+        if change > tolerance and significant:
+            mark = "  РЕГРЕССИЯ"
+            regressions.append(name)
+        elif change < -tolerance:
+            mark = "  ускорение"
+        print(f"{name:<48} {format_us(base['p50']):>10} -> {format_us(current['p50']):<10} {change:+.1%}{mark}")
+    return regressions
+
+
+def main(args: argparse.Namespace) -> int:
+    # Базовый результат читается до замера: --output может указывать на тот же файл
+    baseline = json.loads(Path(args.compare).read_text("utf-8")) if args.compare else None
+    loop = asyncio.new_event_loop()
+    try:
+        benchmarks = build_benchmarks(loop)
+        results = {}
+        for name, batch in benchmarks.items():
+            if args.filter and not any(part in name for part in args.filter):
+                continue
+            # bcrypt намеренно медленный: серия из одного вызова и не больше 5 повторов
+            repeat = min(args.repeat, 5) if name.startswith("bcrypt.") else args.repeat
+            loops, samples = measure(batch, repeat, args.min_time)
+            results[name] = describe(loops, samples)
+            print_result(name, results[name])
+    finally:
+        loop.close()
+
+    plain, resolved = results.get("deps.request_without_dependencies"), results.get("deps.current_user+todo_item_service")
+    if plain and resolved:
+        overhead = resolved["mean"] - plain["mean"]
+        print(f"{'dependency resolution overhead':<48} {format_us(overhead):>10} на запрос")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps({
+            "meta": {
+                "created_at": datetime.now(timezone.utc).isoformat(),
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "host": platform.node(),
+                "bcrypt_rounds": get_password_context().handler().default_rounds,
+                "repeat": args.repeat,
+                "min_time": args.min_time,
+            },
+            "benchmarks": results,
+        }, indent=2), "utf-8")
+        print(f"Результат записан в {args.output}")
+
+    if baseline is not None:
+        print(f"\nСравнение с {args.compare} (допуск {args.tolerance:.0%}):")
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"Регрессии: {', '.join(regressions)}")
+            return 1
+        print("Регрессий нет")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Микробенчмарки кода на пути каждого запроса")
+    parser.add_argument("--repeat", type=int, default=20, help="Серий на замер")
+    parser.add_argument("--min-time", type=float, default=0.05, help="Минимальная длительность серии, секунды")
+    parser.add_argument("--filter", nargs="*", default=None, help="Только замеры, в имени которых есть подстрока")
+    parser.add_argument("--output", default=None, help="Записать результат в JSON")
+    parser.add_argument("--compare", default=None, help="JSON базового результата для сравнения")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="Допустимое замедление медианы, доля")
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1 @@
+"""Сквозной нагрузочный прогон TaskPilot: сценарии, заполнение данных и заменители внешних сервисов."""
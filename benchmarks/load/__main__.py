@@ -0,0 +1,198 @@
+"""
+Сквозной нагрузочный прогон: сервер, Postgres и Redis, OAuth-провайдеры и SMTP заменены локальными.
+
+Заполняет базу (benchmarks.load.seed), поднимает заменители OAuth и SMTP (benchmarks.load.mocks),
+запускает сервер uvicorn с настройками, направленными на них, и по очереди прогоняет сценарии
+(benchmarks.load.scenarios). Результат — p50/p95/p99 и RPS по сценариям и операциям — пишется в JSON
+и сравнивается с базовым: рост p95/p99 или падение RPS больше --tolerance завершает прогон с кодом 1.
+
+    make docker-u && make mig-up
+    python -m benchmarks.load --concurrency 50 --duration 30 --output load-results.json
+    python -m benchmarks.load --update-baseline          # сохранить результат как базовый
+
+С --url прогон идёт против уже запущенного сервера: его OAuth- и SMTP-настройки нужно направить
+на заменители самостоятельно (python -m benchmarks.load.mocks печатает нужные переменные).
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import httpx
+import uvicorn
+
+from benchmarks.common import print_summary
+from benchmarks.load.mocks import SmtpSink, build_oauth_app, oauth_settings
+from benchmarks.load.scenarios import SCENARIOS, run_scenario
+from benchmarks.load.seed import seed
+
+
+DEFAULT_BASELINE = Path(__file__).with_name("baseline.json")
+
+
+def server_env(oauth_url: str, smtp_host: str, smtp_port: int) -> dict[str, str]:
+    """
+    Окружение запускаемого сервера: внешние сервисы заменены локальными, лимит частоты выключен —
+    все виртуальные пользователи идут с одного адреса.
+    """
+    return {
+        **os.environ,
+        **oauth_settings(oauth_url),
+        "GMAIL_SMTP_HOST": smtp_host,
+        "GMAIL_SMTP_PORT": str(smtp_port),
+        "GMAIL_SMTP_START_TLS": "false",
+        "RATE_LIMIT_ENABLED": "false",
+    }
+
+
+async def wait_ready(client: httpx.AsyncClient, timeout: float = 60.0) -> None:
+    """
+    Дождаться конца прогрева сервера: замер не должен включать холодные первые запросы.
+    """
+    deadline = time.perf_counter() + timeout
+    while True:
+        try:
+            if (await client.get("/ready")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        if time.perf_counter() > deadline:
+            raise RuntimeError("Сервер не стал готов (GET /ready) за отведённое время")
+        await asyncio.sleep(0.2)
+
+
+def compare(result: dict, baseline: dict, tolerance: float) -> list[str]:
+    """
+    Регрессии относительно базового результата: падение RPS, рост p95/p99 больше tolerance
+    и новые ошибки. Сценарии, которых нет в базовом результате, не сравниваются.
+    """
+    regressions = []
+    for name, current in result["scenarios"].items():
+        base = baseline.get("scenarios", {}).get(name)
+        if base is None:
+            continue
+        if current["rps"] < base["rps"] * (1 - tolerance):
+            regressions.append(f"{name}: RPS {current['rps']:.1f} < {base['rps']:.1f}")
+        if current["latency_ms"] and base["latency_ms"]:
+            for key in ("p95", "p99"):
+                if current["latency_ms"][key] > base["latency_ms"][key] * (1 + tolerance):
+                    regressions.append(
+                        f"{name}: {key} {current['latency_ms'][key]:.2f}ms > {base['latency_ms'][key]:.2f}ms"
+                    )
+        if current["errors"] and current["errors"] / current["requests"] > base["errors"] / max(base["requests"], 1):
+            regressions.append(f"{name}: ошибок {current['errors']} из {current['requests']}")
+    return regressions
+
+
+async def run(args: argparse.Namespace) -> dict:
+    users = await seed(args.users, args.items_per_user)
+    print(f"Создано {args.users} пользователей по {args.items_per_user} задач")
+
+    sink = SmtpSink(host=args.mock_host, port=args.smtp_port)
+    await sink.start()
+    oauth_server = uvicorn.Server(uvicorn.Config(
+        build_oauth_app(args.oauth_latency_ms), host=args.mock_host, port=args.oauth_port,
+        log_level="warning", access_log=False
+    ))
+    oauth_task = asyncio.create_task(oauth_server.serve())
+
+    url = args.url or f"http://127.0.0.1:{args.port}"
+    server = None
+    if args.url is None:
+        env = server_env(f"http://{args.mock_host}:{args.oauth_port}", args.mock_host, args.smtp_port)
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(args.port),
+             "--workers", str(args.workers), "--log-level", "warning", "--no-access-log"],
+            env=env
+        )
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    try:
+        async with httpx.AsyncClient(base_url=url, limits=limits, timeout=30.0, follow_redirects=False) as client:
+            await wait_ready(client)
+            scenarios = {}
+            for name in args.scenarios:
+                scenarios[name] = await run_scenario(
+                    name, client, users, args.concurrency, args.duration, args.warmup
+                )
+                current = scenarios[name]
+                print(f"{name}: {current['requests']} запросов, {current['rps']:.1f} RPS, ошибок {current['errors']}")
+                for operation, stats in current["operations"].items():
+                    if stats["latency_ms"]:
+                        print_summary(f"  {operation}", stats["latency_ms"])
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+        oauth_server.should_exit = True
+        await oauth_task
+        await sink.stop()
+
+    return {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "host": platform.node(),
+            "url": url,
+            "workers": None if args.url else args.workers,
+            "concurrency": args.concurrency,
+            "duration": args.duration,
+            "warmup": args.warmup,
+            "users": args.users,
+            "items_per_user": args.items_per_user,
+            "oauth_latency_ms": args.oauth_latency_ms,
+            "emails_sent": sink.messages,
+        },
+        "scenarios": scenarios,
+    }
+
+
+def main(args: argparse.Namespace) -> int:
+    result = asyncio.run(run(args))
+    if args.output:
+        Path(args.output).write_text(json.dumps(result, ensure_ascii=False, indent=2), "utf-8")
+        print(f"Результат записан в {args.output}")
+
+    baseline_path = Path(args.baseline)
+    if args.update_baseline:
+        baseline_path.write_text(json.dumps(result, ensure_ascii=False, indent=2), "utf-8")
+        print(f"Базовый результат обновлён: {baseline_path}")
+        return 0
+    if not baseline_path.is_file():
+        print(f"Базового результата нет ({baseline_path}), сравнение пропущено")
+        return 0
+    regressions = compare(result, json.loads(baseline_path.read_text("utf-8")), args.tolerance)
+    for regression in regressions:
+        print(f"Регрессия: {regression}")
+    if not regressions:
+        print(f"Регрессий относительно {baseline_path} нет (допуск {args.tolerance:.0%})")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Сквозной нагрузочный прогон TaskPilot")
+    parser.add_argument("--url", default=None, help="Адрес запущенного сервера; по умолчанию сервер запускается сам")
+    parser.add_argument("--port", type=int, default=8100, help="Порт запускаемого сервера")
+    parser.add_argument("--workers", type=int, default=1, help="Процессов запускаемого сервера")
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS), help="Сценарии")
+    parser.add_argument("--concurrency", type=int, default=50, help="Виртуальных пользователей")
+    parser.add_argument("--duration", type=float, default=30.0, help="Длительность замера сценария, секунды")
+    parser.add_argument("--warmup", type=float, default=5.0, help="Прогрев сценария без записи, секунды")
+    parser.add_argument("--users", type=int, default=200, help="Пользователей в базе")
+    parser.add_argument("--items-per-user", type=int, default=200, help="Задач у каждого пользователя")
+    parser.add_argument("--mock-host", default="127.0.0.1", help="Адрес заменителей OAuth и SMTP")
+    parser.add_argument("--oauth-port", type=int, default=9800, help="Порт заменителя OAuth-провайдеров")
+    parser.add_argument("--smtp-port", type=int, default=2525, help="Порт SMTP-приёмника")
+    parser.add_argument("--oauth-latency-ms", type=float, default=50.0, help="Задержка ответа OAuth-провайдера")
+    parser.add_argument("--output", default="load-results.json", help="Файл результата")
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE), help="Файл базового результата")
+    parser.add_argument("--update-baseline", action="store_true", help="Сохранить результат как базовый")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Допустимое ухудшение, доля")
+    sys.exit(main(parser.parse_args()))
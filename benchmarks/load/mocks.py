@@ -0,0 +1,179 @@
+"""
+Локальные заменители внешних сервисов для нагрузочных прогонов.
+
+- OAuth-провайдеры: эндпоинты токенов и данных пользователя Google, Yandex и VK.
+  Код авторизации определяет пользователя: код ``user-17`` у Google превращается
+  в токен ``google:user-17`` и email ``user-17@google.load``, поэтому повторный вход тем же
+  кодом находит существующего пользователя, а новый код создаёт нового.
+- SMTP-приёмник: принимает письма (EHLO, AUTH, MAIL, RCPT, DATA) и только считает их.
+
+Задержка ответа провайдера (--oauth-latency-ms) имитирует сеть до настоящего сервиса.
+
+    python -m benchmarks.load.mocks --oauth-port 9800 --smtp-port 2525
+"""
+
+import argparse
+import asyncio
+import zlib
+from dataclasses import dataclass
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+
+def _bearer(request: Request, scheme: str = "Bearer") -> str:
+    authorization = request.headers.get("authorization", "")
+    prefix = f"{scheme} "
+    return authorization[len(prefix):] if authorization.startswith(prefix) else ""
+
+
+def oauth_settings(base_url: str) -> dict[str, str]:
+    """
+    Переменные окружения сервера, направляющие OAuth-клиенты на заменитель по адресу base_url.
+    """
+    return {
+        "GOOGLE_TOKEN_URL": f"{base_url}/google/token",
+        "GOOGLE_USER_INFO_URL": f"{base_url}/google/userinfo",
+        "YANDEX_TOKEN_URL": f"{base_url}/yandex/token",
+        "YANDEX_USER_INFO_URL": f"{base_url}/yandex/info",
+        "VK_TOKEN_URL": f"{base_url}/vk/token",
+        "VK_USER_INFO_URL": f"{base_url}/vk/users.get",
+    }
+
+
+def build_oauth_app(latency_ms: float = 0.0) -> Starlette:
+    """
+    ASGI-приложение с эндпоинтами провайдеров в форматах, которые разбирают клиенты app.auth.client.
+    """
+    latency = latency_ms / 1000
+
+    async def delay() -> None:
+        if latency:
+            await asyncio.sleep(latency)
+
+    async def token(request: Request) -> JSONResponse:
+        await delay()
+        form = await request.form()
+        provider = request.path_params["provider"]
+        code = form.get("code", "")
+        if not code:
+            return JSONResponse({"error": "invalid_grant"}, status_code=400)
+        payload = {"access_token": f"{provider}:{code}", "token_type": "bearer", "expires_in": 3600}
+        if provider == "vk":
+            payload.update(user_id=zlib.crc32(code.encode()), email=f"{code}@vk.load")
+        return JSONResponse(payload)
+
+    async def google_userinfo(request: Request) -> JSONResponse:
+        await delay()
+        access_token = _bearer(request)
+        if not access_token.startswith("google:"):
+            return JSONResponse({"error": "invalid_token"}, status_code=401)
+        code = access_token.removeprefix("google:")
+        return JSONResponse({"id": code, "email": f"{code}@google.load", "verified_email": True, "name": code})
+
+    async def yandex_info(request: Request) -> JSONResponse:
+        await delay()
+        access_token = _bearer(request, scheme="OAuth")
+        if not access_token.startswith("yandex:"):
+            return JSONResponse({"error": "invalid_token"}, status_code=401)
+        code = access_token.removeprefix("yandex:")
+        return JSONResponse({"id": code, "login": code, "default_email": f"{code}@yandex.load"})
+
+    async def vk_users_get(request: Request) -> JSONResponse:
+        await delay()
+        access_token = request.query_params.get("access_token", "")
+        if not access_token.startswith("vk:"):
+            return JSONResponse({"error": {"error_code": 5, "error_msg": "User authorization failed"}})
+        code = access_token.removeprefix("vk:")
+        return JSONResponse({"response": [{"id": request.query_params.get("user_ids"), "first_name": code,
+                                           "last_name": "Load"}]})
+
+    return Starlette(routes=[
+        Route("/{provider:str}/token", token, methods=["POST"]),
+        Route("/google/userinfo", google_userinfo),
+        Route("/yandex/info", yandex_info),
+        Route("/vk/users.get", vk_users_get),
+    ])
+
+
+@dataclass
+class SmtpSink:
+    """
+    SMTP-приёмник писем: отвечает успехом на всё и считает принятые письма.
+    STARTTLS не поддерживается — сервер запускается с GMAIL_SMTP_START_TLS=false.
+    """
+    host: str = "127.0.0.1"
+    port: int = 2525
+    messages: int = 0
+    _server: asyncio.Server | None = None
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        async def reply(line: str) -> None:
+            writer.write(line.encode() + b"\r\n")
+            await writer.drain()
+
+        await reply("220 load.local ESMTP sink")
+        try:
+            while line := await reader.readline():
+                command = line.decode("latin-1").strip()
+                verb = command.split(" ", 1)[0].upper()
+                if verb == "EHLO":
+                    writer.write(b"250-load.local\r\n250-AUTH PLAIN\r\n250-8BITMIME\r\n")
+                    await reply("250 SIZE 10485760")
+                elif verb == "AUTH":
+                    await reply("235 2.7.0 Authentication successful")
+                elif verb == "DATA":
+                    await reply("354 End data with <CR><LF>.<CR><LF>")
+                    while (await reader.readline()) not in (b".\r\n", b""):
+                        pass
+                    self.messages += 1
+                    await reply("250 2.0.0 Ok: queued")
+                elif verb == "QUIT":
+                    await reply("221 2.0.0 Bye")
+                    break
+                else:
+                    # HELO, MAIL, RCPT, RSET, NOOP
+                    await reply("250 2.0.0 Ok")
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+async def serve_oauth(host: str, port: int, latency_ms: float) -> None:
+    config = uvicorn.Config(build_oauth_app(latency_ms), host=host, port=port, log_level="warning", access_log=False)
+    await uvicorn.Server(config).serve()
+
+
+async def main(host: str, oauth_port: int, smtp_port: int, latency_ms: float) -> None:
+    sink = SmtpSink(host=host, port=smtp_port)
+    await sink.start()
+    print(f"OAuth: http://{host}:{oauth_port}, SMTP: {host}:{smtp_port}")
+    for name, value in oauth_settings(f"http://{host}:{oauth_port}").items():
+        print(f"{name}={value}")
+    try:
+        await serve_oauth(host, oauth_port, latency_ms)
+    finally:
+        await sink.stop()
+        print(f"Принято писем: {sink.messages}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Локальные OAuth-провайдеры и SMTP-приёмник")
+    parser.add_argument("--host", default="127.0.0.1", help="Адрес для прослушивания")
+    parser.add_argument("--oauth-port", type=int, default=9800, help="Порт OAuth-провайдеров")
+    parser.add_argument("--smtp-port", type=int, default=2525, help="Порт SMTP-приёмника")
+    parser.add_argument("--oauth-latency-ms", type=float, default=0.0, help="Задержка ответа провайдера")
+    args = parser.parse_args()
+    asyncio.run(main(args.host, args.oauth_port, args.smtp_port, args.oauth_latency_ms))
@@ -0,0 +1,210 @@
+"""
+Сценарии нагрузочного прогона.
+
+Сценарий — одна итерация виртуального пользователя; прогон держит --concurrency пользователей,
+каждый выполняет итерации без пауз (закрытая модель нагрузки), пока не истечёт время.
+Задержка записывается по каждой операции сценария отдельно: вход, список, изменения и т. д.
+"""
+
+import asyncio
+import random
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable
+from urllib.parse import parse_qs, urlsplit
+from uuid import uuid4
+
+import httpx
+
+from benchmarks.common import summarize
+from benchmarks.load.seed import LOAD_EMAIL_DOMAIN, LOAD_PASSWORD, LoadUser
+
+
+API = "/api/v1"
+
+# Коды авторизации OAuth-заменителя: повторный код входит существующим пользователем, новый — создаёт его
+OAUTH_CODES = 1000
+
+
+@dataclass
+class ScenarioStats:
+    """Задержки успешных запросов и число ошибок по операциям; до начала замера ничего не пишется."""
+    recording: bool = False
+    latencies_ms: dict[str, list[float]] = field(default_factory=lambda: defaultdict(list))
+    errors: dict[str, int] = field(default_factory=lambda: defaultdict(int))
+
+    def record(self, operation: str, elapsed_ms: float, ok: bool) -> None:
+        if not self.recording:
+            return
+        if ok:
+            self.latencies_ms[operation].append(elapsed_ms)
+        else:
+            self.errors[operation] += 1
+
+    def result(self, duration: float) -> dict:
+        operations = {}
+        for operation in sorted(set(self.latencies_ms) | set(self.errors)):
+            samples = self.latencies_ms.get(operation, [])
+            requests = len(samples) + self.errors.get(operation, 0)
+            operations[operation] = {
+                "requests": requests,
+                "errors": self.errors.get(operation, 0),
+                "rps": requests / duration,
+                "latency_ms": summarize(samples) if samples else None,
+            }
+        samples = [sample for values in self.latencies_ms.values() for sample in values]
+        requests = len(samples) + sum(self.errors.values())
+        return {
+            "duration": duration,
+            "requests": requests,
+            "errors": sum(self.errors.values()),
+            "rps": requests / duration,
+            "latency_ms": summarize(samples) if samples else None,
+            "operations": operations,
+        }
+
+
+@dataclass
+class VirtualUser:
+    """Виртуальный пользователь: свой пользователь из заполненных данных, токен и токен синхронизации."""
+    client: httpx.AsyncClient
+    user: LoadUser
+    stats: ScenarioStats
+    rnd: random.Random
+    token: str | None = None
+    sync_token: str | None = None
+
+    @property
+    def headers(self) -> dict[str, str]:
+        return {"Authorization": f"Bearer {self.token}"}
+
+    async def request(self, operation: str, method: str, url: str, expected: int = 200, **kwargs) -> httpx.Response | None:
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            self.stats.record(operation, (time.perf_counter() - started) * 1000, ok=False)
+            return None
+        ok = response.status_code == expected
+        self.stats.record(operation, (time.perf_counter() - started) * 1000, ok=ok)
+        return response if ok else None
+
+    async def login(self) -> str | None:
+        response = await self.request(
+            "login", "POST", f"{API}/auth/login", params={"minutes": 120},
+            data={"username": self.user.username, "password": LOAD_PASSWORD}
+        )
+        self.token = response.json()["access_token"] if response is not None else None
+        return self.token
+
+    async def ensure_login(self) -> bool:
+        return self.token is not None or await self.login() is not None
+
+
+async def login_storm(vu: VirtualUser) -> None:
+    """Вход по паролю: проверка bcrypt и выпуск JWT."""
+    await vu.login()
+
+
+async def list_polling(vu: VirtualUser) -> None:
+    """Клиент, опрашивающий список: первая страница списка и дельта изменений."""
+    if not await vu.ensure_login():
+        return
+    await vu.request("list", "GET", f"{API}/todo_items/all", params={"limit": 100}, headers=vu.headers)
+    params = {"since": vu.sync_token} if vu.sync_token else {}
+    response = await vu.request("changes", "GET", f"{API}/todo_items/changes", params=params, headers=vu.headers)
+    if response is not None:
+        vu.sync_token = response.json()["next_token"]
+
+
+async def write_sync(vu: VirtualUser) -> None:
+    """Синхронизирующий клиент: создание, правка и удаление задачи с If-Match, затем дельта изменений."""
+    if not await vu.ensure_login():
+        return
+    created = await vu.request(
+        "create", "POST", f"{API}/todo_items/", expected=201, headers=vu.headers,
+        json={"title": f"Нагрузка {uuid4().hex[:8]}", "category_name": vu.rnd.choice(["work", "personal"])}
+    )
+    if created is None:
+        return
+    item_id = created.json()["id"]
+    updated = await vu.request(
+        "update", "PATCH", f"{API}/todo_items/{item_id}",
+        headers={**vu.headers, "If-Match": created.headers["etag"]}, json={"completed": True}
+    )
+    if updated is not None:
+        await vu.request(
+            "delete", "DELETE", f"{API}/todo_items/{item_id}",
+            headers={**vu.headers, "If-Match": updated.headers["etag"]}
+        )
+    params = {"since": vu.sync_token} if vu.sync_token else {}
+    response = await vu.request("changes", "GET", f"{API}/todo_items/changes", params=params, headers=vu.headers)
+    if response is not None:
+        vu.sync_token = response.json()["next_token"]
+
+
+async def oauth_flood(vu: VirtualUser) -> None:
+    """Вход через OAuth: редирект на провайдера с новым state и колбэк с кодом от заменителя провайдера."""
+    provider = vu.rnd.choice(["google", "yandex", "vk"])
+    redirect = await vu.request("oauth_redirect", "GET", f"{API}/auth/login/{provider}", expected=307)
+    if redirect is None:
+        return
+    state = parse_qs(urlsplit(redirect.headers["location"]).query)["state"][0]
+    code = f"oauth-{vu.rnd.randrange(OAUTH_CODES)}"
+    await vu.request("oauth_callback", "GET", f"{API}/auth/login/{provider}/callback", params={"code": code, "state": state})
+
+
+async def register(vu: VirtualUser) -> None:
+    """Регистрация: хеширование пароля, создание пользователя и письмо подтверждения в SMTP-приёмник."""
+    suffix = uuid4().hex[:12]
+    await vu.request(
+        "register", "POST", f"{API}/user/register", expected=201,
+        json={"username": f"reg_{suffix}", "email": f"reg_{suffix}@register{LOAD_EMAIL_DOMAIN}", "password": LOAD_PASSWORD}
+    )
+
+
+SCENARIOS: dict[str, Callable[[VirtualUser], Awaitable[None]]] = {
+    "login_storm": login_storm,
+    "list_polling": list_polling,
+    "write_sync": write_sync,
+    "oauth_flood": oauth_flood,
+    "register": register,
+}
+
+
+async def run_scenario(
+        name: str,
+        client: httpx.AsyncClient,
+        users: list[LoadUser],
+        concurrency: int,
+        duration: float,
+        warmup: float,
+        seed_value: int = 42
+) -> dict:
+    """
+    Прогнать сценарий: warmup секунд без записи (соединения, кеши, планы запросов), затем duration секунд замера.
+    """
+    scenario = SCENARIOS[name]
+    stats = ScenarioStats()
+    stop = asyncio.Event()
+    virtual_users = [
+        VirtualUser(client=client, user=users[number % len(users)], stats=stats, rnd=random.Random(seed_value + number))
+        for number in range(concurrency)
+    ]
+
+    async def loop(vu: VirtualUser) -> None:
+        while not stop.is_set():
+            await scenario(vu)
+
+    tasks = [asyncio.create_task(loop(vu)) for vu in virtual_users]
+    await asyncio.sleep(warmup)
+    stats.recording = True
+    started = time.perf_counter()
+    await asyncio.sleep(duration)
+    stats.recording = False
+    measured = time.perf_counter() - started
+    stop.set()
+    # Итерации, начатые до конца замера, доходят до конца, но уже не записываются
+    await asyncio.gather(*tasks)
+    return stats.result(measured)
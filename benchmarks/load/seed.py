@@ -0,0 +1,124 @@
+"""
+Подготовка Postgres и Redis к нагрузочному прогону.
+
+Удаляет данные прошлых прогонов (пользователей с email в домене .load, их задачи удаляются каскадом),
+создаёт --users пользователей load_user_<n> с паролем LOAD_PASSWORD и по --items-per-user задач у каждого,
+очищает ключи приложения в Redis: кеш списков, лимиты, ключи идемпотентности и state OAuth.
+
+    python -m benchmarks.load.seed --users 200 --items-per-user 200
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from uuid import UUID, uuid4
+
+from redis.asyncio import Redis
+from sqlalchemy import delete, insert, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.auth.auth_service import get_password_context
+from app.database.models import CategoryName, User
+from app.settings import settings
+from benchmarks.common import ensure_category, seed_todo_items
+
+
+LOAD_PASSWORD = "LoadPass123!"
+
+# Домен email всех пользователей прогона: сидированных, зарегистрированных и вошедших через OAuth
+LOAD_EMAIL_DOMAIN = ".load"
+
+# Ключи Redis, которые прогон создаёт или от которых зависит
+REDIS_PREFIXES = ("todo_cache:", "rate_limit:", "idempotency:", "oauth_state:", "email_confirm:")
+
+
+@dataclass
+class LoadUser:
+    id: UUID
+    username: str
+
+
+async def reset_redis(redis: Redis) -> int:
+    """
+    Удалить ключи приложения, оставшиеся от прошлых прогонов.
+    """
+    removed = 0
+    for prefix in REDIS_PREFIXES:
+        batch = [key async for key in redis.scan_iter(match=f"{prefix}*", count=1000)]
+        for start in range(0, len(batch), 1000):
+            removed += await redis.delete(*batch[start:start + 1000])
+    return removed
+
+
+async def seed(users: int, items_per_user: int, seed_value: int = 42) -> list[LoadUser]:
+    """
+    Пересоздать пользователей и задачи прогона; возвращает созданных пользователей.
+    """
+    rnd = random.Random(seed_value)
+    engine = create_async_engine(settings.DATABASE_URL, echo=False)
+    session_maker = async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
+    # Один хеш на всех: bcrypt на каждого пользователя занял бы минуты
+    hashed_password = get_password_context().hash(LOAD_PASSWORD)
+    load_users = [LoadUser(id=uuid4(), username=f"load_user_{number}") for number in range(users)]
+    try:
+        async with session_maker() as session:
+            await session.execute(delete(User).where(User.email.like(f"%{LOAD_EMAIL_DOMAIN}")))
+            await session.commit()
+            category_ids = [await ensure_category(session, name) for name in CategoryName]
+            await session.execute(insert(User), [
+                {
+                    "id": user.id,
+                    "username": user.username,
+                    "email": f"{user.username}@seed{LOAD_EMAIL_DOMAIN}",
+                    "hashed_password": hashed_password,
+                    "is_active": True,
+                    "is_admin": False,
+                }
+                for user in load_users
+            ])
+            await session.commit()
+
+            now = datetime.now()
+            today = date.today()
+            for user in load_users:
+                rows = [
+                    {
+                        "title": f"Задача {number} пользователя {user.username}",
+                        "category_id": rnd.choice(category_ids),
+                        "completed": rnd.random() < 0.3,
+                        "date_of_execution": today + timedelta(days=rnd.randint(-30, 60)) if rnd.random() < 0.5 else None,
+                        "created_at": now - timedelta(minutes=number),
+                    }
+                    for number in range(items_per_user)
+                ]
+                await seed_todo_items(session, user.id, rows)
+            await session.execute(text("ANALYZE users"))
+            await session.execute(text("ANALYZE todo_items"))
+            await session.commit()
+    finally:
+        await engine.dispose()
+
+    redis = Redis.from_url(settings.REDIS_URL)
+    try:
+        await reset_redis(redis)
+    finally:
+        await redis.aclose()
+    return load_users
+
+
+async def main(users: int, items_per_user: int, seed_value: int) -> None:
+    started = time.perf_counter()
+    await seed(users, items_per_user, seed_value)
+    print(f"Создано {users} пользователей и {users * items_per_user} задач за {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Подготовка данных нагрузочного прогона")
+    parser.add_argument("--users", type=int, default=200, help="Количество пользователей")
+    parser.add_argument("--items-per-user", type=int, default=200, help="Задач у каждого пользователя")
+    parser.add_argument("--seed", type=int, default=42, help="Зерно генератора данных")
+    args = parser.parse_args()
+    asyncio.run(main(args.users, args.items_per_user, args.seed))
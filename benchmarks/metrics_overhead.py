@@ -0,0 +1,134 @@
+"""
+Накладные расходы метрик Prometheus.
+
+Без базы данных и Redis, в одном процессе измеряет:
+- запрос к маршруту с параметром пути через ASGI-приложение без MetricsMiddleware и с ним;
+- вызов метода репозитория без обёртки instrumented и с ней;
+- наблюдение в гистограмму (как в InstrumentedRedis и InstrumentedTransport);
+- сбор всех метрик процесса для /metrics.
+
+    python -m benchmarks.metrics_overhead --requests 20000
+"""
+
+import argparse
+import asyncio
+import time
+from dataclasses import dataclass
+
+from fastapi import FastAPI
+from prometheus_client import generate_latest
+
+from app.instrumentation import instrumented
+from app.metrics import REDIS_COMMAND_DURATION
+from app.middleware.metrics import MetricsMiddleware
+from benchmarks.common import summarize
+
+
+def print_us(name: str, samples_s: list[float]) -> float:
+    """
+    Вывести сводку по задержкам в микросекундах и вернуть среднее.
+    """
+    summary = summarize([sample * 1_000_000 for sample in samples_s])
+    print(f"{name:<40} mean={summary['mean']:.2f}us p50={summary['p50']:.2f}us p99={summary['p99']:.2f}us")
+    return summary["mean"]
+
+
+def build_app(with_metrics: bool) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/api/v1/todo_items/{todo_item_id}")
+    async def get_todo_item(todo_item_id: str):
+        return {"id": todo_item_id}
+
+    if with_metrics:
+        app.add_middleware(MetricsMiddleware, routes=app.routes)
+    return app
+
+
+async def call(app: FastAPI, path: str) -> None:
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "root_path": "", "query_string": b"",
+        "headers": [(b"host", b"bench")], "client": ("127.0.0.1", 1), "server": ("bench", 80),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    await app(scope, receive, send)
+
+
+async def bench_http(requests: int) -> None:
+    results = {}
+    for with_metrics in (False, True):
+        app = build_app(with_metrics)
+        for i in range(500):
+            await call(app, f"/api/v1/todo_items/{i}")
+        samples = []
+        for i in range(requests):
+            start = time.perf_counter()
+            await call(app, f"/api/v1/todo_items/{i}")
+            samples.append(time.perf_counter() - start)
+        results[with_metrics] = print_us(f"http {'with' if with_metrics else 'without'} metrics", samples)
+    print(f"{'http overhead':<40} {results[True] - results[False]:.2f}us на запрос")
+
+
+@dataclass
+class PlainRepository:
+    async def get(self) -> int:
+        return 1
+
+
+@instrumented
+@dataclass
+class InstrumentedRepository:
+    async def get(self) -> int:
+        return 1
+
+
+async def bench_repository(calls: int) -> None:
+    results = {}
+    for name, repository in (("plain", PlainRepository()), ("instrumented", InstrumentedRepository())):
+        samples = []
+        for _ in range(calls):
+            start = time.perf_counter()
+            await repository.get()
+            samples.append(time.perf_counter() - start)
+        results[name] = print_us(f"repository method {name}", samples)
+    print(f"{'repository overhead':<40} {results['instrumented'] - results['plain']:.2f}us на вызов")
+
+
+def bench_observe(calls: int) -> None:
+    histogram = REDIS_COMMAND_DURATION.labels("GET")
+    samples = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        histogram.observe(0.0005)
+        samples.append(time.perf_counter() - start)
+    print_us("histogram observe", samples)
+
+
+def bench_scrape(scrapes: int) -> None:
+    samples, size = [], 0
+    for _ in range(scrapes):
+        start = time.perf_counter()
+        size = len(generate_latest())
+        samples.append(time.perf_counter() - start)
+    print_us(f"scrape /metrics ({size // 1024} KiB)", samples)
+
+
+async def main(requests: int) -> None:
+    await bench_http(requests)
+    await bench_repository(requests * 5)
+    bench_observe(requests * 5)
+    bench_scrape(100)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Накладные расходы метрик Prometheus")
+    parser.add_argument("--requests", type=int, default=20000, help="Количество запросов на вариант")
+    args = parser.parse_args()
+    asyncio.run(main(args.requests))
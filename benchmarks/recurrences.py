@@ -0,0 +1,103 @@
+"""
+Бенчмарк генератора повторяющихся задач.
+
+Создаёт --rules правил повторения, из которых только --due попадают в горизонт
+генерации (у остальных next_occurrence через год), и измеряет проход генератора.
+Время прохода должно зависеть от числа новых задач, а не от общего числа правил:
+сравните запуски с разным --rules при одинаковом --due. Второй проход по тем же
+датам проверяет идемпотентность: он не должен создать ни одной задачи.
+
+    python -m benchmarks.recurrences --rules 100000 --due 1000
+"""
+
+import argparse
+import asyncio
+import time
+from datetime import date, datetime, timedelta
+from uuid import uuid4
+
+from sqlalchemy import delete, insert, text, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.database.models import RecurrenceFrequency, TodoRecurrence, User
+from app.repositories.todo_recurrence import TodoRecurrenceRepository
+from app.service.todo_recurrence import TodoRecurrenceService
+from app.settings import settings
+from benchmarks.common import create_bench_user, ensure_category
+
+
+async def generate(session: AsyncSession, batch_size: int) -> tuple[int, float]:
+    """
+    Полный проход генератора; возвращает количество созданных задач и время в секундах.
+    """
+    service = TodoRecurrenceService(repository=TodoRecurrenceRepository(session))
+    today = date.today()
+    horizon = today + timedelta(days=settings.TODO_RECURRENCE_HORIZON_DAYS)
+    created = 0
+    started = time.perf_counter()
+    while True:
+        recurrences = await service.repository.claim_due(horizon, batch_size)
+        created += len(await service.materialize(recurrences, today))
+        if len(recurrences) < batch_size:
+            return created, time.perf_counter() - started
+
+
+async def main(rules: int, due: int, users: int, batch_size: int) -> None:
+    engine = create_async_engine(settings.DATABASE_URL, echo=False)
+    session_maker = async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
+    today = date.today()
+
+    async with session_maker() as session:
+        category_id = await ensure_category(session)
+        user_ids = [await create_bench_user(session, prefix="recurrences") for _ in range(users)]
+        frequencies = list(RecurrenceFrequency)
+        now = datetime.now()
+        rows = [
+            {
+                "id": uuid4(),
+                "title": f"recurrence {i}",
+                "frequency": frequencies[i % len(frequencies)],
+                "interval": 1,
+                "starts_on": today,
+                "next_occurrence": today if i < due else today + timedelta(days=365),
+                "created_at": now,
+                "category_id": category_id,
+                "user_id": user_ids[i % users],
+            }
+            for i in range(rules)
+        ]
+        started = time.perf_counter()
+        for start in range(0, len(rows), 5000):
+            await session.execute(insert(TodoRecurrence), rows[start:start + 5000])
+            await session.commit()
+        await session.execute(text("ANALYZE todo_recurrences"))
+        await session.commit()
+        print(f"Создано {rules} правил ({due} в горизонте) за {time.perf_counter() - started:.1f}s")
+
+        created, elapsed = await generate(session, batch_size)
+        print(f"Первый проход: {created} задач за {elapsed:.2f}s ({created / elapsed:.0f} задач/с)")
+
+        # Возвращаем правила к исходной дате: все даты уже созданы, ON CONFLICT их пропускает
+        due_ids = [row["id"] for row in rows[:due]]
+        await session.execute(
+            update(TodoRecurrence).where(TodoRecurrence.id.in_(due_ids)).values(next_occurrence=today)
+        )
+        await session.commit()
+        repeated, elapsed = await generate(session, batch_size)
+        print(f"Повторный проход: {repeated} задач за {elapsed:.2f}s")
+
+        await session.execute(delete(User).where(User.id.in_(user_ids)))
+        await session.commit()
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Бенчмарк генератора повторяющихся задач")
+    parser.add_argument("--rules", type=int, default=100000, help="Всего правил повторения")
+    parser.add_argument("--due", type=int, default=1000, help="Правил с повторениями в горизонте")
+    parser.add_argument("--users", type=int, default=100, help="Количество пользователей")
+    parser.add_argument("--batch-size", type=int, default=settings.TODO_RECURRENCE_BATCH_SIZE,
+                        help="Правил в одной транзакции")
+    args = parser.parse_args()
+    asyncio.run(main(args.rules, args.due, args.users, args.batch_size))
@@ -0,0 +1,89 @@
+"""
+Бенчмарк пропускной способности напоминаний о сроках задач.
+
+Создаёт пользователей с задачами на один день и разбирает очередь
+несколькими параллельными обработчиками (как несколько воркеров) с
+отправителем-заглушкой. Проверяет, что ни одна задача не выбрана дважды.
+День берётся далеко в будущем, чтобы не задеть напоминания реальных задач.
+
+    python -m benchmarks.reminders --users 100 --items 10000 --workers 4
+"""
+
+import argparse
+import asyncio
+import time
+from collections import Counter
+from datetime import date, datetime, timedelta
+from typing import Sequence
+
+from sqlalchemy import Row, delete, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.database.models import User
+from app.service.email import ReminderDelivery
+from app.settings import settings
+from app.workers.reminders import process_due_reminders
+from benchmarks.common import create_bench_user, ensure_category, seed_todo_items
+
+
+async def main(users: int, items: int, workers: int, batch_size: int) -> None:
+    engine = create_async_engine(settings.DATABASE_URL, echo=False, pool_size=workers + 1)
+    session_maker = async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
+    day = date(2100, 1, 1) + timedelta(days=int(time.time()) % 10000)
+
+    user_ids = []
+    async with session_maker() as session:
+        category_id = await ensure_category(session)
+        now = datetime.now()
+        started = time.perf_counter()
+        for number in range(users):
+            user_id = await create_bench_user(session, prefix="reminders")
+            user_ids.append(user_id)
+            rows = [
+                {"title": f"reminder {number}-{i}", "category_id": category_id,
+                 "completed": False, "created_at": now, "date_of_execution": day}
+                for i in range(items // users)
+            ]
+            await seed_todo_items(session, user_id, rows)
+        await session.execute(text("ANALYZE todo_items"))
+        await session.commit()
+        print(f"Создано {users} пользователей и {items // users * users} задач за {time.perf_counter() - started:.1f}s")
+
+    claimed = Counter()
+    batches = []
+
+    async def send(reminders: Sequence[Row]) -> ReminderDelivery:
+        claimed.update(reminder.id for reminder in reminders)
+        batches.append(len(reminders))
+        return ReminderDelivery()
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(
+        process_due_reminders(session_maker, send, today=day, batch_size=batch_size, lead_days=0, lookback_days=0)
+        for _ in range(workers)
+    ))
+    elapsed = time.perf_counter() - started
+
+    sent = sum(results)
+    duplicates = sum(1 for count in claimed.values() if count > 1)
+    print(
+        f"Обработчиков: {workers}, пачка: {batch_size}, пачек: {len(batches)}\n"
+        f"Напоминаний: {sent} за {elapsed:.2f}s ({sent / elapsed:.0f} задач/с, "
+        f"{sent / elapsed * 86400 / 1_000_000:.1f}M в сутки), повторных выборок: {duplicates}"
+    )
+
+    async with session_maker() as session:
+        await session.execute(delete(User).where(User.id.in_(user_ids)))
+        await session.commit()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Бенчмарк напоминаний о сроках задач")
+    parser.add_argument("--users", type=int, default=100, help="Количество пользователей")
+    parser.add_argument("--items", type=int, default=10000, help="Количество задач со сроком")
+    parser.add_argument("--workers", type=int, default=4, help="Параллельных обработчиков")
+    parser.add_argument("--batch-size", type=int, default=settings.TODO_REMINDER_BATCH_SIZE,
+                        help="Задач в одной транзакции выборки")
+    args = parser.parse_args()
+    asyncio.run(main(args.users, args.items, args.workers, args.batch_size))
@@ -0,0 +1,121 @@
+"""
+Нагрузочный тест потока событий задач: много простаивающих SSE-соединений.
+
+Открывает --connections соединений GET /todo_items/events к запущенному серверу
+(пользователи распределяются по соединениям по кругу), измеряет время установки
+соединений, затем создаёт по задаче у --writes пользователей и измеряет задержку
+доставки события всем соединениям пользователя. С --server-pid выводит прирост
+памяти процесса сервера на одно соединение.
+
+    ulimit -n 65535
+    uvicorn app.main:app --workers 1 &
+    python -m benchmarks.sse_idle --url http://127.0.0.1:8000 --connections 10000 --users 100
+"""
+
+import argparse
+import asyncio
+import time
+from collections import defaultdict
+from uuid import uuid4
+
+import httpx
+
+from benchmarks.common import print_summary, summarize
+
+
+def rss_kb(pid: int) -> int:
+    with open(f"/proc/{pid}/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    return 0
+
+
+async def login(client: httpx.AsyncClient) -> str:
+    suffix = uuid4().hex[:12]
+    email, password = f"sse_{suffix}@bench.local", "BenchPass123!"
+    await client.post("/api/v1/auth/register", json={"username": f"sse_{suffix}", "email": email, "password": password})
+    response = await client.post("/api/v1/auth/login", data={"username": email, "password": password})
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+async def listen(
+        client: httpx.AsyncClient,
+        token: str,
+        connected: asyncio.Event,
+        received: dict[str, list[float]],
+        connect_ms: list[float]
+) -> None:
+    started = time.perf_counter()
+    async with client.stream("GET", "/api/v1/todo_items/events", headers={"Authorization": f"Bearer {token}"}) as response:
+        async for line in response.aiter_lines():
+            if not connected.is_set() and line.startswith("id:"):
+                connect_ms.append((time.perf_counter() - started) * 1000)
+                connected.set()
+            elif line.startswith("data:"):
+                received[line].append(time.perf_counter())
+
+
+async def main(url: str, connections: int, users: int, writes: int, server_pid: int | None) -> None:
+    limits = httpx.Limits(max_connections=connections + 16, max_keepalive_connections=16)
+    timeout = httpx.Timeout(30.0, read=None)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=timeout) as client:
+        tokens = [await login(client) for _ in range(users)]
+        rss_before = rss_kb(server_pid) if server_pid else 0
+
+        received: dict[str, list[float]] = defaultdict(list)
+        connect_ms: list[float] = []
+        events = [asyncio.Event() for _ in range(connections)]
+        started = time.perf_counter()
+        tasks = [
+            asyncio.create_task(listen(client, tokens[i % users], events[i], received, connect_ms))
+            for i in range(connections)
+        ]
+        await asyncio.gather(*(event.wait() for event in events))
+        print(f"Открыто {connections} соединений за {time.perf_counter() - started:.1f}s")
+        print_summary("connect", summarize(connect_ms))
+        if server_pid:
+            rss_after = rss_kb(server_pid)
+            print(f"Память сервера: +{(rss_after - rss_before) / 1024:.1f} MiB, "
+                  f"{(rss_after - rss_before) * 1024 / connections:.0f} байт на соединение")
+
+        # Простой: соединения живут на heartbeat-комментариях
+        await asyncio.sleep(5)
+
+        per_user = connections // users
+        fanout_ms = []
+        for i in range(writes):
+            token = tokens[i % users]
+            before = set(received)
+            sent = time.perf_counter()
+            response = await client.post(
+                "/api/v1/todo_items/", headers={"Authorization": f"Bearer {token}"},
+                json={"title": f"sse {uuid4().hex[:8]}"}
+            )
+            response.raise_for_status()
+            deadline = sent + 10
+            while time.perf_counter() < deadline:
+                new = [line for line in received if line not in before]
+                if new and len(received[new[0]]) >= per_user:
+                    fanout_ms.append((max(received[new[0]]) - sent) * 1000)
+                    break
+                await asyncio.sleep(0.005)
+        if fanout_ms:
+            print_summary(f"fan-out to {per_user} connections", summarize(fanout_ms))
+        print(f"Доставлено {len(fanout_ms)} из {writes} событий всем соединениям пользователя")
+
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Нагрузочный тест SSE-потока событий задач")
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="Адрес запущенного сервера")
+    parser.add_argument("--connections", type=int, default=10000, help="Количество SSE-соединений")
+    parser.add_argument("--users", type=int, default=100, help="Количество пользователей")
+    parser.add_argument("--writes", type=int, default=50, help="Количество изменений для замера доставки")
+    parser.add_argument("--server-pid", type=int, default=None, help="PID процесса сервера для замера памяти")
+    args = parser.parse_args()
+    asyncio.run(main(args.url, args.connections, args.users, args.writes, args.server_pid))
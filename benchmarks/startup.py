@@ -0,0 +1,167 @@
+"""
+Холодный старт процесса приложения.
+
+Каждый прогон — отдельный процесс Python без базы данных и Redis (REPOSITORY_BACKEND=memory,
+кеш, события, идемпотентность и ограничение частоты выключены). В нём измеряются:
+- импорт app.main вместе со сборкой приложения;
+- запуск lifespan и готовность (GET /ready отвечает 200 после прогрева, см. app.warmup);
+- первый и второй запрос к GET /, к списку задач с токеном и к схеме OpenAPI —
+  разница показывает, что откладывается до первого запроса;
+- время до первого ответа на список задач (от начала импорта, вместе с ожиданием готовности)
+  и общее время жизни процесса.
+
+Без Redis шаг прогрева redis завершается ошибкой, это не мешает замеру.
+
+    python -m benchmarks.startup --repeat 10
+    python -m benchmarks.startup --openapi-schema              # со схемой, собранной заранее
+    python -m benchmarks.startup --no-warmup                   # без прогрева: сравнить первые запросы
+    python -m benchmarks.startup --repeat 1 --importtime 20    # самые долгие импорты
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.common import print_summary, summarize
+
+
+# Код дочернего процесса: до импорта app.main в нём не должно загружаться ничего лишнего
+CHILD = r"""
+import asyncio
+import json
+import time
+
+start = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+
+
+async def main():
+    from datetime import timedelta
+
+    from httpx import ASGITransport, AsyncClient
+
+    from app.auth.jwt import create_access_token
+    from app.repositories.memory import InMemoryUserRepository
+    from app.settings import settings
+
+    application = app.main.app
+    phases = {"import_ms": (imported - start) * 1000}
+    lifespan_start = time.perf_counter()
+    async with application.router.lifespan_context(application):
+        phases["lifespan_ms"] = (time.perf_counter() - lifespan_start) * 1000
+        async with AsyncClient(transport=ASGITransport(app=application), base_url="http://startup") as client:
+            while (await client.get("/ready")).status_code != 200:
+                await asyncio.sleep(0.005)
+        phases["ready_ms"] = (time.perf_counter() - start) * 1000
+        user = await InMemoryUserRepository(application.state.memory_store).create_user({
+            "username": "startup", "email": "startup@bench.local", "hashed_password": "", "is_active": True
+        })
+        token = create_access_token({"sub": str(user.id)}, timedelta(minutes=5))
+        prefix = settings.API_VERSION_PREFIX
+        requests = (
+            ("root", "/", {}),
+            ("todo_items", f"{prefix}/todo_items/all", {"Authorization": f"Bearer {token}"}),
+            ("openapi", f"{prefix}/openapi.json", {}),
+        )
+        async with AsyncClient(transport=ASGITransport(app=application), base_url="http://startup") as client:
+            for attempt in ("first", "second"):
+                for name, path, headers in requests:
+                    request_start = time.perf_counter()
+                    response = await client.get(path, headers=headers)
+                    response.raise_for_status()
+                    phases[f"{attempt}_{name}_ms"] = (time.perf_counter() - request_start) * 1000
+                    if attempt == "first" and name == "todo_items":
+                        phases["time_to_first_request_ms"] = (time.perf_counter() - start) * 1000
+    print(json.dumps(phases))
+
+
+asyncio.run(main())
+"""
+
+CHILD_ENV = {
+    "REPOSITORY_BACKEND": "memory",
+    "TODO_CACHE_ENABLED": "false",
+    "TODO_EVENTS_ENABLED": "false",
+    "IDEMPOTENCY_ENABLED": "false",
+    "RATE_LIMIT_ENABLED": "false",
+    "TRACING_EXPORTER": "none",
+    "PROFILING_ENABLED": "false",
+    "DATABASE_REPLICA_URLS": "[]",
+}
+
+
+def run_child(env: dict[str, str]) -> dict[str, float]:
+    """
+    Один холодный старт: фазы из дочернего процесса и общее время его жизни.
+    """
+    start = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-c", CHILD], env=env, capture_output=True, text=True, check=True
+    )
+    phases = json.loads(completed.stdout.strip().splitlines()[-1])
+    phases["process_ms"] = (time.perf_counter() - start) * 1000
+    return phases
+
+
+def print_importtime(env: dict[str, str], top: int) -> None:
+    """
+    Вывести модули с наибольшим суммарным временем импорта (python -X importtime).
+    """
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        env=env, capture_output=True, text=True, check=True
+    )
+    modules = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.removeprefix("import time:").split("|")
+        modules.append((int(cumulative), name.rstrip()))
+    print(f"Импорты с наибольшим суммарным временем (из {len(modules)}):")
+    for cumulative, name in sorted(modules, reverse=True)[:top]:
+        print(f"  {cumulative / 1000:>8.1f}ms {name}")
+
+
+def main(args: argparse.Namespace) -> None:
+    env = {**os.environ, **CHILD_ENV, "WARMUP_ENABLED": str(not args.no_warmup).lower()}
+    with tempfile.TemporaryDirectory() as directory:
+        if args.openapi_schema:
+            schema_path = Path(directory) / "openapi.json"
+            subprocess.run(
+                [sys.executable, "-m", "app.openapi", str(schema_path)], env=env, check=True, capture_output=True
+            )
+            env["OPENAPI_SCHEMA_PATH"] = str(schema_path)
+
+        if args.importtime:
+            print_importtime(env, args.importtime)
+
+        # Первый запуск прогревает кеш байткода и файловый кеш ОС и не учитывается
+        run_child(env)
+        runs = [run_child(env) for _ in range(args.repeat)]
+
+    phases = {name: summarize([run[name] for run in runs]) for name in runs[0]}
+    for name, summary in phases.items():
+        print_summary(name, summary)
+
+    if args.output:
+        result = {"meta": {"python": sys.version.split()[0], "repeat": args.repeat,
+                           "openapi_schema": args.openapi_schema, "warmup": not args.no_warmup},
+                  "phases": phases}
+        Path(args.output).write_text(json.dumps(result, ensure_ascii=False, indent=2), "utf-8")
+        print(f"Результат записан в {args.output}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Холодный старт процесса приложения")
+    parser.add_argument("--repeat", type=int, default=10, help="Количество запусков процесса")
+    parser.add_argument("--openapi-schema", action="store_true", help="Отдавать схему OpenAPI, собранную заранее")
+    parser.add_argument("--no-warmup", action="store_true", help="Выключить прогрев (WARMUP_ENABLED=false)")
+    parser.add_argument("--importtime", type=int, default=0, help="Вывести столько самых долгих импортов")
+    parser.add_argument("--output", default=None, help="Файл результата в JSON")
+    main(parser.parse_args())
@@ -0,0 +1,86 @@
+"""
+Накладные расходы трассировки.
+
+Без базы данных и Redis, в одном процессе: запрос через ASGI-приложение, обработчик которого
+вызывает метод сервиса с @traced, а тот — три «внешних вызова» с листовыми спанами
+(как SQL-запрос и команды Redis). Варианты:
+- без TracingMiddleware;
+- трассировка выключена (TRACING_EXPORTER=none);
+- трассировка включена, запрос не отобран (доля 0);
+- каждый запрос отобран (доля 1), спаны уходят в экспортёр, который их отбрасывает.
+
+    python -m benchmarks.tracing_overhead --requests 20000
+"""
+
+import argparse
+import asyncio
+import time
+
+from fastapi import FastAPI
+
+from app.middleware.tracing import TracingMiddleware
+from app.tracing import Tracer, start_child, traced
+from benchmarks.metrics_overhead import call, print_us
+
+
+class NullExporter:
+    async def export(self, payload: dict) -> None:
+        pass
+
+    async def close(self) -> None:
+        pass
+
+
+@traced
+class BenchService:
+    async def get(self, todo_item_id: str) -> dict:
+        for name in ("db SELECT", "redis GET", "redis SET"):
+            span = start_child(name, "client")
+            if span is not None:
+                span.end()
+        return {"id": todo_item_id}
+
+
+def build_app(tracer: Tracer | None) -> FastAPI:
+    app = FastAPI()
+    service = BenchService()
+
+    @app.get("/api/v1/todo_items/{todo_item_id}")
+    async def get_todo_item(todo_item_id: str):
+        return await service.get(todo_item_id)
+
+    if tracer is not None:
+        app.add_middleware(TracingMiddleware, tracer=tracer, routes=app.routes)
+    return app
+
+
+async def main(requests: int) -> None:
+    variants = {
+        "without middleware": None,
+        "tracing off": Tracer(exporter=None),
+        "enabled, not sampled": Tracer(exporter=NullExporter(), sample_ratio=0.0),
+        "every request sampled": Tracer(exporter=NullExporter(), sample_ratio=1.0),
+    }
+    results = {}
+    for name, tracer in variants.items():
+        app = build_app(tracer)
+        for i in range(500):
+            await call(app, f"/api/v1/todo_items/{i}")
+        samples = []
+        for i in range(requests):
+            start = time.perf_counter()
+            await call(app, f"/api/v1/todo_items/{i}")
+            samples.append(time.perf_counter() - start)
+        results[name] = print_us(f"http {name}", samples)
+        if tracer is not None:
+            await tracer.shutdown()
+    baseline = results["without middleware"]
+    for name in list(variants)[1:]:
+        print(f"{'overhead ' + name:<40} {results[name] - baseline:.2f}us на запрос")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Накладные расходы трассировки")
+    parser.add_argument("--requests", type=int, default=20000, help="Количество запросов на вариант")
+    args = parser.parse_args()
+    asyncio.run(main(args.requests))
@@ -4,6 +4,7 @@
 """
 
 import asyncio
+import os
 from typing import AsyncGenerator, Generator
 
 import pytest
@@ -11,10 +12,16 @@ import pytest_asyncio
 from httpx import ASGITransport, AsyncClient
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
-from app.database.database import Base
-from app.database.dependencies import get_session
-from app.main import app
-from app.settings import Settings
+
+# Тесты регистрируют пользователей с одного адреса: лимит запросов без токена их бы остановил.
+# Переменная задаётся до импорта приложения, которое читает настройки при создании middleware
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
+from app.database.database import Base  # noqa: E402
+from app.database.dependencies import get_session  # noqa: E402
+from app.database.session import get_admin_db, get_read_db  # noqa: E402
+from app.main import app  # noqa: E402
+from app.settings import Settings  # noqa: E402
 
 
 # Настройки для тестовой БД
@@ -69,6 +76,8 @@ async def client(test_session: AsyncSession) -> AsyncGenerator[AsyncClient, None
         yield test_session
 
     app.dependency_overrides[get_session] = override_get_session
+    app.dependency_overrides[get_read_db] = override_get_session
+    app.dependency_overrides[get_admin_db] = override_get_session
 
     async with AsyncClient(
         transport=ASGITransport(app=app),
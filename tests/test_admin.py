@@ -228,3 +228,68 @@ class TestAdminSecurity:
         assert response.status_code == 403
         assert "admin" in response.json()["detail"].lower() or \
                "forbidden" in response.json()["detail"].lower()
+
+
+class TestAdminTodoBrowsing:
+    """Тесты постраничного просмотра и аналитики задач всех пользователей."""
+
+    async def test_keyset_pagination(self, client: AsyncClient, test_session: AsyncSession):
+        """Тест что страницы по курсору не пересекаются и покрывают все задачи."""
+        user_token = await create_user_and_login(client, "user", "user@example.com")
+        for i in range(5):
+            await client.post(
+                "/api/v1/todo_items/",
+                headers={"Authorization": f"Bearer {user_token}"},
+                json={"title": f"Задача {i}"}
+            )
+
+        admin_token = await create_user_and_login(client, "admin", "admin@example.com")
+        await make_user_admin(test_session, "admin@example.com")
+        headers = {"Authorization": f"Bearer {admin_token}"}
+
+        seen = []
+        params = {"limit": 2}
+        while True:
+            response = await client.get("/api/v1/admin/todo_items/all", headers=headers, params=params)
+            assert response.status_code == 200
+            seen.extend(item["id"] for item in response.json())
+            cursor = response.headers.get("X-Next-Cursor")
+            if not cursor:
+                break
+            params = {"limit": 2, "cursor": cursor}
+
+        assert len(seen) == 5
+        assert len(set(seen)) == 5
+
+    async def test_invalid_cursor(self, client: AsyncClient, test_session: AsyncSession):
+        """Тест что некорректный курсор отклоняется."""
+        admin_token = await create_user_and_login(client, "admin", "admin@example.com")
+        await make_user_admin(test_session, "admin@example.com")
+
+        response = await client.get(
+            "/api/v1/admin/todo_items/all?cursor=not-a-cursor",
+            headers={"Authorization": f"Bearer {admin_token}"}
+        )
+
+        assert response.status_code == 400
+
+    async def test_analytics_by_category(self, client: AsyncClient, test_session: AsyncSession):
+        """Тест группировки задач всех пользователей по категориям."""
+        for name in ("user1", "user2"):
+            token = await create_user_and_login(client, name, f"{name}@example.com")
+            await client.post(
+                "/api/v1/todo_items/",
+                headers={"Authorization": f"Bearer {token}"},
+                json={"title": "Работа", "category_name": "work"}
+            )
+
+        admin_token = await create_user_and_login(client, "admin", "admin@example.com")
+        await make_user_admin(test_session, "admin@example.com")
+
+        response = await client.get(
+            "/api/v1/admin/todo_items/analytics?group_by=category",
+            headers={"Authorization": f"Bearer {admin_token}"}
+        )
+
+        assert response.status_code == 200
+        assert {"key": "work", "total": 2, "completed": 0} in response.json()
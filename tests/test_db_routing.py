@@ -0,0 +1,87 @@
+"""Тесты маршрутизации читающих запросов между основной БД и репликами."""
+
+from uuid import uuid4
+
+from redis.exceptions import RedisError
+
+from app.auth.auth_service import AuthService
+from app.database.database import Databases
+from app.database.routing import PrimaryPin, choose_read_session_maker
+from app.repositories.memory import InMemoryUserRepository, MemoryStore
+from tests.test_utils import FakeRedis
+
+
+class BrokenRedis:
+    """Redis, который недоступен."""
+
+    async def set(self, key, value, ex=None):
+        raise RedisError()
+
+    async def exists(self, key):
+        raise RedisError()
+
+
+class TestPrimaryPin:
+    """Тесты метки read-your-writes."""
+
+    async def test_pin_after_write(self):
+        """Тест что после записи пользователь закреплён за основной БД."""
+        pin = PrimaryPin(redis=FakeRedis(), window=5)
+        user_id = uuid4()
+
+        assert not await pin.is_pinned(user_id)
+        await pin.pin(user_id)
+        assert await pin.is_pinned(str(user_id))
+
+    async def test_redis_error_reads_primary(self):
+        """Тест что при недоступном Redis чтения идут в основную БД."""
+        pin = PrimaryPin(redis=BrokenRedis(), window=5)
+
+        await pin.pin(uuid4())
+        assert await pin.is_pinned(uuid4())
+
+
+class TestChooseReadSessionMaker:
+    """Тесты выбора фабрики сессий."""
+
+    async def test_round_robin_and_pin(self):
+        """Тест что чтения идут по репликам по кругу, а закреплённый пользователь — в основную БД."""
+        primary, replicas = object(), [object(), object()]
+        databases = Databases(
+            engine=None, session_maker=primary, replica_engines=[], replica_session_makers=replicas,
+            admin_engine=None, admin_session_maker=None
+        )
+        pin = PrimaryPin(redis=FakeRedis(), window=5)
+        user_id = uuid4()
+
+        assert await choose_read_session_maker(databases, pin, str(user_id)) is replicas[0]
+        assert await choose_read_session_maker(databases, pin, None) is replicas[1]
+
+        await pin.pin(user_id)
+        assert await choose_read_session_maker(databases, pin, str(user_id)) is primary
+        assert await choose_read_session_maker(databases, pin, None) is replicas[0]
+
+    async def test_no_replicas_reads_primary(self):
+        """Тест что без реплик чтения идут в основную БД."""
+        primary = object()
+        databases = Databases(
+            engine=None, session_maker=primary, replica_engines=[], replica_session_makers=[],
+            admin_engine=None, admin_session_maker=None
+        )
+
+        assert await choose_read_session_maker(databases, PrimaryPin(redis=FakeRedis(), window=5), None) is primary
+
+
+class TestUserWritesPin:
+    """Тесты закрепления пользователя за основной БД после записи пользователя."""
+
+    async def test_created_user_is_pinned(self):
+        """Тест что созданный пользователь сразу читается из основной БД."""
+        pin = PrimaryPin(redis=FakeRedis(), window=5)
+        service = AuthService(
+            user_repository=InMemoryUserRepository(MemoryStore()),
+            google_client=None, yandex_client=None, vk_client=None, primary_pin=pin
+        )
+        user = await service.create_user({"username": "new", "email": "new@example.com", "hashed_password": ""})
+
+        assert await pin.is_pinned(user.id)
@@ -0,0 +1,154 @@
+"""Тесты повторов записывающих запросов с Idempotency-Key."""
+
+import asyncio
+
+from fastapi import FastAPI, HTTPException
+from httpx import AsyncClient
+
+from app.middleware.idempotency import IdempotencyMiddleware
+from app.service.idempotency import IdempotencyStore
+from tests.test_utils import FakeRedis, asgi_client, bearer_headers
+
+
+def make_client(calls: list, delay: float = 0.0, wait_timeout: float = 1.0) -> AsyncClient:
+    """Клиент тестового приложения: обработчики считают вызовы в calls."""
+    app = FastAPI()
+
+    @app.post("/todo_items/", status_code=201)
+    async def create(payload: dict):
+        calls.append(payload)
+        await asyncio.sleep(delay)
+        return {"id": len(calls), **payload}
+
+    @app.delete("/todo_items/{todo_item_id}")
+    async def delete(todo_item_id: int):
+        calls.append(todo_item_id)
+        if len(calls) == 1:
+            raise HTTPException(status_code=503, detail="Временная ошибка")
+        return {"detail": "Удалено"}
+
+    app.add_middleware(
+        IdempotencyMiddleware,
+        store=IdempotencyStore(redis=FakeRedis(), wait_timeout=wait_timeout),
+        path_prefixes=("/todo_items",)
+    )
+    return asgi_client(app)
+
+
+def auth_headers(key: str | None = None, user_id=None) -> dict[str, str]:
+    headers = bearer_headers(user_id)
+    if key is not None:
+        headers["Idempotency-Key"] = key
+    return headers
+
+
+class TestIdempotency:
+    """Тесты middleware идемпотентности."""
+
+    async def test_retry_is_replayed(self):
+        """Тест что повтор получает сохранённый ответ без повторного выполнения."""
+        calls = []
+        headers = auth_headers("key-1")
+        async with make_client(calls) as client:
+            first = await client.post("/todo_items/", headers=headers, json={"title": "Задача"})
+            second = await client.post("/todo_items/", headers=headers, json={"title": "Задача"})
+
+        assert len(calls) == 1
+        assert second.status_code == first.status_code == 201
+        assert second.json() == first.json()
+        assert second.headers["idempotent-replayed"] == "true"
+        assert "idempotent-replayed" not in first.headers
+
+    async def test_concurrent_duplicates_wait_for_first(self):
+        """Тест что параллельные дубли ждут ответа первого запроса."""
+        calls = []
+        headers = auth_headers("key-1")
+        async with make_client(calls, delay=0.05) as client:
+            responses = await asyncio.gather(*[
+                client.post("/todo_items/", headers=headers, json={"title": "Задача"}) for _ in range(5)
+            ])
+
+        assert len(calls) == 1
+        assert {response.json()["id"] for response in responses} == {1}
+
+    async def test_slow_first_request_gives_conflict(self):
+        """Тест что дубль получает 409, если первый запрос не успел завершиться."""
+        calls = []
+        headers = auth_headers("key-1")
+        async with make_client(calls, delay=0.3, wait_timeout=0.05) as client:
+            first, second = await asyncio.gather(
+                client.post("/todo_items/", headers=headers, json={"title": "Задача"}),
+                client.post("/todo_items/", headers=headers, json={"title": "Задача"})
+            )
+
+        assert sorted([first.status_code, second.status_code]) == [201, 409]
+        assert len(calls) == 1
+
+    async def test_key_reused_with_other_body(self):
+        """Тест что тот же ключ с другим телом запроса отклоняется."""
+        calls = []
+        headers = auth_headers("key-1")
+        async with make_client(calls) as client:
+            await client.post("/todo_items/", headers=headers, json={"title": "Первая"})
+            response = await client.post("/todo_items/", headers=headers, json={"title": "Вторая"})
+
+        assert response.status_code == 422
+        assert len(calls) == 1
+
+    async def test_server_error_is_not_stored(self):
+        """Тест что после ошибки сервера повтор выполняет запрос заново."""
+        calls = []
+        headers = auth_headers("key-1")
+        async with make_client(calls) as client:
+            first = await client.delete("/todo_items/1", headers=headers)
+            second = await client.delete("/todo_items/1", headers=headers)
+
+        assert (first.status_code, second.status_code) == (503, 200)
+        assert len(calls) == 2
+
+    async def test_keys_are_scoped_by_user(self):
+        """Тест что одинаковые ключи разных пользователей не пересекаются."""
+        calls = []
+        async with make_client(calls) as client:
+            await client.post("/todo_items/", headers=auth_headers("key-1"), json={"title": "Задача"})
+            response = await client.post("/todo_items/", headers=auth_headers("key-1"), json={"title": "Задача"})
+
+        assert len(calls) == 2
+        assert "idempotent-replayed" not in response.headers
+
+    async def test_without_key(self):
+        """Тест что запросы без ключа выполняются каждый раз."""
+        calls = []
+        async with make_client(calls) as client:
+            for _ in range(2):
+                await client.post("/todo_items/", headers=auth_headers(), json={"title": "Задача"})
+
+        assert len(calls) == 2
+
+    async def test_invalid_key(self):
+        """Тест некорректного ключа."""
+        calls = []
+        async with make_client(calls) as client:
+            response = await client.post("/todo_items/", headers=auth_headers("a" * 300), json={"title": "Задача"})
+
+        assert response.status_code == 400
+        assert calls == []
+
+
+class TestIdempotencyStore:
+    """Тесты хранилища ответов."""
+
+    async def test_expired_lock_is_not_released_by_previous_owner(self):
+        """Тест что запрос, потерявший блокировку по TTL, не снимает блокировку дубля."""
+        redis = FakeRedis()
+        store = IdempotencyStore(redis=redis, wait_timeout=0)
+
+        assert await store.begin("user", "key", "first") is None
+        # Блокировка первого запроса истекла, её захватил дубль
+        redis.data.clear()
+        assert await store.begin("user", "key", "second") is None
+
+        await store.release("user", "key", "first")
+        assert redis.data["idempotency:user:key:lock"] == b"second"
+        await store.release("user", "key", "second")
+        assert redis.data == {}
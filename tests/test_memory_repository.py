@@ -0,0 +1,158 @@
+"""Тесты репозиториев в памяти (REPOSITORY_BACKEND=memory)."""
+
+from datetime import date, timedelta
+
+import pytest
+from fastapi import FastAPI, HTTPException
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.exc import IntegrityError
+
+from app.auth.jwt import create_access_token
+from app.database.database import create_databases
+from app.handlers.todo_item import router as todo_item_router
+from app.repositories.memory import InMemoryTodoItemRepository, InMemoryUserRepository, MemoryStore
+from app.schema.todo_item import TodoItemCreate, TodoItemFilter, TodoItemSort, TodoItemUpdate
+from app.service.todo_item import TodoItemService
+from app.settings import settings
+from tests.test_utils import FakeRedis
+
+
+async def make_user(store: MemoryStore, username: str = "alice"):
+    return await InMemoryUserRepository(store).create_user({
+        "username": username, "email": f"{username}@test.local", "hashed_password": "", "is_active": True
+    })
+
+
+async def make_service() -> tuple[TodoItemService, object]:
+    store = MemoryStore()
+    user = await make_user(store)
+    return TodoItemService(repository=InMemoryTodoItemRepository(store)), user
+
+
+class TestInMemoryTodoItems:
+    """Тесты сервиса задач поверх репозитория в памяти."""
+
+    async def test_sort_and_filters(self):
+        """Тест порядка сортировки (пустые даты в конце) и фильтров как в SQL."""
+        service, user = await make_service()
+        today = date.today()
+        for title, due in (("b", today - timedelta(days=1)), ("a", None), ("c", today + timedelta(days=1))):
+            await service.create_todo_item(TodoItemCreate(title=title, date_of_execution=due), user.id)
+
+        by_date = await service.get_todo_items(user.id, sort=TodoItemSort.date_of_execution)
+        by_date_desc = await service.get_todo_items(user.id, sort=TodoItemSort.date_of_execution_desc)
+        by_title_desc = await service.get_todo_items(user.id, sort=TodoItemSort.title_desc, offset=1, limit=1)
+        overdue = await service.get_todo_items(user.id, filters=TodoItemFilter(overdue=True))
+        not_overdue = await service.get_todo_items(user.id, filters=TodoItemFilter(overdue=False))
+        due_from = await service.get_todo_items(user.id, filters=TodoItemFilter(due_from=today))
+
+        assert [item.title for item in by_date] == ["b", "c", "a"]
+        assert [item.title for item in by_date_desc] == ["c", "b", "a"]
+        assert [item.title for item in by_title_desc] == ["b"]
+        assert [item.title for item in overdue] == ["b"]
+        assert sorted(item.title for item in not_overdue) == ["a", "c"]
+        assert [item.title for item in due_from] == ["c"]
+
+    async def test_title_uniqueness_and_trash(self):
+        """Тест что название уникально среди задач вне корзины, а восстановление проверяет его снова."""
+        service, user = await make_service()
+        first = await service.create_todo_item(TodoItemCreate(title="Задача"), user.id)
+        with pytest.raises(HTTPException) as duplicate:
+            await service.create_todo_item(TodoItemCreate(title="Задача"), user.id)
+        await service.delete_todo_item(first.id, user.id)
+        await service.create_todo_item(TodoItemCreate(title="Задача"), user.id)
+        with pytest.raises(HTTPException) as restore:
+            await service.restore_todo_item(first.id, user.id)
+
+        assert duplicate.value.status_code == 400
+        assert restore.value.status_code == 400
+        assert [item.id for item in await service.get_trashed_todo_items(user.id)] == [first.id]
+
+    async def test_versions(self):
+        """Тест что запись увеличивает версию, а запись по устаревшей версии отклоняется."""
+        service, user = await make_service()
+        created = await service.create_todo_item(TodoItemCreate(title="Задача"), user.id)
+        stale = await service.repository.get_todo_item(created.id, user.id)
+        updated = await service.update_todo_item(
+            created.id, TodoItemUpdate(completed=True, category_name="work"), user.id, if_match={1}
+        )
+        with pytest.raises(HTTPException) as precondition:
+            await service.update_todo_item(created.id, TodoItemUpdate(category_name="work"), user.id, if_match={1})
+
+        assert created.version == 1
+        assert updated.version == 2
+        assert updated.completed_at is not None
+        assert await service.repository.update_todo_item(stale, {"title": "Другая"}) is None
+        assert precondition.value.status_code == 412
+        assert (await service.get_todo_item(created.id, user.id)).title == "Задача"
+
+    async def test_changes_and_stats(self):
+        """Тест дельта-синхронизации и счётчиков статистики."""
+        service, user = await make_service()
+        first = await service.create_todo_item(TodoItemCreate(title="Первая", category_name="work"), user.id)
+        second = await service.create_todo_item(
+            TodoItemCreate(title="Вторая", date_of_execution=date.today() - timedelta(days=2)), user.id
+        )
+        full = await service.get_changes(user.id, since=None, limit=10)
+        await service.update_todo_item(first.id, TodoItemUpdate(completed=True, category_name="work"), user.id)
+        await service.delete_todo_item(second.id, user.id)
+        delta = await service.get_changes(user.id, since=full.next_token, limit=10)
+        stats = await service.get_todo_stats(user.id)
+
+        assert [item.id for item in full.items] == [first.id, second.id]
+        assert [item.id for item in delta.items] == [first.id]
+        assert delta.deleted == [second.id]
+        assert stats.total == 1
+        assert stats.completed == 1
+        assert stats.overdue == 0
+        # Дата без невыполненных задач не остаётся в счётчиках
+        assert service.repository.store.due_stats[user.id] == {}
+
+
+class TestInMemoryUsers:
+    """Тесты репозитория пользователей в памяти."""
+
+    async def test_unique_username_and_email(self):
+        """Тест что занятые имя и email отклоняются, как ограничениями таблицы users."""
+        store = MemoryStore()
+        await make_user(store, "alice")
+        repository = InMemoryUserRepository(store)
+        with pytest.raises(IntegrityError):
+            await repository.create_user({"username": "alice", "email": "other@test.local", "hashed_password": ""})
+        with pytest.raises(IntegrityError):
+            await repository.create_user({"username": "bob", "email": "alice@test.local", "hashed_password": ""})
+        inactive = await repository.create_user({"username": "carol", "email": "carol@test.local", "hashed_password": ""})
+
+        assert await repository.get_by_username("carol") is None
+        assert await repository.get_user_by_id(inactive.id) is inactive
+
+
+class TestMemoryBackend:
+    """Тесты обработчиков задач с REPOSITORY_BACKEND=memory без базы данных и Redis."""
+
+    async def test_todo_item_handlers(self):
+        """Тест создания, чтения и изменения задачи через обработчики."""
+        app = FastAPI()
+        app.include_router(todo_item_router)
+        app.state.settings = settings.model_copy(update={
+            "REPOSITORY_BACKEND": "memory", "TODO_CACHE_ENABLED": False, "TODO_EVENTS_ENABLED": False
+        })
+        app.state.databases = create_databases(app.state.settings)
+        app.state.redis = FakeRedis()
+        app.state.memory_store = MemoryStore()
+        user = await make_user(app.state.memory_store)
+        token = create_access_token({"sub": str(user.id)}, timedelta(minutes=5))
+        headers = {"Authorization": f"Bearer {token}"}
+
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            created = await client.post("/todo_items/", json={"title": "Задача"}, headers=headers)
+            updated = await client.patch(
+                f"/todo_items/{created.json()['id']}", json={"completed": True, "category_name": "work"},
+                headers={**headers, "If-Match": created.headers["etag"]}
+            )
+            items = await client.get("/todo_items/all", headers=headers)
+
+        assert created.status_code == 201
+        assert updated.status_code == 200
+        assert updated.headers["etag"] == '"2"'
+        assert [(item["title"], item["completed"]) for item in items.json()] == [("Задача", True)]
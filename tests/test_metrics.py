@@ -0,0 +1,69 @@
+"""Тесты метрик Prometheus."""
+
+from dataclasses import dataclass
+
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from prometheus_client import REGISTRY
+
+from app.instrumentation import instrumented
+from app.middleware.metrics import MetricsMiddleware
+
+
+def duration_count(method: str, route: str, status: str) -> float:
+    value = REGISTRY.get_sample_value(
+        "taskpilot_http_request_duration_seconds_count",
+        {"method": method, "route": route, "status": status}
+    )
+    return value or 0.0
+
+
+class TestMetricsMiddleware:
+    """Тесты метрик HTTP-запросов."""
+
+    async def test_route_template_label(self):
+        """Тест что запросы учитываются по шаблону пути, а неизвестные пути — одной меткой."""
+        app = FastAPI()
+
+        @app.get("/metrics_test/items/{item_id}")
+        async def get_item(item_id: int):
+            return {"id": item_id}
+
+        app.add_middleware(MetricsMiddleware, routes=app.routes)
+        before = duration_count("GET", "/metrics_test/items/{item_id}", "200")
+        unmatched_before = duration_count("GET", "<unmatched>", "404")
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            for item_id in range(3):
+                await client.get(f"/metrics_test/items/{item_id}")
+            await client.get("/metrics_test/unknown/1")
+
+        assert duration_count("GET", "/metrics_test/items/{item_id}", "200") - before == 3
+        assert duration_count("GET", "<unmatched>", "404") - unmatched_before == 1
+
+
+@instrumented
+@dataclass
+class SampleRepository:
+    async def load(self) -> int:
+        return 1
+
+    async def _helper(self) -> int:
+        return 2
+
+
+class TestInstrumentedRepository:
+    """Тесты метрик методов репозиториев."""
+
+    async def test_public_methods_are_timed(self):
+        """Тест что учитываются только публичные методы."""
+        labels = {"method": "SampleRepository.load"}
+        before = REGISTRY.get_sample_value("taskpilot_repository_method_duration_seconds_count", labels) or 0.0
+
+        assert await SampleRepository().load() == 1
+        assert await SampleRepository()._helper() == 2
+
+        after = REGISTRY.get_sample_value("taskpilot_repository_method_duration_seconds_count", labels)
+        assert after - before == 1
+        assert REGISTRY.get_sample_value(
+            "taskpilot_repository_method_duration_seconds_count", {"method": "SampleRepository._helper"}
+        ) is None
@@ -0,0 +1,114 @@
+"""Тесты профилирования отдельных запросов."""
+
+import asyncio
+import json
+import time
+from datetime import timedelta
+from uuid import uuid4
+
+from fastapi import FastAPI
+from httpx import AsyncClient
+
+from app.auth.jwt import create_access_token
+from app.middleware.profiling import PROFILE_TOKEN_SCOPE, ProfilingMiddleware
+from app.profiling import FileProfileStore, ProfileInfo, SamplingProfiler
+from tests.test_utils import asgi_client
+
+
+def busy_work(seconds: float) -> None:
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+def make_client(store: FileProfileStore, route_sample_rates=None, min_duration: float = 0.0) -> AsyncClient:
+    app = FastAPI()
+
+    @app.get("/api/v1/todo_items/all")
+    async def get_all():
+        busy_work(0.03)
+        await asyncio.sleep(0.03)
+        return []
+
+    app.add_middleware(
+        ProfilingMiddleware,
+        profiler=SamplingProfiler(interval=0.001),
+        store=store,
+        path_prefix="/api/v1",
+        route_sample_rates=route_sample_rates,
+        min_duration=min_duration,
+        routes=app.routes
+    )
+    return asgi_client(app)
+
+
+def profile_token(scope: str = PROFILE_TOKEN_SCOPE) -> str:
+    return create_access_token({"scope": scope, "admin": str(uuid4())}, timedelta(minutes=5))
+
+
+class TestProfiling:
+    """Тесты middleware профилирования."""
+
+    async def test_profile_by_token(self, tmp_path):
+        """Тест что запрос с токеном профилирования сохраняет профиль speedscope с CPU и ожиданием."""
+        store = FileProfileStore(directory=str(tmp_path))
+        async with make_client(store) as client:
+            response = await client.get("/api/v1/todo_items/all", headers={"X-Profile-Token": profile_token()})
+
+        profile_id = response.headers["x-profile-id"]
+        infos = await store.list(10)
+        profile = json.loads(await store.get(profile_id))
+        names = {frame["name"] for frame in profile["shared"]["frames"]}
+        sampled = profile["profiles"][0]
+        assert [info.id for info in infos] == [profile_id]
+        assert infos[0].route == "/api/v1/todo_items/all"
+        assert infos[0].reason == "token"
+        assert infos[0].status == 200
+        assert "busy_work" in names
+        assert "<await>" in names
+        assert sampled["type"] == "sampled"
+        assert len(sampled["samples"]) == len(sampled["weights"]) == infos[0].samples > 0
+
+    async def test_not_profiled(self, tmp_path):
+        """Тест что запросы без токена и с чужим токеном не профилируются."""
+        store = FileProfileStore(directory=str(tmp_path))
+        access_token = create_access_token({"sub": str(uuid4())}, timedelta(minutes=5))
+        async with make_client(store) as client:
+            plain = await client.get("/api/v1/todo_items/all")
+            other = await client.get("/api/v1/todo_items/all", headers={"X-Profile-Token": access_token})
+            forged = await client.get("/api/v1/todo_items/all", headers={"X-Profile-Token": "garbage"})
+
+        assert all("x-profile-id" not in response.headers for response in (plain, other, forged))
+        assert await store.list(10) == []
+
+    async def test_route_sampling(self, tmp_path):
+        """Тест выборки по маршруту: профиль сохраняется только для запросов медленнее порога."""
+        fast_store = FileProfileStore(directory=str(tmp_path / "fast"))
+        async with make_client(fast_store, {"GET /todo_items/all": 1.0}, min_duration=10) as client:
+            await client.get("/api/v1/todo_items/all")
+
+        slow_store = FileProfileStore(directory=str(tmp_path / "slow"))
+        async with make_client(slow_store, {"GET /todo_items/all": 1.0}, min_duration=0.01) as client:
+            response = await client.get("/api/v1/todo_items/all")
+
+        assert await fast_store.list(10) == []
+        assert [info.reason for info in await slow_store.list(10)] == ["sampling"]
+        assert "x-profile-id" not in response.headers
+
+
+class TestProfileStore:
+    """Тесты файлового хранилища профилей."""
+
+    async def test_keeps_last_profiles(self, tmp_path):
+        """Тест что хранятся последние max_profiles профилей."""
+        store = FileProfileStore(directory=str(tmp_path), max_profiles=2)
+        for number in range(3):
+            info = ProfileInfo(
+                id=f"{number:032x}", method="GET", path="/", route="/", status=200,
+                duration_ms=1.0, samples=1, reason="token", created_at=1000.0 + number
+            )
+            await store.save(info, {"name": str(number)})
+
+        assert [info.id for info in await store.list(10)] == [f"{2:032x}", f"{1:032x}"]
+        assert await store.get(f"{0:032x}") is None
+        assert json.loads(await store.get(f"{2:032x}")) == {"name": "2"}
@@ -0,0 +1,155 @@
+"""Тесты планов запросов задач: индексы под каждый фильтр и отсечение секций todo_items."""
+
+import re
+from datetime import date, timedelta
+from uuid import UUID, uuid4
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import Executable, delete, insert, select, text, update
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database.models.enums import CategoryName
+from app.database.models.todo_category import TodoCategory
+from app.database.models.todo_item import TodoItem
+from app.database.models.user import User
+from app.repositories.todo_item import search_todo_items_query, suggest_todo_titles_query, todo_items_query
+from app.schema.todo_item import TodoItemFilter, TodoItemSort
+
+
+# Индексы секций todo_items -> имена родительских индексов из модели
+PARTITION_INDEXES = text("""
+    SELECT child.relname, parent.relname
+    FROM pg_inherits
+    JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+    JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+    WHERE parent.relkind = 'I'
+""")
+
+
+async def explain(session: AsyncSession, query: Executable) -> str:
+    """
+    Возвращает текстовый план запроса с запрещённым последовательным сканированием.
+    Индексы секций заменены именами родительских индексов.
+    """
+    compiled = query.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})
+    await session.execute(text("SET LOCAL enable_seqscan = off"))
+    rows = await session.execute(text(f"EXPLAIN {compiled}"))
+    plan = "\n".join(row[0] for row in rows)
+    for child, parent in (await session.execute(PARTITION_INDEXES)).all():
+        plan = re.sub(rf"\b{child}\b", parent, plan)
+    return plan
+
+
+def scanned_partitions(plan: str) -> set[str]:
+    """Секции todo_items, которые читает план."""
+    return set(re.findall(r"\btodo_items_p\d+\b", plan))
+
+
+# Фильтры и сортировка -> индекс, под который они рассчитаны
+PLAN_CASES = [
+    (None, TodoItemSort.created_at_desc, "ix_todo_items_user_id_created_at"),
+    (None, TodoItemSort.created_at, "ix_todo_items_user_id_created_at"),
+    (None, TodoItemSort.title, "ix_todo_items_user_id_title"),
+    (None, TodoItemSort.date_of_execution, "ix_todo_items_user_id_date_of_execution"),
+    (TodoItemFilter(completed=True), TodoItemSort.created_at_desc, "ix_todo_items_user_id_completed_created_at"),
+    (
+        TodoItemFilter(completed=False),
+        TodoItemSort.date_of_execution,
+        "ix_todo_items_pending_user_id_date_of_execution",
+    ),
+    (
+        TodoItemFilter(category_name=CategoryName.work),
+        TodoItemSort.created_at_desc,
+        "ix_todo_items_user_id_category_id_created_at",
+    ),
+    (
+        TodoItemFilter(due_from=date(2025, 1, 1), due_to=date(2025, 1, 31)),
+        TodoItemSort.date_of_execution,
+        "ix_todo_items_user_id_date_of_execution",
+    ),
+    (TodoItemFilter(overdue=True), TodoItemSort.date_of_execution, "ix_todo_items_pending_user_id_date_of_execution"),
+    (
+        TodoItemFilter(completed=False, category_name=CategoryName.study),
+        TodoItemSort.created_at_desc,
+        "ix_todo_items_user_id_category_id_created_at",
+    ),
+]
+
+
+@pytest_asyncio.fixture
+async def plan_user(test_session: AsyncSession) -> UUID:
+    """
+    Пользователь с задачами разных категорий, статусов и сроков среди задач других пользователей.
+    После ANALYZE планировщик выбирает индекс по статистике, а не по пустой таблице.
+    """
+    user_ids = [uuid4() for _ in range(20)]
+    categories = [uuid4() for _ in CategoryName]
+    await test_session.execute(insert(User), [
+        {"id": user_id, "username": f"plans_{user_id.hex}", "email": f"plans_{user_id.hex}@test.local",
+         "hashed_password": "", "is_active": True, "is_admin": False}
+        for user_id in user_ids
+    ])
+    await test_session.execute(insert(TodoCategory), [
+        {"id": category_id, "name": name} for category_id, name in zip(categories, CategoryName)
+    ])
+    for owner in user_ids:
+        await test_session.execute(insert(TodoItem), [
+            {
+                "id": uuid4(),
+                "user_id": owner,
+                "title": f"Задача {number}",
+                "completed": number % 3 == 0,
+                "category_id": categories[number % len(categories)],
+                "date_of_execution": date(2025, 1, 1) + timedelta(days=number % 60) if number % 4 else None,
+            }
+            for number in range(200)
+        ])
+    await test_session.commit()
+    await test_session.execute(text("ANALYZE todo_items"))
+    return user_ids[0]
+
+
+class TestTodoItemsQueryPlans:
+    """Тесты использования индексов запросом списка задач."""
+
+    @pytest.mark.parametrize("filters, sort, expected_index", PLAN_CASES)
+    async def test_list_query_uses_index(
+            self,
+            test_session: AsyncSession,
+            plan_user: UUID,
+            filters: TodoItemFilter | None,
+            sort: TodoItemSort,
+            expected_index: str
+    ):
+        """Тест что комбинация фильтров и сортировки выполняется сканированием своего индекса."""
+        plan = await explain(test_session, todo_items_query(plan_user, filters, sort))
+
+        assert "Seq Scan on todo_items" not in plan
+        assert re.search(rf"(Index (Only )?Scan (Backward )?using|Bitmap Index Scan on) {expected_index}\b", plan), plan
+
+
+def pruning_cases() -> list:
+    user_id = uuid4()
+    item_id = uuid4()
+    return [
+        *(todo_items_query(user_id, filters, sort) for filters, sort, _ in PLAN_CASES),
+        search_todo_items_query(user_id, "купить молоко"),
+        suggest_todo_titles_query(user_id, "куп"),
+        select(TodoItem).where(TodoItem.id == item_id).where(TodoItem.user_id == user_id),
+        select(TodoItem).where(TodoItem.title == "Задача").where(TodoItem.user_id == user_id),
+        update(TodoItem).where(TodoItem.id == item_id).where(TodoItem.user_id == user_id).values(completed=True),
+        delete(TodoItem).where(TodoItem.id == item_id).where(TodoItem.user_id == user_id),
+    ]
+
+
+class TestTodoItemsPartitionPruning:
+    """Тесты отсечения секций: запрос пользователя читает только одну секцию todo_items."""
+
+    @pytest.mark.parametrize("query", pruning_cases())
+    async def test_query_reads_one_partition(self, test_session: AsyncSession, query: Executable):
+        """Тест что запрос репозитория затрагивает ровно одну секцию."""
+        plan = await explain(test_session, query)
+
+        assert len(scanned_partitions(plan)) == 1, plan
@@ -0,0 +1,137 @@
+"""Тесты ограничения частоты запросов."""
+
+from fastapi import FastAPI
+from httpx import AsyncClient
+from redis.exceptions import ConnectionError
+
+from app.middleware.rate_limit import RateLimitMiddleware
+from app.service.rate_limit import RateLimiter
+from tests.test_utils import FakeRedis, asgi_client, bearer_headers
+
+
+class BucketRedis(FakeRedis):
+    """Замена Redis в памяти со скриптом token bucket и управляемыми часами."""
+
+    def __init__(self):
+        super().__init__()
+        self.buckets: dict[str, tuple[float, float]] = {}
+        self.now = 1000.0
+        self.calls = 0
+        self.fail = False
+
+    def register_script(self, script):
+        async def token_bucket(keys, args):
+            self.calls += 1
+            if self.fail:
+                raise ConnectionError("Redis недоступен")
+            capacity, rate, cost, lease, lease_floor = (float(arg) for arg in args)
+            tokens, ts = self.buckets.get(keys[0], (capacity, self.now))
+            tokens = min(capacity, tokens + max(0.0, self.now - ts) * rate)
+            allowed = leased = 0
+            if tokens >= cost:
+                tokens -= cost
+                allowed = 1
+                if lease > 0 and tokens - lease >= lease_floor:
+                    tokens -= lease
+                    leased = int(lease)
+            self.buckets[keys[0]] = (tokens, self.now)
+            return [allowed, str(tokens).encode(), leased]
+        return token_bucket
+
+
+def make_client(redis: BucketRedis, capacity: int = 10, lease_size: int = 0, trusted_proxies: int = 0) -> AsyncClient:
+    app = FastAPI()
+
+    @app.get("/api/v1/todo_items/all")
+    async def get_all():
+        return []
+
+    @app.get("/api/v1/todo_items/search")
+    async def search():
+        return []
+
+    app.add_middleware(
+        RateLimitMiddleware,
+        user_limiter=RateLimiter(redis=redis, capacity=capacity, refill_rate=1.0, lease_size=lease_size),
+        anonymous_limiter=RateLimiter(redis=redis, capacity=2, refill_rate=0.1),
+        path_prefix="/api/v1",
+        route_costs={"GET /todo_items/search": 5},
+        trusted_proxies=trusted_proxies
+    )
+    return asgi_client(app)
+
+
+class TestRateLimit:
+    """Тесты middleware ограничения частоты запросов."""
+
+    async def test_limit_and_headers(self):
+        """Тест что после исчерпания корзины приходит 429 с Retry-After, а с пополнением запросы снова проходят."""
+        redis = BucketRedis()
+        headers = bearer_headers()
+        async with make_client(redis, capacity=3) as client:
+            responses = [await client.get("/api/v1/todo_items/all", headers=headers) for _ in range(4)]
+            redis.now += 1
+            refilled = await client.get("/api/v1/todo_items/all", headers=headers)
+
+        assert [response.status_code for response in responses] == [200, 200, 200, 429]
+        assert responses[0].headers["ratelimit-limit"] == "3"
+        assert responses[0].headers["ratelimit-remaining"] == "2"
+        assert responses[0].headers["ratelimit-policy"] == "3;w=3"
+        assert responses[3].headers["retry-after"] == "1"
+        assert refilled.status_code == 200
+
+    async def test_route_cost(self):
+        """Тест что дорогой маршрут списывает свою стоимость."""
+        redis = BucketRedis()
+        headers = bearer_headers()
+        async with make_client(redis, capacity=10) as client:
+            response = await client.get("/api/v1/todo_items/search", headers=headers)
+
+        assert response.headers["ratelimit-remaining"] == "5"
+
+    async def test_users_and_anonymous_are_separate(self):
+        """Тест что корзины разных пользователей и анонимных клиентов независимы."""
+        redis = BucketRedis()
+        first, second = bearer_headers(), bearer_headers()
+        async with make_client(redis, capacity=1) as client:
+            await client.get("/api/v1/todo_items/all", headers=first)
+            limited = await client.get("/api/v1/todo_items/all", headers=first)
+            other = await client.get("/api/v1/todo_items/all", headers=second)
+            anonymous = await client.get("/api/v1/todo_items/all")
+
+        assert limited.status_code == 429
+        assert other.status_code == 200
+        assert anonymous.status_code == 200
+        assert anonymous.headers["ratelimit-limit"] == "2"
+
+    async def test_forwarded_for_is_read_from_the_right(self):
+        """Тест что подставленные клиентом левые адреса X-Forwarded-For не дают новую корзину."""
+        redis = BucketRedis()
+        async with make_client(redis, trusted_proxies=1) as client:
+            responses = [
+                await client.get("/api/v1/todo_items/all", headers={"X-Forwarded-For": f"10.0.0.{number}, 203.0.113.7"})
+                for number in range(3)
+            ]
+
+        assert [response.status_code for response in responses] == [200, 200, 429]
+        assert [key for key in redis.buckets if "ip:" in key] == ["rate_limit:ip:203.0.113.7"]
+
+    async def test_local_fast_path(self):
+        """Тест что клиенты далеко от лимита обслуживаются из локального запаса без Redis."""
+        redis = BucketRedis()
+        headers = bearer_headers()
+        async with make_client(redis, capacity=100, lease_size=10) as client:
+            responses = [await client.get("/api/v1/todo_items/all", headers=headers) for _ in range(11)]
+
+        assert all(response.status_code == 200 for response in responses)
+        assert redis.calls == 1
+        assert responses[-1].headers["ratelimit-remaining"] == "89"
+
+    async def test_redis_unavailable(self):
+        """Тест что при недоступности Redis запросы пропускаются."""
+        redis = BucketRedis()
+        redis.fail = True
+        async with make_client(redis, capacity=1) as client:
+            responses = [await client.get("/api/v1/todo_items/all", headers=bearer_headers()) for _ in range(3)]
+
+        assert all(response.status_code == 200 for response in responses)
@@ -0,0 +1,75 @@
+"""Тесты вычисления дат по правилам повторения задач."""
+
+from datetime import date
+
+import pytest
+
+from app.database.models.enums import RecurrenceFrequency
+from app.service.recurrence import RecurrenceRule
+
+
+class TestRecurrenceRule:
+    """Тесты правила повторения."""
+
+    def test_daily_interval(self):
+        """Тест ежедневного повторения с интервалом: даты выровнены по дате начала."""
+        rule = RecurrenceRule(RecurrenceFrequency.daily, starts_on=date(2026, 10, 19), interval=3)
+
+        assert rule.between(date(2026, 10, 20), date(2026, 10, 28)) == [
+            date(2026, 10, 22), date(2026, 10, 25), date(2026, 10, 28)
+        ]
+
+    def test_weekly_rrule(self):
+        """Тест еженедельного повторения по дням недели каждую вторую неделю."""
+        rule = RecurrenceRule.parse_rrule("FREQ=WEEKLY;INTERVAL=2;BYDAY=MO,WE", starts_on=date(2026, 10, 19))
+
+        assert rule.between(date(2026, 10, 19), date(2026, 11, 5)) == [
+            date(2026, 10, 19), date(2026, 10, 21), date(2026, 11, 2), date(2026, 11, 4)
+        ]
+
+    def test_weekly_defaults_to_start_weekday(self):
+        """Тест что без дней недели повторение идёт в день недели даты начала."""
+        rule = RecurrenceRule(RecurrenceFrequency.weekly, starts_on=date(2026, 10, 21))
+
+        assert rule.between(date(2026, 10, 1), date(2026, 11, 4)) == [
+            date(2026, 10, 21), date(2026, 10, 28), date(2026, 11, 4)
+        ]
+
+    def test_monthly_short_months(self):
+        """Тест что в коротких месяцах ежемесячное повторение приходится на последний день."""
+        rule = RecurrenceRule.parse_rrule("FREQ=MONTHLY;BYMONTHDAY=31", starts_on=date(2026, 1, 1))
+
+        assert rule.between(date(2026, 1, 1), date(2026, 4, 30)) == [
+            date(2026, 1, 31), date(2026, 2, 28), date(2026, 3, 31), date(2026, 4, 30)
+        ]
+
+    def test_until(self):
+        """Тест что повторения заканчиваются датой UNTIL."""
+        rule = RecurrenceRule.parse_rrule("FREQ=DAILY;UNTIL=20261021", starts_on=date(2026, 10, 19))
+
+        assert rule.between(date(2026, 10, 1), date(2026, 12, 31)) == [
+            date(2026, 10, 19), date(2026, 10, 20), date(2026, 10, 21)
+        ]
+        assert rule.next_occurrence(date(2026, 10, 21)) is None
+
+    def test_occurrences_start_far_from_anchor(self):
+        """Тест что первое повторение далеко от даты начала находится без перебора периодов."""
+        rule = RecurrenceRule(RecurrenceFrequency.weekly, starts_on=date(2000, 1, 3), interval=3, weekdays=(4,))
+
+        dates = rule.between(date(2026, 10, 19), date(2026, 11, 30))
+
+        assert dates and all(day.weekday() == 4 for day in dates)
+        assert all((day - date(2000, 1, 3)).days // 7 % 3 == 0 for day in dates)
+
+    @pytest.mark.parametrize("rrule", [
+        "FREQ=YEARLY",
+        "FREQ=DAILY;COUNT=5",
+        "FREQ=WEEKLY;BYDAY=XX",
+        "FREQ=DAILY;BYDAY=MO",
+        "FREQ=DAILY;INTERVAL=0",
+        "INTERVAL=2",
+    ])
+    def test_invalid_rrule(self, rrule: str):
+        """Тест что неподдерживаемые и некорректные правила отклоняются."""
+        with pytest.raises(ValueError):
+            RecurrenceRule.parse_rrule(rrule, starts_on=date(2026, 10, 19))
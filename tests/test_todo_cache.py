@@ -0,0 +1,196 @@
+"""Тесты кеша списков задач."""
+
+import asyncio
+from datetime import date
+from uuid import uuid4
+
+import pytest
+from httpx import AsyncClient
+
+from app.schema.todo_item import TodoItemFilter, TodoItemSort
+from app.service import todo_item as todo_item_service
+from app.service.cache import TodoListCache
+from app.service.todo_item import list_cache_name
+from tests.test_utils import FakeRedis, create_user_and_login
+
+
+class TestTodoListCache:
+    """Тесты логики кеша."""
+
+    async def test_second_read_is_served_from_cache(self):
+        """Тест что повторное чтение не вызывает загрузку."""
+        cache = TodoListCache(redis=FakeRedis())
+        user_id = uuid4()
+        calls = []
+
+        async def loader() -> bytes:
+            calls.append(1)
+            return b"[]"
+
+        assert await cache.get_or_load(user_id, "list", loader) == b"[]"
+        assert await cache.get_or_load(user_id, "list", loader) == b"[]"
+        assert len(calls) == 1
+
+    async def test_invalidate_switches_version(self):
+        """Тест что инвалидация заставляет перечитать данные."""
+        cache = TodoListCache(redis=FakeRedis())
+        user_id = uuid4()
+        payloads = iter([b"[1]", b"[1,2]"])
+
+        async def loader() -> bytes:
+            return next(payloads)
+
+        assert await cache.get_or_load(user_id, "list", loader) == b"[1]"
+        await cache.invalidate(user_id)
+        assert await cache.get_or_load(user_id, "list", loader) == b"[1,2]"
+
+    async def test_large_payload_is_compressed(self):
+        """Тест что большой payload хранится сжатым и читается без изменений."""
+        redis = FakeRedis()
+        cache = TodoListCache(redis=redis, compress_min_size=16)
+        payload = b"[" + b'{"title":"x"},' * 100 + b"{}]"
+
+        async def loader() -> bytes:
+            return payload
+
+        await cache.get_or_load(uuid4(), "list", loader)
+        stored = next(value for key, value in redis.data.items() if key.endswith(":list"))
+        assert len(stored) < len(payload)
+        assert TodoListCache._decode(stored) == payload
+
+    async def test_disabled_cache_always_loads(self):
+        """Тест что выключенный кеш не обращается к Redis."""
+        redis = FakeRedis()
+        cache = TodoListCache(redis=redis, enabled=False)
+        calls = []
+
+        async def loader() -> bytes:
+            calls.append(1)
+            return b"[]"
+
+        await cache.get_or_load(uuid4(), "list", loader)
+        await cache.get_or_load(uuid4(), "list", loader)
+        assert len(calls) == 2
+        assert redis.data == {}
+
+    async def test_failed_loader_releases_lock(self):
+        """Тест что при ошибке загрузки блокировка снимается и следующий запрос не ждёт её истечения."""
+        redis = FakeRedis()
+        cache = TodoListCache(redis=redis, lock_ttl=30)
+        user_id = uuid4()
+
+        async def failing() -> bytes:
+            raise RuntimeError("база данных недоступна")
+
+        async def loader() -> bytes:
+            return b"[]"
+
+        with pytest.raises(RuntimeError):
+            await cache.get_or_load(user_id, "list", failing)
+
+        assert not any(key.endswith(":lock") for key in redis.data)
+        assert await asyncio.wait_for(cache.get_or_load(user_id, "list", loader), timeout=1) == b"[]"
+
+    async def test_slow_loader_keeps_foreign_lock(self):
+        """Тест что загрузка дольше lock_ttl не снимает блокировку, которую уже взял другой запрос."""
+        redis = FakeRedis()
+        cache = TodoListCache(redis=redis, lock_ttl=30)
+        user_id = uuid4()
+
+        async def slow() -> bytes:
+            # Своя блокировка истекла, её взял другой запрос
+            lock_key = next(key for key in redis.data if key.endswith(":lock"))
+            redis.data[lock_key] = b"other"
+            return b"[]"
+
+        assert await cache.get_or_load(user_id, "list", slow) == b"[]"
+        assert [value for key, value in redis.data.items() if key.endswith(":lock")] == [b"other"]
+
+    async def test_replica_values_are_kept_apart(self):
+        """Тест что список, прочитанный с реплики, не отдаётся читающим основную БД и живёт не дольше max_ttl."""
+        redis = FakeRedis()
+        primary = TodoListCache(redis=redis, ttl=300)
+        replica = TodoListCache(redis=redis, ttl=300, namespace="replica", max_ttl=5)
+        user_id = uuid4()
+
+        async def stale() -> bytes:
+            return b"[]"
+
+        async def fresh() -> bytes:
+            return b"[1]"
+
+        assert await replica.get_or_load(user_id, "list", stale) == b"[]"
+        assert await primary.get_or_load(user_id, "list", fresh) == b"[1]"
+        assert redis.ttls[next(key for key in redis.ttls if ":replica:" in key)] == 5
+
+
+class TestAfterWrite:
+    """Тесты действий после записи."""
+
+    async def test_pin_before_invalidate(self):
+        """Тест что пользователь закрепляется за основной БД раньше, чем сбрасывается кеш."""
+        calls = []
+
+        class Pin:
+            async def pin(self, user_id):
+                calls.append("pin")
+
+        class Cache:
+            async def invalidate(self, user_id):
+                calls.append("invalidate")
+
+        service = todo_item_service.TodoItemService(repository=None, cache=Cache(), primary_pin=Pin())
+        await service._after_write(uuid4(), "updated", uuid4())
+        assert calls == ["pin", "invalidate"]
+
+
+class TestListCacheName:
+    """Тесты имён страниц списка задач в кеше."""
+
+    def test_overdue_key_changes_at_midnight(self, monkeypatch):
+        """Тест что имя страницы с фильтром overdue зависит от даты, а без него — нет."""
+        class Today(date):
+            current = date(2025, 1, 1)
+
+            @classmethod
+            def today(cls):
+                return cls.current
+
+        monkeypatch.setattr(todo_item_service, "date", Today)
+        overdue = TodoItemFilter(overdue=True)
+        plain = TodoItemFilter(completed=False)
+        before = [list_cache_name(filters, TodoItemSort.date_of_execution, 0, None, False) for filters in (overdue, plain)]
+        Today.current = date(2025, 1, 2)
+        after = [list_cache_name(filters, TodoItemSort.date_of_execution, 0, None, False) for filters in (overdue, plain)]
+
+        assert before[0] != after[0]
+        assert before[1] == after[1]
+
+
+class TestTodoListCacheApi:
+    """Тесты инвалидации кеша через API."""
+
+    async def test_list_reflects_new_item(self, client: AsyncClient):
+        """Тест что после создания задачи список не отдаётся из устаревшего кеша."""
+        token = await create_user_and_login(client)
+        headers = {"Authorization": f"Bearer {token}"}
+
+        await client.post("/api/v1/todo_items/", headers=headers, json={"title": "Первая"})
+        first = await client.get("/api/v1/todo_items/all", headers=headers)
+        assert len(first.json()) == 1
+
+        await client.post("/api/v1/todo_items/", headers=headers, json={"title": "Вторая"})
+        second = await client.get("/api/v1/todo_items/all", headers=headers)
+        assert len(second.json()) == 2
+
+    async def test_list_pagination(self, client: AsyncClient):
+        """Тест постраничного получения списка."""
+        token = await create_user_and_login(client)
+        headers = {"Authorization": f"Bearer {token}"}
+
+        for i in range(3):
+            await client.post("/api/v1/todo_items/", headers=headers, json={"title": f"Задача {i}"})
+
+        response = await client.get("/api/v1/todo_items/all?offset=1&limit=1", headers=headers)
+        assert response.status_code == 200
+        assert len(response.json()) == 1
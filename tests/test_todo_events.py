@@ -0,0 +1,157 @@
+"""Тесты потока событий изменения задач (SSE)."""
+
+import asyncio
+import json
+from uuid import uuid4
+
+from redis.exceptions import ResponseError
+
+from app.service.events import TodoEventHub, TodoEventPublisher, events_key, stream_id
+from tests.test_utils import FakeRedis
+
+
+class FakePubSub:
+    def __init__(self, redis: "StreamRedis"):
+        self.redis = redis
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def psubscribe(self, pattern):
+        self.redis.subscribed.set()
+
+    async def listen(self):
+        while True:
+            yield await self.redis.messages.get()
+
+
+class StreamRedis(FakeRedis):
+    """Замена Redis в памяти с журналами событий, скриптом публикации и pub/sub."""
+
+    def __init__(self):
+        super().__init__()
+        self.streams: dict[str, list[tuple[bytes, dict]]] = {}
+        self.max_deleted: dict[str, bytes] = {}
+        self.messages: asyncio.Queue = asyncio.Queue()
+        self.subscribed = asyncio.Event()
+        self.sequence = 0
+
+    def register_script(self, script):
+        async def publish(keys, args):
+            key, (maxlen, data, _ttl) = keys[0], args
+            self.sequence += 1
+            entry_id = f"1000-{self.sequence}".encode()
+            stream = self.streams.setdefault(key, [])
+            stream.append((entry_id, {b"data": data.encode()}))
+            while len(stream) > maxlen:
+                self.max_deleted[key] = stream.pop(0)[0]
+            await self.messages.put({
+                "type": "pmessage", "channel": key.encode(), "data": entry_id + b" " + data.encode()
+            })
+            return entry_id
+        return publish
+
+    def pubsub(self):
+        return FakePubSub(self)
+
+    async def xrevrange(self, key, count=None):
+        return list(reversed(self.streams.get(key, [])))[:count]
+
+    async def xrange(self, key, min="-", max="+"):
+        after = stream_id(min.lstrip("("))
+        return [entry for entry in self.streams.get(key, []) if stream_id(entry[0].decode()) > after]
+
+    async def xinfo_stream(self, key):
+        if key not in self.streams:
+            raise ResponseError("no such key")
+        return {"max-deleted-entry-id": self.max_deleted.get(key)}
+
+
+def parse_frame(frame: str) -> dict[str, str]:
+    return dict(line.split(": ", 1) for line in frame.strip().splitlines() if ": " in line)
+
+
+class TestTodoEventHub:
+    """Тесты раздачи событий SSE-клиентам."""
+
+    async def test_live_events(self):
+        """Тест что событие из общей подписки доходит до клиента пользователя, но не до чужого."""
+        redis = StreamRedis()
+        hub = TodoEventHub(redis=redis)
+        publisher = TodoEventPublisher(redis=redis)
+        user_id, other_user_id, todo_id = uuid4(), uuid4(), uuid4()
+        stream = hub.stream(user_id, None, heartbeat=5)
+        other_stream = hub.stream(other_user_id, None, heartbeat=0.05)
+
+        first = parse_frame(await anext(stream))
+        await anext(other_stream)
+        await redis.subscribed.wait()
+        await publisher.publish(user_id, "created", todo_id)
+        frame = parse_frame(await anext(stream))
+
+        assert first["id"] == "0-0"
+        assert json.loads(frame["data"]) == {"type": "created", "id": str(todo_id)}
+        assert stream_id(frame["id"]) > stream_id(first["id"])
+        assert await anext(other_stream) == ": ping\n\n"
+        await stream.aclose()
+        await other_stream.aclose()
+        await hub.stop()
+
+    async def test_resume_from_last_event_id(self):
+        """Тест что по Last-Event-ID досылаются только пропущенные события."""
+        redis = StreamRedis()
+        hub = TodoEventHub(redis=redis)
+        publisher = TodoEventPublisher(redis=redis)
+        user_id = uuid4()
+        seen = await publisher.publish(user_id, "created", uuid4())
+        missed = await publisher.publish(user_id, "updated", uuid4())
+
+        stream = hub.stream(user_id, seen, heartbeat=5)
+        frame = parse_frame(await anext(stream))
+
+        assert frame["id"] == missed
+        assert json.loads(frame["data"])["type"] == "updated"
+        await stream.aclose()
+        await hub.stop()
+
+    async def test_reset_when_events_trimmed(self):
+        """Тест что клиент получает reset, если пропущенные события вытеснены из журнала."""
+        redis = StreamRedis()
+        hub = TodoEventHub(redis=redis)
+        publisher = TodoEventPublisher(redis=redis, maxlen=2)
+        user_id = uuid4()
+        seen = await publisher.publish(user_id, "created", uuid4())
+        for _ in range(3):
+            latest = await publisher.publish(user_id, "updated", uuid4())
+
+        stream = hub.stream(user_id, seen, heartbeat=5)
+        frame = parse_frame(await anext(stream))
+
+        assert frame["event"] == "reset"
+        assert frame["id"] == latest
+        await stream.aclose()
+        await hub.stop()
+
+    async def test_overflow_catches_up_from_journal(self):
+        """Тест что клиент с переполненной очередью получает все события по журналу без дублей."""
+        redis = StreamRedis()
+        hub = TodoEventHub(redis=redis, queue_size=2)
+        publisher = TodoEventPublisher(redis=redis)
+        user_id = uuid4()
+        stream = hub.stream(user_id, None, heartbeat=5)
+        await anext(stream)
+        await redis.subscribed.wait()
+
+        published = [await publisher.publish(user_id, "updated", uuid4()) for _ in range(5)]
+        while not redis.messages.empty():
+            await asyncio.sleep(0)
+        received = [parse_frame(await anext(stream))["id"] for _ in range(5)]
+
+        assert received == published
+        assert len(hub._subscribers[str(user_id)]) == 1
+        await stream.aclose()
+        assert str(user_id) not in hub._subscribers
+        await hub.stop()
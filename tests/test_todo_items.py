@@ -379,3 +379,577 @@ class TestTodoItemDelete:
         )
 
         assert response.status_code == 404
+
+
+class TestTodoItemSearch:
+    """Тесты полнотекстового поиска задач."""
+
+    async def test_search_russian_and_english(self, client: AsyncClient):
+        """Тест поиска по русскому и английскому тексту с учётом словоформ."""
+        token = await create_user_and_login(client)
+        headers = {"Authorization": f"Bearer {token}"}
+
+        await client.post("/api/v1/todo_items/", headers=headers, json={"title": "Купить молоко"})
+        await client.post("/api/v1/todo_items/", headers=headers, json={"title": "Prepare reports"})
+        await client.post("/api/v1/todo_items/", headers=headers, json={"title": "Позвонить маме"})
+
+        response = await client.get("/api/v1/todo_items/search?q=молока", headers=headers)
+        assert response.status_code == 200
+        assert [item["title"] for item in response.json()] == ["Купить молоко"]
+
+        response = await client.get("/api/v1/todo_items/search?q=report", headers=headers)
+        assert [item["title"] for item in response.json()] == ["Prepare reports"]
+
+    async def test_search_ranks_title_above_description(self, client: AsyncClient):
+        """Тест что совпадение в названии ранжируется выше совпадения в описании."""
+        token = await create_user_and_login(client)
+        headers = {"Authorization": f"Bearer {token}"}
+
+        await client.post(
+            "/api/v1/todo_items/",
+            headers=headers,
+            json={"title": "Поход в магазин", "description": "Купить хлеб"}
+        )
+        await client.post("/api/v1/todo_items/", headers=headers, json={"title": "Хлеб"})
+
+        response = await client.get("/api/v1/todo_items/search?q=хлеб", headers=headers)
+        assert [item["title"] for item in response.json()] == ["Хлеб", "Поход в магазин"]
+
+    async def test_search_is_scoped_by_user(self, client: AsyncClient):
+        """Тест что поиск не возвращает чужие задачи."""
+        token1 = await create_user_and_login(client, "user1", "user1@example.com")
+        await client.post(
+            "/api/v1/todo_items/",
+            headers={"Authorization": f"Bearer {token1}"},
+            json={"title": "Секретный план"}
+        )
+
+        token2 = await create_user_and_login(client, "user2", "user2@example.com")
+        response = await client.get(
+            "/api/v1/todo_items/search?q=план",
+            headers={"Authorization": f"Bearer {token2}"}
+        )
+
+        assert response.status_code == 200
+        assert response.json() == []
+
+    async def test_search_empty_query(self, client: AsyncClient):
+        """Тест поиска с пустым запросом."""
+        token = await create_user_and_login(client)
+
+        response = await client.get(
+            "/api/v1/todo_items/search?q=",
+            headers={"Authorization": f"Bearer {token}"}
+        )
+
+        assert response.status_code == 422
+
+
+class TestTodoItemAutocomplete:
+    """Тесты автодополнения названий задач."""
+
+    async def test_autocomplete_prefix_first(self, client: AsyncClient):
+        """Тест что совпадения по префиксу идут первыми."""
+        token = await create_user_and_login(client)
+        headers = {"Authorization": f"Bearer {token}"}
+
+        for title in ["Отчёт за квартал", "Отправить отчёт", "Купить хлеб"]:
+            await client.post("/api/v1/todo_items/", headers=headers, json={"title": title})
+
+        response = await client.get("/api/v1/todo_items/autocomplete?q=отп", headers=headers)
+
+        assert response.status_code == 200
+        titles = [item["title"] for item in response.json()]
+        assert titles[0] == "Отправить отчёт"
+        assert "Купить хлеб" not in titles
+
+    async def test_autocomplete_tolerates_typo(self, client: AsyncClient):
+        """Тест что подсказки находятся при опечатке."""
+        token = await create_user_and_login(client)
+        headers = {"Authorization": f"Bearer {token}"}
+
+        await client.post("/api/v1/todo_items/", headers=headers, json={"title": "Презентация для клиента"})
+
+        response = await client.get("/api/v1/todo_items/autocomplete?q=презентацыя", headers=headers)
+
+        assert response.status_code == 200
+        assert [item["title"] for item in response.json()] == ["Презентация для клиента"]
+
+    async def test_autocomplete_sees_new_item(self, client: AsyncClient):
+        """Тест что закешированные подсказки сбрасываются после создания задачи."""
+        token = await create_user_and_login(client)
+        headers = {"Authorization": f"Bearer {token}"}
+
+        first = await client.get("/api/v1/todo_items/autocomplete?q=мол", headers=headers)
+        assert first.json() == []
+
+        await client.post("/api/v1/todo_items/", headers=headers, json={"title": "Молоко"})
+        second = await client.get("/api/v1/todo_items/autocomplete?q=мол", headers=headers)
+        assert [item["title"] for item in second.json()] == ["Молоко"]
+
+
+class TestTodoItemFilter:
+    """Тесты фильтрации и сортировки списка задач."""
+
+    async def test_filter_overdue(self, client: AsyncClient):
+        """Тест фильтра просроченных задач."""
+        token = await create_user_and_login(client)
+        headers = {"Authorization": f"Bearer {token}"}
+        yesterday = (date.today() - timedelta(days=1)).isoformat()
+        tomorrow = (date.today() + timedelta(days=1)).isoformat()
+
+        await client.post("/api/v1/todo_items/", headers=headers,
+                          json={"title": "Просрочена", "date_of_execution": yesterday})
+        await client.post("/api/v1/todo_items/", headers=headers,
+                          json={"title": "В срок", "date_of_execution": tomorrow})
+
+        response = await client.get("/api/v1/todo_items/all?overdue=true", headers=headers)
+
+        assert response.status_code == 200
+        assert [item["title"] for item in response.json()] == ["Просрочена"]
+
+    async def test_filter_completed_and_due_range(self, client: AsyncClient):
+        """Тест фильтра по выполнению и диапазону дат."""
+        token = await create_user_and_login(client)
+        headers = {"Authorization": f"Bearer {token}"}
+        today = date.today()
+
+        for days in (1, 5, 10):
+            await client.post("/api/v1/todo_items/", headers=headers, json={
+                "title": f"Через {days} дней",
+                "date_of_execution": (today + timedelta(days=days)).isoformat()
+            })
+
+        response = await client.get(
+            "/api/v1/todo_items/all",
+            headers=headers,
+            params={
+                "completed": "false",
+                "due_from": (today + timedelta(days=2)).isoformat(),
+                "due_to": (today + timedelta(days=10)).isoformat(),
+                "sort": "date_of_execution",
+            }
+        )
+
+        assert [item["title"] for item in response.json()] == ["Через 5 дней", "Через 10 дней"]
+
+    async def test_sort_by_title(self, client: AsyncClient):
+        """Тест сортировки по названию."""
+        token = await create_user_and_login(client)
+        headers = {"Authorization": f"Bearer {token}"}
+
+        for title in ["Бета", "Альфа", "Гамма"]:
+            await client.post("/api/v1/todo_items/", headers=headers, json={"title": title})
+
+        response = await client.get("/api/v1/todo_items/all?sort=-title", headers=headers)
+
+        assert [item["title"] for item in response.json()] == ["Гамма", "Бета", "Альфа"]
+
+    async def test_unknown_sort_key(self, client: AsyncClient):
+        """Тест что сортировка вне белого списка отклоняется."""
+        token = await create_user_and_login(client)
+
+        response = await client.get(
+            "/api/v1/todo_items/all?sort=hashed_password",
+            headers={"Authorization": f"Bearer {token}"}
+        )
+
+        assert response.status_code == 422
+
+
+class TestTodoItemStats:
+    """Тесты статистики задач."""
+
+    async def test_stats_follow_writes(self, client: AsyncClient):
+        """Тест что счётчики обновляются при создании, изменении и удалении задач."""
+        token = await create_user_and_login(client)
+        headers = {"Authorization": f"Bearer {token}"}
+        yesterday = (date.today() - timedelta(days=1)).isoformat()
+
+        first = await client.post("/api/v1/todo_items/", headers=headers, json={
+            "title": "Просроченная", "category_name": "work", "date_of_execution": yesterday
+        })
+        second = await client.post("/api/v1/todo_items/", headers=headers, json={
+            "title": "Личная", "category_name": "personal"
+        })
+
+        response = await client.get("/api/v1/todo_items/stats", headers=headers)
+        assert response.status_code == 200
+        stats = response.json()
+        assert stats["total"] == 2
+        assert stats["pending"] == 2
+        assert stats["overdue"] == 1
+        assert stats["by_category"]["work"] == {"total": 1, "completed": 0}
+
+        await client.patch(
+            f"/api/v1/todo_items/{first.json()['id']}",
+            headers=headers,
+            json={"completed": True, "category_name": "work"}
+        )
+        await client.delete(f"/api/v1/todo_items/{second.json()['id']}", headers=headers)
+
+        stats = (await client.get("/api/v1/todo_items/stats", headers=headers)).json()
+        assert stats["total"] == 1
+        assert stats["completed"] == 1
+        assert stats["overdue"] == 0
+        assert stats["by_category"]["personal"] == {"total": 0, "completed": 0}
+
+    async def test_repair_matches_incremental_stats(self, client: AsyncClient, test_session):
+        """Тест что пересчёт даёт те же значения, что и инкрементальные обновления."""
+        from uuid import UUID
+
+        from app.repositories.todo_stats import TodoStatsRepository
+
+        token = await create_user_and_login(client)
+        headers = {"Authorization": f"Bearer {token}"}
+        for i in range(3):
+            await client.post("/api/v1/todo_items/", headers=headers, json={"title": f"Задача {i}"})
+
+        before = (await client.get("/api/v1/todo_items/stats", headers=headers)).json()
+        user_id = (await client.get("/api/v1/todo_items/all", headers=headers)).json()[0]["user_id"]
+        await TodoStatsRepository(test_session).recompute([UUID(user_id)])
+        after = (await client.get("/api/v1/todo_items/stats", headers=headers)).json()
+
+        assert before == after
+
+
+class TestTodoItemArchive:
+    """Тесты архива выполненных задач."""
+
+    async def test_archived_items_reachable_with_flag(self, client: AsyncClient, test_session):
+        """Тест что архивные задачи скрыты по умолчанию и доступны с include_archived."""
+        from datetime import datetime
+
+        from app.repositories.todo_archive import TodoArchiveRepository
+
+        token = await create_user_and_login(client)
+        headers = {"Authorization": f"Bearer {token}"}
+        old = await client.post("/api/v1/todo_items/", headers=headers, json={"title": "Старый отчёт"})
+        await client.post("/api/v1/todo_items/", headers=headers, json={"title": "Текущая задача"})
+        await client.patch(
+            f"/api/v1/todo_items/{old.json()['id']}",
+            headers=headers,
+            json={"completed": True, "category_name": "personal"}
+        )
+        stats_before = (await client.get("/api/v1/todo_items/stats", headers=headers)).json()
+
+        archived = await TodoArchiveRepository(test_session).archive_completed(
+            completed_before=datetime.now() + timedelta(days=1),
+            batch_size=100
+        )
+        assert len(archived) == 1
+
+        response = await client.get("/api/v1/todo_items/all", headers=headers)
+        assert [item["title"] for item in response.json()] == ["Текущая задача"]
+
+        response = await client.get("/api/v1/todo_items/all?include_archived=true", headers=headers)
+        assert {item["title"] for item in response.json()} == {"Старый отчёт", "Текущая задача"}
+
+        response = await client.get("/api/v1/todo_items/search?q=отчёт", headers=headers)
+        assert response.json() == []
+
+        response = await client.get("/api/v1/todo_items/search?q=отчёт&include_archived=true", headers=headers)
+        assert [item["title"] for item in response.json()] == ["Старый отчёт"]
+
+        stats_after = (await client.get("/api/v1/todo_items/stats", headers=headers)).json()
+        assert stats_after == stats_before
+
+    async def test_pending_items_are_not_archived(self, client: AsyncClient, test_session):
+        """Тест что невыполненные задачи не попадают в архив."""
+        from datetime import datetime
+
+        from app.repositories.todo_archive import TodoArchiveRepository
+
+        token = await create_user_and_login(client)
+        headers = {"Authorization": f"Bearer {token}"}
+        await client.post("/api/v1/todo_items/", headers=headers, json={"title": "Невыполненная"})
+
+        archived = await TodoArchiveRepository(test_session).archive_completed(
+            completed_before=datetime.now() + timedelta(days=1),
+            batch_size=100
+        )
+
+        assert archived == []
+        response = await client.get("/api/v1/todo_items/all", headers=headers)
+        assert len(response.json()) == 1
+
+
+class TestTodoItemTrash:
+    """Тесты корзины задач."""
+
+    async def test_trash_and_restore(self, client: AsyncClient):
+        """Тест что удалённая задача попадает в корзину и восстанавливается вместе со статистикой."""
+        token = await create_user_and_login(client)
+        headers = {"Authorization": f"Bearer {token}"}
+        created = await client.post("/api/v1/todo_items/", headers=headers, json={"title": "В корзину"})
+        todo_id = created.json()["id"]
+        stats_before = (await client.get("/api/v1/todo_items/stats", headers=headers)).json()
+
+        await client.delete(f"/api/v1/todo_items/{todo_id}", headers=headers)
+
+        assert (await client.get("/api/v1/todo_items/all", headers=headers)).json() == []
+        assert (await client.get("/api/v1/todo_items/stats", headers=headers)).json()["total"] == 0
+        trash = (await client.get("/api/v1/todo_items/trash", headers=headers)).json()
+        assert [item["id"] for item in trash] == [todo_id]
+        assert trash[0]["deleted_at"] is not None
+
+        response = await client.post(f"/api/v1/todo_items/{todo_id}/restore", headers=headers)
+        assert response.status_code == 200
+        assert response.json()["title"] == "В корзину"
+
+        assert (await client.get("/api/v1/todo_items/trash", headers=headers)).json() == []
+        assert len((await client.get("/api/v1/todo_items/all", headers=headers)).json()) == 1
+        assert (await client.get("/api/v1/todo_items/stats", headers=headers)).json() == stats_before
+
+    async def test_restore_not_in_trash(self, client: AsyncClient):
+        """Тест восстановления задачи, которой нет в корзине."""
+        token = await create_user_and_login(client)
+        headers = {"Authorization": f"Bearer {token}"}
+        created = await client.post("/api/v1/todo_items/", headers=headers, json={"title": "Активная"})
+
+        response = await client.post(f"/api/v1/todo_items/{created.json()['id']}/restore", headers=headers)
+
+        assert response.status_code == 404
+
+    async def test_restore_title_conflict(self, client: AsyncClient):
+        """Тест что восстановление не создаёт дубликат названия."""
+        token = await create_user_and_login(client)
+        headers = {"Authorization": f"Bearer {token}"}
+        created = await client.post("/api/v1/todo_items/", headers=headers, json={"title": "Дубликат"})
+        await client.delete(f"/api/v1/todo_items/{created.json()['id']}", headers=headers)
+        await client.post("/api/v1/todo_items/", headers=headers, json={"title": "Дубликат"})
+
+        response = await client.post(f"/api/v1/todo_items/{created.json()['id']}/restore", headers=headers)
+
+        assert response.status_code == 400
+
+    async def test_purge_removes_expired_trash(self, client: AsyncClient, test_session):
+        """Тест что очистка окончательно удаляет задачи из корзины."""
+        from datetime import datetime
+
+        from app.repositories.todo_trash import TodoTrashRepository
+
+        token = await create_user_and_login(client)
+        headers = {"Authorization": f"Bearer {token}"}
+        created = await client.post("/api/v1/todo_items/", headers=headers, json={"title": "Удалить навсегда"})
+        await client.delete(f"/api/v1/todo_items/{created.json()['id']}", headers=headers)
+
+        repository = TodoTrashRepository(test_session)
+        deleted_before = datetime.now() + timedelta(days=1)
+        assert await repository.count_expired(deleted_before) == 1
+        assert await repository.purge_expired(deleted_before, batch_size=10) == 1
+        assert await repository.count_expired(deleted_before) == 0
+
+        assert (await client.get("/api/v1/todo_items/trash", headers=headers)).json() == []
+
+
+class TestTodoItemReminders:
+    """Тесты очереди напоминаний о сроках задач."""
+
+    async def test_claim_and_release(self, client: AsyncClient, test_session):
+        """Тест что задача выбирается один раз и возвращается в очередь после ошибки отправки."""
+        from app.repositories.todo_reminder import TodoReminderRepository
+
+        token = await create_user_and_login(client)
+        headers = {"Authorization": f"Bearer {token}"}
+        due = (date.today() + timedelta(days=1)).isoformat()
+        created = await client.post(
+            "/api/v1/todo_items/", headers=headers, json={"title": "Напомнить", "date_of_execution": due}
+        )
+        done = await client.post(
+            "/api/v1/todo_items/", headers=headers, json={"title": "Уже выполнена", "date_of_execution": due}
+        )
+        await client.patch(f"/api/v1/todo_items/{done.json()['id']}", headers=headers, json={"completed": True})
+
+        repository = TodoReminderRepository(test_session)
+        day = date.fromisoformat(due)
+        claimed = await repository.claim_due(day, batch_size=10)
+        assert [str(reminder.id) for reminder in claimed] == [created.json()["id"]]
+        assert claimed[0].email
+        assert await repository.claim_due(day, batch_size=10) == []
+
+        await repository.release([(reminder.id, reminder.user_id) for reminder in claimed])
+        assert len(await repository.claim_due(day, batch_size=10)) == 1
+
+    async def test_reschedule_resets_reminder(self, client: AsyncClient, test_session):
+        """Тест что перенос срока снова ставит задачу в очередь напоминаний."""
+        from app.repositories.todo_reminder import TodoReminderRepository
+
+        token = await create_user_and_login(client)
+        headers = {"Authorization": f"Bearer {token}"}
+        day = date.today() + timedelta(days=1)
+        created = await client.post(
+            "/api/v1/todo_items/", headers=headers, json={"title": "Перенести", "date_of_execution": day.isoformat()}
+        )
+        repository = TodoReminderRepository(test_session)
+        assert len(await repository.claim_due(day, batch_size=10)) == 1
+
+        new_day = day + timedelta(days=1)
+        await client.patch(
+            f"/api/v1/todo_items/{created.json()['id']}", headers=headers,
+            json={"date_of_execution": new_day.isoformat()}
+        )
+
+        assert len(await repository.claim_due(new_day, batch_size=10)) == 1
+
+    async def test_refused_recipient_is_not_retried(self, client: AsyncClient, test_engine):
+        """Тест что после ошибки соединения напоминание повторяется, а на отклонённый адрес — нет."""
+        from sqlalchemy.ext.asyncio import async_sessionmaker
+
+        from app.service.email import ReminderDelivery
+        from app.workers.reminders import process_due_reminders
+
+        token = await create_user_and_login(client)
+        day = date.today() + timedelta(days=1)
+        await client.post(
+            "/api/v1/todo_items/", headers={"Authorization": f"Bearer {token}"},
+            json={"title": "Напомнить", "date_of_execution": day.isoformat()}
+        )
+        session_maker = async_sessionmaker(test_engine, expire_on_commit=False)
+        batches = []
+
+        async def send(reminders):
+            batches.append(len(reminders))
+            if len(batches) == 1:
+                return ReminderDelivery(retry=list(reminders))
+            return ReminderDelivery(refused=list(reminders))
+
+        for _ in range(3):
+            assert await process_due_reminders(session_maker, send, today=day, lead_days=0, lookback_days=0) == 0
+
+        assert batches == [1, 1]
+
+
+class TestTodoItemChanges:
+    """Тесты дельта-синхронизации задач."""
+
+    async def test_changes_since_token(self, client: AsyncClient):
+        """Тест что после токена отдаются только изменённые задачи и id удалённых."""
+        token = await create_user_and_login(client)
+        headers = {"Authorization": f"Bearer {token}"}
+        kept = await client.post("/api/v1/todo_items/", headers=headers, json={"title": "Без изменений"})
+        changed = await client.post("/api/v1/todo_items/", headers=headers, json={"title": "Изменится"})
+        removed = await client.post("/api/v1/todo_items/", headers=headers, json={"title": "Удалится"})
+
+        full = (await client.get("/api/v1/todo_items/changes", headers=headers)).json()
+        assert {item["id"] for item in full["items"]} == {
+            kept.json()["id"], changed.json()["id"], removed.json()["id"]
+        }
+        assert full["deleted"] == [] and full["has_more"] is False
+
+        await client.patch(f"/api/v1/todo_items/{changed.json()['id']}", headers=headers, json={"completed": True})
+        await client.delete(f"/api/v1/todo_items/{removed.json()['id']}", headers=headers)
+        delta = (await client.get(
+            "/api/v1/todo_items/changes", headers=headers, params={"since": full["next_token"]}
+        )).json()
+
+        assert [item["id"] for item in delta["items"]] == [changed.json()["id"]]
+        assert delta["items"][0]["completed"] is True
+        assert delta["deleted"] == [removed.json()["id"]]
+
+        empty = (await client.get(
+            "/api/v1/todo_items/changes", headers=headers, params={"since": delta["next_token"]}
+        )).json()
+        assert empty == {"items": [], "deleted": [], "next_token": delta["next_token"], "has_more": False}
+
+    async def test_changes_pagination(self, client: AsyncClient):
+        """Тест постраничной выдачи изменений."""
+        token = await create_user_and_login(client)
+        headers = {"Authorization": f"Bearer {token}"}
+        for title in ("Первая", "Вторая"):
+            await client.post("/api/v1/todo_items/", headers=headers, json={"title": title})
+
+        first = (await client.get("/api/v1/todo_items/changes", headers=headers, params={"limit": 1})).json()
+        second = (await client.get(
+            "/api/v1/todo_items/changes", headers=headers, params={"limit": 1, "since": first["next_token"]}
+        )).json()
+
+        assert first["has_more"] is True and second["has_more"] is False
+        assert [first["items"][0]["title"], second["items"][0]["title"]] == ["Первая", "Вторая"]
+
+    async def test_purged_item_tombstone(self, client: AsyncClient, test_session):
+        """Тест что окончательно удалённая из корзины задача остаётся в списке удалённых."""
+        from datetime import datetime
+
+        from app.repositories.todo_trash import TodoTrashRepository
+
+        token = await create_user_and_login(client)
+        headers = {"Authorization": f"Bearer {token}"}
+        full = (await client.get("/api/v1/todo_items/changes", headers=headers)).json()
+        created = await client.post("/api/v1/todo_items/", headers=headers, json={"title": "Исчезнет"})
+        await client.delete(f"/api/v1/todo_items/{created.json()['id']}", headers=headers)
+        await TodoTrashRepository(test_session).purge_expired(datetime.now() + timedelta(days=1), batch_size=10)
+
+        delta = (await client.get(
+            "/api/v1/todo_items/changes", headers=headers, params={"since": full["next_token"]}
+        )).json()
+
+        assert delta["items"] == []
+        assert delta["deleted"] == [created.json()["id"]]
+
+    async def test_invalid_token(self, client: AsyncClient):
+        """Тест некорректного токена синхронизации."""
+        token = await create_user_and_login(client)
+        headers = {"Authorization": f"Bearer {token}"}
+
+        response = await client.get("/api/v1/todo_items/changes", headers=headers, params={"since": "garbage"})
+
+        assert response.status_code == 400
+
+
+class TestTodoItemVersions:
+    """Тесты оптимистической блокировки задач (If-Match / ETag)."""
+
+    async def test_patch_with_if_match(self, client: AsyncClient):
+        """Тест что PATCH с актуальной версией проходит и увеличивает версию."""
+        token = await create_user_and_login(client)
+        headers = {"Authorization": f"Bearer {token}"}
+        created = await client.post("/api/v1/todo_items/", headers=headers, json={"title": "Задача"})
+        assert created.headers["etag"] == '"1"'
+        assert created.json()["version"] == 1
+
+        response = await client.patch(
+            f"/api/v1/todo_items/{created.json()['id']}",
+            headers={**headers, "If-Match": created.headers["etag"]},
+            json={"completed": True, "category_name": "personal"}
+        )
+
+        assert response.status_code == 200
+        assert response.headers["etag"] == '"2"'
+        assert response.json()["version"] == 2
+
+    async def test_stale_if_match(self, client: AsyncClient):
+        """Тест что запись по устаревшей версии отклоняется с текущим состоянием задачи."""
+        token = await create_user_and_login(client)
+        headers = {"Authorization": f"Bearer {token}"}
+        created = await client.post("/api/v1/todo_items/", headers=headers, json={"title": "Задача"})
+        todo_item_id = created.json()["id"]
+        stale = {**headers, "If-Match": created.headers["etag"]}
+        await client.patch(f"/api/v1/todo_items/{todo_item_id}", headers=stale,
+                           json={"title": "С первого устройства", "category_name": "personal"})
+
+        response = await client.patch(f"/api/v1/todo_items/{todo_item_id}", headers=stale,
+                                      json={"title": "Со второго устройства", "category_name": "personal"})
+        assert response.status_code == 412
+        assert response.headers["etag"] == '"2"'
+        assert response.json()["detail"]["todo_item"]["title"] == "С первого устройства"
+
+        deleted = await client.delete(f"/api/v1/todo_items/{todo_item_id}", headers=stale)
+        assert deleted.status_code == 412
+        current = await client.get(f"/api/v1/todo_items/{todo_item_id}", headers=headers)
+        assert current.status_code == 200
+
+    async def test_delete_with_if_match(self, client: AsyncClient):
+        """Тест удаления по актуальной версии и If-Match: *."""
+        token = await create_user_and_login(client)
+        headers = {"Authorization": f"Bearer {token}"}
+        first = await client.post("/api/v1/todo_items/", headers=headers, json={"title": "Первая"})
+        second = await client.post("/api/v1/todo_items/", headers=headers, json={"title": "Вторая"})
+
+        by_version = await client.delete(f"/api/v1/todo_items/{first.json()['id']}",
+                                         headers={**headers, "If-Match": f'W/{first.headers["etag"]}'})
+        any_version = await client.delete(f"/api/v1/todo_items/{second.json()['id']}",
+                                          headers={**headers, "If-Match": "*"})
+
+        assert by_version.status_code == 200
+        assert any_version.status_code == 200
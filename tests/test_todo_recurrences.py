@@ -0,0 +1,92 @@
+"""Тесты для API повторяющихся задач."""
+
+from datetime import date, timedelta
+from uuid import UUID
+
+from httpx import AsyncClient
+
+from tests.test_todo_items import create_user_and_login
+
+
+class TestTodoRecurrences:
+    """Тесты правил повторения и генератора задач."""
+
+    async def test_create_materializes_occurrences(self, client: AsyncClient):
+        """Тест что правило сразу создаёт задачи на горизонт генерации."""
+        from app.settings import settings
+
+        token = await create_user_and_login(client)
+        headers = {"Authorization": f"Bearer {token}"}
+
+        response = await client.post(
+            "/api/v1/todo_recurrences/", headers=headers, json={"title": "Зарядка", "frequency": "daily"}
+        )
+
+        assert response.status_code == 201
+        horizon = settings.TODO_RECURRENCE_HORIZON_DAYS
+        assert response.json()["next_occurrence"] == (date.today() + timedelta(days=horizon + 1)).isoformat()
+        items = (await client.get("/api/v1/todo_items/all", headers=headers)).json()
+        assert len(items) == horizon + 1
+        assert f"Зарядка ({date.today():%d.%m.%Y})" in {item["title"] for item in items}
+        stats = (await client.get("/api/v1/todo_items/stats", headers=headers)).json()
+        assert stats["total"] == horizon + 1
+
+    async def test_rrule(self, client: AsyncClient):
+        """Тест правила в формате RRULE."""
+        token = await create_user_and_login(client)
+        headers = {"Authorization": f"Bearer {token}"}
+
+        response = await client.post(
+            "/api/v1/todo_recurrences/", headers=headers,
+            json={"title": "Отчёт", "rrule": "FREQ=WEEKLY;BYDAY=FR"}
+        )
+
+        assert response.status_code == 201
+        assert response.json()["frequency"] == "weekly"
+        assert response.json()["weekdays"] == [4]
+
+    async def test_invalid_rule(self, client: AsyncClient):
+        """Тест что некорректное правило отклоняется."""
+        token = await create_user_and_login(client)
+        headers = {"Authorization": f"Bearer {token}"}
+
+        response = await client.post(
+            "/api/v1/todo_recurrences/", headers=headers,
+            json={"title": "Отчёт", "rrule": "FREQ=YEARLY"}
+        )
+
+        assert response.status_code == 400
+
+    async def test_regeneration_is_idempotent(self, client: AsyncClient, test_session):
+        """Тест что повторная генерация тех же дат не создаёт дублей."""
+        from app.database.models import TodoRecurrence
+        from app.repositories.todo_recurrence import TodoRecurrenceRepository
+        from app.service.todo_recurrence import TodoRecurrenceService
+
+        token = await create_user_and_login(client)
+        headers = {"Authorization": f"Bearer {token}"}
+        created = await client.post(
+            "/api/v1/todo_recurrences/", headers=headers, json={"title": "Полить цветы", "frequency": "daily"}
+        )
+        before = len((await client.get("/api/v1/todo_items/all", headers=headers)).json())
+
+        service = TodoRecurrenceService(repository=TodoRecurrenceRepository(test_session))
+        recurrence = await test_session.get(TodoRecurrence, UUID(created.json()["id"]))
+        recurrence.next_occurrence = date.today()
+        assert await service.materialize([recurrence]) == []
+
+        assert len((await client.get("/api/v1/todo_items/all", headers=headers)).json()) == before
+
+    async def test_delete_keeps_items(self, client: AsyncClient):
+        """Тест что удаление правила не удаляет созданные задачи."""
+        token = await create_user_and_login(client)
+        headers = {"Authorization": f"Bearer {token}"}
+        created = await client.post(
+            "/api/v1/todo_recurrences/", headers=headers, json={"title": "Планёрка", "frequency": "weekly"}
+        )
+
+        response = await client.delete(f"/api/v1/todo_recurrences/{created.json()['id']}", headers=headers)
+
+        assert response.status_code == 200
+        assert (await client.get("/api/v1/todo_recurrences/", headers=headers)).json() == []
+        assert len((await client.get("/api/v1/todo_items/all", headers=headers)).json()) > 0
@@ -0,0 +1,213 @@
+"""Тесты трассировки запросов."""
+
+import asyncio
+import json
+
+from fastapi import FastAPI, HTTPException
+from httpx import AsyncClient
+
+from app.middleware.tracing import TracingMiddleware
+from app.tracing import FileSpanExporter, Tracer, parse_traceparent, start_child, start_span, traced, traceparent_header
+from tests.test_utils import asgi_client
+
+
+INCOMING_TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+INCOMING_SPAN_ID = "00f067aa0ba902b7"
+
+
+class FakeExporter:
+    """Экспортёр в память: пачки спанов OTLP JSON."""
+
+    def __init__(self):
+        self.payloads: list[dict] = []
+        self.closed = False
+
+    async def export(self, payload):
+        self.payloads.append(payload)
+
+    async def close(self):
+        self.closed = True
+
+    @property
+    def spans(self) -> list[dict]:
+        return [
+            span
+            for payload in self.payloads
+            for resource_spans in payload["resourceSpans"]
+            for scope_spans in resource_spans["scopeSpans"]
+            for span in scope_spans["spans"]
+        ]
+
+
+@traced
+class FakeService:
+    async def get(self, todo_item_id: int) -> dict:
+        span = start_child("redis GET", "client")
+        if span is not None:
+            span.end()
+        with start_span("bcrypt"):
+            pass
+        if todo_item_id == 0:
+            raise HTTPException(status_code=404, detail="Не найдено")
+        return {"id": todo_item_id, "traceparent": traceparent_header()}
+
+
+def make_client(tracer: Tracer) -> AsyncClient:
+    app = FastAPI()
+    service = FakeService()
+
+    @app.get("/todo_items/{todo_item_id}")
+    async def get_todo_item(todo_item_id: int):
+        return await service.get(todo_item_id)
+
+    app.add_middleware(TracingMiddleware, tracer=tracer, routes=app.routes)
+    return asgi_client(app)
+
+
+class TestTraceparent:
+    """Тесты разбора заголовка traceparent."""
+
+    def test_parse(self):
+        """Тест корректного заголовка и флага отбора."""
+        assert parse_traceparent(f"00-{INCOMING_TRACE_ID}-{INCOMING_SPAN_ID}-01") == (
+            INCOMING_TRACE_ID, INCOMING_SPAN_ID, True
+        )
+        assert parse_traceparent(f"00-{INCOMING_TRACE_ID}-{INCOMING_SPAN_ID}-00".encode())[2] is False
+
+    def test_invalid(self):
+        """Тест что некорректные заголовки игнорируются."""
+        for value in (None, "", "garbage", f"00-{'0' * 32}-{INCOMING_SPAN_ID}-01",
+                      f"00-{INCOMING_TRACE_ID}-{'0' * 16}-01", f"ff-{INCOMING_TRACE_ID}-{INCOMING_SPAN_ID}-01"):
+            assert parse_traceparent(value) is None
+
+
+class TestTracing:
+    """Тесты спанов запроса."""
+
+    async def test_spans_continue_incoming_trace(self):
+        """Тест что спаны обработчика, сервиса и внешних вызовов — одна трасса, продолжающая входящую."""
+        exporter = FakeExporter()
+        tracer = Tracer(exporter=exporter, sample_ratio=0.0)
+        async with make_client(tracer) as client:
+            response = await client.get(
+                "/todo_items/5", headers={"traceparent": f"00-{INCOMING_TRACE_ID}-{INCOMING_SPAN_ID}-01"}
+            )
+        await tracer.shutdown()
+
+        spans = {span["name"]: span for span in exporter.spans}
+        assert set(spans) == {"GET /todo_items/{todo_item_id}", "FakeService.get", "redis GET", "bcrypt"}
+        assert {span["traceId"] for span in spans.values()} == {INCOMING_TRACE_ID}
+        server = spans["GET /todo_items/{todo_item_id}"]
+        assert server["parentSpanId"] == INCOMING_SPAN_ID
+        assert server["kind"] == 2
+        assert spans["FakeService.get"]["parentSpanId"] == server["spanId"]
+        assert spans["redis GET"]["parentSpanId"] == spans["FakeService.get"]["spanId"]
+        assert spans["bcrypt"]["parentSpanId"] == spans["FakeService.get"]["spanId"]
+        assert response.headers["traceresponse"] == f"00-{INCOMING_TRACE_ID}-{server['spanId']}-01"
+        assert response.json()["traceparent"] == f"00-{INCOMING_TRACE_ID}-{spans['FakeService.get']['spanId']}-01"
+        assert exporter.closed
+
+    async def test_not_sampled(self):
+        """Тест что неотобранные запросы не создают спанов, но передают контекст дальше."""
+        exporter = FakeExporter()
+        tracer = Tracer(exporter=exporter, sample_ratio=0.0)
+        async with make_client(tracer) as client:
+            new_trace = await client.get("/todo_items/5")
+            unsampled = await client.get(
+                "/todo_items/5", headers={"traceparent": f"00-{INCOMING_TRACE_ID}-{INCOMING_SPAN_ID}-00"}
+            )
+        await tracer.shutdown()
+
+        assert exporter.spans == []
+        assert "traceresponse" not in new_trace.headers
+        assert unsampled.json()["traceparent"].startswith(f"00-{INCOMING_TRACE_ID}-")
+        assert unsampled.json()["traceparent"].endswith("-00")
+
+    async def test_sample_ratio(self):
+        """Тест что при доле 1 отбираются все запросы без входящего контекста."""
+        exporter = FakeExporter()
+        tracer = Tracer(exporter=exporter, sample_ratio=1.0)
+        async with make_client(tracer) as client:
+            for todo_item_id in range(1, 4):
+                await client.get(f"/todo_items/{todo_item_id}")
+        await tracer.shutdown()
+
+        servers = [span for span in exporter.spans if span["kind"] == 2]
+        assert len(servers) == 3
+        assert len({span["traceId"] for span in servers}) == 3
+        assert all("parentSpanId" not in span for span in servers)
+
+    async def test_error_status(self):
+        """Тест что исключение сервиса отмечается в его спане."""
+        exporter = FakeExporter()
+        tracer = Tracer(exporter=exporter, sample_ratio=1.0)
+        async with make_client(tracer) as client:
+            response = await client.get("/todo_items/0")
+        await tracer.shutdown()
+
+        spans = {span["name"]: span for span in exporter.spans}
+        assert response.status_code == 404
+        assert spans["FakeService.get"]["status"]["code"] == 2
+        assert {"key": "exception.type", "value": {"stringValue": "HTTPException"}} in spans["FakeService.get"]["attributes"]
+        assert {"key": "http.status_code", "value": {"intValue": "404"}} in spans["GET /todo_items/{todo_item_id}"]["attributes"]
+
+    async def test_disabled(self):
+        """Тест что без экспортёра запросы проходят без трассировки."""
+        tracer = Tracer(exporter=None, sample_ratio=1.0)
+        async with make_client(tracer) as client:
+            response = await client.get("/todo_items/5")
+
+        assert response.status_code == 200
+        assert "traceresponse" not in response.headers
+        assert response.json()["traceparent"] is None
+
+
+class TestTracer:
+    """Тесты пакетной отправки спанов."""
+
+    async def test_batches_and_queue_limit(self):
+        """Тест отправки полными пачками и отбрасывания спанов сверх очереди."""
+        exporter = FakeExporter()
+        tracer = Tracer(exporter=exporter, batch_size=2, max_queue_size=3, flush_interval=3600)
+        root = tracer.start_trace("root", f"00-{INCOMING_TRACE_ID}-{INCOMING_SPAN_ID}-01")
+        for number in range(3):
+            root.child(f"child {number}").end()
+        await tracer.shutdown()
+
+        assert [len(payload["resourceSpans"][0]["scopeSpans"][0]["spans"]) for payload in exporter.payloads] == [2, 1]
+
+        exporter = FakeExporter()
+        tracer = Tracer(exporter=exporter, batch_size=100, max_queue_size=3, flush_interval=3600)
+        root = tracer.start_trace("root", f"00-{INCOMING_TRACE_ID}-{INCOMING_SPAN_ID}-01")
+        for number in range(5):
+            root.child(f"child {number}").end()
+        await tracer.shutdown()
+
+        assert len(exporter.spans) == 3
+
+    async def test_flush_loop_sends_by_time(self):
+        """Тест что неполная пачка уходит по flush_interval без новых спанов."""
+        exporter = FakeExporter()
+        tracer = Tracer(exporter=exporter, batch_size=100, flush_interval=0.05)
+        flush_loop = asyncio.create_task(tracer.run_flush_loop())
+        tracer.start_trace("root", f"00-{INCOMING_TRACE_ID}-{INCOMING_SPAN_ID}-01").end()
+        await asyncio.sleep(0.2)
+        flush_loop.cancel()
+
+        assert [span["name"] for span in exporter.spans] == ["root"]
+        await tracer.shutdown()
+
+    async def test_file_exporter(self, tmp_path):
+        """Тест что файловый экспортёр пишет пачку строкой OTLP JSON."""
+        path = tmp_path / "traces.jsonl"
+        tracer = Tracer(exporter=FileSpanExporter(path=str(path)), service_name="taskpilot-test")
+        root = tracer.start_trace("root", f"00-{INCOMING_TRACE_ID}-{INCOMING_SPAN_ID}-01")
+        root.child("child").end()
+        root.end()
+        await tracer.shutdown()
+
+        lines = path.read_text(encoding="utf-8").splitlines()
+        payload = json.loads(lines[0])
+        assert len(lines) == 1
+        assert payload["resourceSpans"][0]["resource"]["attributes"][0]["value"]["stringValue"] == "taskpilot-test"
+        assert [span["name"] for span in payload["resourceSpans"][0]["scopeSpans"][0]["spans"]] == ["child", "root"]
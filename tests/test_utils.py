@@ -1,8 +1,73 @@
 """Вспомогательные утилиты для тестов."""
 
+from datetime import timedelta
 from typing import Optional
+from uuid import UUID, uuid4
 
-from httpx import AsyncClient
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from app.auth.jwt import create_access_token
+
+
+class FakeRedis:
+    """
+    Замена Redis в памяти для тестов без сервера: строки, счётчики и TTL последней записи ключа (ttls).
+    register_script выполняет скрипт снятия блокировки владельцем (compare-and-delete);
+    тесты других скриптов переопределяют его в подклассе.
+    """
+
+    def __init__(self):
+        self.data: dict[str, bytes] = {}
+        self.ttls: dict[str, float] = {}
+
+    @staticmethod
+    def _encode(value) -> bytes:
+        return value if isinstance(value, bytes) else str(value).encode()
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None, px=None, nx=False):
+        if nx and key in self.data:
+            return None
+        self.data[key] = self._encode(value)
+        if ex is not None or px is not None:
+            self.ttls[key] = ex if ex is not None else px / 1000
+        return True
+
+    async def delete(self, *keys):
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+    async def exists(self, key):
+        return int(key in self.data)
+
+    async def incr(self, key):
+        value = int(self.data.get(key, b"0")) + 1
+        self.data[key] = self._encode(value)
+        return value
+
+    def register_script(self, script):
+        async def release(keys, args):
+            if self.data.get(keys[0]) == self._encode(args[0]):
+                return await self.delete(keys[0])
+            return 0
+        return release
+
+
+def asgi_client(app: FastAPI) -> AsyncClient:
+    """
+    Клиент тестового приложения без сервера.
+    """
+    return AsyncClient(transport=ASGITransport(app=app), base_url="http://test")
+
+
+def bearer_headers(user_id: UUID | None = None) -> dict[str, str]:
+    """
+    Заголовок с токеном доступа пользователя user_id (по умолчанию — нового); пользователя в базе нет.
+    """
+    token = create_access_token({"sub": str(user_id or uuid4())}, timedelta(minutes=5))
+    return {"Authorization": f"Bearer {token}"}
 
 
 async def register_user(
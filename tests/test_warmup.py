@@ -0,0 +1,88 @@
+"""Тесты прогрева процесса и готовности GET /ready."""
+
+import asyncio
+
+from httpx import ASGITransport, AsyncClient
+
+from app import warmup
+from app.database.models.enums import CategoryName
+from app.database.models.todo_category import TodoCategory
+from app.main import create_app
+from app.repositories.todo_item import TodoItemRepository, category_map
+from app.settings import settings
+
+
+def make_settings(**overrides):
+    return settings.model_copy(update={
+        "RATE_LIMIT_ENABLED": False, "IDEMPOTENCY_ENABLED": False, "WARMUP_BCRYPT": False, **overrides
+    })
+
+
+class TestWarmUp:
+    """Тесты шагов прогрева."""
+
+    async def test_failed_and_slow_steps_do_not_block_readiness(self, monkeypatch):
+        """Тест что ошибка шага записывается, шаг по таймауту прерывается, а процесс становится готовым."""
+        async def failing(redis):
+            raise ConnectionError("redis недоступен")
+
+        async def slow(databases, connections):
+            await asyncio.sleep(10)
+
+        monkeypatch.setattr(warmup, "warm_redis", failing)
+        monkeypatch.setattr(warmup, "warm_database", slow)
+        state = warmup.WarmupState()
+
+        await warmup.warm_up(state, make_settings(WARMUP_TIMEOUT=0.05), databases=None, redis=None)
+
+        assert state.ready
+        assert "serializers" in state.durations_ms
+        assert "ConnectionError" in state.errors["redis"]
+        assert state.errors["database"] == "timeout"
+
+    async def test_category_map_skips_query(self):
+        """Тест что категория из заполненной карты возвращается без запроса к базе."""
+        category = TodoCategory(id=warmup.WARMUP_ID, name=CategoryName.work)
+        category_map[CategoryName.work] = category
+        try:
+            found = await TodoItemRepository(db=None).check_category_exists(CategoryName.work)
+        finally:
+            category_map.clear()
+
+        assert found is category
+
+
+class TestReadiness:
+    """Тесты эндпоинта готовности."""
+
+    async def test_ready_after_warm_up(self, monkeypatch):
+        """Тест что /ready отвечает 503 до прогрева и 200 после него."""
+        release = asyncio.Event()
+
+        async def blocked(redis):
+            await release.wait()
+
+        monkeypatch.setattr(warmup, "warm_redis", blocked)
+        app = create_app(make_settings(REPOSITORY_BACKEND="memory"))
+
+        async with app.router.lifespan_context(app):
+            async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+                warming = await client.get("/ready")
+                release.set()
+                while not app.state.warmup.ready:
+                    await asyncio.sleep(0.001)
+                ready = await client.get("/ready")
+
+        assert warming.status_code == 503
+        assert warming.json()["status"] == "warming_up"
+        assert ready.status_code == 200
+        assert set(ready.json()["warmup"]["durations_ms"]) == {"redis", "serializers"}
+
+    async def test_ready_without_warm_up(self):
+        """Тест что с выключенным прогревом процесс готов сразу."""
+        app = create_app(make_settings(WARMUP_ENABLED=False))
+
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            response = await client.get("/ready")
+
+        assert response.status_code == 200